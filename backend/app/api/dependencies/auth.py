@@ -11,6 +11,7 @@ from app.core.rbac import is_valid_role
 from app.core.security import SecurityError, decode_token
 from app.infra.db.repositories.user_repository import UserRepository
 from app.infra.db.session import get_db_session
+from app.services.auth.user_status_cache import CachedUserStatus, user_status_cache
 
 
 class UserAuthenticationError(ApiHttpError):
@@ -71,7 +72,7 @@ def require_authenticated_user(
             details={"role": str(role)},
         )
 
-    user = UserRepository(db).get_by_id(int(subject))
+    user = _load_user_status(db, int(subject), token_role=role)
     if user is None:
         raise UserAuthenticationError(
             code="invalid_token",
@@ -96,6 +97,31 @@ def require_authenticated_user(
     )
 
 
+def _load_user_status(db: Session, user_id: int, *, token_role: str) -> CachedUserStatus | None:
+    """Statut de l'utilisateur depuis le cache, relu en base si absent.
+
+    Une entrée dont le rôle diffère de celui du jeton (id recyclé, rôle modifié)
+    est ignorée et rafraîchie.
+    """
+    cached = user_status_cache.get(user_id)
+    if cached is not None and cached.role == token_role:
+        return cached
+
+    token = user_status_cache.begin()
+    user = UserRepository(db).get_by_id(user_id)
+    if user is None:
+        return None
+    status = CachedUserStatus(
+        id=user.id,
+        role=user.role,
+        email=user.email,
+        created_at=user.created_at,
+        is_suspended=user.is_suspended,
+    )
+    user_status_cache.set(status.id, status, token)
+    return status
+
+
 def require_admin_user(
     user: AuthenticatedUser = Depends(require_authenticated_user),
 ) -> AuthenticatedUser:
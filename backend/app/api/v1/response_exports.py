@@ -1,34 +1,132 @@
-"""Fabriques de réponses HTTP pour les exports de l'API v1."""
+"""Fabriques de réponses HTTP pour les exports de l'API v1.
+
+Les exports sont produits en flux: les lignes sont sérialisées par blocs de
+`_FLUSH_CHARS` caractères au fil de la lecture, sans matérialiser le jeu complet.
+"""
 
 from __future__ import annotations
 
 import csv
 import io
-from typing import Any
+import json
+import zlib
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Literal
 
 from fastapi.responses import StreamingResponse
 
+ExportFormat = Literal["csv", "ndjson"]
+ExportCompression = Literal["none", "gzip"]
+
+# Taille cible d'un bloc envoyé au client avant compression.
+_FLUSH_CHARS = 64 * 1024
+_MEDIA_TYPES: dict[str, str] = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_csv_chunks(rows: Iterable[Mapping[str, Any]], fieldnames: list[str]) -> Iterator[str]:
+    """Sérialise les lignes en CSV (en-tête compris) par blocs successifs."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= _FLUSH_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
-def generate_csv_response(
-    rows: list[dict[str, Any]],
+def iter_ndjson_chunks(rows: Iterable[Mapping[str, Any]], fieldnames: list[str]) -> Iterator[str]:
+    """Sérialise les lignes en NDJSON (un objet JSON par ligne) par blocs successifs."""
+    lines: list[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(
+            {name: row.get(name) for name in fieldnames},
+            default=_json_default,
+            ensure_ascii=False,
+        )
+        lines.append(line)
+        size += len(line) + 1
+        if size >= _FLUSH_CHARS:
+            yield "\n".join(lines) + "\n"
+            lines, size = [], 0
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Compresse un flux texte UTF-8 au format gzip sans le bufferiser entièrement."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export_response(
+    rows: Iterable[Mapping[str, Any]],
     fieldnames: list[str],
-    filename: str,
+    basename: str,
     *,
+    export_format: ExportFormat = "csv",
+    compression: ExportCompression = "none",
+    on_complete: Callable[[int, bool], None] | None = None,
     extra_headers: dict[str, str] | None = None,
 ) -> StreamingResponse:
-    """Construit une réponse CSV téléchargeable pour les routeurs API v1."""
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(rows)
-    output.seek(0)
+    """Construit une réponse d'export en flux (CSV ou NDJSON, gzip optionnel).
+
+    Le nom du fichier est `basename` suffixé du format (`.csv`, `.ndjson`) puis de
+    `.gz` si compressé. `on_complete(rows_sent, completed)` est appelé à la fin du flux,
+    y compris s'il est interrompu (client déconnecté, erreur de lecture): `rows_sent`
+    compte alors les lignes des blocs déjà remis au serveur et `completed` vaut False.
+    """
+    row_count = 0
+
+    def counted_rows() -> Iterator[Mapping[str, Any]]:
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    def body() -> Iterator[str | bytes]:
+        serializer = iter_csv_chunks if export_format == "csv" else iter_ndjson_chunks
+        text_chunks = serializer(counted_rows(), fieldnames)
+        chunks: Iterable[str | bytes] = (
+            iter_gzip_chunks(text_chunks) if compression == "gzip" else text_chunks
+        )
+        rows_sent = 0
+        completed = False
+        try:
+            for chunk in chunks:
+                rows_sent = row_count
+                yield chunk
+            rows_sent = row_count
+            completed = True
+        finally:
+            if on_complete is not None:
+                on_complete(rows_sent, completed)
 
+    media_type = _MEDIA_TYPES[export_format]
+    filename = f"{basename}.{export_format}"
+    if compression == "gzip":
+        filename = f"{filename}.gz"
+        media_type = "application/gzip"
     headers = {"Content-Disposition": f"attachment; filename={filename}"}
     if extra_headers:
         headers.update(extra_headers)
 
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers=headers,
-    )
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
@@ -6,11 +6,12 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
 from app.api.dependencies.auth import AuthenticatedUser, require_admin_user
-from app.api.v1.response_exports import generate_csv_response
+from app.api.v1.response_exports import stream_export_response
+from app.core.config import settings
 from app.core.request_id import resolve_request_id
 from app.infra.db.models.billing import BillingPlanModel, UserSubscriptionModel
 from app.infra.db.models.stripe_billing import StripeBillingProfileModel
@@ -26,6 +27,38 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/v1/admin/exports", tags=["admin-exports"])
 
 
+def _stream_export(
+    db: Session,
+    stmt: Select[Any],
+    *,
+    request_id: str,
+    current_user: AuthenticatedUser,
+    export_type: str,
+    payload: AdminExportRequest,
+    fieldnames: list[str],
+    basename: str,
+) -> Any:
+    """Diffuse le résultat par lots `yield_per` et audite le volume envoyé, même interrompu."""
+    if settings.admin_export_max_rows:
+        stmt = stmt.limit(settings.admin_export_max_rows)
+    result = db.execute(stmt.execution_options(yield_per=settings.admin_export_batch_size))
+    filters = payload.model_dump(mode="json")
+
+    def record_audit(row_count: int, completed: bool) -> None:
+        _record_export_audit(
+            db, request_id, current_user, export_type, row_count, filters, completed=completed
+        )
+
+    return stream_export_response(
+        result.mappings(),
+        fieldnames,
+        basename,
+        export_format=payload.format,
+        compression=payload.compression,
+        on_complete=record_audit,
+    )
+
+
 @router.post("/users")
 def export_users(
     request: Request,
@@ -47,8 +80,7 @@ def export_users(
             StripeBillingProfileModel.stripe_customer_id,
         )
         .outerjoin(StripeBillingProfileModel, StripeBillingProfileModel.user_id == UserModel.id)
-        .order_by(UserModel.created_at.desc())
-        .limit(5000)
+        .order_by(UserModel.created_at.desc(), UserModel.id.desc())
     )
 
     if payload.period:
@@ -57,20 +89,6 @@ def export_users(
         if payload.period.end:
             stmt = stmt.where(UserModel.created_at <= payload.period.end)
 
-    results = db.execute(stmt).all()
-    rows = [dict(r._mapping) for r in results]
-
-    # 1. Audit
-    _record_export_audit(
-        db,
-        request_id,
-        current_user,
-        "users",
-        len(rows),
-        payload.model_dump(mode="json"),
-    )
-
-    # 2. Return CSV
     fieldnames = [
         "id",
         "email",
@@ -82,7 +100,16 @@ def export_users(
         "subscription_status",
         "stripe_customer_id",
     ]
-    return generate_csv_response(rows, fieldnames, "users_export.csv")
+    return _stream_export(
+        db,
+        stmt,
+        request_id=request_id,
+        current_user=current_user,
+        export_type="users",
+        payload=payload,
+        fieldnames=fieldnames,
+        basename="users_export",
+    )
 
 
 @router.post("/billing")
@@ -105,8 +132,7 @@ def export_billing(
         )
         .join(UserModel, UserModel.id == UserSubscriptionModel.user_id)
         .join(BillingPlanModel, BillingPlanModel.id == UserSubscriptionModel.plan_id)
-        .order_by(UserSubscriptionModel.created_at.desc())
-        .limit(5000)
+        .order_by(UserSubscriptionModel.created_at.desc(), UserSubscriptionModel.id.desc())
     )
 
     if payload.period:
@@ -115,20 +141,6 @@ def export_billing(
         if payload.period.end:
             stmt = stmt.where(UserSubscriptionModel.created_at <= payload.period.end)
 
-    results = db.execute(stmt).all()
-    rows = [dict(r._mapping) for r in results]
-
-    # 1. Audit
-    _record_export_audit(
-        db,
-        request_id,
-        current_user,
-        "billing",
-        len(rows),
-        payload.model_dump(mode="json"),
-    )
-
-    # 2. Return CSV
     fieldnames = [
         "user_id",
         "email",
@@ -138,4 +150,13 @@ def export_billing(
         "started_at",
         "failure_reason",
     ]
-    return generate_csv_response(rows, fieldnames, "billing_export.csv")
+    return _stream_export(
+        db,
+        stmt,
+        request_id=request_id,
+        current_user=current_user,
+        export_type="billing",
+        payload=payload,
+        fieldnames=fieldnames,
+        basename="billing_export",
+    )
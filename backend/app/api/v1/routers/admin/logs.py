@@ -8,6 +8,8 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.api.dependencies.auth import AuthenticatedUser, require_admin_user
+from app.core.request_id import resolve_request_id
+from app.infra.db.keyset import CountMode, count_rows, keyset_after, next_cursor_for
 from app.infra.db.models.audit_event import AuditEventModel
 from app.infra.db.models.product_entitlements import (
     FeatureCatalogModel,
@@ -26,6 +28,7 @@ from app.services.api_contracts.admin.logs import (
     AdminStripeEventsResponse,
 )
 from app.services.ops.admin_logs import (
+    _decode_cursor,
     _mask_email,
 )
 
@@ -38,19 +41,27 @@ router = APIRouter(prefix="/v1/admin/logs", tags=["admin-logs"])
 def get_app_errors(
     request: Request,
     limit: int = Query(default=50, le=100),
+    cursor: str | None = Query(default=None, max_length=256),
     current_user: AuthenticatedUser = Depends(require_admin_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
     """
-    Get application errors from audit logs.
+    Get application errors from audit logs, newest first.
+
+    Pass back ``next_cursor`` as ``cursor`` to read the following page.
     """
+    keyset_cursor = _decode_cursor(cursor, resolve_request_id(request))
     stmt = (
         select(AuditEventModel)
         .where(AuditEventModel.status == "error")
-        .order_by(AuditEventModel.created_at.desc())
+        .order_by(AuditEventModel.created_at.desc(), AuditEventModel.id.desc())
         .limit(limit)
     )
-    results = db.scalars(stmt).all()
+    if keyset_cursor is not None:
+        stmt = stmt.where(
+            keyset_after(AuditEventModel.created_at, AuditEventModel.id, keyset_cursor)
+        )
+    results = list(db.scalars(stmt).all())
 
     data = [
         {
@@ -64,7 +75,11 @@ def get_app_errors(
         for result in results
     ]
 
-    return {"data": data, "total": len(data)}
+    return {
+        "data": data,
+        "total": len(data),
+        "next_cursor": next_cursor_for(results, page_size=limit, sort_attr="created_at"),
+    }
 
 
 @router.get("/stripe", response_model=AdminStripeEventsResponse)
@@ -72,20 +87,38 @@ def get_stripe_events(
     request: Request,
     status: str | None = Query(default=None),
     limit: int = Query(default=50, le=100),
+    cursor: str | None = Query(default=None, max_length=256),
+    count: CountMode = Query(default="exact"),
     current_user: AuthenticatedUser = Depends(require_admin_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
     """
-    Get Stripe webhook events history.
+    Get Stripe webhook events history, newest first.
+
+    ``count=estimated`` reads the planner estimate and ``count=none`` skips the total.
     """
-    stmt = select(StripeWebhookEventModel).order_by(StripeWebhookEventModel.received_at.desc())
+    keyset_cursor = _decode_cursor(cursor, resolve_request_id(request))
+    stmt = select(StripeWebhookEventModel)
     if status:
         stmt = stmt.where(StripeWebhookEventModel.status == status)
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
-    results = db.scalars(stmt.limit(limit)).all()
+    total = count_rows(db, stmt, count)
+    stmt = stmt.order_by(
+        StripeWebhookEventModel.received_at.desc(), StripeWebhookEventModel.id.desc()
+    )
+    if keyset_cursor is not None:
+        stmt = stmt.where(
+            keyset_after(
+                StripeWebhookEventModel.received_at, StripeWebhookEventModel.id, keyset_cursor
+            )
+        )
+    results = list(db.scalars(stmt.limit(limit)).all())
 
-    return {"data": results, "total": total or 0}
+    return {
+        "data": results,
+        "total": total,
+        "next_cursor": next_cursor_for(results, page_size=limit, sort_attr="received_at"),
+    }
 
 
 @router.get("/quota-alerts", response_model=AdminQuotaAlertsResponse)
@@ -51,6 +51,8 @@ router = APIRouter(prefix="/v1/ops/b2b/entitlements/repair", tags=["ops-b2b-enti
 def run_repair(
     request: Request,
     dry_run: bool = Query(default=False),
+    start_after_account_id: int | None = Query(default=None, ge=0),
+    max_accounts: int | None = Query(default=None, ge=1),
     current_user: AuthenticatedUser = Depends(require_authenticated_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
@@ -64,7 +66,12 @@ def run_repair(
     if limit_error is not None:
         return limit_error
 
-    report = B2BEntitlementRepairService.run_auto_repair(db, dry_run=dry_run)
+    report = B2BEntitlementRepairService.run_auto_repair(
+        db,
+        dry_run=dry_run,
+        start_after_account_id=start_after_account_id,
+        max_accounts=max_accounts,
+    )
 
     return {
         "data": {
@@ -83,6 +90,7 @@ def run_repair(
                 for b in report.remaining_blockers
             ],
             "dry_run": report.dry_run,
+            "next_account_id": report.next_account_id,
         },
         "meta": {"request_id": request_id},
     }
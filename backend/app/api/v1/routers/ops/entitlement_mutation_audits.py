@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.api.dependencies.auth import AuthenticatedUser, require_authenticated_user
 from app.core.datetime_provider import datetime_provider
 from app.core.request_id import resolve_request_id
+from app.infra.db.keyset import CountMode, next_cursor_for
 from app.infra.db.models.entitlement_mutation.alert.alert_event import (
     CanonicalEntitlementMutationAlertEventModel,
 )
@@ -54,6 +55,7 @@ from app.services.canonical_entitlement.alert.handling import (
 )
 from app.services.canonical_entitlement.audit.api_mutation_audits import (
     _alert_event_to_item,
+    _decode_cursor_param,
     _enforce_limits,
     _ensure_ops_role,
     _load_active_rule_applications_by_event_ids,
@@ -97,8 +99,6 @@ PersistedReviewStatusLiteral = WritableReviewStatusLiteral
 # Endpoints
 # ---------------------------------------------------------------------------
 
-_DIFF_FILTER_MAX = 10_000
-
 
 @router.get(
     "/mutation-audits",
@@ -135,6 +135,8 @@ def list_mutation_audits(
     # Filtre review (61.35)
     review_status_filter: ReviewStatusLiteral | None = Query(default=None, alias="review_status"),
     include_payloads: bool = Query(default=False),
+    cursor: str | None = Query(default=None, max_length=256),
+    count: CountMode = Query(default="exact"),
     current_user: AuthenticatedUser = Depends(require_authenticated_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
@@ -159,6 +161,8 @@ def list_mutation_audits(
         changed_field_filter=changed_field_filter,
         review_status_filter=review_status_filter,
         include_payloads=include_payloads,
+        cursor=cursor,
+        count_mode=count,
     )
 
 
@@ -204,30 +208,10 @@ def get_review_queue_summary(
     ) is not None:
         return err
 
-    # Check SQL count before building rows (to avoid large diff processing)
-    _, sql_count = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-        db,
-        page=1,
-        page_size=1,
-        feature_code=feature_code,
-        actor_type=actor_type,
-        actor_identifier=actor_identifier,
-        date_from=date_from,
-        date_to=date_to,
-    )
-    if sql_count > _DIFF_FILTER_MAX:
-        return _raise_error(
-            status_code=400,
-            request_id=request_id,
-            code="diff_filter_result_set_too_large",
-            message=f"Too many results ({sql_count} > {_DIFF_FILTER_MAX}). Add filters to narrow.",
-            details={"sql_count": sql_count, "max_allowed": _DIFF_FILTER_MAX},
-        )
-
-    now_utc = datetime_provider.utcnow()
-    rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
+    # Synthèse agrégée en SQL sur la review queue matérialisée.
+    summary = CanonicalEntitlementReviewQueueService.get_review_queue_summary(
         db,
-        now_utc=now_utc,
+        now_utc=datetime_provider.utcnow(),
         risk_level=risk_level_filter,
         effective_review_status=effective_review_status_filter,
         feature_code=feature_code,
@@ -237,11 +221,8 @@ def get_review_queue_summary(
         date_from=date_from,
         date_to=date_to,
         sla_status=sla_status_filter,
-        max_sql_rows=_DIFF_FILTER_MAX,
     )
 
-    summary = CanonicalEntitlementReviewQueueService.summarize_review_queue_rows(rows)
-
     return {
         "data": {
             "pending_review_count": summary.pending_review_count,
@@ -302,46 +283,30 @@ def get_review_queue(
     ) is not None:
         return err
 
-    # Check SQL count
-    _, sql_count = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-        db,
-        page=1,
-        page_size=1,
-        feature_code=feature_code,
-        actor_type=actor_type,
-        actor_identifier=actor_identifier,
-        date_from=date_from,
-        date_to=date_to,
-    )
-    if sql_count > _DIFF_FILTER_MAX:
-        return _raise_error(
-            status_code=400,
-            request_id=request_id,
-            code="diff_filter_result_set_too_large",
-            message=f"Too many results ({sql_count} > {_DIFF_FILTER_MAX}). Add filters to narrow.",
-            details={"sql_count": sql_count, "max_allowed": _DIFF_FILTER_MAX},
-        )
-
+    # Statut SLA, tri métier et pagination résolus en SQL sur la review queue matérialisée.
     now_utc = datetime_provider.utcnow()
-    rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
+    queue_filters: dict[str, Any] = {
+        "risk_level": risk_level_filter,
+        "effective_review_status": effective_review_status_filter,
+        "feature_code": feature_code,
+        "actor_type": actor_type,
+        "actor_identifier": actor_identifier,
+        "incident_key": incident_key_filter,
+        "date_from": date_from,
+        "date_to": date_to,
+        "sla_status": sla_status_filter,
+    }
+    total_count = CanonicalEntitlementReviewQueueService.count_review_queue_rows(
+        db, now_utc=now_utc, **queue_filters
+    )
+    page_rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
         db,
         now_utc=now_utc,
-        risk_level=risk_level_filter,
-        effective_review_status=effective_review_status_filter,
-        feature_code=feature_code,
-        actor_type=actor_type,
-        actor_identifier=actor_identifier,
-        incident_key=incident_key_filter,
-        date_from=date_from,
-        date_to=date_to,
-        sla_status=sla_status_filter,
-        max_sql_rows=_DIFF_FILTER_MAX,
+        limit=page_size,
+        offset=(page - 1) * page_size,
+        **queue_filters,
     )
 
-    total_count = len(rows)
-    start = (page - 1) * page_size
-    page_rows = rows[start : start + page_size]
-
     return {
         "data": {
             "items": [_row_to_queue_item(row) for row in page_rows],
@@ -448,6 +413,8 @@ def list_alert_events(
     request_id_filter: str | None = Query(default=None, alias="request_id"),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None, max_length=256),
+    count: CountMode = Query(default="exact"),
     current_user: AuthenticatedUser = Depends(require_authenticated_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
@@ -467,10 +434,13 @@ def list_alert_events(
     ) is not None:
         return err
 
+    keyset_cursor = _decode_cursor_param(cursor, request_id)
     rows, total_count = CanonicalEntitlementAlertQueryService.list_alert_events(
         db,
         page=page,
         page_size=page_size,
+        cursor=keyset_cursor,
+        count_mode=count,
         alert_kind=alert_kind,
         delivery_status=delivery_status,
         audit_id=audit_id,
@@ -499,6 +469,9 @@ def list_alert_events(
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor_for(
+                [row.event for row in rows], page_size=page_size, sort_attr="created_at"
+            ),
         },
         "meta": {"request_id": request_id},
     }
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.api.dependencies.auth import AuthenticatedUser, require_authenticated_user
 from app.core.request_id import resolve_request_id
+from app.infra.db.keyset import CountMode
 from app.infra.db.session import get_db_session
 from app.services.api_contracts.common import ErrorEnvelope
 from app.services.api_contracts.public.audit import (
@@ -46,6 +47,8 @@ def list_audit_events(
     target_user_id: int | None = Query(default=None),
     limit: int = Query(default=50),
     offset: int = Query(default=0),
+    cursor: str | None = Query(default=None, max_length=256),
+    count: CountMode = Query(default="exact"),
     current_user: AuthenticatedUser = Depends(require_authenticated_user),
     db: Session = Depends(get_db_session),
 ) -> Any:
@@ -70,6 +73,8 @@ def list_audit_events(
             date_to=date_to,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            count_mode=count,
         )
         result = AuditService.list_events(db, filters=filters)
         return {"data": result.model_dump(mode="json"), "meta": {"request_id": request_id}}
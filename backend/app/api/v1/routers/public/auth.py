@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.api.dependencies.auth import AuthenticatedUser, require_authenticated_user
 from app.api.errors import build_error_response
 from app.core.config import settings
+from app.core.rate_limit import RateLimitError
 from app.core.request_id import resolve_request_id
 from app.infra.db.session import get_db_session
 from app.services.api_contracts.common import ErrorEnvelope
@@ -21,9 +22,11 @@ from app.services.api_contracts.public.auth import (
     RefreshRequest,
     RegisterRequest,
 )
+from app.services.auth.password_hasher import PasswordHashingUnavailableError
 from app.services.auth.public_support import (
     AuditWriteError,
     _audit_unavailable_response,
+    _enforce_password_attempt_admission,
     _record_audit_event,
     _resolve_refresh_actor,
 )
@@ -34,6 +37,35 @@ router = APIRouter(prefix="/v1/auth", tags=["auth"])
 logger = logging.getLogger(__name__)
 
 
+def _password_admission_error(request: Request, request_id: str, operation: str) -> Any:
+    client_ip = request.client.host if request.client is not None else "unknown"
+    try:
+        _enforce_password_attempt_admission(client_ip=client_ip, operation=operation)
+    except RateLimitError as error:
+        return build_error_response(
+            status_code=429,
+            request_id=request_id,
+            code=error.code,
+            message=error.message,
+            details=error.details,
+            headers={"Retry-After": error.details["retry_after"]},
+        )
+    return None
+
+
+def _password_hashing_unavailable_response(
+    request_id: str, error: PasswordHashingUnavailableError
+) -> Any:
+    return build_error_response(
+        status_code=503,
+        request_id=request_id,
+        code=error.code,
+        message=error.message,
+        details=error.details,
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.get(
     "/me",
     response_model=AuthMeApiResponse,
@@ -71,6 +103,9 @@ def register(
     db: Session = Depends(get_db_session),
 ) -> Any:
     request_id = resolve_request_id(request)
+    admission_error = _password_admission_error(request, request_id, "register")
+    if admission_error is not None:
+        return admission_error
     try:
         auth_response = AuthService.register(db, email=payload.email, password=payload.password)
         _record_audit_event(
@@ -145,6 +180,9 @@ def register(
             message=error.message,
             details=error.details,
         )
+    except PasswordHashingUnavailableError as error:
+        db.rollback()
+        return _password_hashing_unavailable_response(request_id, error)
     except AuditWriteError:
         db.rollback()
         return _audit_unavailable_response(request_id)
@@ -157,6 +195,9 @@ def register(
 )
 def login(request: Request, payload: LoginRequest, db: Session = Depends(get_db_session)) -> Any:
     request_id = resolve_request_id(request)
+    admission_error = _password_admission_error(request, request_id, "login")
+    if admission_error is not None:
+        return admission_error
     try:
         auth_response = AuthService.login(db, email=payload.email, password=payload.password)
         _record_audit_event(
@@ -193,6 +234,9 @@ def login(request: Request, payload: LoginRequest, db: Session = Depends(get_db_
             message=error.message,
             details=error.details,
         )
+    except PasswordHashingUnavailableError as error:
+        db.rollback()
+        return _password_hashing_unavailable_response(request_id, error)
     except AuditWriteError:
         db.rollback()
         return _audit_unavailable_response(request_id)
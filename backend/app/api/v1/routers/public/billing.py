@@ -50,6 +50,7 @@ from app.services.billing.stripe_customer_portal_service import (
     StripeCustomerPortalService,
     StripeCustomerPortalServiceError,
 )
+from app.services.billing.stripe_webhook_inbox import StripeWebhookInboxService
 from app.services.billing.stripe_webhook_service import (
     StripeWebhookService,
     StripeWebhookServiceError,
@@ -653,8 +654,12 @@ async def stripe_webhook(
             payload_bytes, sig_header, settings.stripe_webhook_secret
         )
 
-        # 1. Traitement métier (prioritaire)
-        status = StripeWebhookService.handle_event(db, event)
+        # 1. Inbox: persistance en `received` et ack immédiat, traitement par les workers.
+        #    Sinon traitement métier inline (prioritaire).
+        if settings.stripe_webhook_inbox_enabled:
+            status = StripeWebhookInboxService.enqueue(db, event)
+        else:
+            status = StripeWebhookService.handle_event(db, event)
         db.commit()
         if status == "failed_internal":
             logger.warning(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -25,6 +26,7 @@ from app.services.api_contracts.public.geocoding import (
     GeocodingResolveRequest,
     ReverseGeocodingRequest,
 )
+from app.services.geocoding.place_index import geo_place_index, indexed_place_from_model
 from app.services.geocoding.public_support import (
     _normalize_query,
     _raise_error,
@@ -44,6 +46,46 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/v1/geocoding", tags=["geocoding"])
 
 
+def _persist_resolved_place(
+    db: Session, provider: str, snapshot: GeocodingSearchResult
+) -> dict[str, Any]:
+    """Retrouve ou crée le lieu résolu, valide la transaction et le sérialise.
+
+    La sérialisation reste dans ce thread: après commit, la relecture des attributs
+    expirés interroge la base.
+    """
+    repo = GeoPlaceResolvedRepository(db)
+    try:
+        resolved, _ = repo.find_or_create(
+            data=GeoPlaceResolvedCreateData(
+                provider=provider,
+                provider_place_id=snapshot.provider_place_id,
+                display_name=snapshot.display_name,
+                latitude=snapshot.lat,
+                longitude=snapshot.lon,
+                osm_type=snapshot.osm_type,
+                osm_id=snapshot.osm_id,
+                place_type=snapshot.type,
+                place_class=snapshot.class_,
+                importance=snapshot.importance,
+                place_rank=snapshot.place_rank,
+                country_code=snapshot.address.country_code,
+                country=snapshot.address.country,
+                state=snapshot.address.state,
+                county=snapshot.address.county,
+                city=snapshot.address.city,
+                postcode=snapshot.address.postcode,
+                raw_payload=snapshot.model_dump(mode="json", by_alias=True),
+            )
+        )
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    geo_place_index.remember(indexed_place_from_model(resolved))
+    return _resolved_place_to_dict(resolved)
+
+
 @router.get(
     "/search",
     response_model=None,
@@ -56,7 +98,7 @@ router = APIRouter(prefix="/v1/geocoding", tags=["geocoding"])
         503: {"model": ErrorEnvelope},
     },
 )
-def search_places(
+async def search_places(
     request: Request,
     q: str = Query(..., description="Requête de recherche de lieu"),
     limit: int = Query(default=5, description="Nombre max de résultats (1-10)"),
@@ -101,7 +143,7 @@ def search_places(
     normalized_lang = lang.strip().lower() if lang else None
 
     try:
-        results = GeocodingService.search_with_cache(
+        results = await GeocodingService.search_with_cache(
             db,
             normalized,
             clamped_limit,
@@ -175,7 +217,7 @@ def get_resolved_place(
         500: {"model": ErrorEnvelope},
     },
 )
-def resolve_place(
+async def resolve_place(
     request: Request,
     payload: GeocodingResolveRequest,
     db: Session = Depends(get_db_session),
@@ -184,7 +226,7 @@ def resolve_place(
 
     if payload.snapshot is None:
         try:
-            snapshot = GeocodingService.resolve_place_snapshot(
+            snapshot = await GeocodingService.resolve_place_snapshot(
                 provider=payload.provider,
                 provider_place_id=payload.provider_place_id,
             )
@@ -224,33 +266,10 @@ def resolve_place(
             details={"reason": str(err)},
         )
 
-    repo = GeoPlaceResolvedRepository(db)
     try:
-        resolved, _ = repo.find_or_create(
-            data=GeoPlaceResolvedCreateData(
-                provider=payload.provider,
-                provider_place_id=snapshot.provider_place_id,
-                display_name=snapshot.display_name,
-                latitude=snapshot.lat,
-                longitude=snapshot.lon,
-                osm_type=snapshot.osm_type,
-                osm_id=snapshot.osm_id,
-                place_type=snapshot.type,
-                place_class=snapshot.class_,
-                importance=snapshot.importance,
-                place_rank=snapshot.place_rank,
-                country_code=snapshot.address.country_code,
-                country=snapshot.address.country,
-                state=snapshot.address.state,
-                county=snapshot.address.county,
-                city=snapshot.address.city,
-                postcode=snapshot.address.postcode,
-                raw_payload=snapshot.model_dump(mode="json", by_alias=True),
-            )
-        )
-        db.commit()
+        # Session synchrone: la persistance tourne hors de la boucle d'événements.
+        data = await asyncio.to_thread(_persist_resolved_place, db, payload.provider, snapshot)
     except SQLAlchemyError:
-        db.rollback()
         return _raise_error(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             request_id=request_id,
@@ -258,8 +277,7 @@ def resolve_place(
             message="resolved place could not be persisted",
             details={},
         )
-
-    return {"data": _resolved_place_to_dict(resolved), "meta": {"request_id": request_id}}
+    return {"data": data, "meta": {"request_id": request_id}}
 
 
 @router.post(
@@ -272,7 +290,7 @@ def resolve_place(
         503: {"model": ErrorEnvelope},
     },
 )
-def reverse_geocode(
+async def reverse_geocode(
     request: Request,
     payload: ReverseGeocodingRequest,
     lang: str | None = Query(default=None, description="Langue de réponse (ex: fr, en)"),
@@ -282,7 +300,7 @@ def reverse_geocode(
     normalized_lang = lang.strip().lower() if lang else None
 
     try:
-        result = GeocodingService.reverse(
+        result = await GeocodingService.reverse(
             lat=payload.lat,
             lon=payload.lon,
             lang=normalized_lang,
@@ -311,7 +329,7 @@ def reverse_geocode(
             "country": result.address.country,
             "lat": result.lat,
             "lon": result.lon,
-            "timezone_iana": None,
+            "timezone_iana": GeocodingService.derive_timezone(lat=result.lat, lon=result.lon),
         },
         "meta": {"request_id": request_id},
     }
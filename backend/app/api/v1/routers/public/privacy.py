@@ -4,6 +4,7 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Body, Depends, Request
+from fastapi.responses import FileResponse
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
@@ -156,6 +157,46 @@ def get_export_status(
         )
 
 
+@router.get(
+    "/export/artifact",
+    response_class=FileResponse,
+    responses={
+        401: {"model": ErrorEnvelope},
+        403: {"model": ErrorEnvelope},
+        404: {"model": ErrorEnvelope},
+        429: {"model": ErrorEnvelope},
+    },
+)
+def download_export_artifact(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(require_authenticated_user),
+    db: Session = Depends(get_db_session),
+) -> Any:
+    request_id = resolve_request_id(request)
+    role_error = _ensure_user_role(current_user, request_id)
+    if role_error is not None:
+        return role_error
+    rate_error = _enforce_privacy_limits(
+        user_id=current_user.id,
+        plan_code=None,
+        operation="download_export",
+        request_id=request_id,
+    )
+    if rate_error is not None:
+        return rate_error
+    try:
+        path = PrivacyService.get_export_artifact_path(db, user_id=current_user.id)
+    except PrivacyServiceError as error:
+        return _raise_error(
+            status_code=404,
+            request_id=request_id,
+            code=error.code,
+            message=error.message,
+            details=error.details,
+        )
+    return FileResponse(path, media_type="application/gzip", filename=path.name)
+
+
 @router.post(
     "/delete",
     response_model=PrivacyApiResponse,
@@ -51,6 +51,14 @@ class Settings:
         )
         return "strict"
 
+    @staticmethod
+    def _parse_rate_limit_backend() -> str:
+        raw_backend = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+        if raw_backend in {"memory", "redis"}:
+            return raw_backend
+        logger.warning("rate_limit_invalid_backend backend=%s fallback=memory", raw_backend)
+        return "memory"
+
     @staticmethod
     def _parse_feature_scope_validation_mode() -> str:
         raw_mode = os.getenv("FEATURE_SCOPE_VALIDATION_MODE", "strict").strip().lower()
@@ -231,6 +239,120 @@ class Settings:
         self.billing_subscription_cache_ttl_seconds = float(
             os.getenv("BILLING_SUBSCRIPTION_CACHE_TTL_SECONDS", "5")
         )
+        self.entitlement_plan_cache_ttl_seconds = self._parse_float_env(
+            "ENTITLEMENT_PLAN_CACHE_TTL_SECONDS", default=60.0, minimum=0.0
+        )
+        self.entitlement_subject_cache_ttl_seconds = self._parse_float_env(
+            "ENTITLEMENT_SUBJECT_CACHE_TTL_SECONDS", default=5.0, minimum=0.0
+        )
+        self.entitlement_usage_cache_ttl_seconds = self._parse_float_env(
+            "ENTITLEMENT_USAGE_CACHE_TTL_SECONDS", default=5.0, minimum=0.0
+        )
+        self.entitlement_snapshot_cache_max_subjects = self._parse_int_env(
+            "ENTITLEMENT_SNAPSHOT_CACHE_MAX_SUBJECTS", default=10_000, minimum=1
+        )
+        # Cache du statut des utilisateurs authentifiés par jeton; un TTL à 0 le désactive.
+        self.user_status_cache_ttl_seconds = self._parse_float_env(
+            "USER_STATUS_CACHE_TTL_SECONDS", default=5.0, minimum=0.0
+        )
+        self.user_status_cache_max_entries = self._parse_int_env(
+            "USER_STATUS_CACHE_MAX_ENTRIES", default=50_000, minimum=1
+        )
+        # Cache des clés API B2B vérifiées; un TTL à 0 le désactive.
+        self.b2b_api_key_cache_ttl_seconds = self._parse_float_env(
+            "B2B_API_KEY_CACHE_TTL_SECONDS", default=30.0, minimum=0.0
+        )
+        self.b2b_api_key_cache_max_entries = self._parse_int_env(
+            "B2B_API_KEY_CACHE_MAX_ENTRIES", default=10_000, minimum=1
+        )
+        # Invalidation inter-workers par un compteur de version partagé dans Redis.
+        self.b2b_api_key_cache_redis_invalidation = self._parse_bool_env(
+            "B2B_API_KEY_CACHE_REDIS_INVALIDATION", default=False
+        )
+        self.b2b_api_key_cache_version_check_seconds = self._parse_float_env(
+            "B2B_API_KEY_CACHE_VERSION_CHECK_SECONDS", default=1.0, minimum=0.0
+        )
+        self.b2b_quota_lease_enabled = self._parse_bool_env(
+            "B2B_QUOTA_LEASE_ENABLED", default=False
+        )
+        self.b2b_quota_lease_size = self._parse_int_env(
+            "B2B_QUOTA_LEASE_SIZE", default=100, minimum=1
+        )
+        self.b2b_quota_lease_flush_interval_seconds = self._parse_float_env(
+            "B2B_QUOTA_LEASE_FLUSH_INTERVAL_SECONDS", default=5.0, minimum=0.1
+        )
+        # Reconstruction périodique du ledger de réconciliation B2B; 0 = désactivée.
+        self.b2b_reconciliation_ledger_recompute_interval_seconds = self._parse_float_env(
+            "B2B_RECONCILIATION_LEDGER_RECOMPUTE_INTERVAL_SECONDS", default=3600.0, minimum=0.0
+        )
+        self.b2b_reconciliation_ledger_recompute_batch_size = self._parse_int_env(
+            "B2B_RECONCILIATION_LEDGER_RECOMPUTE_BATCH_SIZE", default=200, minimum=1
+        )
+        # Hachage des mots de passe: paramètres versionnés, pool de processus dédié
+        # (0 worker = hachage dans le thread appelant) et admission par IP avant hachage.
+        self.password_hash_iterations = self._parse_int_env(
+            "PASSWORD_HASH_ITERATIONS", default=120_000, minimum=1_000
+        )
+        self.password_hash_workers = self._parse_int_env(
+            "PASSWORD_HASH_WORKERS", default=2, minimum=0
+        )
+        self.password_hash_max_pending = self._parse_int_env(
+            "PASSWORD_HASH_MAX_PENDING", default=32, minimum=1
+        )
+        self.password_hash_timeout_seconds = self._parse_float_env(
+            "PASSWORD_HASH_TIMEOUT_SECONDS", default=5.0, minimum=0.1
+        )
+        self.auth_password_attempts_per_ip_per_minute = self._parse_int_env(
+            "AUTH_PASSWORD_ATTEMPTS_PER_IP_PER_MINUTE", default=120, minimum=0
+        )
+        # Audit/réparation des droits B2B: lots de comptes (keyset) et workers d'évaluation.
+        self.b2b_entitlement_audit_chunk_size = self._parse_int_env(
+            "B2B_ENTITLEMENT_AUDIT_CHUNK_SIZE", default=500, minimum=1
+        )
+        self.b2b_entitlement_audit_workers = self._parse_int_env(
+            "B2B_ENTITLEMENT_AUDIT_WORKERS", default=4, minimum=1
+        )
+        self.stripe_webhook_inbox_enabled = self._parse_bool_env(
+            "STRIPE_WEBHOOK_INBOX_ENABLED", default=False
+        )
+        self.stripe_webhook_inbox_workers = self._parse_int_env(
+            "STRIPE_WEBHOOK_INBOX_WORKERS", default=4, minimum=1
+        )
+        self.stripe_webhook_inbox_batch_size = self._parse_int_env(
+            "STRIPE_WEBHOOK_INBOX_BATCH_SIZE", default=20, minimum=1
+        )
+        self.stripe_webhook_inbox_poll_interval_seconds = self._parse_float_env(
+            "STRIPE_WEBHOOK_INBOX_POLL_INTERVAL_SECONDS", default=1.0, minimum=0.05
+        )
+        self.stripe_webhook_inbox_max_attempts = self._parse_int_env(
+            "STRIPE_WEBHOOK_INBOX_MAX_ATTEMPTS", default=8, minimum=1
+        )
+        self.stripe_webhook_inbox_retry_base_seconds = self._parse_float_env(
+            "STRIPE_WEBHOOK_INBOX_RETRY_BASE_SECONDS", default=5.0, minimum=0.0
+        )
+        self.stripe_webhook_inbox_stale_claim_seconds = self._parse_float_env(
+            "STRIPE_WEBHOOK_INBOX_STALE_CLAIM_SECONDS", default=300.0, minimum=1.0
+        )
+        # Demandes RGPD traitées par un worker d'arrière-plan plutôt que dans la requête HTTP.
+        self.privacy_jobs_enabled = self._parse_bool_env("PRIVACY_JOBS_ENABLED", default=False)
+        self.privacy_job_poll_interval_seconds = self._parse_float_env(
+            "PRIVACY_JOB_POLL_INTERVAL_SECONDS", default=2.0, minimum=0.05
+        )
+        self.privacy_job_stale_claim_seconds = self._parse_float_env(
+            "PRIVACY_JOB_STALE_CLAIM_SECONDS", default=900.0, minimum=1.0
+        )
+        self.privacy_purge_chunk_size = self._parse_int_env(
+            "PRIVACY_PURGE_CHUNK_SIZE", default=1000, minimum=1
+        )
+        # Répertoire des archives d'export RGPD; vide: répertoire temporaire du système.
+        self.privacy_export_artifact_dir = os.getenv("PRIVACY_EXPORT_ARTIFACT_DIR", "").strip()
+        # Exports admin en flux: 0 = pas de plafond de lignes.
+        self.admin_export_max_rows = self._parse_int_env(
+            "ADMIN_EXPORT_MAX_ROWS", default=0, minimum=0
+        )
+        self.admin_export_batch_size = self._parse_int_env(
+            "ADMIN_EXPORT_BATCH_SIZE", default=1000, minimum=1
+        )
         self.enable_reference_seed_admin_fallback = self._parse_bool_env(
             "ENABLE_REFERENCE_SEED_ADMIN_FALLBACK", default=False
         )
@@ -254,9 +376,51 @@ class Settings:
         self.nominatim_timeout_seconds = self._parse_int_env(
             "NOMINATIM_TIMEOUT_SECONDS", default=10, minimum=1
         )
+        # Politique Nominatim: au plus une requête par seconde et par application.
+        self.nominatim_min_interval_seconds = self._parse_float_env(
+            "NOMINATIM_MIN_INTERVAL_SECONDS", default=1.0, minimum=0.0
+        )
+        self.nominatim_max_queue_wait_seconds = self._parse_float_env(
+            "NOMINATIM_MAX_QUEUE_WAIT_SECONDS", default=5.0, minimum=0.0
+        )
+        self.nominatim_http_max_connections = self._parse_int_env(
+            "NOMINATIM_HTTP_MAX_CONNECTIONS", default=4, minimum=1
+        )
         self.geocoding_cache_ttl_seconds = self._parse_int_env(
             "GEOCODING_CACHE_TTL_SECONDS", default=3600, minimum=1
         )
+        # Cache mémoire devant geocoding_query_cache; 0 entrée le désactive.
+        self.geocoding_memory_cache_max_entries = self._parse_int_env(
+            "GEOCODING_MEMORY_CACHE_MAX_ENTRIES", default=2048, minimum=0
+        )
+        self.geocoding_memory_cache_ttl_seconds = self._parse_int_env(
+            "GEOCODING_MEMORY_CACHE_TTL_SECONDS", default=300, minimum=1
+        )
+        self.geocoding_negative_cache_ttl_seconds = self._parse_int_env(
+            "GEOCODING_NEGATIVE_CACHE_TTL_SECONDS", default=300, minimum=1
+        )
+        self.geocoding_prefix_reuse_enabled = self._parse_bool_env(
+            "GEOCODING_PREFIX_REUSE_ENABLED", default=True
+        )
+        # Purge périodique des lignes expirées de geocoding_query_cache; 0 la désactive.
+        self.geocoding_cache_purge_interval_seconds = self._parse_float_env(
+            "GEOCODING_CACHE_PURGE_INTERVAL_SECONDS", default=3600.0, minimum=0.0
+        )
+        self.geocoding_cache_purge_batch_size = self._parse_int_env(
+            "GEOCODING_CACHE_PURGE_BATCH_SIZE", default=1000, minimum=1
+        )
+        # Index spatial local (géocodage inverse, timezone) chargé au démarrage.
+        self.geo_place_index_enabled = self._parse_bool_env("GEO_PLACE_INDEX_ENABLED", default=True)
+        # Fichier binaire mappé en mémoire; vide: index gardé en mémoire du processus.
+        self.geo_place_index_path = os.getenv("GEO_PLACE_INDEX_PATH", "").strip()
+        # Jeu de villes optionnel au format GeoNames (ex. cities15000.txt).
+        self.geo_place_index_cities_path = os.getenv("GEO_PLACE_INDEX_CITIES_PATH", "").strip()
+        self.geo_place_index_reverse_max_km = self._parse_float_env(
+            "GEO_PLACE_INDEX_REVERSE_MAX_KM", default=2.0, minimum=0.0
+        )
+        self.geo_place_index_timezone_max_km = self._parse_float_env(
+            "GEO_PLACE_INDEX_TIMEZONE_MAX_KM", default=50.0, minimum=0.0
+        )
         self.astral_gateway_url = os.getenv("ASTRAL_GATEWAY_URL", "http://localhost:8082").strip()
         self.astral_jobs_api_url = os.getenv("ASTRAL_JOBS_API_URL", "http://localhost:8081").strip()
         self.astral_mercure_url = os.getenv(
@@ -274,6 +438,41 @@ class Settings:
             default=30.0,
             minimum=0.1,
         )
+        self.astral_http_max_connections = self._parse_int_env(
+            "ASTRAL_HTTP_MAX_CONNECTIONS", default=100, minimum=1
+        )
+        self.astral_http_max_keepalive_connections = self._parse_int_env(
+            "ASTRAL_HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20, minimum=0
+        )
+        self.astral_http_keepalive_expiry_seconds = self._parse_float_env(
+            "ASTRAL_HTTP_KEEPALIVE_EXPIRY_SECONDS",
+            default=30.0,
+            minimum=0.0,
+        )
+        self.astral_http2_enabled = self._parse_bool_env("ASTRAL_HTTP2_ENABLED", default=False)
+        self.astral_mercure_subscriber_queue_size = self._parse_int_env(
+            "ASTRAL_MERCURE_SUBSCRIBER_QUEUE_SIZE", default=64, minimum=2
+        )
+        self.astral_mercure_idle_check_seconds = self._parse_float_env(
+            "ASTRAL_MERCURE_IDLE_CHECK_SECONDS",
+            default=15.0,
+            minimum=0.1,
+        )
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0").strip()
+        self.rate_limit_backend = self._parse_rate_limit_backend()
+        self.rate_limit_redis_prefix = os.getenv("RATE_LIMIT_REDIS_PREFIX", "rate_limit:")
+        self.rate_limit_max_keys = self._parse_int_env(
+            "RATE_LIMIT_MAX_KEYS", default=100_000, minimum=1
+        )
+        self.rate_limit_shards = self._parse_int_env("RATE_LIMIT_SHARDS", default=32, minimum=1)
+        self.astral_job_status_cache_ttl_seconds = self._parse_float_env(
+            "ASTRAL_JOB_STATUS_CACHE_TTL_SECONDS",
+            default=2.0,
+            minimum=0.0,
+        )
+        self.astral_job_status_cache_max_entries = self._parse_int_env(
+            "ASTRAL_JOB_STATUS_CACHE_MAX_ENTRIES", default=10_000, minimum=1
+        )
 
         # Review Queue Alerting (Story 61.39)
         self.ops_review_queue_alerts_enabled = self._parse_bool_env(
@@ -284,6 +483,27 @@ class Settings:
         self.ops_review_queue_alert_max_candidates = self._parse_int_env(
             "OPS_REVIEW_QUEUE_ALERT_MAX_CANDIDATES", default=100, minimum=1
         )
+        self.ops_review_queue_alert_webhook_timeout_seconds = self._parse_float_env(
+            "OPS_REVIEW_QUEUE_ALERT_WEBHOOK_TIMEOUT_SECONDS", default=10.0, minimum=0.1
+        )
+        self.ops_review_queue_alert_delivery_concurrency = self._parse_int_env(
+            "OPS_REVIEW_QUEUE_ALERT_DELIVERY_CONCURRENCY", default=16, minimum=1
+        )
+        self.ops_review_queue_alert_delivery_max_attempts = self._parse_int_env(
+            "OPS_REVIEW_QUEUE_ALERT_DELIVERY_MAX_ATTEMPTS", default=3, minimum=1
+        )
+        self.ops_review_queue_alert_delivery_backoff_base_seconds = self._parse_float_env(
+            "OPS_REVIEW_QUEUE_ALERT_DELIVERY_BACKOFF_BASE_SECONDS", default=0.2, minimum=0.0
+        )
+        self.ops_review_queue_alert_delivery_backoff_max_seconds = self._parse_float_env(
+            "OPS_REVIEW_QUEUE_ALERT_DELIVERY_BACKOFF_MAX_SECONDS", default=5.0, minimum=0.0
+        )
+        self.ops_review_queue_alert_circuit_failure_threshold = self._parse_int_env(
+            "OPS_REVIEW_QUEUE_ALERT_CIRCUIT_FAILURE_THRESHOLD", default=5, minimum=1
+        )
+        self.ops_review_queue_alert_circuit_open_seconds = self._parse_float_env(
+            "OPS_REVIEW_QUEUE_ALERT_CIRCUIT_OPEN_SECONDS", default=30.0, minimum=0.0
+        )
 
         # Feature Scope Validation Mode (Story 61.29)
         self.feature_scope_validation_mode = self._parse_feature_scope_validation_mode()
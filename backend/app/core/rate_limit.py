@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
 from dataclasses import dataclass
 from math import ceil
 from threading import Lock
 from time import monotonic
+from typing import Protocol
 
 from app.core.datetime_provider import datetime_provider
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class RateLimitError(Exception):
@@ -17,8 +22,105 @@ class RateLimitError(Exception):
     status_code: int = 429
 
 
-_WINDOWS: defaultdict[str, deque[float]] = defaultdict(deque)
-_LOCK = Lock()
+class RateLimiterBackend(Protocol):
+    """Stockage de l'état de limitation, local au processus ou partagé."""
+
+    def acquire(self, key: str, *, limit: int, window_seconds: float) -> float | None:
+        """Enregistre un appel; retourne None s'il passe, sinon le délai d'attente en secondes."""
+        ...
+
+    def reset(self) -> None:
+        """Oublie tout l'état de limitation."""
+        ...
+
+
+class InMemoryGcraRateLimiter:
+    """Limiteur GCRA en mémoire: une échéance théorique (TAT) par clé.
+
+    GCRA équivaut à un seau de `limit` jetons rempli en `window_seconds`: une rafale de
+    `limit` appels passe, puis le débit est lissé. L'état tient en un float par clé,
+    les clés sont réparties sur des shards verrouillés indépendamment et les moins
+    récemment utilisées sont évincées au-delà de `max_keys`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_keys: int = 100_000,
+        shards: int = 32,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if max_keys < 1 or shards < 1:
+            raise ValueError("max_keys and shards must be >= 1")
+        self._clock = clock
+        self._shard_capacity = max(1, ceil(max_keys / shards))
+        self._shards: list[tuple[Lock, OrderedDict[str, float]]] = [
+            (Lock(), OrderedDict()) for _ in range(shards)
+        ]
+
+    def acquire(self, key: str, *, limit: int, window_seconds: float) -> float | None:
+        interval = window_seconds / limit
+        lock, tats = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            now = self._clock()
+            tat = max(tats.get(key, now), now)
+            new_tat = tat + interval
+            excess = new_tat - now - window_seconds
+            if excess > 0:
+                return excess
+            tats[key] = new_tat
+            tats.move_to_end(key)
+            if len(tats) > self._shard_capacity:
+                tats.popitem(last=False)
+        return None
+
+    def reset(self) -> None:
+        for lock, tats in self._shards:
+            with lock:
+                tats.clear()
+
+    def __len__(self) -> int:
+        return sum(len(tats) for _, tats in self._shards)
+
+
+_backend: RateLimiterBackend | None = None
+_backend_lock = Lock()
+
+
+def _build_backend() -> RateLimiterBackend:
+    from app.core.config import settings
+
+    if settings.rate_limit_backend == "redis":
+        from app.infra.cache.redis_client import get_redis_client
+        from app.infra.cache.redis_rate_limiter import RedisGcraRateLimiter
+
+        return RedisGcraRateLimiter(
+            get_redis_client(),
+            prefix=settings.rate_limit_redis_prefix,
+            fallback=InMemoryGcraRateLimiter(
+                max_keys=settings.rate_limit_max_keys, shards=settings.rate_limit_shards
+            ),
+        )
+    return InMemoryGcraRateLimiter(
+        max_keys=settings.rate_limit_max_keys, shards=settings.rate_limit_shards
+    )
+
+
+def get_rate_limiter() -> RateLimiterBackend:
+    """Retourne le backend configuré (`RATE_LIMIT_BACKEND`), construit au premier appel."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend()
+    return _backend
+
+
+def configure_rate_limiter(backend: RateLimiterBackend | None) -> None:
+    """Remplace le backend courant; None revient au backend issu de la configuration."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
 
 
 def _utc_iso_now() -> str:
@@ -26,28 +128,21 @@ def _utc_iso_now() -> str:
 
 
 def check_rate_limit(*, key: str, limit: int, window_seconds: int) -> None:
-    now = monotonic()
-    with _LOCK:
-        bucket = _WINDOWS[key]
-        while bucket and now - bucket[0] > window_seconds:
-            bucket.popleft()
-        if len(bucket) >= limit:
-            elapsed = now - bucket[0] if bucket else 0.0
-            retry_after_seconds = max(1, ceil(window_seconds - elapsed))
-            raise RateLimitError(
-                code="rate_limit_exceeded",
-                message="rate limit exceeded",
-                details={
-                    "key": key,
-                    "limit": str(limit),
-                    "window_seconds": str(window_seconds),
-                    "retry_after": str(retry_after_seconds),
-                    "timestamp": _utc_iso_now(),
-                },
-            )
-        bucket.append(now)
+    retry_after = get_rate_limiter().acquire(key, limit=limit, window_seconds=window_seconds)
+    if retry_after is None:
+        return
+    raise RateLimitError(
+        code="rate_limit_exceeded",
+        message="rate limit exceeded",
+        details={
+            "key": key,
+            "limit": str(limit),
+            "window_seconds": str(window_seconds),
+            "retry_after": str(max(1, ceil(retry_after))),
+            "timestamp": _utc_iso_now(),
+        },
+    )
 
 
 def reset_rate_limits() -> None:
-    with _LOCK:
-        _WINDOWS.clear()
+    get_rate_limiter().reset()
@@ -5,6 +5,7 @@ import hmac
 import os
 import uuid
 from datetime import timedelta
+from functools import lru_cache
 from typing import Any
 
 import jwt
@@ -21,27 +22,75 @@ class SecurityError(Exception):
         super().__init__(message)
 
 
-def hash_password(password: str) -> str:
-    salt = os.urandom(16)
-    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
-    return f"{salt.hex()}${hashed.hex()}"
+# Format versionné: `pbkdf2_sha256$<iterations>$<sel hex>$<hash hex>`. Les hashes
+# historiques `<sel hex>$<hash hex>` restent vérifiables avec leurs 120 000 itérations.
+PASSWORD_HASH_SCHEME = "pbkdf2_sha256"
+LEGACY_PASSWORD_HASH_ITERATIONS = 120_000
 
 
-def verify_password(password: str, stored_password_hash: str) -> bool:
-    try:
-        salt_hex, hash_hex = stored_password_hash.split("$", 1)
-    except ValueError:
-        return False
+def hash_password(password: str, iterations: int | None = None) -> str:
+    iterations = iterations or settings.password_hash_iterations
+    salt = os.urandom(16)
+    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{PASSWORD_HASH_SCHEME}${iterations}${salt.hex()}${hashed.hex()}"
+
+
+def _parse_password_hash(stored_password_hash: str) -> tuple[int, bytes, bytes] | None:
+    parts = stored_password_hash.split("$")
+    if len(parts) == 2:
+        iterations = LEGACY_PASSWORD_HASH_ITERATIONS
+        salt_hex, hash_hex = parts
+    elif len(parts) == 4 and parts[0] == PASSWORD_HASH_SCHEME and parts[1].isdigit():
+        iterations = int(parts[1])
+        salt_hex, hash_hex = parts[2], parts[3]
+    else:
+        return None
     try:
-        salt = bytes.fromhex(salt_hex)
-        expected_hash = bytes.fromhex(hash_hex)
+        return iterations, bytes.fromhex(salt_hex), bytes.fromhex(hash_hex)
     except ValueError:
-        return False
+        return None
+
 
-    candidate_hash = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+def verify_password(password: str, stored_password_hash: str) -> bool:
+    parsed = _parse_password_hash(stored_password_hash)
+    if parsed is None or parsed[0] < 1:
+        return False
+    iterations, salt, expected_hash = parsed
+    candidate_hash = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     return hmac.compare_digest(candidate_hash, expected_hash)
 
 
+def password_needs_rehash(stored_password_hash: str) -> bool:
+    """Indique si le hash n'utilise pas le format et les paramètres courants."""
+    parsed = _parse_password_hash(stored_password_hash)
+    if parsed is None or not stored_password_hash.startswith(f"{PASSWORD_HASH_SCHEME}$"):
+        return True
+    return parsed[0] != settings.password_hash_iterations
+
+
+def jwt_key_id(secret_key: str) -> str:
+    """Identifiant public (`kid`) d'une clé de signature, sans rien révéler du secret."""
+    return hashlib.sha256(f"jwt-kid:{secret_key}".encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=8)
+def _verification_keys_by_id(secret_keys: tuple[str, ...]) -> dict[str, str]:
+    return {jwt_key_id(secret_key): secret_key for secret_key in reversed(secret_keys)}
+
+
+def _candidate_verification_keys(token: str) -> list[str]:
+    """Clé désignée par le `kid` du jeton; toutes les clés pour les jetons sans `kid`."""
+    secret_keys = settings.jwt_verification_secret_keys
+    try:
+        key_id = jwt.get_unverified_header(token).get("kid")
+    except jwt.PyJWTError:
+        return []
+    if not isinstance(key_id, str):
+        return secret_keys
+    secret_key = _verification_keys_by_id(tuple(secret_keys)).get(key_id)
+    return [secret_key] if secret_key is not None else []
+
+
 def create_token(
     subject: str,
     role: str,
@@ -59,7 +108,12 @@ def create_token(
     }
     if jti is not None:
         payload["jti"] = jti
-    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return jwt.encode(
+        payload,
+        settings.jwt_secret_key,
+        algorithm=settings.jwt_algorithm,
+        headers={"kid": jwt_key_id(settings.jwt_secret_key)},
+    )
 
 
 def create_access_token(subject: str, role: str) -> str:
@@ -79,7 +133,7 @@ def create_refresh_token(subject: str, role: str) -> str:
 def decode_token(token: str, expected_type: str | None = None) -> dict[str, Any]:
     payload: dict[str, Any] | None = None
     expired_error: Exception | None = None
-    for secret_key in settings.jwt_verification_secret_keys:
+    for secret_key in _candidate_verification_keys(token):
         try:
             payload = jwt.decode(
                 token,
@@ -6,11 +6,15 @@ from __future__ import annotations
 import json
 import logging
 from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
 
+from app.infra.astral.http_pool import AstralHttpLease, AstralHttpPool, astral_http_pool
+from app.infra.astral.mercure_hub import MercureFanoutHub, mercure_fanout_hub
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,9 +52,17 @@ class AstralClientConfig:
 class AstralClient:
     """Centralise les appels HTTP vers Astral et normalise leurs erreurs."""
 
-    def __init__(self, config: AstralClientConfig) -> None:
-        """Prepare un client sans ouvrir de connexion persistante globale."""
+    def __init__(
+        self,
+        config: AstralClientConfig,
+        *,
+        pool: AstralHttpPool | None = None,
+        mercure_hub: MercureFanoutHub | None = None,
+    ) -> None:
+        """Prépare un client adossé au pool et au hub Mercure partagés du processus."""
         self._config = config
+        self._pool = pool or astral_http_pool
+        self._mercure_hub = mercure_hub or mercure_fanout_hub
 
     @property
     def mercure_url(self) -> str:
@@ -76,20 +88,33 @@ class AstralClient:
 
     async def get_services(self) -> dict[str, Any] | list[Any]:
         """Expose le catalogue des services Astral pour diagnostics internes."""
-        async with self._client() as client:
-            response = await client.get(
+        async with self._session() as lease:
+            response = await lease.client.get(
                 f"{self._config.jobs_api_url.rstrip('/')}/v1/services",
                 headers=self._headers(),
+                timeout=self._config.timeout_seconds,
+                extensions=lease.extensions,
             )
         return self._decode_response(response)
 
-    async def stream_mercure_events(
+    def stream_mercure_events(
         self,
         *,
         topic: str,
         is_disconnected: Callable[[], Awaitable[bool]],
     ) -> AsyncIterator[bytes]:
-        """Proxy le flux Mercure Astral en conservant les secrets cote backend."""
+        """Proxy le flux Mercure Astral en conservant les secrets côté backend.
+
+        Tous les abonnés locaux d'un même topic partagent une seule souscription amont.
+        """
+        return self._mercure_hub.subscribe(
+            f"{self.mercure_url}?topic={topic}",
+            open_upstream=lambda: self._open_mercure_stream(topic),
+            is_disconnected=is_disconnected,
+        )
+
+    async def _open_mercure_stream(self, topic: str) -> AsyncIterator[bytes]:
+        """Ouvre la souscription Mercure amont d'un topic."""
         try:
             async with httpx.AsyncClient(timeout=None) as client:
                 async with client.stream(
@@ -115,8 +140,6 @@ class AstralClient:
                         yield f"event: error\ndata: {payload}\n\n".encode("utf-8")
                         return
                     async for chunk in response.aiter_bytes():
-                        if await is_disconnected():
-                            break
                         yield chunk
         except httpx.HTTPError as error:
             logger.warning(
@@ -145,8 +168,14 @@ class AstralClient:
         headers = self._headers()
         headers.update(extra_headers or {})
         try:
-            async with self._client() as client:
-                response = await client.post(url, json=payload, headers=headers)
+            async with self._session() as lease:
+                response = await lease.client.post(
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=self._config.timeout_seconds,
+                    extensions=lease.extensions,
+                )
         except httpx.TimeoutException as error:
             raise AstralClientError(
                 code="astral_upstream_timeout",
@@ -172,8 +201,13 @@ class AstralClient:
     async def _get_json(self, url: str) -> dict[str, Any]:
         """Execute un GET JSON avec mapping d'erreur uniforme."""
         try:
-            async with self._client() as client:
-                response = await client.get(url, headers=self._headers())
+            async with self._session() as lease:
+                response = await lease.client.get(
+                    url,
+                    headers=self._headers(),
+                    timeout=self._config.timeout_seconds,
+                    extensions=lease.extensions,
+                )
         except httpx.TimeoutException as error:
             raise AstralClientError(
                 code="astral_upstream_timeout",
@@ -243,6 +277,12 @@ class AstralClient:
             headers["X-API-Key"] = self._config.api_key
         return headers
 
-    def _client(self) -> httpx.AsyncClient:
-        """Cree un client HTTP court-vivant avec timeout centralise."""
-        return httpx.AsyncClient(timeout=self._config.timeout_seconds)
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AstralHttpLease]:
+        """Emprunte le pool partagé, ou crée un client court-vivant s'il est fermé."""
+        async with self._pool.lease() as lease:
+            if lease is not None:
+                yield lease
+                return
+        async with httpx.AsyncClient(timeout=self._config.timeout_seconds) as client:
+            yield AstralHttpLease(client=client)
@@ -0,0 +1,173 @@
+# Commentaire global: pool HTTP partagé et long-vivant vers l'API jobs Astral.
+"""Pool HTTP partagé par processus pour les appels Astral hors flux Mercure."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any
+
+import httpx
+
+from app.infra.observability.metrics import observe_duration, set_gauge
+
+logger = logging.getLogger(__name__)
+
+POOL_IN_USE_METRIC = "astral_http_pool_in_use"
+POOL_IDLE_METRIC = "astral_http_pool_idle"
+POOL_CONNECTIONS_METRIC = "astral_http_pool_connections"
+POOL_WAIT_METRIC = "astral_http_pool_wait_seconds"
+
+
+@dataclass(frozen=True, slots=True)
+class AstralHttpPoolConfig:
+    """Limites du pool de connexions Astral."""
+
+    timeout_seconds: float
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class AstralHttpPoolStats:
+    """Photo instantanée de l'occupation du pool."""
+
+    in_use: int
+    idle: int
+    connections: int
+
+
+@dataclass(slots=True)
+class AstralHttpLease:
+    """Client emprunté au pool avec les extensions de trace httpx à propager."""
+
+    client: httpx.AsyncClient
+    extensions: dict[str, Any] = field(default_factory=dict)
+
+
+class AstralHttpPool:
+    """Détient un unique `httpx.AsyncClient` ouvert au démarrage et fermé à l'arrêt."""
+
+    def __init__(self) -> None:
+        """Prépare un pool fermé; `open` doit être appelé par le lifespan."""
+        self._client: httpx.AsyncClient | None = None
+        self._transport: httpx.AsyncBaseTransport | None = None
+        self._in_use = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Indique si le pool partagé est disponible."""
+        return self._client is not None
+
+    async def open(
+        self,
+        config: AstralHttpPoolConfig,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """Ouvre le client partagé; un appel répété est sans effet."""
+        if self._client is not None:
+            return
+        if transport is None:
+            transport = self._build_transport(config)
+        self._transport = transport
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=config.timeout_seconds,
+        )
+        self._publish_stats()
+        logger.info(
+            "astral_http_pool_opened max_connections=%s max_keepalive=%s http2=%s",
+            config.max_connections,
+            config.max_keepalive_connections,
+            config.http2_enabled,
+        )
+
+    async def aclose(self) -> None:
+        """Ferme les connexions keep-alive du pool partagé."""
+        client = self._client
+        self._client = None
+        self._transport = None
+        if client is not None:
+            await client.aclose()
+        self._in_use = 0
+        self._publish_stats()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[AstralHttpLease | None]:
+        """Emprunte le client partagé, ou `None` si le pool n'est pas ouvert."""
+        client = self._client
+        if client is None:
+            yield None
+            return
+
+        started = monotonic()
+        wait_recorded = False
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            """Mesure le délai jusqu'à l'envoi des headers sur une connexion acquise."""
+            nonlocal wait_recorded
+            if wait_recorded or not event_name.endswith("send_request_headers.started"):
+                return
+            wait_recorded = True
+            observe_duration(POOL_WAIT_METRIC, monotonic() - started)
+
+        self._in_use += 1
+        self._publish_stats()
+        try:
+            yield AstralHttpLease(client=client, extensions={"trace": trace})
+        finally:
+            self._in_use -= 1
+            self._publish_stats()
+
+    def stats(self) -> AstralHttpPoolStats:
+        """Retourne l'occupation courante sans bloquer le pool."""
+        connections = self._pool_connections()
+        idle = sum(1 for connection in connections if _is_idle(connection))
+        return AstralHttpPoolStats(
+            in_use=self._in_use,
+            idle=idle,
+            connections=len(connections),
+        )
+
+    def _publish_stats(self) -> None:
+        """Expose l'occupation du pool via les jauges d'observabilité."""
+        stats = self.stats()
+        set_gauge(POOL_IN_USE_METRIC, stats.in_use)
+        set_gauge(POOL_IDLE_METRIC, stats.idle)
+        set_gauge(POOL_CONNECTIONS_METRIC, stats.connections)
+
+    def _pool_connections(self) -> list[Any]:
+        """Lit les connexions httpcore du transport quand elles sont exposées."""
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return list(connections) if connections is not None else []
+
+    @staticmethod
+    def _build_transport(config: AstralHttpPoolConfig) -> httpx.AsyncHTTPTransport:
+        """Construit le transport keep-alive, avec repli HTTP/1.1 si `h2` manque."""
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry_seconds,
+        )
+        if config.http2_enabled:
+            try:
+                return httpx.AsyncHTTPTransport(limits=limits, http2=True)
+            except ImportError:
+                logger.warning("astral_http_pool_http2_unavailable fallback=http1.1")
+        return httpx.AsyncHTTPTransport(limits=limits)
+
+
+def _is_idle(connection: Any) -> bool:
+    """Évalue l'état idle d'une connexion httpcore sans lever d'erreur."""
+    is_idle = getattr(connection, "is_idle", None)
+    return bool(is_idle()) if callable(is_idle) else False
+
+
+astral_http_pool = AstralHttpPool()
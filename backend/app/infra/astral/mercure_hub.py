@@ -0,0 +1,176 @@
+# Commentaire global: diffusion locale d'une souscription Mercure unique par topic.
+"""Hub de fan-out partageant un flux Mercure amont entre plusieurs abonnés locaux."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.infra.observability.metrics import increment_counter, set_gauge
+
+logger = logging.getLogger(__name__)
+
+HUB_TOPICS_METRIC = "astral_mercure_hub_topics"
+HUB_SUBSCRIBERS_METRIC = "astral_mercure_hub_subscribers"
+HUB_UPSTREAM_OPENED_METRIC = "astral_mercure_hub_upstream_opened_total"
+HUB_DROPPED_SUBSCRIBERS_METRIC = "astral_mercure_hub_dropped_subscribers_total"
+
+SLOW_CONSUMER_EVENT = (
+    b"event: error\n"
+    b'data: {"code": "astral_mercure_slow_consumer", '
+    b'"message": "Subscriber dropped after falling behind"}\n\n'
+)
+_EVENT_SEPARATOR = b"\n\n"
+_MAX_PENDING_EVENT_BYTES = 64 * 1024
+
+_Subscriber = asyncio.Queue[bytes | None]
+
+
+@dataclass(slots=True)
+class _TopicChannel:
+    """Souscription amont partagée et files de ses abonnés locaux."""
+
+    subscribers: set[_Subscriber] = field(default_factory=set)
+    task: asyncio.Task[None] | None = None
+
+
+class MercureFanoutHub:
+    """Maintient une connexion amont par topic et diffuse ses événements SSE."""
+
+    def __init__(self, *, queue_size: int, idle_check_seconds: float) -> None:
+        """Configure la file bornée de chaque abonné et la sonde de déconnexion."""
+        self._queue_size = queue_size
+        self._idle_check_seconds = idle_check_seconds
+        self._channels: dict[str, _TopicChannel] = {}
+
+    def subscriber_count(self, key: str) -> int:
+        """Retourne le nombre d'abonnés locaux d'un topic."""
+        channel = self._channels.get(key)
+        return len(channel.subscribers) if channel is not None else 0
+
+    async def subscribe(
+        self,
+        key: str,
+        *,
+        open_upstream: Callable[[], AsyncIterator[bytes]],
+        is_disconnected: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[bytes]:
+        """Rejoint le flux partagé du topic, en l'ouvrant pour le premier abonné."""
+        # Deux places réservées permettent toujours d'ajouter l'erreur et la fin de flux.
+        queue: _Subscriber = asyncio.Queue(maxsize=self._queue_size + 2)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = _TopicChannel()
+            self._channels[key] = channel
+            channel.subscribers.add(queue)
+            channel.task = asyncio.create_task(self._pump(key, channel, open_upstream()))
+            increment_counter(HUB_UPSTREAM_OPENED_METRIC)
+        else:
+            channel.subscribers.add(queue)
+        self._publish_stats()
+
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self._idle_check_seconds)
+                except TimeoutError:
+                    # La déconnexion n'est sondée qu'en l'absence de trafic.
+                    if await is_disconnected():
+                        break
+                    continue
+                if event is None:
+                    break
+                yield event
+        finally:
+            self._unsubscribe(key, channel, queue)
+
+    async def _pump(
+        self,
+        key: str,
+        channel: _TopicChannel,
+        upstream: AsyncIterator[bytes],
+    ) -> None:
+        """Lit le flux amont et diffuse chaque événement SSE complet aux abonnés."""
+        pending = b""
+        try:
+            async for chunk in upstream:
+                pending += chunk
+                while (boundary := pending.find(_EVENT_SEPARATOR)) >= 0:
+                    split_at = boundary + len(_EVENT_SEPARATOR)
+                    self._broadcast(channel, pending[:split_at])
+                    pending = pending[split_at:]
+                if len(pending) > _MAX_PENDING_EVENT_BYTES:
+                    self._broadcast(channel, pending)
+                    pending = b""
+                if not channel.subscribers:
+                    break
+            if pending:
+                self._broadcast(channel, pending)
+        finally:
+            aclose = getattr(upstream, "aclose", None)
+            if aclose is not None:
+                with contextlib.suppress(Exception):
+                    await aclose()
+            if self._channels.get(key) is channel:
+                self._channels.pop(key, None)
+            for queue in list(channel.subscribers):
+                _close_subscriber(queue)
+            channel.subscribers.clear()
+            self._publish_stats()
+
+    def _broadcast(self, channel: _TopicChannel, event: bytes) -> None:
+        """Pousse un événement sans attendre; un abonné saturé est déconnecté."""
+        dropped = 0
+        for queue in list(channel.subscribers):
+            if queue.qsize() < self._queue_size:
+                queue.put_nowait(event)
+                continue
+            channel.subscribers.discard(queue)
+            _close_subscriber(queue, final_event=SLOW_CONSUMER_EVENT, discard_pending=True)
+            dropped += 1
+        if dropped:
+            increment_counter(HUB_DROPPED_SUBSCRIBERS_METRIC, float(dropped))
+            logger.warning("astral_mercure_hub_slow_consumer_dropped count=%s", dropped)
+            self._publish_stats()
+
+    def _unsubscribe(self, key: str, channel: _TopicChannel, queue: _Subscriber) -> None:
+        """Retire un abonné et ferme l'amont quand le dernier abonné part."""
+        channel.subscribers.discard(queue)
+        if not channel.subscribers:
+            if self._channels.get(key) is channel:
+                self._channels.pop(key, None)
+            if channel.task is not None and not channel.task.done():
+                channel.task.cancel()
+        self._publish_stats()
+
+    def _publish_stats(self) -> None:
+        """Expose le nombre de topics amont et d'abonnés locaux."""
+        set_gauge(HUB_TOPICS_METRIC, len(self._channels))
+        set_gauge(
+            HUB_SUBSCRIBERS_METRIC,
+            sum(len(channel.subscribers) for channel in self._channels.values()),
+        )
+
+
+def _close_subscriber(
+    queue: _Subscriber,
+    *,
+    final_event: bytes | None = None,
+    discard_pending: bool = False,
+) -> None:
+    """Dépose la fin de flux, après avoir vidé la file d'un abonné abandonné."""
+    while discard_pending and not queue.empty():
+        queue.get_nowait()
+    if final_event is not None:
+        queue.put_nowait(final_event)
+    queue.put_nowait(None)
+
+
+mercure_fanout_hub = MercureFanoutHub(
+    queue_size=settings.astral_mercure_subscriber_queue_size,
+    idle_check_seconds=settings.astral_mercure_idle_check_seconds,
+)
@@ -1 +1,27 @@
-"""Redis placeholders for next stories."""
+# Commentaire global: client Redis partagé par processus.
+"""Client Redis construit paresseusement à partir de `REDIS_URL`."""
+
+from __future__ import annotations
+
+from threading import Lock
+
+import redis
+
+from app.core.config import settings
+
+_client: redis.Redis | None = None
+_client_lock = Lock()
+
+
+def get_redis_client() -> redis.Redis:
+    """Retourne le client partagé; la connexion n'est ouverte qu'au premier appel réseau."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.redis_url,
+                    socket_timeout=0.5,
+                    socket_connect_timeout=0.5,
+                )
+    return _client
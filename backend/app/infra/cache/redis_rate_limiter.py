@@ -0,0 +1,84 @@
+# Commentaire global: limiteur de débit GCRA partagé entre workers via Redis.
+"""Backend Redis de `app.core.rate_limit`, atomique par script Lua.
+
+Le script lit l'échéance théorique (TAT) de la clé, décide et la réécrit en une seule
+opération côté serveur: la limite est globale à tous les workers, sans course entre
+lecture et écriture. L'horloge est celle du serveur Redis (`TIME`), commune à tous les
+clients. La clé expire dès que son TAT est dépassé: la mémoire reste O(1) par clé active.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import redis
+
+from app.core.rate_limit import RateLimiterBackend
+from app.infra.observability.metrics import increment_counter
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ERRORS_METRIC = "rate_limit_backend_errors_total"
+
+# KEYS[1]: clé; ARGV[1]: intervalle d'émission (us); ARGV[2]: tolérance de rafale (us).
+# Retourne 0 si l'appel passe, sinon l'attente en microsecondes.
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000000 + tonumber(now_parts[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+local new_tat = tat + interval
+local excess = new_tat - now - tolerance
+if excess > 0 then
+  return math.ceil(excess)
+end
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return 0
+"""
+
+
+class RedisGcraRateLimiter:
+    """GCRA partagé; bascule sur un backend local si Redis est indisponible."""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        prefix: str = "rate_limit:",
+        fallback: RateLimiterBackend | None = None,
+    ) -> None:
+        self._client = client
+        self._prefix = prefix
+        self._fallback = fallback
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    def acquire(self, key: str, *, limit: int, window_seconds: float) -> float | None:
+        interval_us = max(1, round(window_seconds * 1_000_000 / limit))
+        try:
+            excess_us = int(
+                self._script(
+                    keys=[f"{self._prefix}{key}"],
+                    args=[interval_us, round(window_seconds * 1_000_000)],
+                )
+            )
+        except redis.RedisError:
+            increment_counter(BACKEND_ERRORS_METRIC, 1.0, labels={"backend": "redis"})
+            logger.warning("rate_limit_redis_unavailable key=%s", key, exc_info=True)
+            if self._fallback is None:
+                return None
+            return self._fallback.acquire(key, limit=limit, window_seconds=window_seconds)
+        if excess_us <= 0:
+            return None
+        return excess_us / 1_000_000
+
+    def reset(self) -> None:
+        """Supprime les clés du préfixe (tests et outils d'exploitation)."""
+        keys = list(self._client.scan_iter(match=f"{self._prefix}*", count=1000))
+        if keys:
+            self._client.delete(*keys)
+        if self._fallback is not None:
+            self._fallback.reset()
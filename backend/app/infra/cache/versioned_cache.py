@@ -0,0 +1,174 @@
+# Commentaire global: cache LRU à durée de vie fixe invalidé par jeton de version.
+"""Socle des caches process-local alimentés par des lectures ORM.
+
+- `VersionedTtlCache` est un LRU borné dont les entrées expirent après un TTL fixe.
+  Chaque invalidation incrémente une version: une lecture commencée avant
+  (`begin()`) n'est pas stockée par `set()`, même si elle se termine après;
+- `SessionCacheInvalidation` relie un cache aux écritures ORM sur ses tables sources:
+  il invalide au flush (ou à l'UPDATE/DELETE en masse, qui vide tout), puis rejoue
+  l'invalidation au commit ou rollback pour les lectures concurrentes.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from threading import Lock
+from time import monotonic
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.infra.observability.metrics import increment_counter
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+# Clé réservée des invalidations en attente qui visent tout le cache.
+_ALL_KEYS = object()
+
+
+class VersionedTtlCache(Generic[_K, _V]):
+    """LRU borné à durée de vie fixe; les lectures en vol sont rejetées après invalidation."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        metric_prefix: str,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._hits_metric = f"{metric_prefix}_hits_total"
+        self._misses_metric = f"{metric_prefix}_misses_total"
+        self._invalidations_metric = f"{metric_prefix}_invalidations_total"
+        self._clock = clock
+        self._lock = Lock()
+        self._version = 0
+        self._entries: OrderedDict[_K, tuple[float, _V]] = OrderedDict()
+
+    def begin(self) -> int:
+        """Retourne le jeton à présenter lors du stockage d'une lecture."""
+        with self._lock:
+            return self._version
+
+    def get(self, key: _K) -> _V | None:
+        """Retourne la valeur cachée si elle n'a pas expiré."""
+        with self._lock:
+            value = None
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached = entry
+                if expires_at > self._clock():
+                    value = cached
+                    self._entries.move_to_end(key)
+                else:
+                    self._entries.pop(key, None)
+        increment_counter(self._hits_metric if value is not None else self._misses_metric)
+        return value
+
+    def set(self, key: _K, value: _V, token: int) -> None:
+        """Stocke une lecture si aucune invalidation n'a eu lieu depuis le jeton."""
+        with self._lock:
+            if self._ttl_seconds <= 0 or self._version != token:
+                return
+            self._entries[key] = (self._clock() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[_K] | None = None) -> None:
+        """Oublie les clés données (toutes si None) et rejette les lectures en vol."""
+        with self._lock:
+            self._version += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+        increment_counter(self._invalidations_metric)
+
+    def clear(self) -> None:
+        """Vide le cache sans compter d'invalidation (tests et outils d'exploitation)."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SessionCacheInvalidation:
+    """Invalide un cache sur les écritures ORM de ses tables sources.
+
+    `key_of` extrait la clé de cache d'une instance écrite (None: instance ignorée);
+    sans `key_of`, toute écriture invalide le cache entier. `invalidate` reçoit les
+    clés à oublier, ou None pour tout; `on_commit` remplace `invalidate` au commit
+    (par exemple pour publier l'invalidation aux autres workers).
+    """
+
+    def __init__(
+        self,
+        *,
+        tables: frozenset[str],
+        info_key: str,
+        invalidate: Callable[[set[Any] | None], None],
+        key_of: Callable[[Any], Any | None] | None = None,
+        on_commit: Callable[[set[Any] | None], None] | None = None,
+        watch_inserts: bool = True,
+    ) -> None:
+        self._tables = tables
+        self._info_key = info_key
+        self._invalidate = invalidate
+        self._key_of = key_of
+        self._on_commit = on_commit or invalidate
+        self._watch_inserts = watch_inserts
+
+    def register(self) -> None:
+        """Branche les hooks sur toutes les sessions."""
+        event.listen(Session, "after_flush", self._on_after_flush)
+        event.listen(Session, "do_orm_execute", self._on_orm_execute)
+        event.listen(Session, "after_commit", self._on_after_commit)
+        event.listen(Session, "after_rollback", self._on_after_rollback)
+
+    def _remember(self, session: Session, keys: set[Any]) -> None:
+        """Invalide tout de suite et rejoue au commit/rollback pour les lecteurs concurrents."""
+        self._invalidate(None if _ALL_KEYS in keys else keys)
+        session.info.setdefault(self._info_key, set()).update(keys)
+
+    def _replay(self, session: Session, invalidate: Callable[[set[Any] | None], None]) -> None:
+        keys = session.info.pop(self._info_key, None)
+        if keys:
+            invalidate(None if _ALL_KEYS in keys else keys)
+
+    def _on_after_flush(self, session: Session, flush_context: Any) -> None:
+        instances = (*session.dirty, *session.deleted)
+        if self._watch_inserts:
+            instances = (*session.new, *instances)
+        keys: set[Any] = set()
+        for instance in instances:
+            if getattr(type(instance), "__tablename__", None) not in self._tables:
+                continue
+            key = _ALL_KEYS if self._key_of is None else self._key_of(instance)
+            if key is not None:
+                keys.add(key)
+        if keys:
+            self._remember(session, keys)
+
+    def _on_orm_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        table_name = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+        if table_name in self._tables:
+            # Une écriture en masse ne désigne pas ses lignes: tout le cache est oublié.
+            self._remember(orm_execute_state.session, {_ALL_KEYS})
+
+    def _on_after_commit(self, session: Session) -> None:
+        self._replay(session, self._on_commit)
+
+    def _on_after_rollback(self, session: Session) -> None:
+        self._replay(session, self._invalidate)
@@ -0,0 +1,108 @@
+# Commentaire global: pagination par curseur (keyset) des listings append-only.
+"""Encode des curseurs opaques sur `(horodatage, id)` et compte les lignes à la demande.
+
+Les listings ops sont triés par horodatage décroissant puis id décroissant: la page
+suivante reprend strictement après le dernier couple vu, ce qui reste en temps constant
+quelle que soit la profondeur, là où OFFSET relit toutes les lignes précédentes.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+CountMode = Literal["exact", "estimated", "none"]
+
+
+class InvalidCursorError(ValueError):
+    """Curseur illisible, falsifié ou produit par une autre version du tri."""
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """Position du dernier élément servi: valeur de tri et id de départage."""
+
+    sort_value: datetime
+    row_id: int
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    payload = json.dumps({"t": sort_value.isoformat(), "i": int(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> KeysetCursor:
+    """Décode un curseur opaque; lève `InvalidCursorError` si le jeton est invalide."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value = datetime.fromisoformat(payload["t"])
+        row_id = payload["i"]
+    except (ValueError, TypeError, KeyError, UnicodeError) as error:
+        raise InvalidCursorError("cursor is invalid") from error
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise InvalidCursorError("cursor is invalid")
+    return KeysetCursor(sort_value=sort_value, row_id=row_id)
+
+
+def next_cursor_for(
+    items: list[Any], *, page_size: int, sort_attr: str, id_attr: str = "id"
+) -> str | None:
+    """Retourne le curseur de la page suivante, ou None si la page n'est pas pleine."""
+    if not items or len(items) < page_size:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+
+def keyset_after(sort_column: Any, id_column: Any, cursor: KeysetCursor) -> Any:
+    """Condition `(tri, id) < curseur` pour un ordre `tri DESC, id DESC`."""
+    return or_(
+        sort_column < cursor.sort_value,
+        and_(sort_column == cursor.sort_value, id_column < cursor.row_id),
+    )
+
+
+def count_rows(db: Session, query: Select[Any], mode: CountMode) -> int | None:
+    """Compte les lignes de `query` selon le mode demandé.
+
+    `estimated` lit l'estimation du planificateur PostgreSQL (`EXPLAIN`), sans
+    parcourir la table; les autres dialectes retombent sur le comptage exact.
+    """
+    if mode == "none":
+        return None
+    if mode == "estimated" and db.get_bind().dialect.name == "postgresql":
+        estimate = _planner_row_estimate(db, query)
+        if estimate is not None:
+            return estimate
+    return db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+
+
+def _planner_row_estimate(db: Session, query: Select[Any]) -> int | None:
+    connection = db.connection()
+    compiled = query.order_by(None).compile(dialect=connection.dialect)
+    try:
+        # Savepoint: un EXPLAIN en échec ne doit pas invalider la transaction en cours.
+        with connection.begin_nested():
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+    except Exception:
+        logger.warning("keyset_count_estimate_failed", exc_info=True)
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return max(int(plan[0]["Plan"]["Plan Rows"]), 0)
+    except (LookupError, TypeError, ValueError):
+        return None
@@ -24,6 +24,9 @@ from app.infra.db.models.enterprise_billing import (
 from app.infra.db.models.enterprise_feature_usage_counters import (
     EnterpriseFeatureUsageCounterModel,
 )
+from app.infra.db.models.enterprise_reconciliation_ledger import (
+    EnterpriseReconciliationLedgerEntryModel,
+)
 from app.infra.db.models.entitlement_mutation.alert.alert_event import (
     CanonicalEntitlementMutationAlertEventModel,
 )
@@ -36,12 +39,18 @@ from app.infra.db.models.entitlement_mutation.alert.handling import (
 from app.infra.db.models.entitlement_mutation.alert.handling_event import (
     CanonicalEntitlementMutationAlertHandlingEventModel,
 )
+from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+    CanonicalEntitlementMutationAuditChangedFieldModel,
+)
 from app.infra.db.models.entitlement_mutation.audit.review import (
     CanonicalEntitlementMutationAuditReviewModel,
 )
 from app.infra.db.models.entitlement_mutation.audit.review_event import (
     CanonicalEntitlementMutationAuditReviewEventModel,
 )
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
+)
 from app.infra.db.models.entitlement_mutation.suppression.suppression_application import (
     CanonicalEntitlementMutationAlertSuppressionApplicationModel,
 )
@@ -80,9 +89,11 @@ __all__ = [
     "CanonicalEntitlementMutationAlertHandlingModel",
     "CanonicalEntitlementMutationAlertSuppressionApplicationModel",
     "CanonicalEntitlementMutationAlertSuppressionRuleModel",
+    "CanonicalEntitlementMutationAuditChangedFieldModel",
     "CanonicalEntitlementMutationAuditModel",
     "CanonicalEntitlementMutationAuditReviewEventModel",
     "CanonicalEntitlementMutationAuditReviewModel",
+    "CanonicalEntitlementMutationReviewQueueEntryModel",
     "ConfigTextModel",
     "EmailLogModel",
     "EnterpriseAccountBillingPlanModel",
@@ -91,6 +102,7 @@ __all__ = [
     "EnterpriseBillingCycleModel",
     "EnterpriseBillingPlanModel",
     "EnterpriseFeatureUsageCounterModel",
+    "EnterpriseReconciliationLedgerEntryModel",
     "FeatureCatalogModel",
     "FeatureFlagModel",
     "FeatureUsageCounterModel",
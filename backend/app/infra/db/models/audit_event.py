@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.datetime_provider import utc_now
@@ -11,6 +11,8 @@ from app.infra.db.base import Base
 
 class AuditEventModel(Base):
     __tablename__ = "audit_events"
+    # Support de la pagination par curseur `(created_at, id)` décroissante.
+    __table_args__ = (Index("ix_audit_events_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     request_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, DateTime, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.datetime_provider import utc_now
 from app.infra.db.base import Base
 
+if TYPE_CHECKING:
+    from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+        CanonicalEntitlementMutationAuditChangedFieldModel,
+    )
+    from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+        CanonicalEntitlementMutationReviewQueueEntryModel,
+    )
+
 
 class CanonicalEntitlementMutationAuditModel(Base):
     __tablename__ = "canonical_entitlement_mutation_audits"
+    # Support de la pagination par curseur `(occurred_at, id)` décroissante.
+    __table_args__ = (Index("ix_cema_occurred_at_id", "occurred_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     occurred_at: Mapped[datetime] = mapped_column(
@@ -26,3 +37,13 @@ class CanonicalEntitlementMutationAuditModel(Base):
     source_origin: Mapped[str] = mapped_column(String(64), nullable=False)
     before_payload: Mapped[dict] = mapped_column(JSON, nullable=False)
     after_payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # Diff canonique calculé à l'écriture; l'historique est rempli par la migration 0150.
+    change_kind: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    risk_level: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)
+    changed_field_rows: Mapped[list[CanonicalEntitlementMutationAuditChangedFieldModel]] = (
+        relationship(cascade="all, delete-orphan", passive_deletes=True)
+    )
+    # Ligne SLA de la review queue, tenue à jour à l'écriture de l'audit et des revues.
+    review_queue_entry: Mapped[CanonicalEntitlementMutationReviewQueueEntryModel | None] = (
+        relationship(cascade="all, delete-orphan", passive_deletes=True, uselist=False)
+    )
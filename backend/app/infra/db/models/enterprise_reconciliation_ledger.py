@@ -0,0 +1,60 @@
+# Commentaire global: ledger matérialisé de la réconciliation usage/facturation B2B.
+"""Définit la ligne de réconciliation tenue par compte entreprise et par période."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.datetime_provider import utc_now
+from app.infra.db.base import Base
+
+
+class EnterpriseReconciliationLedgerEntryModel(Base):
+    """Agrégats usage/facturation d'une période et classification de l'écart.
+
+    Les compteurs d'usage et les cycles l'alimentent par deltas; `severity`,
+    `mismatch_type` et `status` sont recalculés en SQL à chaque écriture.
+    """
+
+    __tablename__ = "enterprise_reconciliation_ledger_entries"
+    __table_args__ = (
+        UniqueConstraint(
+            "enterprise_account_id",
+            "period_start",
+            "period_end",
+            name="uq_enterprise_reconciliation_ledger_account_period",
+        ),
+        Index(
+            "ix_enterprise_reconciliation_ledger_severity_account_period",
+            "severity",
+            "enterprise_account_id",
+            "period_start",
+        ),
+        Index("ix_enterprise_reconciliation_ledger_period_start", "period_start"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    enterprise_account_id: Mapped[int] = mapped_column(
+        ForeignKey("enterprise_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    usage_units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    usage_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    billing_cycle_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    billed_units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    billable_units: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_amount_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    mismatch_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    severity: Mapped[str] = mapped_column(String(16), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    last_action_code: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    last_action_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_action_actor_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_action_note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False
+    )
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, synonym
 
 from app.infra.db.base import Base
@@ -22,6 +22,8 @@ class CanonicalEntitlementMutationAlertEventModel(
     """Porte le current state d'une alerte et ses snapshots d'émission."""
 
     __tablename__ = "canonical_entitlement_mutation_alert_events"
+    # Support de la pagination par curseur `(created_at, id)` décroissante.
+    __table_args__ = (Index("ix_cemae_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     audit_id: Mapped[int] = mapped_column(
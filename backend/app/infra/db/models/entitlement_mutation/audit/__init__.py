@@ -1,14 +1,22 @@
 # Modèles de revue d'audit du sous-domaine entitlement mutation.
-"""Réexporte les modèles de current state et d'historique des revues d'audit."""
+"""Réexporte les champs modifiés, les modèles de revue et l'entrée de review queue."""
 
+from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+    CanonicalEntitlementMutationAuditChangedFieldModel,
+)
 from app.infra.db.models.entitlement_mutation.audit.review import (
     CanonicalEntitlementMutationAuditReviewModel,
 )
 from app.infra.db.models.entitlement_mutation.audit.review_event import (
     CanonicalEntitlementMutationAuditReviewEventModel,
 )
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
+)
 
 __all__ = [
+    "CanonicalEntitlementMutationAuditChangedFieldModel",
     "CanonicalEntitlementMutationAuditReviewEventModel",
     "CanonicalEntitlementMutationAuditReviewModel",
+    "CanonicalEntitlementMutationReviewQueueEntryModel",
 ]
@@ -0,0 +1,23 @@
+# Champs modifiés d'un audit du sous-domaine entitlement mutation.
+"""Définit la table de jointure des chemins modifiés d'un audit de mutation."""
+
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infra.db.base import Base
+
+
+class CanonicalEntitlementMutationAuditChangedFieldModel(Base):
+    """Porte un chemin stable du diff canonique (`binding.*`, `quotas[...]`)."""
+
+    __tablename__ = "canonical_entitlement_mutation_audit_changed_fields"
+    __table_args__ = (Index("ix_cemacf_field_path_audit_id", "field_path", "audit_id"),)
+
+    audit_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("canonical_entitlement_mutation_audits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    field_path: Mapped[str] = mapped_column(String(255), primary_key=True)
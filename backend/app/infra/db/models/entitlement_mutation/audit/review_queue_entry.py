@@ -0,0 +1,41 @@
+# Entrée matérialisée de la review queue du sous-domaine entitlement mutation.
+"""Définit la ligne SLA maintenue pour chaque audit de mutation."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infra.db.base import Base
+from app.infra.db.models.entitlement_mutation.shared.base_mixins import UpdatedAtMixin
+
+
+class CanonicalEntitlementMutationReviewQueueEntryModel(Base, UpdatedAtMixin):
+    """Porte le statut effectif et les échéances SLA d'un audit.
+
+    `due_soon_at` et `due_at` figent les seuils: le statut SLA se déduit par simple
+    comparaison à l'instant courant, sans recalcul applicatif.
+    """
+
+    __tablename__ = "canonical_entitlement_mutation_review_queue_entries"
+    __table_args__ = (
+        Index("ix_cemrqe_priority_occurred_at", "status_priority", "occurred_at", "audit_id"),
+        Index("ix_cemrqe_due_soon_at", "due_soon_at"),
+    )
+
+    audit_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("canonical_entitlement_mutation_audits.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    risk_level: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    effective_review_status: Mapped[str | None] = mapped_column(
+        String(32), nullable=True, index=True
+    )
+    status_priority: Mapped[int] = mapped_column(Integer, nullable=False)
+    sla_target_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    due_soon_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    due_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy import JSON, Boolean, DateTime, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.datetime_provider import utc_now
@@ -16,6 +17,9 @@ class StripeWebhookEventModel(Base):
         Index("ix_stripe_webhook_events_event_type", "event_type"),
         Index("ix_stripe_webhook_events_stripe_object_id", "stripe_object_id"),
         Index("ix_stripe_webhook_events_status", "status"),
+        Index("ix_stripe_webhook_events_received_at_id", "received_at", "id"),
+        Index("ix_stripe_webhook_events_status_id", "status", "id"),
+        Index("ix_stripe_webhook_events_customer_id_id", "stripe_customer_id", "id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -23,7 +27,7 @@ class StripeWebhookEventModel(Base):
     event_type: Mapped[str] = mapped_column(String(255), nullable=False)
     stripe_object_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     livemode: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
-    # processing | processed | failed
+    # received (inbox) | processing | processed | failed
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="processing")
     processing_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     received_at: Mapped[datetime] = mapped_column(
@@ -31,3 +35,8 @@ class StripeWebhookEventModel(Base):
     )
     processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Inbox: événement complet rejoué par les workers, ordonné par client Stripe.
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    stripe_customer_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    available_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
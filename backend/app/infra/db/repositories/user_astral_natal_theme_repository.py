@@ -92,6 +92,21 @@ class UserAstralNatalThemeRepository:
         self.db.flush()
         return model
 
+    def update_response(
+        self,
+        model: UserAstralNatalThemeModel,
+        *,
+        status: str,
+        service_code: str,
+        response_payload: dict[str, Any],
+    ) -> UserAstralNatalThemeModel:
+        """Actualise une ligne déjà chargée sans la relire par `run_id`."""
+        model.status = status
+        model.service_code = service_code
+        model.response_payload = response_payload
+        self.db.flush()
+        return model
+
     def mark_limited_theme_superseded(
         self,
         *,
@@ -0,0 +1 @@
+"""Client HTTP vers le fournisseur de géocodage Nominatim."""
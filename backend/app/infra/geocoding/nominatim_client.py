@@ -0,0 +1,222 @@
+# Commentaire global: client Nominatim asynchrone, mutualisé et cadencé par processus.
+"""Client Nominatim partagé par processus.
+
+- un unique `httpx.AsyncClient` keep-alive, ouvert par le lifespan et fermé à l'arrêt;
+- les requêtes identiques en vol sont fusionnées en un seul appel amont (single-flight);
+- les envois sont espacés d'au moins `min_interval_seconds` (politique Nominatim de
+  1 requête/seconde): les rafales attendent leur créneau au lieu d'échouer en 429.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+
+import httpx
+
+from app.core.config import settings
+from app.infra.observability.metrics import increment_counter, observe_duration
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_METRIC = "nominatim_single_flight_joined_total"
+QUEUE_WAIT_METRIC = "nominatim_queue_wait_seconds"
+QUEUE_REJECTED_METRIC = "nominatim_queue_rejected_total"
+UPSTREAM_REQUESTS_METRIC = "nominatim_upstream_requests_total"
+
+# Délai appliqué après un 429 sans en-tête Retry-After exploitable.
+_DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+class NominatimClientError(Exception):
+    """Échec d'un appel Nominatim: transport, statut HTTP ou file d'attente saturée."""
+
+    def __init__(self, message: str, *, status_code: int | None = None) -> None:
+        self.message = message
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class NominatimRateLimitedError(NominatimClientError):
+    """Nominatim refuse la requête (429) ou la file locale ne peut plus l'absorber."""
+
+
+@dataclass(frozen=True, slots=True)
+class NominatimClientConfig:
+    """Paramètres réseau et de cadence du client Nominatim."""
+
+    timeout_seconds: float
+    user_agent: str
+    min_interval_seconds: float = 1.0
+    max_queue_wait_seconds: float = 5.0
+    max_connections: int = 4
+    keepalive_expiry_seconds: float = 30.0
+
+
+class _RequestScheduler:
+    """Attribue à chaque envoi un créneau espacé d'au moins `min_interval` secondes."""
+
+    def __init__(self, clock: Callable[[], float] = monotonic) -> None:
+        self._clock = clock
+        self._next_slot = 0.0
+        self._lock = Lock()
+
+    def reserve(self, *, min_interval: float, max_wait: float) -> float:
+        """Réserve le prochain créneau et retourne l'attente; lève si elle dépasse `max_wait`."""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next_slot)
+            wait = start - now
+            if wait > max_wait:
+                increment_counter(QUEUE_REJECTED_METRIC, 1.0)
+                raise NominatimRateLimitedError("Nominatim request queue is saturated")
+            self._next_slot = start + min_interval
+            return wait
+
+    def defer(self, delay_seconds: float) -> None:
+        """Repousse tous les créneaux suivants après un refus amont."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, self._clock() + delay_seconds)
+
+
+class NominatimClient:
+    """Appels GET Nominatim mutualisés, dédoublonnés et cadencés."""
+
+    def __init__(
+        self,
+        config: NominatimClientConfig,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Prépare un client fermé; sans `open`, chaque appel utilise un client éphémère."""
+        self._config = config
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._scheduler = _RequestScheduler(clock)
+        self._in_flight: dict[str, asyncio.Task[bytes]] = {}
+
+    @property
+    def is_open(self) -> bool:
+        """Indique si le client keep-alive partagé est disponible."""
+        return self._client is not None
+
+    async def open(self) -> None:
+        """Ouvre le client partagé; un appel répété est sans effet."""
+        if self._client is not None:
+            return
+        self._client = self._build_client()
+        logger.info(
+            "nominatim_client_opened max_connections=%s min_interval=%s",
+            self._config.max_connections,
+            self._config.min_interval_seconds,
+        )
+
+    async def aclose(self) -> None:
+        """Ferme les connexions keep-alive du client partagé."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def get(self, url: str, params: dict[str, str], *, flight_key: str) -> bytes:
+        """Retourne le corps de la réponse, partagé avec les appels identiques en vol."""
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(flight_key)
+        if task is not None and task.get_loop() is loop:
+            increment_counter(SINGLE_FLIGHT_METRIC, 1.0)
+        else:
+            task = loop.create_task(self._fetch(url, params))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda done: self._forget(flight_key, done))
+        # shield: l'annulation d'un appelant n'interrompt pas l'appel partagé.
+        return await asyncio.shield(task)
+
+    def _forget(self, flight_key: str, task: asyncio.Task[bytes]) -> None:
+        if self._in_flight.get(flight_key) is task:
+            del self._in_flight[flight_key]
+        if not task.cancelled():
+            # Marque l'erreur comme lue même si tous les appelants ont abandonné.
+            task.exception()
+
+    async def _fetch(self, url: str, params: dict[str, str]) -> bytes:
+        """Attend un créneau puis envoie; un 429 repousse la file et retente une fois."""
+        config = self._config
+        for attempt in range(2):
+            wait = self._scheduler.reserve(
+                min_interval=config.min_interval_seconds,
+                max_wait=config.max_queue_wait_seconds,
+            )
+            observe_duration(QUEUE_WAIT_METRIC, wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await self._send(url, params)
+            if response.status_code != 429:
+                if response.status_code >= 400:
+                    raise NominatimClientError(
+                        f"Nominatim returned HTTP {response.status_code}",
+                        status_code=response.status_code,
+                    )
+                return response.content
+            self._scheduler.defer(_retry_after_seconds(response))
+            logger.warning("nominatim_rate_limited attempt=%d", attempt + 1)
+        raise NominatimRateLimitedError("Nominatim rate limit exceeded", status_code=429)
+
+    async def _send(self, url: str, params: dict[str, str]) -> httpx.Response:
+        increment_counter(UPSTREAM_REQUESTS_METRIC, 1.0)
+        try:
+            async with self._session() as client:
+                return await client.get(url, params=params)
+        except httpx.HTTPError as err:
+            raise NominatimClientError("Nominatim service unavailable") from err
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._client is not None:
+            yield self._client
+            return
+        async with self._build_client() as client:
+            yield client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        config = self._config
+        transport = self._transport or httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+                keepalive_expiry=config.keepalive_expiry_seconds,
+            ),
+            retries=0,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=config.timeout_seconds,
+            headers={"User-Agent": config.user_agent, "Accept": "application/json"},
+        )
+
+
+def _retry_after_seconds(response: httpx.Response) -> float:
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return _DEFAULT_RETRY_AFTER_SECONDS
+
+
+def build_nominatim_client() -> NominatimClient:
+    """Construit le client à partir de la configuration applicative."""
+    return NominatimClient(
+        NominatimClientConfig(
+            timeout_seconds=float(settings.nominatim_timeout_seconds),
+            user_agent=f"{settings.nominatim_user_agent} (contact: {settings.nominatim_contact})",
+            min_interval_seconds=settings.nominatim_min_interval_seconds,
+            max_queue_wait_seconds=settings.nominatim_max_queue_wait_seconds,
+            max_connections=settings.nominatim_http_max_connections,
+        )
+    )
+
+
+nominatim_client = build_nominatim_client()
@@ -1,64 +1,170 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
+import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from threading import Lock
-from typing import NamedTuple
+from typing import Any
 
 from app.core.datetime_provider import datetime_provider
 
-_COUNTERS: defaultdict[str, float] = defaultdict(float)
-_HISTOGRAMS: defaultdict[str, deque[float]] = defaultdict(deque)
-_COUNTER_EVENTS: defaultdict[str, deque["CounterEvent"]] = defaultdict(deque)
-_HISTOGRAM_EVENTS: defaultdict[str, deque["HistogramEvent"]] = defaultdict(deque)
+# Deux anneaux de buckets par métrique: minutes récentes et heures jusqu'à la rétention.
+# La mémoire d'une métrique est fixe, quel que soit le nombre d'événements enregistrés.
+# Une fenêtre est arrondie à la minute (<= 2h) ou à l'heure (au-delà).
+_MINUTE_BUCKETS = 120
+_HOUR_BUCKETS = 8 * 24
 _METRICS_RETENTION = timedelta(days=8)
-_MAX_EVENTS_PER_METRIC = 200_000
-_LOCK = Lock()
 
+# Histogramme log-linéaire: ~2 % d'erreur relative entre 1 microseconde et ~3 heures.
+_HISTOGRAM_PRECISION = 0.02
+_HISTOGRAM_MIN_VALUE = 1e-6
+_HISTOGRAM_MAX_VALUE = 1e4
+_LOG_BASE = math.log1p(_HISTOGRAM_PRECISION)
+_MAX_BUCKET_INDEX = math.ceil(math.log(_HISTOGRAM_MAX_VALUE / _HISTOGRAM_MIN_VALUE) / _LOG_BASE)
+
+
+def _bucket_index(value: float) -> int:
+    """Index du bucket log-linéaire d'une valeur; 0 regroupe les valeurs nulles."""
+    if value <= _HISTOGRAM_MIN_VALUE:
+        return 0
+    index = 1 + int(math.log(value / _HISTOGRAM_MIN_VALUE) / _LOG_BASE)
+    return min(index, _MAX_BUCKET_INDEX)
+
+
+def _bucket_value(index: int) -> float:
+    """Valeur représentative (milieu géométrique) d'un bucket."""
+    if index == 0:
+        return 0.0
+    return _HISTOGRAM_MIN_VALUE * math.exp((index - 0.5) * _LOG_BASE)
+
+
+@dataclass
+class DurationHistogram:
+    """Distribution de durées fusionnable, à précision relative bornée."""
+
+    counts: dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = 0.0
+
+    def record(self, value: float) -> None:
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: DurationHistogram) -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Percentile par rang le plus proche, borné par les extrêmes observés."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(max(0.0, min(1.0, q)) * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(_bucket_value(index), self.minimum), self.maximum)
+        return self.maximum
+
+
+class _Ring:
+    """Anneau de buckets temporels réinitialisés paresseusement à la réutilisation."""
+
+    __slots__ = ("_stamps", "_values", "_factory")
+
+    def __init__(self, size: int, factory: Callable[[], object]) -> None:
+        self._stamps = [-1] * size
+        self._values: list[object] = [None] * size
+        self._factory = factory
+
+    def slot(self, stamp: int) -> Any:
+        position = stamp % len(self._stamps)
+        if self._stamps[position] != stamp:
+            self._stamps[position] = stamp
+            self._values[position] = self._factory()
+        return self._values[position]
+
+    def since(self, first_stamp: int, last_stamp: int) -> Iterator[Any]:
+        for stamp, value in zip(self._stamps, self._values, strict=True):
+            if first_stamp <= stamp <= last_stamp:
+                yield value
+
+
+class _Accumulator:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+
+class _CounterSeries:
+    __slots__ = ("total", "minutes", "hours", "last_update")
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.minutes = _Ring(_MINUTE_BUCKETS, _Accumulator)
+        self.hours = _Ring(_HOUR_BUCKETS, _Accumulator)
+        self.last_update = 0.0
 
-class CounterEvent(NamedTuple):
-    timestamp: datetime
-    value: float
 
+class _DurationSeries:
+    __slots__ = ("lifetime", "minutes", "hours", "last_update")
+
+    def __init__(self) -> None:
+        self.lifetime = DurationHistogram()
+        self.minutes = _Ring(_MINUTE_BUCKETS, DurationHistogram)
+        self.hours = _Ring(_HOUR_BUCKETS, DurationHistogram)
+        self.last_update = 0.0
 
-class HistogramEvent(NamedTuple):
-    timestamp: datetime
-    value: float
+
+_COUNTERS: dict[str, _CounterSeries] = {}
+_DURATIONS: dict[str, _DurationSeries] = {}
+_GAUGES: dict[str, float] = {}
+_LOCK = Lock()
 
 
 def _utc_now() -> datetime:
     return datetime_provider.utcnow()
 
 
-def _prune_events(
-    events: deque[CounterEvent] | deque[HistogramEvent],
-    *,
-    now: datetime,
-) -> None:
-    cutoff = now - _METRICS_RETENTION
-    while events and events[0].timestamp < cutoff:
-        events.popleft()
-    while len(events) > _MAX_EVENTS_PER_METRIC:
-        events.popleft()
-
+def _stamps(now: datetime) -> tuple[float, int, int]:
+    epoch_seconds = now.timestamp()
+    return epoch_seconds, int(epoch_seconds // 60), int(epoch_seconds // 3600)
 
-def _prune_histogram_values(values: deque[float]) -> None:
-    while len(values) > _MAX_EVENTS_PER_METRIC:
-        values.popleft()
 
+def _window_slots(
+    series: _CounterSeries | _DurationSeries, window: timedelta, now: datetime
+) -> Iterator[Any]:
+    """Buckets couvrant la fenêtre: minutes si elle tient dans l'anneau, sinon heures."""
+    epoch_seconds, minute, hour = _stamps(now)
+    cutoff = epoch_seconds - window.total_seconds()
+    if window <= timedelta(minutes=_MINUTE_BUCKETS - 1):
+        return series.minutes.since(int(cutoff // 60), minute)
+    return series.hours.since(int(cutoff // 3600), hour)
 
-def _cleanup_stale_metric_names() -> None:
-    for metric_name in list(_COUNTER_EVENTS.keys()):
-        if _COUNTER_EVENTS[metric_name]:
-            continue
-        _COUNTER_EVENTS.pop(metric_name, None)
-        _COUNTERS.pop(metric_name, None)
 
-    for metric_name in list(_HISTOGRAM_EVENTS.keys()):
-        if _HISTOGRAM_EVENTS[metric_name]:
-            continue
-        _HISTOGRAM_EVENTS.pop(metric_name, None)
-        _HISTOGRAMS.pop(metric_name, None)
+def _drop_stale_metric_names(now: datetime) -> None:
+    cutoff = now.timestamp() - _METRICS_RETENTION.total_seconds()
+    for registry in (_COUNTERS, _DURATIONS):
+        for metric_name in [
+            name for name, series in registry.items() if series.last_update < cutoff
+        ]:
+            registry.pop(metric_name, None)
 
 
 def _format_metric_name(name: str, labels: dict[str, str] | None = None) -> str:
@@ -69,103 +175,100 @@ def _format_metric_name(name: str, labels: dict[str, str] | None = None) -> str:
 
 
 def increment_counter(name: str, value: float = 1.0, labels: dict[str, str] | None = None) -> None:
-    now = _utc_now()
+    epoch_seconds, minute, hour = _stamps(_utc_now())
     full_name = _format_metric_name(name, labels)
     with _LOCK:
-        _COUNTERS[full_name] += value
-        metric_events = _COUNTER_EVENTS[full_name]
-        metric_events.append(CounterEvent(timestamp=now, value=value))
-        _prune_events(metric_events, now=now)
-        _cleanup_stale_metric_names()
+        series = _COUNTERS.get(full_name)
+        if series is None:
+            series = _COUNTERS[full_name] = _CounterSeries()
+        series.total += value
+        series.minutes.slot(minute).value += value
+        series.hours.slot(hour).value += value
+        series.last_update = epoch_seconds
 
 
 def observe_duration(
     name: str, duration_seconds: float, labels: dict[str, str] | None = None
 ) -> None:
-    now = _utc_now()
+    epoch_seconds, minute, hour = _stamps(_utc_now())
     full_name = _format_metric_name(name, labels)
     with _LOCK:
-        histogram_values = _HISTOGRAMS[full_name]
-        histogram_values.append(duration_seconds)
-        _prune_histogram_values(histogram_values)
-        metric_events = _HISTOGRAM_EVENTS[full_name]
-        metric_events.append(HistogramEvent(timestamp=now, value=duration_seconds))
-        _prune_events(metric_events, now=now)
-        _cleanup_stale_metric_names()
+        series = _DURATIONS.get(full_name)
+        if series is None:
+            series = _DURATIONS[full_name] = _DurationSeries()
+        series.lifetime.record(duration_seconds)
+        series.minutes.slot(minute).record(duration_seconds)
+        series.hours.slot(hour).record(duration_seconds)
+        series.last_update = epoch_seconds
+
+
+def set_gauge(name: str, value: float, labels: dict[str, str] | None = None) -> None:
+    full_name = _format_metric_name(name, labels)
+    with _LOCK:
+        _GAUGES[full_name] = float(value)
+
+
+def get_gauge(name: str) -> float | None:
+    with _LOCK:
+        return _GAUGES.get(name)
 
 
 def get_metrics_snapshot() -> dict[str, dict[str, float]]:
     with _LOCK:
-        now = _utc_now()
-        for events in _COUNTER_EVENTS.values():
-            _prune_events(events, now=now)
-        for events in _HISTOGRAM_EVENTS.values():
-            _prune_events(events, now=now)
-        _cleanup_stale_metric_names()
-
-        counters = {key: float(value) for key, value in _COUNTERS.items()}
-        durations = {
-            key: (sum(values) / len(values) if values else 0.0)
-            for key, values in _HISTOGRAMS.items()
-        }
-    return {"counters": counters, "durations_avg_seconds": durations}
+        _drop_stale_metric_names(_utc_now())
+        counters = {key: float(series.total) for key, series in _COUNTERS.items()}
+        durations = {key: series.lifetime.mean for key, series in _DURATIONS.items()}
+        gauges = dict(_GAUGES)
+    return {"counters": counters, "durations_avg_seconds": durations, "gauges": gauges}
 
 
 def get_counter_sum_in_window(name: str, window: timedelta) -> float:
     now = _utc_now()
-    cutoff = now - window
     with _LOCK:
-        metric_events = _COUNTER_EVENTS[name]
-        _prune_events(metric_events, now=now)
-        _cleanup_stale_metric_names()
-        return float(sum(item.value for item in metric_events if item.timestamp >= cutoff))
+        series = _COUNTERS.get(name)
+        if series is None:
+            return 0.0
+        return float(sum(bucket.value for bucket in _window_slots(series, window, now)))
 
 
-def get_duration_values_in_window(name: str, window: timedelta) -> list[float]:
+def get_duration_histogram_in_window(name: str, window: timedelta) -> DurationHistogram:
     now = _utc_now()
-    cutoff = now - window
+    merged = DurationHistogram()
     with _LOCK:
-        metric_events = _HISTOGRAM_EVENTS[name]
-        _prune_events(metric_events, now=now)
-        _cleanup_stale_metric_names()
-        return [item.value for item in metric_events if item.timestamp >= cutoff]
+        series = _DURATIONS.get(name)
+        if series is not None:
+            for bucket in _window_slots(series, window, now):
+                merged.merge(bucket)
+    return merged
 
 
 def get_counter_sums_by_prefix_in_window(prefix: str, window: timedelta) -> dict[str, float]:
     now = _utc_now()
-    cutoff = now - window
     with _LOCK:
-        result: dict[str, float] = {}
-        for metric_name, metric_events in _COUNTER_EVENTS.items():
-            if not metric_name.startswith(prefix):
-                continue
-            _prune_events(metric_events, now=now)
-            result[metric_name] = float(
-                sum(item.value for item in metric_events if item.timestamp >= cutoff)
-            )
-        _cleanup_stale_metric_names()
-    return result
+        return {
+            metric_name: float(sum(bucket.value for bucket in _window_slots(series, window, now)))
+            for metric_name, series in _COUNTERS.items()
+            if metric_name.startswith(prefix)
+        }
 
 
-def get_duration_values_by_prefix_in_window(
+def get_duration_histograms_by_prefix_in_window(
     prefix: str, window: timedelta
-) -> dict[str, list[float]]:
+) -> dict[str, DurationHistogram]:
     now = _utc_now()
-    cutoff = now - window
+    result: dict[str, DurationHistogram] = {}
     with _LOCK:
-        result: dict[str, list[float]] = {}
-        for metric_name, metric_events in _HISTOGRAM_EVENTS.items():
+        for metric_name, series in _DURATIONS.items():
             if not metric_name.startswith(prefix):
                 continue
-            _prune_events(metric_events, now=now)
-            result[metric_name] = [item.value for item in metric_events if item.timestamp >= cutoff]
-        _cleanup_stale_metric_names()
+            merged = result[metric_name] = DurationHistogram()
+            for bucket in _window_slots(series, window, now):
+                merged.merge(bucket)
     return result
 
 
 def reset_metrics() -> None:
     with _LOCK:
         _COUNTERS.clear()
-        _HISTOGRAMS.clear()
-        _COUNTER_EVENTS.clear()
-        _HISTOGRAM_EVENTS.clear()
+        _DURATIONS.clear()
+        _GAUGES.clear()
@@ -0,0 +1 @@
+"""Livraison concurrente de webhooks sortants (alertes ops)."""
@@ -0,0 +1,227 @@
+# Commentaire global: moteur de livraison concurrente des webhooks d'alertes ops.
+"""Livre un lot de payloads en parallèle sur un client HTTP asynchrone mutualisé.
+
+- un `httpx.AsyncClient` keep-alive par lot, partagé par tous les envois du lot;
+- une concurrence bornée par sémaphore (`concurrency` envois en vol au plus);
+- un disjoncteur par destination (hôte): après `circuit_failure_threshold` échecs
+  consécutifs, les envois vers cette destination échouent sans appel réseau
+  pendant `circuit_open_seconds`;
+- des retries avec backoff exponentiel à jitter complet sur les échecs.
+
+La phase réseau ne touche pas la base: les services appellent le moteur entre la
+préparation et l'écriture groupée des tentatives et des états.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.infra.observability.metrics import increment_counter, observe_duration
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_ATTEMPTS_METRIC = "ops_alert_webhook_attempts_total"
+CIRCUIT_OPENED_METRIC = "ops_alert_webhook_circuit_opened_total"
+CIRCUIT_REJECTED_METRIC = "ops_alert_webhook_circuit_rejected_total"
+BATCH_DURATION_METRIC = "ops_alert_webhook_batch_seconds"
+
+# Erreur persistée quand le disjoncteur refuse l'envoi avant tout appel réseau.
+CIRCUIT_OPEN_ERROR = "circuit_open"
+
+WebhookSender = Callable[
+    [httpx.AsyncClient, str, dict[str, Any]], Awaitable[tuple[bool, str | None]]
+]
+
+
+@dataclass(frozen=True, slots=True)
+class AlertDeliveryEngineConfig:
+    """Limites réseau, retries et disjoncteur d'un lot de livraisons webhook."""
+
+    concurrency: int
+    max_attempts: int
+    backoff_base_seconds: float
+    backoff_max_seconds: float
+    circuit_failure_threshold: int
+    circuit_open_seconds: float
+    timeout_seconds: float
+
+    @classmethod
+    def from_settings(cls) -> AlertDeliveryEngineConfig:
+        """Construit la configuration courante à partir des settings applicatifs."""
+        return cls(
+            concurrency=settings.ops_review_queue_alert_delivery_concurrency,
+            max_attempts=settings.ops_review_queue_alert_delivery_max_attempts,
+            backoff_base_seconds=settings.ops_review_queue_alert_delivery_backoff_base_seconds,
+            backoff_max_seconds=settings.ops_review_queue_alert_delivery_backoff_max_seconds,
+            circuit_failure_threshold=settings.ops_review_queue_alert_circuit_failure_threshold,
+            circuit_open_seconds=settings.ops_review_queue_alert_circuit_open_seconds,
+            timeout_seconds=settings.ops_review_queue_alert_webhook_timeout_seconds,
+        )
+
+
+class _DestinationCircuitBreaker:
+    """Compte les échecs consécutifs par destination et ouvre le circuit au seuil."""
+
+    def __init__(self, clock: Callable[[], float] = monotonic) -> None:
+        self._clock = clock
+        self._lock = Lock()
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+
+    def allow(self, destination: str) -> bool:
+        """Indique si un envoi est autorisé; un circuit expiré laisse passer une sonde."""
+        with self._lock:
+            return self._open_until.get(destination, 0.0) <= self._clock()
+
+    def record_success(self, destination: str) -> None:
+        with self._lock:
+            self._failures.pop(destination, None)
+            self._open_until.pop(destination, None)
+
+    def record_failure(self, destination: str, *, threshold: int, open_seconds: float) -> None:
+        """Ouvre le circuit au seuil; une sonde en échec le rouvre immédiatement."""
+        with self._lock:
+            failures = self._failures.get(destination, 0) + 1
+            self._failures[destination] = failures
+            if failures >= threshold:
+                self._open_until[destination] = self._clock() + open_seconds
+                if failures == threshold:
+                    increment_counter(CIRCUIT_OPENED_METRIC, 1.0)
+                    logger.warning(
+                        "ops_alert_webhook_circuit_opened destination=%s failures=%d",
+                        destination,
+                        failures,
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+
+
+alert_delivery_circuit_breaker = _DestinationCircuitBreaker()
+
+
+def reset_alert_delivery_circuits() -> None:
+    """Referme tous les circuits (tests et redémarrages à chaud)."""
+    alert_delivery_circuit_breaker.clear()
+
+
+def backoff_delay(
+    attempt: int,
+    *,
+    base_seconds: float,
+    max_seconds: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """Délai avant la tentative `attempt + 1`: jitter complet sur `base * 2^(attempt-1)`."""
+    return rand() * min(max_seconds, base_seconds * (2 ** (attempt - 1)))
+
+
+async def deliver_webhooks(
+    url: str,
+    payloads: Sequence[dict[str, Any]],
+    *,
+    send: WebhookSender,
+    config: AlertDeliveryEngineConfig,
+    transport: httpx.AsyncBaseTransport | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> list[tuple[bool, str | None]]:
+    """Livre `payloads` vers `url` et retourne `(succès, erreur)` dans le même ordre."""
+    destination = urlsplit(url).netloc or url
+    semaphore = asyncio.Semaphore(config.concurrency)
+    limits = httpx.Limits(
+        max_connections=config.concurrency,
+        max_keepalive_connections=config.concurrency,
+    )
+
+    async def deliver_one(client: httpx.AsyncClient, payload: dict[str, Any]):
+        error: str | None = None
+        for attempt in range(1, config.max_attempts + 1):
+            if not alert_delivery_circuit_breaker.allow(destination):
+                increment_counter(CIRCUIT_REJECTED_METRIC, 1.0)
+                return False, error or CIRCUIT_OPEN_ERROR
+            # Le sémaphore ne couvre que l'envoi: une attente de backoff libère son slot.
+            async with semaphore:
+                success, error = await send(client, url, payload)
+            increment_counter(
+                WEBHOOK_ATTEMPTS_METRIC,
+                1.0,
+                labels={"status": "sent" if success else "failed"},
+            )
+            if success:
+                alert_delivery_circuit_breaker.record_success(destination)
+                return True, None
+            alert_delivery_circuit_breaker.record_failure(
+                destination,
+                threshold=config.circuit_failure_threshold,
+                open_seconds=config.circuit_open_seconds,
+            )
+            if attempt < config.max_attempts:
+                await sleep(
+                    backoff_delay(
+                        attempt,
+                        base_seconds=config.backoff_base_seconds,
+                        max_seconds=config.backoff_max_seconds,
+                    )
+                )
+        return False, error
+
+    started = monotonic()
+    async with httpx.AsyncClient(
+        timeout=config.timeout_seconds,
+        limits=limits,
+        transport=transport,
+    ) as client:
+        results = await asyncio.gather(*(deliver_one(client, payload) for payload in payloads))
+    observe_duration(BATCH_DURATION_METRIC, monotonic() - started)
+    return list(results)
+
+
+async def post_json_webhook(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: dict[str, Any],
+) -> tuple[bool, str | None]:
+    """POST JSON sur le client du lot; toute réponse hors 2xx ou erreur réseau échoue."""
+    try:
+        response = await client.post(url, json=payload)
+    except httpx.HTTPError as error:
+        return False, str(error) or error.__class__.__name__
+    if 200 <= response.status_code < 300:
+        return True, None
+    return False, f"HTTP {response.status_code}"
+
+
+def run_webhook_batch(
+    url: str,
+    payloads: Sequence[dict[str, Any]],
+    *,
+    send: WebhookSender,
+    config: AlertDeliveryEngineConfig | None = None,
+) -> list[tuple[bool, str | None]]:
+    """Point d'entrée synchrone des services: exécute le lot sur sa propre boucle."""
+    effective_config = config or AlertDeliveryEngineConfig.from_settings()
+
+    def run() -> list[tuple[bool, str | None]]:
+        return asyncio.run(deliver_webhooks(url, payloads, send=send, config=effective_config))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run()
+    # Appel depuis une boucle active (endpoint async): le lot tourne dans un thread dédié.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run).result()
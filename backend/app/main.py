@@ -1,6 +1,7 @@
 # Commentaire global: point d'entree FastAPI et assemblage runtime de l'application backend.
 """Point d'entree FastAPI et assemblage runtime de l'application backend."""
 
+import asyncio
 import logging
 from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
@@ -21,9 +22,19 @@ from app.api.v1.routers.registry import include_api_v1_routers
 from app.core.config import _should_load_backend_dotenv, env_path, settings
 from app.core.exceptions import ApplicationError
 from app.core.request_id import resolve_request_id
+from app.infra.astral.http_pool import AstralHttpPoolConfig, astral_http_pool
 from app.infra.db.bootstrap import ensure_local_sqlite_schema_ready
+from app.infra.geocoding.nominatim_client import nominatim_client
 from app.infra.observability.metrics import increment_counter, observe_duration
+from app.services.auth.password_hasher import password_hasher
+from app.services.b2b.quota_lease_buffer import enterprise_quota_lease_buffer
+from app.services.b2b.reconciliation_ledger import schedule_ledger_recompute
 from app.services.billing.pricing_experiment_service import PricingExperimentService
+from app.services.billing.stripe_webhook_inbox import stripe_webhook_inbox_workers
+from app.services.geocoding.place_index import warm_geo_place_index
+from app.services.geocoding.query_cache import geocoding_query_cache_purger
+from app.services.geocoding_service import GeocodingService
+from app.services.privacy.job_runner import privacy_job_runner
 from app.startup.canonical_db_validation import run_canonical_db_startup_validation
 from app.startup.feature_scope_validation import run_feature_scope_startup_validation
 from app.startup.stripe_portal_validation import run_stripe_portal_startup_validation
@@ -72,6 +83,17 @@ def _ensure_support_categories_seeded() -> None:
         logger.error("support_categories_auto_seed_failed error=%s", e)
 
 
+def _warm_local_geocoding() -> None:
+    """Charge l'index des lieux et TimezoneFinder avant la première requête."""
+    if not settings.geo_place_index_enabled:
+        return
+    try:
+        warm_geo_place_index()
+    except Exception:
+        logger.exception("geo_place_index_warm_failed")
+    GeocodingService.warm_timezone_finder()
+
+
 def _ensure_canonical_entitlements_seeded() -> None:
     """Auto-heal canonical entitlements locally before strict startup validation."""
     if settings.app_env in {"production", "prod"}:
@@ -140,6 +162,7 @@ async def _app_lifespan(_: FastAPI):
     from app.core.scheduler import shutdown_scheduler, start_scheduler
 
     start_scheduler()
+    schedule_ledger_recompute()
     logger.warning(
         (
             "diagnostic_startup_config_status app_env=%s backend_dotenv_loaded=%s "
@@ -174,8 +197,43 @@ async def _app_lifespan(_: FastAPI):
     with SessionLocal() as db:
         run_canonical_db_startup_validation(settings.canonical_db_validation_mode, db)
 
-    yield
-    shutdown_scheduler()
+    await astral_http_pool.open(
+        AstralHttpPoolConfig(
+            timeout_seconds=settings.astral_timeout_seconds,
+            max_connections=settings.astral_http_max_connections,
+            max_keepalive_connections=settings.astral_http_max_keepalive_connections,
+            keepalive_expiry_seconds=settings.astral_http_keepalive_expiry_seconds,
+            http2_enabled=settings.astral_http2_enabled,
+        )
+    )
+    await nominatim_client.open()
+    await asyncio.to_thread(_warm_local_geocoding)
+    if settings.geocoding_cache_purge_interval_seconds > 0:
+        geocoding_query_cache_purger.start(
+            interval_seconds=settings.geocoding_cache_purge_interval_seconds
+        )
+    if settings.b2b_quota_lease_enabled:
+        enterprise_quota_lease_buffer.start(
+            interval_seconds=settings.b2b_quota_lease_flush_interval_seconds
+        )
+    if settings.stripe_webhook_inbox_enabled:
+        stripe_webhook_inbox_workers.start(
+            workers=settings.stripe_webhook_inbox_workers,
+            interval_seconds=settings.stripe_webhook_inbox_poll_interval_seconds,
+        )
+    if settings.privacy_jobs_enabled:
+        privacy_job_runner.start(interval_seconds=settings.privacy_job_poll_interval_seconds)
+    try:
+        yield
+    finally:
+        await privacy_job_runner.aclose()
+        await stripe_webhook_inbox_workers.aclose()
+        await enterprise_quota_lease_buffer.aclose()
+        await astral_http_pool.aclose()
+        await nominatim_client.aclose()
+        await geocoding_query_cache_purger.aclose()
+        password_hasher.shutdown()
+        shutdown_scheduler()
 
 
 app = FastAPI(title="horoscope-backend", version="0.1.0", lifespan=_app_lifespan)
@@ -19,6 +19,8 @@ class AdminExportRequest(BaseModel):
     """Contrat Pydantic exposé par l'API."""
 
     period: DatePeriod | None = None
+    format: Literal["csv", "ndjson"] = "csv"
+    compression: Literal["none", "gzip"] = "none"
 
 
 class AdminGenerationExportRequest(AdminExportRequest):
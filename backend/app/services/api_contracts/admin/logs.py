@@ -23,6 +23,7 @@ class AdminAppErrorsResponse(BaseModel):
 
     data: list[AdminAppErrorLog]
     total: int
+    next_cursor: str | None = None
 
 
 class AdminStripeEventLog(BaseModel):
@@ -41,7 +42,8 @@ class AdminStripeEventsResponse(BaseModel):
     """Contrat Pydantic exposé par l'API."""
 
     data: list[AdminStripeEventLog]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
 
 
 class AdminQuotaAlert(BaseModel):
@@ -32,6 +32,7 @@ class RepairRunData(BaseModel):
     skipped_already_canonical: int
     remaining_blockers: list[RepairBlockerPayload]
     dry_run: bool
+    next_account_id: int | None = None
 
 
 class RepairRunResponse(BaseModel):
@@ -143,9 +143,10 @@ class MutationAuditListData(BaseModel):
     """Contrat Pydantic exposé par l'API."""
 
     items: list[MutationAuditItem]
-    total_count: int
+    total_count: int | None
     page: int
     page_size: int
+    next_cursor: str | None = None
 
 
 class ResponseMeta(BaseModel):
@@ -430,9 +431,10 @@ class AlertEventListData(BaseModel):
     """Contrat Pydantic exposé par l'API."""
 
     items: list[AlertEventItem]
-    total_count: int
+    total_count: int | None
     page: int
     page_size: int
+    next_cursor: str | None = None
 
 
 class AlertEventListApiResponse(BaseModel):
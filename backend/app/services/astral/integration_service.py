@@ -15,10 +15,12 @@ from app.core.auth_context import AuthenticatedUser
 from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
 from app.infra.astral.client import AstralClient, AstralClientConfig, AstralClientError
+from app.infra.db.models.user_astral_natal_theme import UserAstralNatalThemeModel
 from app.infra.db.repositories.user_astral_natal_theme_repository import (
     UserAstralNatalThemeRepository,
 )
 from app.infra.db.repositories.user_birth_profile_repository import UserBirthProfileRepository
+from app.services.astral.job_status_cache import AstralJobStatusCache, astral_job_status_cache
 from app.services.entitlement.effective_entitlement_resolver_service import (
     EffectiveEntitlementResolverService,
 )
@@ -79,8 +81,27 @@ class AstralJobCommand:
 class AstralIntegrationService:
     """Orchestre les jobs Astral en preservant les frontieres applicatives."""
 
-    def __init__(self, client: AstralClient | None = None) -> None:
-        """Injecte un client Astral ou cree le client configure par defaut."""
+    def __init__(
+        self,
+        client: AstralClient | None = None,
+        *,
+        status_cache: AstralJobStatusCache | None = None,
+    ) -> None:
+        """Injecte un client Astral ou crée le client configuré par défaut.
+
+        Le cache de statut partagé du processus n'accompagne que le client par
+        défaut; un client injecté reçoit un cache privé sauf s'il est fourni.
+        """
+        if status_cache is None:
+            status_cache = (
+                astral_job_status_cache
+                if client is None
+                else AstralJobStatusCache(
+                    ttl_seconds=settings.astral_job_status_cache_ttl_seconds,
+                    max_entries=settings.astral_job_status_cache_max_entries,
+                )
+            )
+        self._status_cache = status_cache
         self._client = client or AstralClient(
             AstralClientConfig(
                 jobs_api_url=settings.astral_jobs_api_url,
@@ -190,6 +211,7 @@ class AstralIntegrationService:
         user: AuthenticatedUser | None = None,
     ) -> dict[str, Any]:
         """Recupere l'etat d'un job Astral sans recalcul local."""
+        persisted = None
         if db is not None and user is not None:
             persisted = UserAstralNatalThemeRepository(db).get_by_run_id(run_id)
             if (
@@ -199,13 +221,15 @@ class AstralIntegrationService:
             ):
                 return self._cached_job_response(persisted.response_payload)
         try:
-            response = await self._client.get_job_status(run_id)
-            sanitized = self._sanitize_job_response(response)
-            if db is not None and user is not None:
+            sanitized = await self._status_cache.get_or_fetch(
+                run_id,
+                lambda: self._fetch_job_status(run_id),
+            )
+            if db is not None and user is not None and persisted is not None:
                 self._update_persisted_natal_theme_response(
                     db=db,
                     user_id=user.id,
-                    run_id=run_id,
+                    model=persisted,
                     response=sanitized,
                 )
             return sanitized
@@ -219,6 +243,11 @@ class AstralIntegrationService:
                 },
             ) from error
 
+    async def _fetch_job_status(self, run_id: str) -> dict[str, Any]:
+        """Interroge Astral une seule fois pour tous les pollings concurrents du job."""
+        response = await self._client.get_job_status(run_id)
+        return self._sanitize_job_response(response)
+
     def mercure_topic(self, *, tenant_id: str, run_id: str) -> str:
         """Construit le topic Mercure canonique du job."""
         return f"tenants/{tenant_id}/jobs/{run_id}"
@@ -639,30 +668,21 @@ class AstralIntegrationService:
         *,
         db: Session,
         user_id: int,
-        run_id: str,
+        model: UserAstralNatalThemeModel,
         response: dict[str, Any],
     ) -> None:
-        """Actualise la ligne persistée quand le polling récupère le résultat final."""
-        repository = UserAstralNatalThemeRepository(db)
-        model = repository.get_by_run_id(run_id)
-        if model is None or model.user_id != user_id:
+        """Actualise la ligne persistée uniquement quand le polling change son statut."""
+        if model.user_id != user_id:
             return
         if model.status == "superseded":
             return
         status = response.get("status")
-        if not isinstance(status, str):
+        if not isinstance(status, str) or status == model.status:
             return
-        repository.upsert_response(
-            user_id=model.user_id,
-            birth_profile_id=model.birth_profile_id,
-            birth_fingerprint=model.birth_fingerprint,
-            theme_level=model.theme_level,
-            requested_product=model.requested_product,
-            requested_plan=model.requested_plan,
-            service_code=str(response.get("service_code") or model.service_code),
+        UserAstralNatalThemeRepository(db).update_response(
+            model,
             status=status,
-            run_id=run_id,
-            client_request_id=model.client_request_id,
+            service_code=str(response.get("service_code") or model.service_code),
             response_payload=response,
         )
         db.commit()
@@ -0,0 +1,94 @@
+# Commentaire global: cache court et coalescence des lectures de statut de job Astral.
+"""Cache TTL borné et single-flight pour le polling des jobs Astral."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from time import monotonic
+from typing import Any
+
+from app.core.config import settings
+from app.infra.observability.metrics import increment_counter
+
+CACHE_HITS_METRIC = "astral_job_status_cache_hits_total"
+CACHE_MISSES_METRIC = "astral_job_status_cache_misses_total"
+COALESCED_METRIC = "astral_job_status_coalesced_total"
+
+
+class AstralJobStatusCache:
+    """Partage un appel amont par `run_id` et conserve sa réponse quelques secondes."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Configure la durée de vie et la borne mémoire du cache."""
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+
+    async def get_or_fetch(
+        self,
+        run_id: str,
+        fetch: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Retourne le statut caché, rejoint l'appel en vol, ou lance l'appel amont."""
+        cached = self._get_fresh(run_id)
+        if cached is not None:
+            increment_counter(CACHE_HITS_METRIC)
+            return dict(cached)
+
+        task = self._in_flight.get(run_id)
+        if task is not None:
+            increment_counter(COALESCED_METRIC)
+        else:
+            increment_counter(CACHE_MISSES_METRIC)
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[run_id] = task
+            task.add_done_callback(lambda done: self._on_fetch_done(run_id, done))
+        # Le shield évite qu'un client déconnecté annule l'appel partagé.
+        return dict(await asyncio.shield(task))
+
+    def invalidate(self, run_id: str) -> None:
+        """Oublie le statut caché d'un job."""
+        self._entries.pop(run_id, None)
+
+    def clear(self) -> None:
+        """Vide le cache sans toucher aux appels en vol."""
+        self._entries.clear()
+
+    def _get_fresh(self, run_id: str) -> dict[str, Any] | None:
+        """Lit une entrée encore valide et la marque comme récente."""
+        entry = self._entries.get(run_id)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._entries.pop(run_id, None)
+            return None
+        self._entries.move_to_end(run_id)
+        return value
+
+    def _on_fetch_done(self, run_id: str, task: asyncio.Task[dict[str, Any]]) -> None:
+        """Publie le résultat de l'appel partagé; les erreurs ne sont jamais cachées."""
+        if self._in_flight.get(run_id) is task:
+            self._in_flight.pop(run_id, None)
+        if task.cancelled() or task.exception() is not None or self._ttl_seconds <= 0:
+            return
+        self._entries[run_id] = (self._clock() + self._ttl_seconds, task.result())
+        self._entries.move_to_end(run_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+astral_job_status_cache = AstralJobStatusCache(
+    ttl_seconds=settings.astral_job_status_cache_ttl_seconds,
+    max_entries=settings.astral_job_status_cache_max_entries,
+)
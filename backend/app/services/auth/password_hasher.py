@@ -0,0 +1,146 @@
+# Commentaire global: exécuteur borné du hachage PBKDF2 hors des threads de requête.
+"""Déporte le hachage et la vérification des mots de passe dans un pool de processus.
+
+- exécuté dans les threads de requête, PBKDF2 dispute le CPU du processus HTTP et
+  une rafale de logins occupe tout son threadpool. Le pool (`PASSWORD_HASH_WORKERS`
+  processus, démarrés en `spawn` au premier usage) borne ce coût à des cœurs dédiés;
+- la file est bornée (`PASSWORD_HASH_MAX_PENDING`): au-delà, ou après
+  `PASSWORD_HASH_TIMEOUT_SECONDS`, l'appel échoue vite avec
+  `PasswordHashingUnavailableError` au lieu d'empiler des threads en attente;
+- `password_hash_queue_depth` suit la profondeur de file, `password_hash_rejected_total`
+  les refus et `password_hash_duration_seconds` la latence, attente comprise;
+- `PASSWORD_HASH_WORKERS=0` garde le hachage dans le thread appelant.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from time import monotonic
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_password
+from app.infra.observability.metrics import increment_counter, observe_duration, set_gauge
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH_METRIC = "password_hash_queue_depth"
+REJECTED_METRIC = "password_hash_rejected_total"
+DURATION_METRIC = "password_hash_duration_seconds"
+
+_T = TypeVar("_T")
+
+
+class PasswordHashingUnavailableError(Exception):
+    """Le pool de hachage est saturé ou n'a pas répondu à temps."""
+
+    def __init__(self, reason: str) -> None:
+        self.code = "password_hashing_unavailable"
+        self.message = "password hashing is temporarily unavailable"
+        self.details = {"reason": reason}
+        super().__init__(self.message)
+
+
+class PasswordHasher:
+    """Hache et vérifie les mots de passe sur un pool de processus borné."""
+
+    def __init__(
+        self,
+        *,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        timeout_seconds: float | None = None,
+    ) -> None:
+        self._workers = workers
+        self._max_pending = max_pending
+        self._timeout_seconds = timeout_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", hash_password, password, settings.password_hash_iterations)
+
+    def verify(self, password: str, stored_password_hash: str) -> bool:
+        return self._run("verify", verify_password, password, stored_password_hash)
+
+    def shutdown(self) -> None:
+        """Arrête le pool; il sera recréé au prochain appel."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, operation: str, fn: Callable[..., _T], *args: object) -> _T:
+        workers = self._workers if self._workers is not None else settings.password_hash_workers
+        started = monotonic()
+        if workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                observe_duration(DURATION_METRIC, monotonic() - started, {"operation": operation})
+
+        max_pending = (
+            self._max_pending
+            if self._max_pending is not None
+            else settings.password_hash_max_pending
+        )
+        with self._lock:
+            if self._pending >= max_pending:
+                increment_counter(REJECTED_METRIC, labels={"reason": "queue_full"})
+                raise PasswordHashingUnavailableError("queue_full")
+            self._pending += 1
+            set_gauge(QUEUE_DEPTH_METRIC, self._pending)
+            executor = self._executor
+            if executor is None:
+                executor = self._executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        timeout = (
+            self._timeout_seconds
+            if self._timeout_seconds is not None
+            else settings.password_hash_timeout_seconds
+        )
+        try:
+            try:
+                future = executor.submit(fn, *args)
+            except BaseException:
+                self._release_slot()
+                raise
+            # La place se libère quand la tâche se termine réellement: une tâche expirée
+            # mais déjà lancée ne s'annule pas et occupe toujours un worker.
+            future.add_done_callback(self._release_slot)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError as error:
+                future.cancel()
+                increment_counter(REJECTED_METRIC, labels={"reason": "timeout"})
+                raise PasswordHashingUnavailableError("timeout") from error
+        except BrokenProcessPool:
+            # Un processus mort rend le pool inutilisable: on le recrée au prochain
+            # appel et on termine celui-ci dans le thread courant.
+            logger.exception("password_hash_pool_broken operation=%s", operation)
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return fn(*args)
+        finally:
+            observe_duration(DURATION_METRIC, monotonic() - started, {"operation": operation})
+
+    def _release_slot(self, _future: object = None) -> None:
+        with self._lock:
+            self._pending -= 1
+            set_gauge(QUEUE_DEPTH_METRIC, self._pending)
+
+
+password_hasher = PasswordHasher()
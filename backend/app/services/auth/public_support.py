@@ -8,9 +8,12 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.exceptions import ApplicationError
+from app.core.rate_limit import RateLimitError, check_rate_limit
 from app.core.rbac import is_valid_role
 from app.core.security import SecurityError, decode_token
+from app.infra.observability.metrics import increment_counter
 from app.services.ops.audit_service import AuditEventCreatePayload, AuditService
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,22 @@ class AuditWriteError(Exception):
     """Signale une indisponibilite de l'audit technique."""
 
 
+def _enforce_password_attempt_admission(*, client_ip: str, operation: str) -> None:
+    """Limite par IP les appels qui déclenchent un hachage, avant tout calcul PBKDF2.
+
+    Pas d'événement d'audit sur refus: une rafale de credential stuffing ne doit pas
+    se transformer en écritures DB.
+    """
+    limit = settings.auth_password_attempts_per_ip_per_minute
+    if limit <= 0:
+        return
+    try:
+        check_rate_limit(key=f"auth_password:ip:{client_ip}", limit=limit, window_seconds=60)
+    except RateLimitError:
+        increment_counter("auth_password_admission_rejected_total", labels={"operation": operation})
+        raise
+
+
 def _audit_unavailable_response(request_id: str) -> Any:
     raise ApplicationError(
         request_id=request_id,
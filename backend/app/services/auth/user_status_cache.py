@@ -0,0 +1,78 @@
+# Commentaire global: cache process-local du statut des utilisateurs authentifiés.
+"""Évite de relire `users` à chaque requête authentifiée par jeton d'accès.
+
+- une entrée porte le rôle, l'email, la date de création et `is_suspended` d'un
+  utilisateur, pour `USER_STATUS_CACHE_TTL_SECONDS` (0 désactive le cache);
+- toute écriture ORM sur `users` (suspension, réactivation, anonymisation, création
+  sur un id recyclé) invalide l'utilisateur au flush, puis de nouveau au commit ou
+  rollback; une mise à jour/suppression en masse vide tout. Une lecture commencée
+  avant une invalidation n'est pas stockée (jeton de version);
+- entre workers, le TTL borne le délai de prise en compte d'une suspension.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from time import monotonic
+from typing import Any
+
+from app.core.config import settings
+from app.infra.cache.versioned_cache import SessionCacheInvalidation, VersionedTtlCache
+
+_USERS_TABLE = "users"
+_PENDING_INFO_KEY = "user_status_cache_pending"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUserStatus:
+    """Statut d'un utilisateur, détaché de la session ORM."""
+
+    id: int
+    role: str
+    email: str
+    created_at: datetime
+    is_suspended: bool
+
+
+class UserStatusCache(VersionedTtlCache[int, CachedUserStatus]):
+    """Cache des statuts indexé par id utilisateur."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        super().__init__(
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            metric_prefix="user_status_cache",
+            clock=clock,
+        )
+
+
+user_status_cache = UserStatusCache(
+    ttl_seconds=settings.user_status_cache_ttl_seconds,
+    max_entries=settings.user_status_cache_max_entries,
+)
+
+
+def reset_user_status_cache() -> None:
+    """Vide complètement le cache des statuts utilisateur."""
+    user_status_cache.invalidate()
+
+
+def _user_id(instance: Any) -> int | None:
+    user_id = getattr(instance, "id", None)
+    return user_id if isinstance(user_id, int) else None
+
+
+SessionCacheInvalidation(
+    tables=frozenset({_USERS_TABLE}),
+    info_key=_PENDING_INFO_KEY,
+    invalidate=user_status_cache.invalidate,
+    key_of=_user_id,
+).register()
@@ -7,6 +7,8 @@ inscription, connexion et rafraîchissement des tokens JWT.
 
 from __future__ import annotations
 
+import logging
+
 from pydantic import BaseModel, EmailStr, TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
 
@@ -16,11 +18,13 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    password_needs_rehash,
 )
 from app.infra.db.repositories.user_refresh_token_repository import UserRefreshTokenRepository
 from app.infra.db.repositories.user_repository import UserRepository
+from app.services.auth.password_hasher import PasswordHashingUnavailableError, password_hasher
+
+logger = logging.getLogger(__name__)
 
 
 class AuthServiceError(Exception):
@@ -163,6 +167,7 @@ class AuthService:
         Raises:
             AuthServiceError: Si l'email est déjà utilisé, invalide,
                 ou si le mot de passe/rôle ne respecte pas les critères.
+            PasswordHashingUnavailableError: Si le pool de hachage est saturé.
         """
         normalized_email = _normalize_email(email)
         _validate_password(password)
@@ -183,7 +188,7 @@ class AuthService:
 
         user = repo.create(
             email=normalized_email,
-            password_hash=hash_password(password),
+            password_hash=password_hasher.hash(password),
             role=role,
         )
         # Tests and local resets can recycle integer user IDs across fresh databases.
@@ -215,16 +220,23 @@ class AuthService:
 
         Raises:
             AuthServiceError: Si les identifiants sont invalides.
+            PasswordHashingUnavailableError: Si le pool de hachage est saturé.
         """
         normalized_email = _normalize_email(email)
         repo = UserRepository(db)
         user = repo.get_by_email(normalized_email)
-        if user is None or not verify_password(password, user.password_hash):
+        if user is None or not password_hasher.verify(password, user.password_hash):
             raise AuthServiceError(
                 code="invalid_credentials",
                 message="credentials are invalid",
                 details={},
             )
+        if password_needs_rehash(user.password_hash):
+            # Migration transparente vers les paramètres de hachage courants.
+            try:
+                user.password_hash = password_hasher.hash(password)
+            except PasswordHashingUnavailableError:
+                logger.warning("auth_password_rehash_deferred user_id=%s", user.id)
 
         access_token = create_access_token(subject=str(user.id), role=user.role)
         refresh_token = create_refresh_token(subject=str(user.id), role=user.role)
@@ -6,7 +6,9 @@ from typing import Literal
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+from app.services.b2b.quota_lease_buffer import enterprise_quota_lease_buffer
 from app.services.entitlement.effective_entitlement_gate_helpers import select_quota_usage_state
 from app.services.entitlement.effective_entitlement_resolver_service import (
     EffectiveEntitlementResolverService,
@@ -59,8 +61,12 @@ class B2BApiEntitlementGate:
             db, enterprise_account_id=account_id
         )
         access = snapshot.entitlements.get(B2BApiEntitlementGate.FEATURE_CODE)
+        leased = settings.b2b_quota_lease_enabled
+        # En mode bail, le compteur en base inclut les unités réservées par ce processus:
+        # c'est le bail qui tranche l'épuisement.
+        lease_may_serve = leased and access is not None and access.reason_code == "quota_exhausted"
 
-        if not access or not access.granted:
+        if not access or (not access.granted and not lease_may_serve):
             reason_code = access.reason_code if access else "subject_not_eligible"
             if reason_code == "quota_exhausted":
                 exhausted_state = select_quota_usage_state(access)
@@ -116,13 +122,21 @@ class B2BApiEntitlementGate:
                 reset_mode=state.reset_mode,
             )
             try:
-                new_state = EnterpriseQuotaUsageService.consume(
-                    db,
-                    account_id=account_id,
-                    feature_code=B2BApiEntitlementGate.FEATURE_CODE,
-                    quota=quota_def,
-                    amount=1,
-                )
+                if leased:
+                    new_state = enterprise_quota_lease_buffer.consume(
+                        account_id=account_id,
+                        feature_code=B2BApiEntitlementGate.FEATURE_CODE,
+                        quota=quota_def,
+                        amount=1,
+                    )
+                else:
+                    new_state = EnterpriseQuotaUsageService.consume(
+                        db,
+                        account_id=account_id,
+                        feature_code=B2BApiEntitlementGate.FEATURE_CODE,
+                        quota=quota_def,
+                        amount=1,
+                    )
                 consumed_states.append(new_state)
             except QuotaExhaustedError as exc:
                 raise B2BApiQuotaExceededError(
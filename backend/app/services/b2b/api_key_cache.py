@@ -0,0 +1,154 @@
+# Commentaire global: cache process-local des clés API B2B déjà vérifiées.
+"""Évite de refaire requêtes et HMAC pour une clé API B2B déjà authentifiée.
+
+- la clé présentée n'est jamais conservée: l'entrée est indexée par son SHA-256;
+- une entrée porte le compte, le credential et leurs statuts au moment de la
+  vérification; les statuts sont réévalués à chaque appel par le service;
+- toute écriture ORM sur `enterprise_api_credentials` ou `enterprise_accounts`
+  (rotation, révocation, suspension) incrémente la version du cache au flush, puis
+  de nouveau au commit ou rollback. Une lecture commencée avant une invalidation
+  n'est pas stockée (jeton de version);
+- avec `B2B_API_KEY_CACHE_REDIS_INVALIDATION`, le commit incrémente aussi une version
+  partagée dans Redis, relue au plus toutes les `B2B_API_KEY_CACHE_VERSION_CHECK_SECONDS`
+  par les autres workers. Sans Redis, le TTL borne la fraîcheur entre processus.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from hashlib import sha256
+from time import monotonic
+
+from app.core.config import settings
+from app.infra.cache.versioned_cache import SessionCacheInvalidation, VersionedTtlCache
+from app.infra.observability.metrics import increment_counter
+
+logger = logging.getLogger(__name__)
+
+SHARED_VERSION_ERRORS_METRIC = "b2b_api_key_cache_shared_version_errors_total"
+
+SHARED_VERSION_KEY = "b2b_api_key_cache:version"
+
+# Tables dont une écriture peut changer le résultat d'une authentification.
+_SOURCE_TABLES = frozenset({"enterprise_api_credentials", "enterprise_accounts"})
+_PENDING_INFO_KEY = "b2b_api_key_cache_pending"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedApiKeyAuth:
+    """Résultat d'une vérification de clé, détaché de la session ORM."""
+
+    account_id: int
+    credential_id: int
+    key_prefix: str
+    credential_status: str
+    account_status: str
+
+
+def api_key_digest(api_key: str) -> str:
+    """Empreinte de la clé présentée, utilisée comme clé de cache."""
+    return sha256(api_key.encode()).hexdigest()
+
+
+class EnterpriseApiKeyCache(VersionedTtlCache[str, CachedApiKeyAuth]):
+    """Cache des vérifications indexé par empreinte, aligné sur la version partagée Redis."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        version_check_seconds: float = 1.0,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        super().__init__(
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            metric_prefix="b2b_api_key_cache",
+            clock=clock,
+        )
+        self._version_check_seconds = version_check_seconds
+        self._shared_version: int | None = None
+        self._next_shared_check = 0.0
+
+    def sync_shared_version(self, read_version: Callable[[], int | None]) -> None:
+        """Invalide le cache si la version partagée a changé depuis la dernière lecture."""
+        now = self._clock()
+        with self._lock:
+            if now < self._next_shared_check:
+                return
+            self._next_shared_check = now + self._version_check_seconds
+        version = read_version()
+        if version is None:
+            return
+        with self._lock:
+            previous, self._shared_version = self._shared_version, version
+        if previous is not None and previous != version:
+            self.invalidate()
+
+    def clear(self) -> None:
+        """Vide le cache et oublie la dernière version partagée observée."""
+        super().clear()
+        with self._lock:
+            self._shared_version = None
+            self._next_shared_check = 0.0
+
+
+enterprise_api_key_cache = EnterpriseApiKeyCache(
+    ttl_seconds=settings.b2b_api_key_cache_ttl_seconds,
+    max_entries=settings.b2b_api_key_cache_max_entries,
+    version_check_seconds=settings.b2b_api_key_cache_version_check_seconds,
+)
+
+
+def _read_shared_version() -> int | None:
+    from app.infra.cache.redis_client import get_redis_client
+
+    try:
+        raw = get_redis_client().get(SHARED_VERSION_KEY)
+    except Exception:
+        increment_counter(SHARED_VERSION_ERRORS_METRIC)
+        logger.warning("b2b_api_key_cache_shared_version_read_failed", exc_info=True)
+        return None
+    return int(raw) if raw is not None else 0
+
+
+def _publish_shared_version() -> None:
+    from app.infra.cache.redis_client import get_redis_client
+
+    try:
+        get_redis_client().incr(SHARED_VERSION_KEY)
+    except Exception:
+        increment_counter(SHARED_VERSION_ERRORS_METRIC)
+        logger.warning("b2b_api_key_cache_shared_version_publish_failed", exc_info=True)
+
+
+def get_verified_api_key(digest: str) -> CachedApiKeyAuth | None:
+    """Lit le cache après avoir pris en compte les invalidations des autres workers."""
+    if settings.b2b_api_key_cache_redis_invalidation:
+        enterprise_api_key_cache.sync_shared_version(_read_shared_version)
+    return enterprise_api_key_cache.get(digest)
+
+
+def invalidate_api_key_cache(*, publish: bool = True) -> None:
+    """Invalide le cache local et, si configuré, celui des autres workers."""
+    enterprise_api_key_cache.invalidate()
+    if publish and settings.b2b_api_key_cache_redis_invalidation:
+        _publish_shared_version()
+
+
+def reset_api_key_cache() -> None:
+    """Vide complètement le cache des clés API vérifiées."""
+    enterprise_api_key_cache.clear()
+
+
+# Un rollback n'a rien publié: seule la copie locale est invalidée.
+SessionCacheInvalidation(
+    tables=_SOURCE_TABLES,
+    info_key=_PENDING_INFO_KEY,
+    invalidate=lambda _keys: enterprise_api_key_cache.invalidate(),
+    on_commit=lambda _keys: invalidate_api_key_cache(),
+    watch_inserts=False,
+).register()
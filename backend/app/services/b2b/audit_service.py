@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import select
+from sqlalchemy import Select, and_, case, false, func, or_, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_billing import (
     EnterpriseAccountBillingPlanModel,
@@ -69,13 +73,173 @@ class B2BAuditService:
         resolution_source_filter: str | None = None,
         blocker_only: bool = False,
     ) -> tuple[list[B2BAuditEntry], int]:
-        all_accounts = db.scalars(
-            select(EnterpriseAccountModel).where(EnterpriseAccountModel.status == "active")
-        ).all()
-        if not all_accounts:
+        """Pagine l'audit en SQL puis n'évalue en détail que les comptes de la page.
+
+        Filtres et total portent sur la classification calculée en base; l'usage
+        des quotas n'est lu que pour les comptes restitués.
+        """
+        classified = B2BAuditService._classified_accounts_query(
+            resolution_source_filter=resolution_source_filter,
+            blocker_only=blocker_only,
+        ).subquery()
+        total_count = db.scalar(select(func.count()).select_from(classified)) or 0
+        if total_count == 0:
             return [], 0
 
-        account_ids = [account.id for account in all_accounts]
+        page_account_ids = list(
+            db.scalars(
+                select(classified.c.account_id)
+                .order_by(classified.c.account_id)
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+            ).all()
+        )
+        return B2BAuditService._evaluate_account_ids(db, page_account_ids), total_count
+
+    @staticmethod
+    def iter_b2b_entitlement_audit(
+        *,
+        resolution_source_filter: str | None = None,
+        blocker_only: bool = False,
+        start_after_account_id: int | None = None,
+        chunk_size: int | None = None,
+        workers: int | None = None,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> Iterator[B2BAuditEntry]:
+        """Parcourt tout l'audit par lots de comptes ordonnés par id (keyset).
+
+        Les lots sont filtrés en SQL puis évalués sur un pool de `workers` threads,
+        chacun avec sa propre session; au plus `workers` lots sont en vol, ce qui
+        borne la mémoire, et les entrées sont restituées dans l'ordre des comptes.
+        """
+        chunk_size = chunk_size or settings.b2b_entitlement_audit_chunk_size
+        workers = workers or settings.b2b_entitlement_audit_workers
+        if session_factory is None:
+            from app.infra.db.session import SessionLocal
+
+            session_factory = SessionLocal
+
+        def evaluate(account_ids: list[int]) -> list[B2BAuditEntry]:
+            with session_factory() as worker_db:
+                return B2BAuditService._evaluate_account_ids(worker_db, account_ids)
+
+        classified = B2BAuditService._classified_accounts_query(
+            resolution_source_filter=resolution_source_filter,
+            blocker_only=blocker_only,
+        ).subquery()
+        with session_factory() as db, ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: deque[Future[list[B2BAuditEntry]]] = deque()
+            last_account_id = start_after_account_id
+            exhausted = False
+            while not exhausted or pending:
+                while not exhausted and len(pending) < workers:
+                    statement = select(classified.c.account_id)
+                    if last_account_id is not None:
+                        statement = statement.where(classified.c.account_id > last_account_id)
+                    account_ids = list(
+                        db.scalars(
+                            statement.order_by(classified.c.account_id).limit(chunk_size)
+                        ).all()
+                    )
+                    if account_ids:
+                        last_account_id = account_ids[-1]
+                        pending.append(pool.submit(evaluate, account_ids))
+                    exhausted = len(account_ids) < chunk_size
+                if pending:
+                    yield from pending.popleft().result()
+
+    @staticmethod
+    def _classified_accounts_query(
+        *,
+        resolution_source_filter: str | None = None,
+        blocker_only: bool = False,
+    ) -> Select[tuple[int, str]]:
+        """Requête (account_id, resolution_source) des comptes actifs.
+
+        Reproduit en SQL la classification de `_audit_account` (plan canonique actif,
+        binding `b2b_api_access`, quota positif) pour filtrer et compter sans évaluer
+        chaque compte en Python.
+        """
+        canonical_plans = (
+            select(
+                PlanCatalogModel.source_id.label("source_id"),
+                func.max(PlanCatalogModel.id).label("plan_id"),
+            )
+            .where(
+                PlanCatalogModel.source_type == SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+                PlanCatalogModel.source_id.is_not(None),
+                PlanCatalogModel.audience == Audience.B2B,
+                PlanCatalogModel.is_active,
+            )
+            .group_by(PlanCatalogModel.source_id)
+            .subquery()
+        )
+        feature_id = (
+            select(FeatureCatalogModel.id)
+            .where(FeatureCatalogModel.feature_code == B2BAuditService.FEATURE_CODE)
+            .scalar_subquery()
+        )
+        has_valid_quota = (
+            select(PlanFeatureQuotaModel.id)
+            .where(
+                PlanFeatureQuotaModel.plan_feature_binding_id == PlanFeatureBindingModel.id,
+                PlanFeatureQuotaModel.quota_limit > 0,
+            )
+            .exists()
+        )
+        resolution_source = case(
+            (canonical_plans.c.plan_id.is_(None), "settings_fallback"),
+            (PlanFeatureBindingModel.id.is_(None), "settings_fallback"),
+            (
+                or_(
+                    PlanFeatureBindingModel.is_enabled.is_(false()),
+                    PlanFeatureBindingModel.access_mode == AccessMode.DISABLED,
+                ),
+                "canonical_disabled",
+            ),
+            (PlanFeatureBindingModel.access_mode == AccessMode.UNLIMITED, "canonical_unlimited"),
+            (has_valid_quota, "canonical_quota"),
+            else_="settings_fallback",
+        )
+        statement = (
+            select(
+                EnterpriseAccountModel.id.label("account_id"),
+                resolution_source.label("resolution_source"),
+            )
+            .outerjoin(
+                EnterpriseAccountBillingPlanModel,
+                EnterpriseAccountBillingPlanModel.enterprise_account_id
+                == EnterpriseAccountModel.id,
+            )
+            .outerjoin(
+                canonical_plans,
+                canonical_plans.c.source_id == EnterpriseAccountBillingPlanModel.plan_id,
+            )
+            .outerjoin(
+                PlanFeatureBindingModel,
+                and_(
+                    PlanFeatureBindingModel.plan_id == canonical_plans.c.plan_id,
+                    PlanFeatureBindingModel.feature_id == feature_id,
+                ),
+            )
+            .where(EnterpriseAccountModel.status == "active")
+        )
+        if resolution_source_filter:
+            statement = statement.where(resolution_source == resolution_source_filter)
+        if blocker_only:
+            statement = statement.where(resolution_source == "settings_fallback")
+        return statement
+
+    @staticmethod
+    def _evaluate_account_ids(db: Session, account_ids: list[int]) -> list[B2BAuditEntry]:
+        """Évalue un lot de comptes avec des lectures préchargées, dans l'ordre des ids."""
+        if not account_ids:
+            return []
+        accounts = db.scalars(
+            select(EnterpriseAccountModel)
+            .where(EnterpriseAccountModel.id.in_(account_ids))
+            .order_by(EnterpriseAccountModel.id)
+        ).all()
         account_plans = {
             account_plan.enterprise_account_id: account_plan
             for account_plan in db.scalars(
@@ -110,7 +274,7 @@ class B2BAuditService:
         )
 
         entries: list[B2BAuditEntry] = []
-        for account in all_accounts:
+        for account in accounts:
             account_plan = account_plans.get(account.id)
             enterprise_plan = (
                 enterprise_plans.get(account_plan.plan_id) if account_plan is not None else None
@@ -121,27 +285,18 @@ class B2BAuditService:
             binding = bindings.get(canonical_plan.id) if canonical_plan is not None else None
             quota_models = quotas.get(binding.id) if binding is not None else None
 
-            entry = B2BAuditService._audit_account(
-                db,
-                account,
-                acc_plan=account_plan,
-                ent_plan=enterprise_plan,
-                canonical_plan=canonical_plan,
-                binding=binding,
-                quota_models=quota_models,
+            entries.append(
+                B2BAuditService._audit_account(
+                    db,
+                    account,
+                    acc_plan=account_plan,
+                    ent_plan=enterprise_plan,
+                    canonical_plan=canonical_plan,
+                    binding=binding,
+                    quota_models=quota_models,
+                )
             )
-
-            if resolution_source_filter and entry.resolution_source != resolution_source_filter:
-                continue
-            if blocker_only and entry.resolution_source != "settings_fallback":
-                continue
-
-            entries.append(entry)
-
-        total_count = len(entries)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        return entries[start_idx:end_idx], total_count
+        return entries
 
     @staticmethod
     def _prefetch_canonical_plans(
@@ -154,13 +309,16 @@ class B2BAuditService:
         return {
             plan.source_id: plan
             for plan in db.scalars(
-                select(PlanCatalogModel).where(
+                select(PlanCatalogModel)
+                .where(
                     PlanCatalogModel.source_type
                     == SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
                     PlanCatalogModel.source_id.in_(enterprise_plan_ids),
                     PlanCatalogModel.audience == Audience.B2B,
                     PlanCatalogModel.is_active,
                 )
+                # Le plus récent gagne, comme dans `_classified_accounts_query`.
+                .order_by(PlanCatalogModel.id)
             ).all()
             if plan.source_id is not None
         }
@@ -219,6 +377,7 @@ class B2BAuditService:
         canonical_plan: PlanCatalogModel | None = None,
         binding: PlanFeatureBindingModel | None = None,
         quota_models: list[PlanFeatureQuotaModel] | None = None,
+        include_usage: bool = True,
     ) -> B2BAuditEntry:
         enterprise_plan = ent_plan
         if acc_plan is None:
@@ -382,6 +541,25 @@ class B2BAuditService:
             )
 
         quota_model = valid_quota_models[0]
+        if not include_usage:
+            # La réparation ne lit que la classification: pas de lecture des compteurs.
+            return B2BAuditEntry(
+                account_id=account.id,
+                company_name=account.company_name,
+                enterprise_plan_id=enterprise_plan_id,
+                enterprise_plan_code=enterprise_plan_code,
+                canonical_plan_id=canonical_plan_id,
+                canonical_plan_code=canonical_plan_code,
+                feature_code=B2BAuditService.FEATURE_CODE,
+                resolution_source="canonical_quota",
+                reason="quota_binding_active",
+                binding_status="quota",
+                quota_limit=quota_model.quota_limit,
+                remaining=None,
+                window_end=None,
+                admin_user_id_present=admin_user_id_present,
+                manual_review_required=False,
+            )
         quota_def = QuotaDefinition(
             quota_key=quota_model.quota_key,
             quota_limit=quota_model.quota_limit,
@@ -21,6 +21,12 @@ from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_api_credential import EnterpriseApiCredentialModel
+from app.services.b2b.api_key_cache import (
+    CachedApiKeyAuth,
+    api_key_digest,
+    enterprise_api_key_cache,
+    get_verified_api_key,
+)
 
 
 class EnterpriseCredentialsServiceError(Exception):
@@ -125,6 +131,9 @@ class EnterpriseCredentialsService:
         """
         Authentifie une clé API et retourne les informations du compte.
 
+        Une clé déjà vérifiée est servie par `enterprise_api_key_cache` sans requête ni
+        HMAC; les statuts du compte et du credential restent contrôlés à chaque appel.
+
         Args:
             db: Session de base de données.
             api_key: Clé API brute à authentifier.
@@ -149,25 +158,59 @@ class EnterpriseCredentialsService:
                 details={},
             )
 
-        key_prefix = normalized[:16]
-        candidates = db.scalars(
-            select(EnterpriseApiCredentialModel)
-            .where(EnterpriseApiCredentialModel.key_prefix == key_prefix)
+        digest = api_key_digest(normalized)
+        verified = get_verified_api_key(digest)
+        if verified is None:
+            token = enterprise_api_key_cache.begin()
+            verified = EnterpriseCredentialsService._verify_api_key(db, api_key=normalized)
+            enterprise_api_key_cache.set(digest, verified, token)
+
+        if verified.account_status != "active":
+            raise EnterpriseCredentialsServiceError(
+                code="enterprise_account_inactive",
+                message="enterprise account is inactive",
+                details={"status": verified.account_status},
+            )
+        if verified.credential_status != "active":
+            raise EnterpriseCredentialsServiceError(
+                code="revoked_api_key",
+                message="api key is revoked",
+                details={},
+            )
+
+        return EnterpriseApiKeyAuthData(
+            account_id=verified.account_id,
+            credential_id=verified.credential_id,
+            key_prefix=verified.key_prefix,
+            credential_status=verified.credential_status,
+            account_status=verified.account_status,
+        )
+
+    @staticmethod
+    def _verify_api_key(db: Session, *, api_key: str) -> CachedApiKeyAuth:
+        """Retrouve le credential d'une clé et son compte en une seule requête."""
+        rows = db.execute(
+            select(EnterpriseApiCredentialModel, EnterpriseAccountModel)
+            .outerjoin(
+                EnterpriseAccountModel,
+                EnterpriseAccountModel.id == EnterpriseApiCredentialModel.enterprise_account_id,
+            )
+            .where(EnterpriseApiCredentialModel.key_prefix == api_key[:16])
             .order_by(
                 desc(EnterpriseApiCredentialModel.created_at),
                 desc(EnterpriseApiCredentialModel.id),
             )
             .limit(10)
         ).all()
-        if not candidates:
+        if not rows:
             raise EnterpriseCredentialsServiceError(
                 code="invalid_api_key",
                 message="api key is invalid",
                 details={},
             )
 
-        candidate_hashes = EnterpriseCredentialsService._candidate_hashes(normalized)
-        matched = next((item for item in candidates if item.secret_hash in candidate_hashes), None)
+        candidate_hashes = EnterpriseCredentialsService._candidate_hashes(api_key)
+        matched = next((row for row in rows if row[0].secret_hash in candidate_hashes), None)
         if matched is None:
             raise EnterpriseCredentialsServiceError(
                 code="invalid_api_key",
@@ -175,35 +218,18 @@ class EnterpriseCredentialsService:
                 details={},
             )
 
-        account = db.scalar(
-            select(EnterpriseAccountModel)
-            .where(EnterpriseAccountModel.id == matched.enterprise_account_id)
-            .limit(1)
-        )
+        credential, account = matched
         if account is None:
             raise EnterpriseCredentialsServiceError(
                 code="enterprise_account_not_found",
                 message="enterprise account was not found",
                 details={},
             )
-        if account.status != "active":
-            raise EnterpriseCredentialsServiceError(
-                code="enterprise_account_inactive",
-                message="enterprise account is inactive",
-                details={"status": account.status},
-            )
-        if matched.status != "active":
-            raise EnterpriseCredentialsServiceError(
-                code="revoked_api_key",
-                message="api key is revoked",
-                details={},
-            )
-
-        return EnterpriseApiKeyAuthData(
+        return CachedApiKeyAuth(
             account_id=account.id,
-            credential_id=matched.id,
-            key_prefix=matched.key_prefix,
-            credential_status=matched.status,
+            credential_id=credential.id,
+            key_prefix=credential.key_prefix,
+            credential_status=credential.status,
             account_status=account.status,
         )
 
@@ -358,6 +384,8 @@ class EnterpriseCredentialsService:
         """
         Fait la rotation du credential actif (révoque et en crée un nouveau).
 
+        La révocation invalide le cache des clés vérifiées dès le flush.
+
         Args:
             db: Session de base de données.
             admin_user_id: Identifiant de l'administrateur.
@@ -1,6 +1,7 @@
+from collections.abc import Sequence
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -8,13 +9,33 @@ from app.core.datetime_provider import datetime_provider
 from app.infra.db.models.enterprise_feature_usage_counters import (
     EnterpriseFeatureUsageCounterModel,
 )
+from app.services.b2b.reconciliation_ledger import record_usage_delta
 from app.services.entitlement.entitlement_types import QuotaDefinition, UsageState
 from app.services.entitlement.feature_scope_registry import (
     FeatureScope,
     require_feature_scope,
 )
-from app.services.quota.usage_service import QuotaExhaustedError
-from app.services.quota.window_resolver import QuotaWindow, QuotaWindowResolver
+from app.services.entitlement.snapshot_cache import (
+    B2B_SUBJECT,
+    ENTITLEMENT_CACHE_SUBJECT_OPTION,
+)
+from app.services.quota.atomic_consume import (
+    read_counter_used,
+    supports_atomic_consume,
+    upsert_consume_counter,
+)
+from app.services.quota.rolling_counters import read_rolling_carried_over, read_rolling_used
+from app.services.quota.usage_service import (
+    QuotaExhaustedError,
+    build_usage_state,
+    build_usage_states,
+    counter_window_filter,
+)
+from app.services.quota.window_resolver import (
+    QuotaWindow,
+    QuotaWindowResolver,
+    RollingQuotaWindow,
+)
 
 
 class EnterpriseQuotaUsageService:
@@ -36,6 +57,19 @@ class EnterpriseQuotaUsageService:
             quota.period_unit, quota.period_value, quota.reset_mode, ref_dt
         )
 
+        if isinstance(window, RollingQuotaWindow):
+            used = read_rolling_used(
+                db,
+                EnterpriseFeatureUsageCounterModel,
+                subject_column="enterprise_account_id",
+                subject_id=account_id,
+                feature_code=feature_code,
+                quota=quota,
+                start=window.window_start,
+                end=window.window_end,
+            )
+            return build_usage_state(feature_code, quota, window, used)
+
         counter = db.scalar(
             select(EnterpriseFeatureUsageCounterModel)
             .where(
@@ -68,6 +102,39 @@ class EnterpriseQuotaUsageService:
             window_end=window.window_end,
         )
 
+    @staticmethod
+    def get_usages(
+        db: Session,
+        *,
+        account_id: int,
+        quotas: Sequence[tuple[str, QuotaDefinition]],
+        ref_dt: datetime | None = None,
+    ) -> list[UsageState]:
+        """Lit l'usage de plusieurs quotas d'un compte en une requête de compteurs."""
+        for feature_code, _ in quotas:
+            require_feature_scope(feature_code, FeatureScope.B2B)
+        if not quotas:
+            return []
+
+        if ref_dt is None:
+            ref_dt = datetime_provider.utcnow()
+
+        windows = [
+            QuotaWindowResolver.compute_window(
+                quota.period_unit, quota.period_value, quota.reset_mode, ref_dt
+            )
+            for _, quota in quotas
+        ]
+        counters = db.scalars(
+            select(EnterpriseFeatureUsageCounterModel).where(
+                EnterpriseFeatureUsageCounterModel.enterprise_account_id == account_id,
+                EnterpriseFeatureUsageCounterModel.feature_code.in_({f for f, _ in quotas}),
+                EnterpriseFeatureUsageCounterModel.quota_key.in_({q.quota_key for _, q in quotas}),
+                counter_window_filter(EnterpriseFeatureUsageCounterModel, windows),
+            )
+        ).all()
+        return build_usage_states(counters, quotas, windows)
+
     @staticmethod
     def consume(
         db: Session,
@@ -90,37 +157,149 @@ class EnterpriseQuotaUsageService:
             quota.period_unit, quota.period_value, quota.reset_mode, ref_dt
         )
 
-        counter = EnterpriseQuotaUsageService._find_or_create_counter(
-            db, account_id=account_id, feature_code=feature_code, quota=quota, window=window
+        carried_over = read_rolling_carried_over(
+            db,
+            EnterpriseFeatureUsageCounterModel,
+            subject_column="enterprise_account_id",
+            subject_id=account_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=window,
+        )
+
+        if supports_atomic_consume(db):
+            return EnterpriseQuotaUsageService._consume_atomic(
+                db,
+                account_id=account_id,
+                feature_code=feature_code,
+                quota=quota,
+                window=window,
+                amount=amount,
+                carried_over=carried_over,
+            )
+
+        # Écritures par instructions ORM, hors flush: le delta du ledger est reporté
+        # explicitement, comme sur le chemin atomique.
+        counter_window = QuotaWindowResolver.counter_window(window)
+        counter, created = EnterpriseQuotaUsageService._find_or_create_counter(
+            db,
+            account_id=account_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=counter_window,
         )
 
-        if counter.used_count + amount > quota.quota_limit:
+        if counter.used_count + carried_over + amount > quota.quota_limit:
+            EnterpriseQuotaUsageService._record_usage_delta(
+                db,
+                account_id=account_id,
+                feature_code=feature_code,
+                quota=quota,
+                window=counter_window,
+                units=0,
+                created=created,
+            )
             raise QuotaExhaustedError(
                 quota_key=quota.quota_key,
-                used=counter.used_count,
+                used=counter.used_count + carried_over,
                 limit=quota.quota_limit,
                 feature_code=feature_code,
             )
 
-        counter.used_count += amount
-        db.flush()
+        db.execute(
+            update(EnterpriseFeatureUsageCounterModel)
+            .where(EnterpriseFeatureUsageCounterModel.id == counter.id)
+            .values(used_count=EnterpriseFeatureUsageCounterModel.used_count + amount),
+            execution_options={
+                "synchronize_session": "evaluate",
+                ENTITLEMENT_CACHE_SUBJECT_OPTION: (B2B_SUBJECT, account_id),
+            },
+        )
+        EnterpriseQuotaUsageService._record_usage_delta(
+            db,
+            account_id=account_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=counter_window,
+            units=amount,
+            created=created,
+        )
 
-        used = counter.used_count
-        remaining = max(0, quota.quota_limit - used)
-        exhausted = used >= quota.quota_limit
+        return build_usage_state(feature_code, quota, window, counter.used_count + carried_over)
 
-        return UsageState(
+    @staticmethod
+    def _consume_atomic(
+        db: Session,
+        *,
+        account_id: int,
+        feature_code: str,
+        quota: QuotaDefinition,
+        window: QuotaWindow,
+        amount: int,
+        carried_over: int,
+    ) -> UsageState:
+        """Consomme en une instruction UPSERT conditionnelle, sans verrou de ligne."""
+        counter_window = QuotaWindowResolver.counter_window(window)
+        counter, created = upsert_consume_counter(
+            db,
+            EnterpriseFeatureUsageCounterModel,
+            subject_column="enterprise_account_id",
+            subject_id=account_id,
+            subject_cache_key=(B2B_SUBJECT, account_id),
+            feature_code=feature_code,
+            quota=quota,
+            window=counter_window,
+            amount=amount,
+            carried_over=carried_over,
+        )
+        if counter is None:
+            raise QuotaExhaustedError(
+                quota_key=quota.quota_key,
+                used=carried_over
+                + read_counter_used(
+                    db,
+                    EnterpriseFeatureUsageCounterModel,
+                    subject_column="enterprise_account_id",
+                    subject_id=account_id,
+                    feature_code=feature_code,
+                    quota=quota,
+                    window=counter_window,
+                ),
+                limit=quota.quota_limit,
+                feature_code=feature_code,
+            )
+        EnterpriseQuotaUsageService._record_usage_delta(
+            db,
+            account_id=account_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=counter_window,
+            units=amount,
+            created=created,
+        )
+        return build_usage_state(feature_code, quota, window, counter.used_count + carried_over)
+
+    @staticmethod
+    def _record_usage_delta(
+        db: Session,
+        *,
+        account_id: int,
+        feature_code: str,
+        quota: QuotaDefinition,
+        window: QuotaWindow,
+        units: int,
+        created: bool,
+    ) -> None:
+        """Reporte au ledger l'usage consommé et, le cas échéant, le compteur créé."""
+        record_usage_delta(
+            db,
+            account_id=account_id,
             feature_code=feature_code,
-            quota_key=quota.quota_key,
-            quota_limit=quota.quota_limit,
-            used=used,
-            remaining=remaining,
-            exhausted=exhausted,
             period_unit=quota.period_unit,
-            period_value=quota.period_value,
             reset_mode=quota.reset_mode,
             window_start=window.window_start,
-            window_end=window.window_end,
+            units=units,
+            rows=1 if created else 0,
         )
 
     @staticmethod
@@ -131,7 +310,8 @@ class EnterpriseQuotaUsageService:
         feature_code: str,
         quota: QuotaDefinition,
         window: QuotaWindow,
-    ) -> EnterpriseFeatureUsageCounterModel:
+    ) -> tuple[EnterpriseFeatureUsageCounterModel, bool]:
+        """Retourne le compteur verrouillé de la fenêtre et s'il vient d'être créé."""
         query = (
             select(EnterpriseFeatureUsageCounterModel)
             .where(
@@ -148,26 +328,28 @@ class EnterpriseQuotaUsageService:
         )
         counter = db.scalar(query)
         if counter is not None:
-            return counter
+            return counter, False
 
-        counter = EnterpriseFeatureUsageCounterModel(
-            enterprise_account_id=account_id,
-            feature_code=feature_code,
-            quota_key=quota.quota_key,
-            period_unit=quota.period_unit,
-            period_value=quota.period_value,
-            reset_mode=quota.reset_mode,
-            window_start=window.window_start,
-            window_end=window.window_end,
-            used_count=0,
-        )
         try:
             with db.begin_nested():
-                db.add(counter)
-                db.flush()
+                db.execute(
+                    insert(EnterpriseFeatureUsageCounterModel).values(
+                        enterprise_account_id=account_id,
+                        feature_code=feature_code,
+                        quota_key=quota.quota_key,
+                        period_unit=quota.period_unit,
+                        period_value=quota.period_value,
+                        reset_mode=quota.reset_mode,
+                        window_start=window.window_start,
+                        window_end=window.window_end,
+                        used_count=0,
+                    ),
+                    execution_options={ENTITLEMENT_CACHE_SUBJECT_OPTION: (B2B_SUBJECT, account_id)},
+                )
         except IntegrityError:
             # Another process created it
             counter = db.scalar(query)
             if counter is None:
                 raise
-        return counter
+            return counter, False
+        return db.scalars(query).one(), True
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Literal
 
@@ -8,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_billing import (
     EnterpriseAccountBillingPlanModel,
@@ -65,6 +67,8 @@ class RepairRunReport:
     skipped_already_canonical: int = 0
     remaining_blockers: list[RepairBlockerEntry] = field(default_factory=list)
     dry_run: bool = False
+    # Dernier compte traité quand `max_accounts` a interrompu le parcours, sinon None.
+    next_account_id: int | None = None
 
 
 @dataclass
@@ -93,169 +97,238 @@ class B2BEntitlementRepairService:
     FEATURE_CODE = "b2b_api_access"
 
     @classmethod
-    def run_auto_repair(cls, db: Session, *, dry_run: bool = False) -> RepairRunReport:
+    def run_auto_repair(
+        cls,
+        db: Session,
+        *,
+        dry_run: bool = False,
+        start_after_account_id: int | None = None,
+        max_accounts: int | None = None,
+        chunk_size: int | None = None,
+    ) -> RepairRunReport:
+        """Répare les comptes actifs par lots ordonnés par id (keyset).
+
+        Chaque lot est préchargé puis commité (point de reprise); `max_accounts`
+        borne le temps d'un appel et `next_account_id` indique où reprendre via
+        `start_after_account_id`. En dry-run, rien n'est commité.
+        """
         report = RepairRunReport(dry_run=dry_run)
+        chunk_size = chunk_size or settings.b2b_entitlement_audit_chunk_size
         dry_run_scope = db.begin_nested() if dry_run else None
+        # Backfills pas encore visibles des préchargements (aperçus dry-run ou
+        # créations du lot en cours), réinjectés dans les lots suivants.
+        backfilled_plans: dict[int, PlanCatalogModel] = {}
+        backfilled_bindings: dict[int, PlanFeatureBindingModel | _RepairBindingPreview] = {}
+        backfilled_quotas: dict[int, list] = {}
+        last_account_id = start_after_account_id
 
         try:
-            all_accounts = db.scalars(
-                select(EnterpriseAccountModel).where(EnterpriseAccountModel.status == "active")
-            ).all()
-            report.accounts_scanned = len(all_accounts)
+            while True:
+                limit = chunk_size
+                if max_accounts is not None:
+                    limit = min(limit, max_accounts - report.accounts_scanned)
+                    if limit <= 0:
+                        report.next_account_id = last_account_id
+                        break
+
+                statement = select(EnterpriseAccountModel).where(
+                    EnterpriseAccountModel.status == "active"
+                )
+                if last_account_id is not None:
+                    statement = statement.where(EnterpriseAccountModel.id > last_account_id)
+                accounts = db.scalars(
+                    statement.order_by(EnterpriseAccountModel.id).limit(limit)
+                ).all()
+                if not accounts:
+                    break
+
+                cls._repair_chunk(
+                    db,
+                    accounts,
+                    report=report,
+                    dry_run=dry_run,
+                    backfilled_plans=backfilled_plans,
+                    backfilled_bindings=backfilled_bindings,
+                    backfilled_quotas=backfilled_quotas,
+                )
+                report.accounts_scanned += len(accounts)
+                last_account_id = accounts[-1].id
+                if not dry_run:
+                    db.commit()
+                    backfilled_plans.clear()
+                    backfilled_bindings.clear()
+                    backfilled_quotas.clear()
+                if len(accounts) < limit:
+                    break
+        finally:
+            if dry_run_scope is not None:
+                dry_run_scope.rollback()
 
-            if not all_accounts:
-                return report
+        return report
+
+    @classmethod
+    def _repair_chunk(
+        cls,
+        db: Session,
+        accounts: Sequence[EnterpriseAccountModel],
+        *,
+        report: RepairRunReport,
+        dry_run: bool,
+        backfilled_plans: dict[int, PlanCatalogModel],
+        backfilled_bindings: dict[int, PlanFeatureBindingModel | _RepairBindingPreview],
+        backfilled_quotas: dict[int, list],
+    ) -> None:
+        account_ids = [account.id for account in accounts]
+        account_plans = {
+            account_plan.enterprise_account_id: account_plan
+            for account_plan in db.scalars(
+                select(EnterpriseAccountBillingPlanModel).where(
+                    EnterpriseAccountBillingPlanModel.enterprise_account_id.in_(account_ids)
+                )
+            ).all()
+        }
 
-            account_ids = [account.id for account in all_accounts]
-            account_plans = {
-                account_plan.enterprise_account_id: account_plan
-                for account_plan in db.scalars(
-                    select(EnterpriseAccountBillingPlanModel).where(
-                        EnterpriseAccountBillingPlanModel.enterprise_account_id.in_(account_ids)
+        plan_ids = [account_plan.plan_id for account_plan in account_plans.values()]
+        enterprise_plans = (
+            {
+                plan.id: plan
+                for plan in db.scalars(
+                    select(EnterpriseBillingPlanModel).where(
+                        EnterpriseBillingPlanModel.id.in_(plan_ids)
                     )
                 ).all()
             }
+            if plan_ids
+            else {}
+        )
 
-            plan_ids = [account_plan.plan_id for account_plan in account_plans.values()]
-            enterprise_plans = (
-                {
-                    plan.id: plan
-                    for plan in db.scalars(
-                        select(EnterpriseBillingPlanModel).where(
-                            EnterpriseBillingPlanModel.id.in_(plan_ids)
-                        )
-                    ).all()
-                }
-                if plan_ids
-                else {}
-            )
-
-            canonical_plans = B2BAuditService._prefetch_canonical_plans(db, plan_ids)
-            bindings = B2BAuditService._prefetch_bindings(
+        canonical_plans = {
+            **B2BAuditService._prefetch_canonical_plans(db, plan_ids),
+            **backfilled_plans,
+        }
+        bindings = {
+            **B2BAuditService._prefetch_bindings(
                 db,
                 canonical_plan_ids=[plan.id for plan in canonical_plans.values()],
-            )
-            quotas = B2BAuditService._prefetch_quotas(
+            ),
+            **backfilled_bindings,
+        }
+        quotas = {
+            **B2BAuditService._prefetch_quotas(
                 db,
                 binding_ids=[binding.id for binding in bindings.values()],
-            )
+            ),
+            **backfilled_quotas,
+        }
 
-            for account in all_accounts:
-                # NOTE: L'absence d'admin_user_id (account.admin_user_id is None) n'est JAMAIS
-                # un motif de remaining_blockers depuis Story 61.25.
-                # Les quotas B2B sont indexés par enterprise_account_id.
-                # admin_user_id est hors périmètre quota.
-                # Use savepoint to isolate account repair
-                with db.begin_nested():
-                    account_plan = account_plans.get(account.id)
-                    enterprise_plan = (
-                        enterprise_plans.get(account_plan.plan_id)
-                        if account_plan is not None
-                        else None
-                    )
-                    current_canonical_plan = (
-                        canonical_plans.get(account_plan.plan_id)
-                        if account_plan is not None
-                        else None
-                    )
-                    current_binding = (
-                        bindings.get(current_canonical_plan.id)
-                        if current_canonical_plan is not None
-                        else None
-                    )
-                    current_quotas = (
-                        quotas.get(current_binding.id) if current_binding is not None else None
-                    )
+        for account in accounts:
+            # NOTE: L'absence d'admin_user_id (account.admin_user_id is None) n'est JAMAIS
+            # un motif de remaining_blockers depuis Story 61.25.
+            # Les quotas B2B sont indexés par enterprise_account_id.
+            # admin_user_id est hors périmètre quota.
+            # Use savepoint to isolate account repair
+            with db.begin_nested():
+                account_plan = account_plans.get(account.id)
+                enterprise_plan = (
+                    enterprise_plans.get(account_plan.plan_id) if account_plan is not None else None
+                )
+                current_canonical_plan = (
+                    canonical_plans.get(account_plan.plan_id) if account_plan is not None else None
+                )
+                current_binding = (
+                    bindings.get(current_canonical_plan.id)
+                    if current_canonical_plan is not None
+                    else None
+                )
+                current_quotas = (
+                    quotas.get(current_binding.id) if current_binding is not None else None
+                )
 
-                    # Recalculate state to decide repair
-                    audit_entry = B2BAuditService._audit_account(
-                        db,
-                        account,
-                        acc_plan=account_plan,
-                        ent_plan=enterprise_plan,
-                        canonical_plan=current_canonical_plan,
-                        binding=current_binding,
-                        quota_models=current_quotas,
-                    )
+                # Recalculate state to decide repair
+                audit_entry = B2BAuditService._audit_account(
+                    db,
+                    account,
+                    acc_plan=account_plan,
+                    ent_plan=enterprise_plan,
+                    canonical_plan=current_canonical_plan,
+                    binding=current_binding,
+                    quota_models=current_quotas,
+                    include_usage=False,
+                )
 
-                    if audit_entry.resolution_source in {
-                        "canonical_quota",
-                        "canonical_unlimited",
-                        "canonical_disabled",
-                    }:
-                        report.skipped_already_canonical += 1
-                        continue
-
-                    if audit_entry.reason == "manual_review_required":
-                        report.remaining_blockers.append(
-                            RepairBlockerEntry(
-                                account_id=account.id,
-                                company_name=account.company_name,
-                                reason=audit_entry.reason,
-                                recommended_action="classify_zero_units",
-                            )
+                if audit_entry.resolution_source in {
+                    "canonical_quota",
+                    "canonical_unlimited",
+                    "canonical_disabled",
+                }:
+                    report.skipped_already_canonical += 1
+                    continue
+
+                if audit_entry.reason == "manual_review_required":
+                    report.remaining_blockers.append(
+                        RepairBlockerEntry(
+                            account_id=account.id,
+                            company_name=account.company_name,
+                            reason=audit_entry.reason,
+                            recommended_action="classify_zero_units",
                         )
-                        continue
-
-                    # Auto-repairable cases
-                    try:
-                        # Case: no_canonical_plan
-                        if (
-                            audit_entry.reason == "no_canonical_plan"
-                            and account_plan is not None
-                            and enterprise_plan is not None
-                        ):
-                            created, current_canonical_plan = cls._backfill_canonical_plan(
-                                db, enterprise_plan, dry_run
-                            )
-                            if created:
-                                report.plans_created += 1
-                                canonical_plans[account_plan.plan_id] = current_canonical_plan
-
-                        # Case: no_binding with included_monthly_units > 0
-                        if (
-                            current_canonical_plan
-                            and enterprise_plan
-                            and enterprise_plan.included_monthly_units > 0
-                        ):
-                            current_binding = bindings.get(current_canonical_plan.id)
-                            if current_binding is None:
-                                b_created, q_created, current_binding, current_quota = (
-                                    cls._backfill_binding_and_quota(
-                                        db, current_canonical_plan, enterprise_plan, dry_run
-                                    )
-                                )
-                                if b_created:
-                                    report.bindings_created += 1
-                                    bindings[current_canonical_plan.id] = current_binding
-                                if q_created:
-                                    report.quotas_created += 1
-                                    quotas[current_binding.id] = [current_quota]
-
-                    except IntegrityError as e:
-                        # Rollback only this account's changes via the nested savepoint.
-                        logger.warning(
-                            "IntegrityError during repair for account %s: %s",
-                            account.id,
-                            e,
+                    )
+                    continue
+
+                # Auto-repairable cases
+                try:
+                    # Case: no_canonical_plan
+                    if (
+                        audit_entry.reason == "no_canonical_plan"
+                        and account_plan is not None
+                        and enterprise_plan is not None
+                    ):
+                        created, current_canonical_plan = cls._backfill_canonical_plan(
+                            db, enterprise_plan, dry_run
                         )
-                        report.remaining_blockers.append(
-                            RepairBlockerEntry(
-                                account_id=account.id,
-                                company_name=account.company_name,
-                                reason="schema_constraint_violation",
-                                recommended_action="schema_constraint_violation",
+                        if created:
+                            report.plans_created += 1
+                            canonical_plans[account_plan.plan_id] = current_canonical_plan
+                            backfilled_plans[account_plan.plan_id] = current_canonical_plan
+
+                    # Case: no_binding with included_monthly_units > 0
+                    if (
+                        current_canonical_plan
+                        and enterprise_plan
+                        and enterprise_plan.included_monthly_units > 0
+                    ):
+                        current_binding = bindings.get(current_canonical_plan.id)
+                        if current_binding is None:
+                            b_created, q_created, current_binding, current_quota = (
+                                cls._backfill_binding_and_quota(
+                                    db, current_canonical_plan, enterprise_plan, dry_run
+                                )
                             )
+                            if b_created:
+                                report.bindings_created += 1
+                                bindings[current_canonical_plan.id] = current_binding
+                                backfilled_bindings[current_canonical_plan.id] = current_binding
+                            if q_created:
+                                report.quotas_created += 1
+                                quotas[current_binding.id] = [current_quota]
+                                backfilled_quotas[current_binding.id] = [current_quota]
+
+                except IntegrityError as e:
+                    # Rollback only this account's changes via the nested savepoint.
+                    logger.warning(
+                        "IntegrityError during repair for account %s: %s",
+                        account.id,
+                        e,
+                    )
+                    report.remaining_blockers.append(
+                        RepairBlockerEntry(
+                            account_id=account.id,
+                            company_name=account.company_name,
+                            reason="schema_constraint_violation",
+                            recommended_action="schema_constraint_violation",
                         )
-                        continue
-        finally:
-            if dry_run_scope is not None:
-                dry_run_scope.rollback()
-
-        if not dry_run:
-            db.commit()
-
-        return report
+                    )
+                    continue
 
     @classmethod
     def _backfill_canonical_plan(
@@ -0,0 +1,298 @@
+# Commentaire global: métrage B2B en écriture différée par baux de quota.
+"""Consomme le quota B2B en mémoire à partir de baux réservés en base par blocs.
+
+Au lieu d'un UPDATE par appel API, chaque processus réserve `lease_size` unités d'un
+compteur (compte, feature, quota, fenêtre) en une seule consommation, puis sert les
+appels suivants depuis ce bail. `flush` rend à la base les unités réservées mais non
+consommées: après un flush, `used_count` vaut exactement la consommation réelle.
+
+Garanties:
+
+- la réservation passe par `EnterpriseQuotaUsageService.consume`, donc la limite du
+  quota n'est jamais dépassée en base;
+- un arrêt brutal sans flush laisse au plus un bail par compteur et par processus
+  compté comme consommé: l'écart est borné par la taille du bail;
+- une consommation servie depuis un bail n'est pas annulée par le rollback de la
+  requête appelante.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.models.enterprise_feature_usage_counters import (
+    EnterpriseFeatureUsageCounterModel,
+)
+from app.infra.observability.metrics import increment_counter
+from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+from app.services.b2b.reconciliation_ledger import record_usage_delta
+from app.services.entitlement.entitlement_types import QuotaDefinition, UsageState
+from app.services.entitlement.snapshot_cache import (
+    B2B_SUBJECT,
+    ENTITLEMENT_CACHE_SUBJECT_OPTION,
+)
+from app.services.quota.usage_service import QuotaExhaustedError, build_usage_state
+from app.services.quota.window_resolver import QuotaWindow, QuotaWindowResolver
+
+logger = logging.getLogger(__name__)
+
+LEASE_RESERVATIONS_METRIC = "b2b_quota_lease_reservations_total"
+LEASE_RESERVED_UNITS_METRIC = "b2b_quota_lease_reserved_units_total"
+LEASE_RELEASED_UNITS_METRIC = "b2b_quota_lease_released_units_total"
+LEASE_FLUSH_ERRORS_METRIC = "b2b_quota_lease_flush_errors_total"
+
+# Nombre de tentatives de réservation lorsque des baux concurrents rendent des unités.
+_RESERVE_ATTEMPTS = 3
+# Verrous de compteur répartis par hachage: leur nombre reste fixe malgré la rotation
+# des fenêtres de quota.
+_KEY_LOCK_STRIPES = 64
+
+LeaseKey = tuple[int, str, str, str, int, str, datetime]
+
+
+@dataclass(slots=True)
+class _Lease:
+    """Unités réservées en base pour un compteur, et part déjà consommée en mémoire."""
+
+    account_id: int
+    feature_code: str
+    quota: QuotaDefinition
+    window: QuotaWindow
+    granted: int = 0
+    consumed: int = 0
+    db_used: int = 0
+
+    @property
+    def available(self) -> int:
+        return self.granted - self.consumed
+
+
+class EnterpriseQuotaLeaseBuffer:
+    """Tampon de baux de quota B2B partagé par processus."""
+
+    def __init__(
+        self,
+        *,
+        lease_size: int,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        if lease_size < 1:
+            raise ValueError("lease_size must be >= 1")
+        self._lease_size = lease_size
+        self._session_factory = session_factory
+        self._leases: dict[LeaseKey, _Lease] = {}
+        self._key_locks = tuple(Lock() for _ in range(_KEY_LOCK_STRIPES))
+        self._lock = Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def lease_size(self) -> int:
+        return self._lease_size
+
+    def consume(
+        self,
+        *,
+        account_id: int,
+        feature_code: str,
+        quota: QuotaDefinition,
+        amount: int = 1,
+        ref_dt: datetime | None = None,
+    ) -> UsageState:
+        """Consomme `amount` depuis le bail du compteur, en le rechargeant si besoin."""
+        if amount <= 0:
+            raise ValueError("amount must be >= 1")
+        if ref_dt is None:
+            ref_dt = datetime_provider.utcnow()
+
+        window = QuotaWindowResolver.compute_window(
+            quota.period_unit, quota.period_value, quota.reset_mode, ref_dt
+        )
+        key: LeaseKey = (
+            account_id,
+            feature_code,
+            quota.quota_key,
+            quota.period_unit,
+            quota.period_value,
+            quota.reset_mode,
+            QuotaWindowResolver.counter_window(window).window_start,
+        )
+        with self._key_lock(key):
+            with self._lock:
+                lease = self._leases.get(key)
+                if lease is None:
+                    lease = _Lease(
+                        account_id=account_id,
+                        feature_code=feature_code,
+                        quota=quota,
+                        window=window,
+                    )
+                    self._leases[key] = lease
+            if lease.available < amount:
+                self._reserve(lease, needed=amount - lease.available, ref_dt=ref_dt)
+            lease.consumed += amount
+            return build_usage_state(feature_code, quota, window, lease.db_used - lease.available)
+
+    def flush(self) -> int:
+        """Rend à la base les unités non consommées de tous les baux et les oublie.
+
+        Retourne le nombre d'unités rendues. Si la transaction de restitution échoue,
+        les baux vidés sont remis en place et le prochain flush retente de les rendre.
+        """
+        with self._lock:
+            keys = list(self._leases)
+        drained: list[tuple[LeaseKey, _Lease]] = []
+        for key in keys:
+            with self._key_lock(key), self._lock:
+                lease = self._leases.pop(key, None)
+            if lease is not None and lease.available > 0:
+                drained.append((key, lease))
+        if not drained:
+            return 0
+
+        released = 0
+        try:
+            with self._open_session() as db:
+                now = datetime_provider.utcnow()
+                for _, lease in drained:
+                    self._release(db, lease, now)
+                    released += lease.available
+                db.commit()
+        except Exception:
+            increment_counter(LEASE_FLUSH_ERRORS_METRIC, 1.0)
+            logger.exception("b2b_quota_lease_flush_failed leases=%d", len(drained))
+            self._restore(drained)
+            return 0
+        increment_counter(LEASE_RELEASED_UNITS_METRIC, float(released))
+        return released
+
+    def outstanding_units(self) -> int:
+        """Unités réservées en base et pas encore consommées, tous baux confondus."""
+        with self._lock:
+            return sum(lease.available for lease in self._leases.values())
+
+    def start(self, *, interval_seconds: float) -> None:
+        """Démarre le flush périodique dans la boucle asyncio courante."""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(self._flush_periodically(interval_seconds))
+
+    async def aclose(self) -> None:
+        """Arrête le flush périodique puis rend les unités restantes."""
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.flush)
+
+    def clear(self) -> None:
+        """Oublie les baux sans les rendre (tests)."""
+        with self._lock:
+            self._leases.clear()
+
+    async def _flush_periodically(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def _key_lock(self, key: LeaseKey) -> Lock:
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def _restore(self, drained: list[tuple[LeaseKey, _Lease]]) -> None:
+        """Remet en place des baux non rendus, fusionnés avec ceux ouverts entre-temps."""
+        for key, lease in drained:
+            with self._key_lock(key), self._lock:
+                current = self._leases.get(key)
+                if current is None:
+                    self._leases[key] = lease
+                    continue
+                current.granted += lease.available
+                current.db_used = max(current.db_used, lease.db_used)
+
+    def _open_session(self) -> Session:
+        if self._session_factory is None:
+            from app.infra.db.session import SessionLocal
+
+            return SessionLocal()
+        return self._session_factory()
+
+    def _reserve(self, lease: _Lease, *, needed: int, ref_dt: datetime) -> None:
+        """Réserve un bloc en base, réduit au reste du quota si le bloc entier ne passe plus."""
+        block = max(self._lease_size, needed)
+        with self._open_session() as db:
+            for _ in range(_RESERVE_ATTEMPTS):
+                try:
+                    state = EnterpriseQuotaUsageService.consume(
+                        db,
+                        account_id=lease.account_id,
+                        feature_code=lease.feature_code,
+                        quota=lease.quota,
+                        amount=block,
+                        ref_dt=ref_dt,
+                    )
+                except QuotaExhaustedError as exc:
+                    db.rollback()
+                    remaining = exc.limit - exc.used
+                    if remaining < needed:
+                        raise
+                    block = min(block, remaining)
+                    continue
+                db.commit()
+                lease.granted += block
+                lease.db_used = state.used
+                increment_counter(LEASE_RESERVATIONS_METRIC, 1.0)
+                increment_counter(LEASE_RESERVED_UNITS_METRIC, float(block))
+                return
+        raise QuotaExhaustedError(
+            quota_key=lease.quota.quota_key,
+            used=lease.quota.quota_limit,
+            limit=lease.quota.quota_limit,
+            feature_code=lease.feature_code,
+        )
+
+    @staticmethod
+    def _release(db: Session, lease: _Lease, now: datetime) -> None:
+        model = EnterpriseFeatureUsageCounterModel
+        quota = lease.quota
+        counter_window = QuotaWindowResolver.counter_window(lease.window)
+        db.execute(
+            update(model)
+            .where(
+                model.enterprise_account_id == lease.account_id,
+                model.feature_code == lease.feature_code,
+                model.quota_key == quota.quota_key,
+                model.period_unit == quota.period_unit,
+                model.period_value == quota.period_value,
+                model.reset_mode == quota.reset_mode,
+                model.window_start == counter_window.window_start,
+            )
+            .values(used_count=model.used_count - lease.available, updated_at=now),
+            execution_options={
+                "synchronize_session": False,
+                ENTITLEMENT_CACHE_SUBJECT_OPTION: (B2B_SUBJECT, lease.account_id),
+            },
+        )
+        record_usage_delta(
+            db,
+            account_id=lease.account_id,
+            feature_code=lease.feature_code,
+            period_unit=quota.period_unit,
+            reset_mode=quota.reset_mode,
+            window_start=counter_window.window_start,
+            units=-lease.available,
+        )
+
+
+enterprise_quota_lease_buffer = EnterpriseQuotaLeaseBuffer(lease_size=settings.b2b_quota_lease_size)
@@ -0,0 +1,406 @@
+# Commentaire global: maintenance incrémentale du ledger de réconciliation B2B.
+"""Tient à jour une ligne de réconciliation par (compte, période) au fil des écritures.
+
+- les compteurs `b2b_api_access` mensuels calendaires ajoutent leur delta d'usage
+  (`usage_units = usage_units + :delta`), ce qui reste exact sous concurrence;
+- un cycle de facturation créé, modifié ou supprimé remplace les colonnes de facturation;
+- une action de réconciliation auditée devient la dernière action de la ligne;
+- `severity`, `mismatch_type` et `status` sont recalculés dans la même instruction SQL.
+
+Les écritures ORM sont captées par un hook `after_flush`. Les chemins qui écrivent
+hors flush (consommation B2B, atomique ou verrouillée, et restitution des baux)
+appellent `record_usage_delta`.
+Toute autre écriture en masse est rattrapée par la reconstruction périodique
+(`run_ledger_recompute`), qui corrige aussi une éventuelle dérive.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from enum import StrEnum
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import and_, case, event, insert, inspect, literal, null, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.models.audit_event import AuditEventModel
+from app.infra.db.models.enterprise_billing import EnterpriseBillingCycleModel
+from app.infra.db.models.enterprise_feature_usage_counters import (
+    EnterpriseFeatureUsageCounterModel,
+)
+from app.infra.db.models.enterprise_reconciliation_ledger import (
+    EnterpriseReconciliationLedgerEntryModel,
+)
+from app.infra.db.models.product_entitlements import PeriodUnit, ResetMode
+from app.infra.observability.metrics import increment_counter, observe_duration
+
+logger = logging.getLogger(__name__)
+
+LEDGER_RECOMPUTE_JOB_ID = "b2b_reconciliation_ledger_recompute"
+LEDGER_RECOMPUTE_SECONDS_METRIC = "b2b_reconciliation_ledger_recompute_seconds"
+LEDGER_RECOMPUTE_ERRORS_METRIC = "b2b_reconciliation_ledger_recompute_errors_total"
+
+RECONCILED_FEATURE_CODE = "b2b_api_access"
+RECONCILIATION_TARGET_TYPE = "enterprise_billing_reconciliation"
+# Au-delà de cet écart (en unités), un cycle existant est en écart majeur.
+MINOR_DELTA_UNITS = 5
+
+_UPSERT_BUILDERS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_KEY_COLUMNS = ("enterprise_account_id", "period_start", "period_end")
+
+LedgerKey = tuple[int, date, date]
+
+
+class ReconciliationSeverity(StrEnum):
+    """Niveaux de gravité des écarts de réconciliation."""
+
+    NONE = "none"
+    MINOR = "minor"
+    MAJOR = "major"
+
+
+class ReconciliationStatus(StrEnum):
+    """Statuts possibles d'un problème de réconciliation."""
+
+    OPEN = "open"
+    INVESTIGATING = "investigating"
+    RESOLVED = "resolved"
+
+
+class ReconciliationActionCode(StrEnum):
+    """Actions disponibles pour résoudre un problème de réconciliation."""
+
+    RECALCULATE = "recalculate"
+    RESYNC = "resync"
+    MARK_INVESTIGATED = "mark_investigated"
+    ANNOTATE = "annotate"
+
+
+def month_period(day: date) -> tuple[date, date]:
+    """Bornes du mois contenant `day`, clé de période des compteurs mensuels."""
+    month_start = day.replace(day=1)
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return month_start, next_month - timedelta(days=1)
+
+
+def is_reconciled_counter(*, feature_code: str, period_unit: str, reset_mode: str) -> bool:
+    """Indique si un compteur d'usage alimente la réconciliation de facturation."""
+    return (
+        feature_code == RECONCILED_FEATURE_CODE
+        and period_unit == PeriodUnit.MONTH
+        and reset_mode == ResetMode.CALENDAR
+    )
+
+
+def _as_expression(value: Any) -> ColumnElement[Any]:
+    if isinstance(value, ColumnElement):
+        return value
+    return null() if value is None else literal(value)
+
+
+def classification_columns(
+    *, usage_units: Any, billed_units: Any, billing_cycle_id: Any, last_action_code: Any
+) -> dict[str, ColumnElement[Any]]:
+    """Expressions SQL de `severity`, `mismatch_type` et `status` pour des valeurs données.
+
+    Reprend les règles de `B2BReconciliationService._severity`, `_mismatch_type` et
+    `_status`; les valeurs peuvent être des colonnes de la ligne ou des littéraux.
+    """
+    usage = _as_expression(usage_units)
+    billed = _as_expression(billed_units)
+    has_cycle = _as_expression(billing_cycle_id).is_not(None)
+    delta = usage - billed
+    return {
+        "severity": case(
+            (delta == 0, ReconciliationSeverity.NONE.value),
+            (~has_cycle, ReconciliationSeverity.MAJOR.value),
+            (
+                delta.between(-MINOR_DELTA_UNITS, MINOR_DELTA_UNITS),
+                ReconciliationSeverity.MINOR.value,
+            ),
+            else_=ReconciliationSeverity.MAJOR.value,
+        ),
+        "mismatch_type": case(
+            (and_(~has_cycle, usage > 0), "missing_billing_cycle"),
+            (and_(has_cycle, usage == 0, billed > 0), "missing_usage_data"),
+            (usage != billed, "usage_vs_billing_mismatch"),
+            else_="coherent",
+        ),
+        "status": case(
+            (delta == 0, ReconciliationStatus.RESOLVED.value),
+            (
+                _as_expression(last_action_code).is_not(None),
+                ReconciliationStatus.INVESTIGATING.value,
+            ),
+            else_=ReconciliationStatus.OPEN.value,
+        ),
+    }
+
+
+def _write_entry(
+    connection: Connection,
+    key: LedgerKey,
+    *,
+    inserted: Mapping[str, Any],
+    updated: Mapping[str, Any],
+) -> None:
+    """Crée la ligne avec `inserted` ou applique `updated` à la ligne existante."""
+    table = EnterpriseReconciliationLedgerEntryModel.__table__
+    now = datetime_provider.utcnow()
+
+    def _with_classification(values: Mapping[str, Any]) -> dict[str, Any]:
+        return {
+            **values,
+            **classification_columns(
+                usage_units=values["usage_units"],
+                billed_units=values["billed_units"],
+                billing_cycle_id=values["billing_cycle_id"],
+                last_action_code=values["last_action_code"],
+            ),
+            "updated_at": now,
+        }
+
+    current = {
+        name: table.c[name]
+        for name in (
+            "usage_units",
+            "usage_rows",
+            "billing_cycle_id",
+            "billed_units",
+            "last_action_code",
+        )
+    }
+    set_values = _with_classification({**current, **updated})
+    insert_values = _with_classification(
+        {
+            "usage_units": 0,
+            "usage_rows": 0,
+            "billing_cycle_id": None,
+            "billed_units": 0,
+            "last_action_code": None,
+            **inserted,
+        }
+    )
+    insert_values.update(dict(zip(_KEY_COLUMNS, key, strict=True)))
+
+    builder = _UPSERT_BUILDERS.get(connection.dialect.name)
+    if builder is not None:
+        connection.execute(
+            builder(table)
+            .values(insert_values)
+            .on_conflict_do_update(index_elements=list(_KEY_COLUMNS), set_=set_values)
+        )
+        return
+    result = connection.execute(update(table).where(_key_clause(key)).values(set_values))
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(insert_values))
+
+
+def _key_clause(key: LedgerKey) -> ColumnElement[bool]:
+    table = EnterpriseReconciliationLedgerEntryModel.__table__
+    return and_(*(table.c[name] == value for name, value in zip(_KEY_COLUMNS, key, strict=True)))
+
+
+def _apply_usage_delta(connection: Connection, key: LedgerKey, *, units: int, rows: int) -> None:
+    table = EnterpriseReconciliationLedgerEntryModel.__table__
+    _write_entry(
+        connection,
+        key,
+        inserted={"usage_units": units, "usage_rows": rows},
+        updated={
+            "usage_units": table.c.usage_units + units,
+            "usage_rows": table.c.usage_rows + rows,
+        },
+    )
+
+
+def _apply_cycle(
+    connection: Connection, key: LedgerKey, cycle: EnterpriseBillingCycleModel | None
+) -> None:
+    values = {
+        "billing_cycle_id": cycle.id if cycle is not None else None,
+        "billed_units": cycle.consumed_units if cycle is not None else 0,
+        "billable_units": cycle.billable_units if cycle is not None else None,
+        "total_amount_cents": cycle.total_amount_cents if cycle is not None else None,
+    }
+    _write_entry(connection, key, inserted=values, updated=values)
+
+
+def _apply_action(connection: Connection, key: LedgerKey, audit: AuditEventModel) -> None:
+    """Enregistre la dernière action d'un problème existant, sans créer de ligne."""
+    table = EnterpriseReconciliationLedgerEntryModel.__table__
+    action_code = audit.details.get("action_code")
+    note = audit.details.get("note")
+    connection.execute(
+        update(table)
+        .where(_key_clause(key))
+        .values(
+            last_action_code=action_code,
+            last_action_at=audit.created_at or datetime_provider.utcnow(),
+            last_action_actor_user_id=audit.actor_user_id,
+            last_action_note=note if isinstance(note, str) and note else None,
+            status=classification_columns(
+                usage_units=table.c.usage_units,
+                billed_units=table.c.billed_units,
+                billing_cycle_id=table.c.billing_cycle_id,
+                last_action_code=action_code,
+            )["status"],
+            updated_at=datetime_provider.utcnow(),
+        )
+    )
+
+
+def record_usage_delta(
+    db: Session,
+    *,
+    account_id: int,
+    feature_code: str,
+    period_unit: str,
+    reset_mode: str,
+    window_start: datetime,
+    units: int,
+    rows: int = 0,
+) -> None:
+    """Reporte dans le ledger une variation d'usage écrite hors ORM."""
+    if not is_reconciled_counter(
+        feature_code=feature_code, period_unit=period_unit, reset_mode=reset_mode
+    ):
+        return
+    if units == 0 and rows == 0:
+        return
+    key = (account_id, *month_period(window_start.date()))
+    _apply_usage_delta(db.connection(), key, units=units, rows=rows)
+
+
+def _parse_issue_key(target_id: str | None) -> LedgerKey | None:
+    parts = (target_id or "").split(":")
+    if len(parts) != 3 or not parts[0].isdigit():
+        return None
+    try:
+        return int(parts[0]), date.fromisoformat(parts[1]), date.fromisoformat(parts[2])
+    except ValueError:
+        return None
+
+
+def _counter_key(counter: EnterpriseFeatureUsageCounterModel) -> LedgerKey | None:
+    if not is_reconciled_counter(
+        feature_code=counter.feature_code,
+        period_unit=counter.period_unit,
+        reset_mode=counter.reset_mode,
+    ):
+        return None
+    return (counter.enterprise_account_id, *month_period(counter.window_start.date()))
+
+
+def _used_count_change(counter: EnterpriseFeatureUsageCounterModel) -> int:
+    history = inspect(counter).attrs.used_count.history
+    if not history.has_changes():
+        return 0
+    added = next((value for value in history.added if isinstance(value, int)), None)
+    deleted = next((value for value in history.deleted if isinstance(value, int)), 0)
+    return 0 if added is None else added - deleted
+
+
+@event.listens_for(Session, "after_flush")
+def _on_after_flush(session: Session, flush_context: Any) -> None:
+    usage: dict[LedgerKey, list[int]] = defaultdict(lambda: [0, 0])
+    cycles: dict[LedgerKey, EnterpriseBillingCycleModel | None] = {}
+    actions: list[tuple[LedgerKey, AuditEventModel]] = []
+    action_codes = {code.value for code in ReconciliationActionCode}
+
+    for instance in session.new:
+        if isinstance(instance, EnterpriseFeatureUsageCounterModel):
+            key = _counter_key(instance)
+            if key is not None:
+                usage[key][0] += instance.used_count or 0
+                usage[key][1] += 1
+        elif isinstance(instance, EnterpriseBillingCycleModel):
+            cycles[(instance.enterprise_account_id, instance.period_start, instance.period_end)] = (
+                instance
+            )
+        elif (
+            isinstance(instance, AuditEventModel)
+            and instance.target_type == RECONCILIATION_TARGET_TYPE
+            and (instance.details or {}).get("action_code") in action_codes
+        ):
+            key = _parse_issue_key(instance.target_id)
+            if key is not None:
+                actions.append((key, instance))
+    for instance in session.dirty:
+        if isinstance(instance, EnterpriseFeatureUsageCounterModel):
+            key = _counter_key(instance)
+            if key is not None:
+                usage[key][0] += _used_count_change(instance)
+        elif isinstance(instance, EnterpriseBillingCycleModel):
+            cycles[(instance.enterprise_account_id, instance.period_start, instance.period_end)] = (
+                instance
+            )
+    for instance in session.deleted:
+        if isinstance(instance, EnterpriseFeatureUsageCounterModel):
+            key = _counter_key(instance)
+            if key is not None:
+                usage[key][0] -= instance.used_count or 0
+                usage[key][1] -= 1
+        elif isinstance(instance, EnterpriseBillingCycleModel):
+            cycles[(instance.enterprise_account_id, instance.period_start, instance.period_end)] = (
+                None
+            )
+
+    if not (usage or cycles or actions):
+        return
+    connection = session.connection()
+    for key, (units, rows) in usage.items():
+        if units or rows:
+            _apply_usage_delta(connection, key, units=units, rows=rows)
+    for key, cycle in cycles.items():
+        _apply_cycle(connection, key, cycle)
+    for key, audit in sorted(actions, key=lambda item: item[1].id or 0):
+        _apply_action(connection, key, audit)
+
+
+def run_ledger_recompute() -> int:
+    """Reconstruit tout le ledger depuis les sources; point d'entrée du job planifié."""
+    from app.infra.db.session import SessionLocal
+    from app.services.b2b.reconciliation_service import B2BReconciliationService
+
+    started = monotonic()
+    try:
+        with SessionLocal() as db:
+            written = B2BReconciliationService.recompute_ledger(
+                db, batch_size=settings.b2b_reconciliation_ledger_recompute_batch_size
+            )
+    except Exception:
+        increment_counter(LEDGER_RECOMPUTE_ERRORS_METRIC)
+        logger.exception("b2b_reconciliation_ledger_recompute_failed")
+        return 0
+    observe_duration(LEDGER_RECOMPUTE_SECONDS_METRIC, monotonic() - started)
+    logger.info("b2b_reconciliation_ledger_recomputed entries=%d", written)
+    return written
+
+
+def schedule_ledger_recompute() -> bool:
+    """Planifie la reconstruction périodique si le scheduler tourne et l'intervalle est > 0."""
+    from app.core.scheduler import scheduler
+
+    interval_seconds = settings.b2b_reconciliation_ledger_recompute_interval_seconds
+    if scheduler is None or not scheduler.running or interval_seconds <= 0:
+        return False
+    scheduler.add_job(
+        run_ledger_recompute,
+        "interval",
+        seconds=interval_seconds,
+        id=LEDGER_RECOMPUTE_JOB_ID,
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
+    return True
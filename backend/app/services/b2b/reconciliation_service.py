@@ -7,12 +7,12 @@ des comptes entreprise, détectant et permettant de résoudre les écarts.
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import date, datetime, timedelta, timezone
-from enum import StrEnum
 from typing import Any
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
 from app.infra.db.models.audit_event import AuditEventModel
@@ -21,8 +21,19 @@ from app.infra.db.models.enterprise_billing import EnterpriseBillingCycleModel
 from app.infra.db.models.enterprise_feature_usage_counters import (
     EnterpriseFeatureUsageCounterModel,
 )
+from app.infra.db.models.enterprise_reconciliation_ledger import (
+    EnterpriseReconciliationLedgerEntryModel,
+)
 from app.infra.db.models.product_entitlements import PeriodUnit, ResetMode
 from app.services.b2b.billing_service import B2BBillingService
+from app.services.b2b.reconciliation_ledger import (
+    RECONCILED_FEATURE_CODE,
+    RECONCILIATION_TARGET_TYPE,
+    ReconciliationActionCode,
+    ReconciliationSeverity,
+    ReconciliationStatus,
+    month_period,
+)
 
 
 class B2BReconciliationServiceError(Exception):
@@ -43,31 +54,6 @@ class B2BReconciliationServiceError(Exception):
         super().__init__(message)
 
 
-class ReconciliationSeverity(StrEnum):
-    """Niveaux de gravité des écarts de réconciliation."""
-
-    NONE = "none"
-    MINOR = "minor"
-    MAJOR = "major"
-
-
-class ReconciliationStatus(StrEnum):
-    """Statuts possibles d'un problème de réconciliation."""
-
-    OPEN = "open"
-    INVESTIGATING = "investigating"
-    RESOLVED = "resolved"
-
-
-class ReconciliationActionCode(StrEnum):
-    """Actions disponibles pour résoudre un problème de réconciliation."""
-
-    RECALCULATE = "recalculate"
-    RESYNC = "resync"
-    MARK_INVESTIGATED = "mark_investigated"
-    ANNOTATE = "annotate"
-
-
 class ReconciliationActionHint(BaseModel):
     """Suggestion d'action de réconciliation avec description."""
 
@@ -147,7 +133,7 @@ class B2BReconciliationService:
     facturés, et fournit des outils pour investiguer et corriger ces écarts.
     """
 
-    _TARGET_TYPE = "enterprise_billing_reconciliation"
+    _TARGET_TYPE = RECONCILIATION_TARGET_TYPE
     _ACTION_HINTS = [
         ReconciliationActionHint(
             code=ReconciliationActionCode.RECALCULATE,
@@ -174,10 +160,7 @@ class B2BReconciliationService:
     @staticmethod
     def _month_bounds(day: date) -> tuple[date, date]:
         """Calcule les bornes du mois contenant la date donnée."""
-        month_start = day.replace(day=1)
-        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
-        month_end = next_month - timedelta(days=1)
-        return month_start, month_end
+        return month_period(day)
 
     @staticmethod
     def _normalize_period_bounds(
@@ -294,16 +277,19 @@ class B2BReconciliationService:
         account_id: int | None,
         period_start: date | None,
         period_end: date | None,
+        account_ids: Sequence[int] | None = None,
     ) -> dict[tuple[int, date, date], dict[str, int]]:
         """
         Agrège les données d'usage par période mensuelle.
         Utilise EnterpriseFeatureUsageCounterModel comme source de vérité canonique.
+        `account_ids` restreint l'agrégat à un lot de comptes (reconstruction du ledger).
         """
         # 1. Collecter les account_ids
-        account_ids_query = select(EnterpriseAccountModel.id)
-        if account_id is not None:
-            account_ids_query = account_ids_query.where(EnterpriseAccountModel.id == account_id)
-        account_ids = [row for row in db.scalars(account_ids_query).all()]
+        if account_ids is None:
+            account_ids_query = select(EnterpriseAccountModel.id)
+            if account_id is not None:
+                account_ids_query = account_ids_query.where(EnterpriseAccountModel.id == account_id)
+            account_ids = [row for row in db.scalars(account_ids_query).all()]
 
         if not account_ids:
             return {}
@@ -315,7 +301,7 @@ class B2BReconciliationService:
             EnterpriseFeatureUsageCounterModel.used_count,
         ).where(
             EnterpriseFeatureUsageCounterModel.enterprise_account_id.in_(account_ids),
-            EnterpriseFeatureUsageCounterModel.feature_code == "b2b_api_access",
+            EnterpriseFeatureUsageCounterModel.feature_code == RECONCILED_FEATURE_CODE,
             EnterpriseFeatureUsageCounterModel.period_unit == PeriodUnit.MONTH,
             EnterpriseFeatureUsageCounterModel.reset_mode == ResetMode.CALENDAR,
         )
@@ -360,11 +346,14 @@ class B2BReconciliationService:
         account_id: int | None,
         period_start: date | None,
         period_end: date | None,
+        account_ids: Sequence[int] | None = None,
     ) -> dict[tuple[int, date, date], EnterpriseBillingCycleModel]:
         """Récupère les cycles de facturation par période."""
         query = select(EnterpriseBillingCycleModel)
         if account_id is not None:
             query = query.where(EnterpriseBillingCycleModel.enterprise_account_id == account_id)
+        if account_ids is not None:
+            query = query.where(EnterpriseBillingCycleModel.enterprise_account_id.in_(account_ids))
         if period_start is not None:
             query = query.where(EnterpriseBillingCycleModel.period_start >= period_start)
         if period_end is not None:
@@ -460,6 +449,47 @@ class B2BReconciliationService:
             last_action=last_action,
         )
 
+    @staticmethod
+    def _issue_from_entry(
+        entry: EnterpriseReconciliationLedgerEntryModel,
+    ) -> ReconciliationIssueData:
+        """Construit un problème de réconciliation depuis sa ligne de ledger."""
+        last_action: ReconciliationLastAction | None = None
+        if entry.last_action_code is not None and entry.last_action_at is not None:
+            last_action = ReconciliationLastAction(
+                action=ReconciliationActionCode(entry.last_action_code),
+                at=entry.last_action_at.isoformat(),
+                actor_user_id=entry.last_action_actor_user_id,
+                note=entry.last_action_note,
+            )
+        return ReconciliationIssueData(
+            issue_id=B2BReconciliationService._issue_id(
+                account_id=entry.enterprise_account_id,
+                period_start=entry.period_start,
+                period_end=entry.period_end,
+            ),
+            account_id=entry.enterprise_account_id,
+            period_start=entry.period_start,
+            period_end=entry.period_end,
+            mismatch_type=entry.mismatch_type,
+            severity=ReconciliationSeverity(entry.severity),
+            status=ReconciliationStatus(entry.status),
+            usage_measured_units=entry.usage_units,
+            billing_consumed_units=entry.billed_units,
+            delta_units=entry.usage_units - entry.billed_units,
+            billing_cycle_id=entry.billing_cycle_id,
+            billable_units=entry.billable_units,
+            total_amount_cents=entry.total_amount_cents,
+            source_trace={
+                "usage_rows": entry.usage_rows,
+                "billing_cycle_id": entry.billing_cycle_id,
+                "period_start": entry.period_start.isoformat(),
+                "period_end": entry.period_end.isoformat(),
+            },
+            recommended_actions=B2BReconciliationService._ACTION_HINTS,
+            last_action=last_action,
+        )
+
     @staticmethod
     def list_issues(
         db: Session,
@@ -511,52 +541,28 @@ class B2BReconciliationService:
             B2BReconciliationService._normalize_period_bounds(period_start, period_end)
         )
 
-        usage_map = B2BReconciliationService._usage_by_period(
-            db,
-            account_id=account_id,
-            period_start=normalized_period_start,
-            period_end=normalized_period_end,
-        )
-        billing_map = B2BReconciliationService._billing_by_period(
-            db,
-            account_id=account_id,
-            period_start=normalized_period_start,
-            period_end=normalized_period_end,
-        )
-        keys = set(usage_map.keys()) | set(billing_map.keys())
-        issue_ids = {
-            B2BReconciliationService._issue_id(
-                account_id=account, period_start=start, period_end=end
-            )
-            for account, start, end in keys
-        }
-        latest_actions = B2BReconciliationService._latest_actions(db, issue_ids=issue_ids)
-
-        issues: list[ReconciliationIssueData] = []
-        for account, start, end in sorted(keys, key=lambda item: (item[0], item[1], item[2])):
-            usage_bucket = usage_map.get((account, start, end), {"usage_units": 0, "usage_rows": 0})
-            cycle = billing_map.get((account, start, end))
-            issue_id = B2BReconciliationService._issue_id(
-                account_id=account,
-                period_start=start,
-                period_end=end,
-            )
-            issue = B2BReconciliationService._build_issue(
-                account_id=account,
-                period_start=start,
-                period_end=end,
-                usage_units=usage_bucket["usage_units"],
-                usage_rows=usage_bucket["usage_rows"],
-                cycle=cycle,
-                last_action=latest_actions.get(issue_id),
-            )
-            if severity is not None and issue.severity != severity:
-                continue
-            issues.append(issue)
-
-        total = len(issues)
+        entry = EnterpriseReconciliationLedgerEntryModel
+        criteria = [or_(entry.usage_rows > 0, entry.billing_cycle_id.is_not(None))]
+        if account_id is not None:
+            criteria.append(entry.enterprise_account_id == account_id)
+        if normalized_period_start is not None:
+            criteria.append(entry.period_start >= normalized_period_start)
+        if normalized_period_end is not None:
+            criteria.append(entry.period_end <= normalized_period_end)
+        if severity is not None:
+            criteria.append(entry.severity == severity.value)
+
+        total = db.scalar(select(func.count()).select_from(entry).where(*criteria)) or 0
+        rows = db.scalars(
+            select(entry)
+            .where(*criteria)
+            .order_by(entry.enterprise_account_id, entry.period_start, entry.period_end)
+            .offset(offset)
+            .limit(limit)
+            .execution_options(populate_existing=True)
+        ).all()
         return ReconciliationIssueListData(
-            items=issues[offset : offset + limit],
+            items=[B2BReconciliationService._issue_from_entry(row) for row in rows],
             total=total,
             limit=limit,
             offset=offset,
@@ -578,22 +584,25 @@ class B2BReconciliationService:
             B2BReconciliationServiceError: Si le problème n'existe pas.
         """
         account_id, period_start, period_end = B2BReconciliationService.parse_issue_id(issue_id)
-        listed = B2BReconciliationService.list_issues(
-            db,
-            account_id=account_id,
-            period_start=period_start,
-            period_end=period_end,
-            limit=100,
-            offset=0,
+        entry = EnterpriseReconciliationLedgerEntryModel
+        row = db.scalar(
+            select(entry)
+            .where(
+                entry.enterprise_account_id == account_id,
+                entry.period_start == period_start,
+                entry.period_end == period_end,
+                or_(entry.usage_rows > 0, entry.billing_cycle_id.is_not(None)),
+            )
+            .execution_options(populate_existing=True)
         )
-        issue = next((item for item in listed.items if item.issue_id == issue_id), None)
-        if issue is None:
+        if row is None:
             raise B2BReconciliationServiceError(
                 code="reconciliation_issue_not_found",
                 message="reconciliation issue was not found",
                 details={"issue_id": issue_id},
             )
-        rows = db.scalars(
+        issue = B2BReconciliationService._issue_from_entry(row)
+        audit_rows = db.scalars(
             select(AuditEventModel)
             .where(
                 AuditEventModel.target_type == B2BReconciliationService._TARGET_TYPE,
@@ -603,7 +612,7 @@ class B2BReconciliationService:
             .limit(20)
         ).all()
         action_log: list[ReconciliationLastAction] = []
-        for row in rows:
+        for row in audit_rows:
             action_code = row.details.get("action_code")
             if not isinstance(action_code, str):
                 continue
@@ -675,3 +684,120 @@ class B2BReconciliationService:
             message="reconciliation action executed",
             correction_state=correction_state,
         )
+
+    @staticmethod
+    def recompute_ledger(
+        db: Session,
+        *,
+        account_ids: Sequence[int] | None = None,
+        batch_size: int = 200,
+    ) -> int:
+        """
+        Reconstruit le ledger de réconciliation depuis les compteurs, cycles et audits.
+
+        Les comptes sont traités par lots de `batch_size`, chacun commité: la mémoire
+        reste bornée et les verrous courts. Les lignes sans usage ni cycle sont supprimées.
+
+        Args:
+            db: Session de base de données.
+            account_ids: Comptes à reconstruire (tous si None).
+            batch_size: Nombre de comptes par lot.
+
+        Returns:
+            Nombre de lignes de ledger écrites.
+        """
+        written = 0
+        if account_ids is not None:
+            ids = sorted(set(account_ids))
+            for index in range(0, len(ids), batch_size):
+                written += B2BReconciliationService._recompute_ledger_batch(
+                    db, ids[index : index + batch_size]
+                )
+                db.commit()
+            return written
+
+        last_account_id = 0
+        while True:
+            batch = list(
+                db.scalars(
+                    select(EnterpriseAccountModel.id)
+                    .where(EnterpriseAccountModel.id > last_account_id)
+                    .order_by(EnterpriseAccountModel.id)
+                    .limit(batch_size)
+                )
+            )
+            if not batch:
+                return written
+            written += B2BReconciliationService._recompute_ledger_batch(db, batch)
+            db.commit()
+            last_account_id = batch[-1]
+
+    @staticmethod
+    def _recompute_ledger_batch(db: Session, account_ids: Sequence[int]) -> int:
+        """Recalcule les lignes de ledger d'un lot de comptes."""
+        usage_map = B2BReconciliationService._usage_by_period(
+            db, account_id=None, period_start=None, period_end=None, account_ids=account_ids
+        )
+        billing_map = B2BReconciliationService._billing_by_period(
+            db, account_id=None, period_start=None, period_end=None, account_ids=account_ids
+        )
+        keys = set(usage_map) | set(billing_map)
+        latest_actions = B2BReconciliationService._latest_actions(
+            db,
+            issue_ids={
+                B2BReconciliationService._issue_id(
+                    account_id=account, period_start=start, period_end=end
+                )
+                for account, start, end in keys
+            },
+        )
+        entry_model = EnterpriseReconciliationLedgerEntryModel
+        existing = {
+            (row.enterprise_account_id, row.period_start, row.period_end): row
+            for row in db.scalars(
+                select(entry_model)
+                .where(entry_model.enterprise_account_id.in_(account_ids))
+                .execution_options(populate_existing=True)
+            )
+        }
+        for account, start, end in keys:
+            usage_bucket = usage_map.get((account, start, end), {"usage_units": 0, "usage_rows": 0})
+            issue = B2BReconciliationService._build_issue(
+                account_id=account,
+                period_start=start,
+                period_end=end,
+                usage_units=usage_bucket["usage_units"],
+                usage_rows=usage_bucket["usage_rows"],
+                cycle=billing_map.get((account, start, end)),
+                last_action=latest_actions.get(
+                    B2BReconciliationService._issue_id(
+                        account_id=account, period_start=start, period_end=end
+                    )
+                ),
+            )
+            entry = existing.pop((account, start, end), None)
+            if entry is None:
+                entry = entry_model(
+                    enterprise_account_id=account, period_start=start, period_end=end
+                )
+                db.add(entry)
+            entry.usage_units = issue.usage_measured_units
+            entry.usage_rows = usage_bucket["usage_rows"]
+            entry.billing_cycle_id = issue.billing_cycle_id
+            entry.billed_units = issue.billing_consumed_units
+            entry.billable_units = issue.billable_units
+            entry.total_amount_cents = issue.total_amount_cents
+            entry.mismatch_type = issue.mismatch_type
+            entry.severity = issue.severity.value
+            entry.status = issue.status.value
+            last_action = issue.last_action
+            entry.last_action_code = last_action.action.value if last_action else None
+            entry.last_action_at = (
+                datetime.fromisoformat(last_action.at) if last_action is not None else None
+            )
+            entry.last_action_actor_user_id = last_action.actor_user_id if last_action else None
+            entry.last_action_note = last_action.note if last_action else None
+        for stale in existing.values():
+            db.delete(stale)
+        db.flush()
+        return len(keys)
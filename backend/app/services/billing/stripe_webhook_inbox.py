@@ -0,0 +1,296 @@
+# Commentaire global: inbox durable des webhooks Stripe et workers de traitement.
+"""Découple l'accusé de réception Stripe du traitement métier des webhooks.
+
+- l'endpoint vérifie la signature, persiste l'événement en `received` et répond 2xx;
+- des workers asyncio claiment les événements par lots (`FOR UPDATE SKIP LOCKED`
+  sur PostgreSQL), un seul événement en cours par client Stripe et dans l'ordre
+  d'arrivée;
+- le traitement réutilise `StripeWebhookService.process_claimed_event`: les
+  transitions `processing -> processed | failed` restent celles de
+  `StripeWebhookIdempotencyService`;
+- un échec est replanifié avec un backoff exponentiel jusqu'à `max_attempts`, un
+  claim abandonné (worker arrêté brutalement) est repris après `stale_claim_seconds`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import stripe
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.models.stripe_webhook_event import StripeWebhookEventModel
+from app.infra.observability.metrics import increment_counter, observe_duration, set_gauge
+from app.services.billing.stripe_webhook_service import StripeWebhookService
+
+logger = logging.getLogger(__name__)
+
+RECEIVED_STATUS = "received"
+
+INBOX_EVENTS_METRIC = "stripe_webhook_inbox_events_total"
+INBOX_LAG_METRIC = "stripe_webhook_inbox_lag_seconds"
+INBOX_BACKLOG_METRIC = "stripe_webhook_inbox_backlog"
+INBOX_WORKER_ERRORS_METRIC = "stripe_webhook_inbox_worker_errors_total"
+
+# Plafond du délai de replanification d'un événement en échec.
+_MAX_RETRY_DELAY_SECONDS = 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class ClaimedWebhookEvent:
+    """Événement claimé par un worker, avec son retard depuis la réception."""
+
+    record_id: int
+    stripe_event_id: str
+    payload: dict[str, Any]
+    processing_attempts: int
+    lag_seconds: float
+
+
+def _event_payload(event: stripe.Event) -> dict[str, Any]:
+    """Copie JSON brute de l'événement, rejouable par `stripe.Event.construct_from`."""
+    return json.loads(json.dumps(event))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class StripeWebhookInboxService:
+    """Écrit et claim les événements de l'inbox `stripe_webhook_events`."""
+
+    @staticmethod
+    def enqueue(db: Session, event: stripe.Event) -> str:
+        """
+        Persiste un événement vérifié en `received`.
+        Retourne `received`, ou `duplicate_ignored` si Stripe relivre un événement connu.
+        """
+        stripe_event_id = str(event.id)
+        stripe_object_id = getattr(event.data.object, "id", None)
+        try:
+            with db.begin_nested():
+                db.add(
+                    StripeWebhookEventModel(
+                        stripe_event_id=stripe_event_id,
+                        event_type=str(event.type),
+                        stripe_object_id=str(stripe_object_id) if stripe_object_id else None,
+                        livemode=bool(getattr(event, "livemode", False)),
+                        status=RECEIVED_STATUS,
+                        processing_attempts=0,
+                        payload=_event_payload(event),
+                        stripe_customer_id=StripeWebhookService._extract_customer_id(event),
+                    )
+                )
+                db.flush()
+            increment_counter(INBOX_EVENTS_METRIC, 1.0, labels={"outcome": RECEIVED_STATUS})
+            return RECEIVED_STATUS
+        except IntegrityError:
+            pass
+
+        record = db.scalars(
+            select(StripeWebhookEventModel)
+            .where(StripeWebhookEventModel.stripe_event_id == stripe_event_id)
+            .with_for_update()
+        ).first()
+        if record is not None and record.status == "failed":
+            # Relivraison d'un événement en échec: remis en file sans attendre le backoff.
+            record.status = RECEIVED_STATUS
+            record.available_at = None
+            if record.payload is None:
+                record.payload = _event_payload(event)
+                record.stripe_customer_id = StripeWebhookService._extract_customer_id(event)
+            db.flush()
+            return RECEIVED_STATUS
+        return "duplicate_ignored"
+
+    @staticmethod
+    def claim_batch(
+        db: Session,
+        *,
+        now_utc: datetime,
+        limit: int,
+        max_attempts: int,
+        stale_claim_seconds: float,
+    ) -> list[ClaimedWebhookEvent]:
+        """
+        Passe en `processing` les plus anciens événements prêts, un seul par client Stripe.
+        Le commit appartient à l'appelant: il libère les verrous `SKIP LOCKED`.
+        """
+        model = StripeWebhookEventModel
+        sibling = aliased(StripeWebhookEventModel)
+        retryable_failed = and_(
+            model.status == "failed",
+            model.processing_attempts < max_attempts,
+            or_(model.available_at.is_(None), model.available_at <= now_utc),
+        )
+        stale_claim = and_(
+            model.status == "processing",
+            model.claimed_at < now_utc - timedelta(seconds=stale_claim_seconds),
+        )
+        # Un événement plus ancien encore à traiter pour le même client bloque les suivants.
+        older_pending = exists().where(
+            sibling.stripe_customer_id == model.stripe_customer_id,
+            sibling.id < model.id,
+            or_(
+                sibling.status.in_((RECEIVED_STATUS, "processing")),
+                and_(sibling.status == "failed", sibling.processing_attempts < max_attempts),
+            ),
+        )
+        records = list(
+            db.scalars(
+                select(model)
+                .where(
+                    model.payload.is_not(None),
+                    or_(model.status == RECEIVED_STATUS, retryable_failed, stale_claim),
+                    ~older_pending,
+                )
+                .order_by(model.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        )
+
+        claimed: list[ClaimedWebhookEvent] = []
+        for record in records:
+            record.status = "processing"
+            record.processing_attempts += 1
+            record.last_error = None
+            record.processed_at = None
+            record.claimed_at = now_utc
+            claimed.append(
+                ClaimedWebhookEvent(
+                    record_id=record.id,
+                    stripe_event_id=record.stripe_event_id,
+                    payload=dict(record.payload or {}),
+                    processing_attempts=record.processing_attempts,
+                    lag_seconds=max(
+                        (_as_utc(now_utc) - _as_utc(record.received_at)).total_seconds(), 0.0
+                    ),
+                )
+            )
+        db.flush()
+        return claimed
+
+    @staticmethod
+    def process(
+        db: Session,
+        claimed: ClaimedWebhookEvent,
+        *,
+        now_utc: datetime,
+        retry_base_seconds: float,
+    ) -> str:
+        """Rejoue l'événement claimé et replanifie un échec avec backoff exponentiel."""
+        event = stripe.Event.construct_from(claimed.payload, stripe.api_key)
+        outcome = StripeWebhookService.process_claimed_event(db, event)
+        if outcome == "failed_internal":
+            record = db.get(StripeWebhookEventModel, claimed.record_id)
+            if record is not None:
+                delay = min(
+                    retry_base_seconds * (2 ** (claimed.processing_attempts - 1)),
+                    _MAX_RETRY_DELAY_SECONDS,
+                )
+                record.available_at = now_utc + timedelta(seconds=delay)
+                db.flush()
+        increment_counter(INBOX_EVENTS_METRIC, 1.0, labels={"outcome": outcome})
+        return outcome
+
+    @staticmethod
+    def backlog(db: Session) -> int:
+        """Nombre d'événements reçus et pas encore claimés."""
+        return (
+            db.scalar(
+                select(func.count())
+                .select_from(StripeWebhookEventModel)
+                .where(StripeWebhookEventModel.status == RECEIVED_STATUS)
+            )
+            or 0
+        )
+
+
+class StripeWebhookInboxWorkerPool:
+    """Pool de workers asyncio qui vident l'inbox, chacun dans un thread à son tour."""
+
+    def __init__(self, session_factory: Callable[[], Session] | None = None) -> None:
+        self._session_factory = session_factory
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def run_once(self) -> int:
+        """Claim puis traite un lot; retourne le nombre d'événements claimés."""
+        with self._open_session() as db:
+            claimed = StripeWebhookInboxService.claim_batch(
+                db,
+                now_utc=datetime_provider.utcnow(),
+                limit=settings.stripe_webhook_inbox_batch_size,
+                max_attempts=settings.stripe_webhook_inbox_max_attempts,
+                stale_claim_seconds=settings.stripe_webhook_inbox_stale_claim_seconds,
+            )
+            set_gauge(INBOX_BACKLOG_METRIC, float(StripeWebhookInboxService.backlog(db)))
+            db.commit()
+            for item in claimed:
+                observe_duration(INBOX_LAG_METRIC, item.lag_seconds)
+                try:
+                    StripeWebhookInboxService.process(
+                        db,
+                        item,
+                        now_utc=datetime_provider.utcnow(),
+                        retry_base_seconds=settings.stripe_webhook_inbox_retry_base_seconds,
+                    )
+                    db.commit()
+                except Exception:
+                    # Le claim reste `processing`: il sera repris une fois périmé.
+                    db.rollback()
+                    increment_counter(INBOX_WORKER_ERRORS_METRIC, 1.0)
+                    logger.exception(
+                        "stripe_webhook_inbox_process_failed event_id=%s", item.stripe_event_id
+                    )
+        return len(claimed)
+
+    def start(self, *, workers: int, interval_seconds: float) -> None:
+        """Démarre `workers` boucles de polling dans la boucle asyncio courante."""
+        if any(not task.done() for task in self._tasks):
+            return
+        self._tasks = [
+            asyncio.create_task(self._poll(interval_seconds)) for _ in range(max(workers, 1))
+        ]
+
+    async def aclose(self) -> None:
+        """Arrête les workers; un lot en cours termine dans son thread."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _poll(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.run_once)
+            except Exception:
+                increment_counter(INBOX_WORKER_ERRORS_METRIC, 1.0)
+                logger.exception("stripe_webhook_inbox_poll_failed")
+                claimed = 0
+            if claimed == 0:
+                await asyncio.sleep(interval_seconds)
+
+    def _open_session(self) -> Session:
+        if self._session_factory is None:
+            from app.infra.db.session import SessionLocal
+
+            return SessionLocal()
+        return self._session_factory()
+
+
+stripe_webhook_inbox_workers = StripeWebhookInboxWorkerPool()
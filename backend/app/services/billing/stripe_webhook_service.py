@@ -84,6 +84,18 @@ class StripeWebhookService:
         if claim_status == "duplicate_ignored":
             return "duplicate_ignored"
 
+        return StripeWebhookService.process_claimed_event(db, event)
+
+    @staticmethod
+    def process_claimed_event(db: Session, event: stripe.Event) -> str:
+        """
+        Exécute la logique métier d'un événement déjà claimé (`processing`).
+        Partagé par le traitement inline et les workers de l'inbox.
+        """
+        event_type = event.type
+        event_id = event.id
+        customer_id = StripeWebhookService._extract_customer_id(event)
+
         try:
             # On utilise un SAVEPOINT (begin_nested) pour la logique métier
             # afin de pouvoir rollback la logique métier mais committer le statut 'failed'
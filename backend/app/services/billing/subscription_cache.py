@@ -7,6 +7,11 @@ from time import monotonic
 
 from app.core.config import settings
 from app.services.billing.models import SubscriptionStatusData
+from app.services.entitlement.snapshot_cache import (
+    B2C_SUBJECT,
+    invalidate_entitlement_subject,
+    reset_entitlement_snapshot_cache,
+)
 
 MAX_SUBSCRIPTION_CACHE_ENTRIES = 10_000
 SUBSCRIPTION_STATUS_CACHE: dict[int, tuple[float, SubscriptionStatusData]] = {}
@@ -66,9 +71,12 @@ def invalidate_cached_subscription_status(user_id: int) -> None:
     """Invalide le cache d abonnement d un utilisateur donne."""
     with SUBSCRIPTION_STATUS_CACHE_LOCK:
         SUBSCRIPTION_STATUS_CACHE.pop(user_id, None)
+    # Le plan et le statut billing du snapshot d entitlements derivent de ce statut.
+    invalidate_entitlement_subject(B2C_SUBJECT, user_id)
 
 
 def reset_subscription_status_cache() -> None:
     """Vide completement le cache des statuts d abonnement."""
     with SUBSCRIPTION_STATUS_CACHE_LOCK:
         SUBSCRIPTION_STATUS_CACHE.clear()
+    reset_entitlement_snapshot_cache()
@@ -21,6 +21,7 @@ from app.services.canonical_entitlement.alert.retry import (
 )
 from app.services.canonical_entitlement.shared.alert_delivery_runtime import (
     CanonicalEntitlementAlertDeliveryRuntime,
+    PendingAlertDelivery,
 )
 from app.services.canonical_entitlement.suppression.application import (
     CanonicalEntitlementAlertSuppressionApplicationService,
@@ -82,41 +83,29 @@ class CanonicalEntitlementAlertBatchRetryService:
                 alert_event_ids=alert_event_ids,
             )
 
-        retried_count = 0
-        sent_count = 0
-        failed_count = 0
-
-        for event in candidates:
-            attempt_number = CanonicalEntitlementAlertRetryService._next_attempt_number(
-                db, alert_event_id=event.id
-            )
-            outcome = CanonicalEntitlementAlertDeliveryRuntime.deliver_payload(
-                event.payload,
-                log_message="ops_alert_batch_retry_log_delivery",
-                delivered_at=effective_now,
-            )
-            if outcome.status == "sent":
-                sent_count += 1
-            else:
-                failed_count += 1
-
-            CanonicalEntitlementAlertDeliveryRuntime.add_delivery_attempt(
-                db=db,
-                alert_event=event,
-                attempt_number=attempt_number,
-                request_id=request_id,
+        attempt_numbers = CanonicalEntitlementAlertRetryService._next_attempt_numbers(
+            db, alert_event_ids=alert_event_ids
+        )
+        deliveries = [
+            PendingAlertDelivery(
+                alert_event_id=event.id,
+                attempt_number=attempt_numbers[event.id],
                 payload=event.payload,
-                outcome=outcome,
-            )
-            CanonicalEntitlementAlertDeliveryRuntime.apply_delivery_state(
-                alert_event=event,
-                outcome=outcome,
-                attempt_number=attempt_number,
-                updated_at=effective_now,
             )
-            retried_count += 1
+            for event in candidates
+        ]
+        # Phase réseau concurrente hors transaction, puis écriture groupée des états.
+        outcomes = CanonicalEntitlementAlertDeliveryRuntime.deliver_pending(
+            db,
+            deliveries,
+            log_message="ops_alert_batch_retry_log_delivery",
+            delivered_at=effective_now,
+            request_id=request_id,
+        )
+        sent_count = sum(1 for outcome in outcomes if outcome.status == "sent")
+        retried_count = len(outcomes)
+        failed_count = retried_count - sent_count
 
-        db.flush()
         return BatchRetryResult(
             candidate_count=candidate_count,
             retried_count=retried_count,
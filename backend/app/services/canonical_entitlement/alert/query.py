@@ -8,9 +8,10 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import case, func, literal, select
+from sqlalchemy import Integer, case, func, literal, select
 from sqlalchemy.orm import Session
 
+from app.infra.db.keyset import CountMode, KeysetCursor, count_rows, keyset_after
 from app.infra.db.models.entitlement_mutation.alert.alert_event import (
     CanonicalEntitlementMutationAlertEventModel,
 )
@@ -64,10 +65,18 @@ class CanonicalEntitlementAlertQueryService:
         request_id: str | None = None,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
-    ) -> tuple[list[AlertEventRow], int]:
+        cursor: KeysetCursor | None = None,
+        count_mode: CountMode = "exact",
+    ) -> tuple[list[AlertEventRow], int | None]:
+        """Pagine les alertes par `(created_at, id)` décroissants en un aller-retour.
+
+        Avec `cursor`, la page reprend après le dernier couple servi et `page` est
+        ignoré. Le total exact reste calculé dans la même requête; `estimated` et
+        `none` évitent le parcours complet du filtre.
+        """
         model = CanonicalEntitlementMutationAlertEventModel
         column_names = [column.name for column in model.__table__.columns]
-        base_subquery = CanonicalEntitlementAlertQueryService._build_filtered_query(
+        filtered_query = CanonicalEntitlementAlertQueryService._build_filtered_query(
             alert_kind=alert_kind,
             delivery_status=delivery_status,
             audit_id=audit_id,
@@ -78,15 +87,24 @@ class CanonicalEntitlementAlertQueryService:
             request_id=request_id,
             date_from=date_from,
             date_to=date_to,
-        ).subquery()
-        paged_subquery = (
-            select(base_subquery)
-            .order_by(base_subquery.c.created_at.desc(), base_subquery.c.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .subquery()
         )
-        total_count_subquery = select(func.count()).select_from(base_subquery).scalar_subquery()
+        base_subquery = filtered_query.subquery()
+        paged_query = select(base_subquery).order_by(
+            base_subquery.c.created_at.desc(), base_subquery.c.id.desc()
+        )
+        if cursor is not None:
+            paged_query = paged_query.where(
+                keyset_after(base_subquery.c.created_at, base_subquery.c.id, cursor)
+            )
+        else:
+            paged_query = paged_query.offset((page - 1) * page_size)
+        paged_subquery = paged_query.limit(page_size).subquery()
+        if count_mode == "exact":
+            total_count_subquery = select(func.count()).select_from(base_subquery).scalar_subquery()
+            separate_total = None
+        else:
+            total_count_subquery = literal(None, type_=Integer)
+            separate_total = count_rows(db, filtered_query, count_mode)
         has_page_items = select(literal(1)).select_from(paged_subquery).exists()
         page_query = select(
             *[paged_subquery.c[name].label(name) for name in column_names],
@@ -103,13 +121,16 @@ class CanonicalEntitlementAlertQueryService:
             ).where(~has_page_items)
         )
         page_rows = list(db.execute(page_query).mappings().all())
-        if not page_rows:
-            return [], 0
-        if page_rows[0]["is_empty"]:
-            return [], page_rows[0]["total_count"] or 0
+        if count_mode != "exact":
+            total_count = separate_total
+        elif page_rows:
+            total_count = page_rows[0]["total_count"] or 0
+        else:
+            total_count = 0
+        if not page_rows or page_rows[0]["is_empty"]:
+            return [], total_count
 
         events = [model(**{name: row[name] for name in column_names}) for row in page_rows]
-        total_count = page_rows[0]["total_count"] or 0
 
         attempts_by_event = CanonicalEntitlementAlertQueryService._load_attempts_by_event(
             db,
@@ -18,6 +18,7 @@ from app.infra.db.models.entitlement_mutation.alert.delivery_attempt import (
 )
 from app.services.canonical_entitlement.shared.alert_delivery_runtime import (
     CanonicalEntitlementAlertDeliveryRuntime,
+    PendingAlertDelivery,
 )
 from app.services.canonical_entitlement.suppression.application import (
     CanonicalEntitlementAlertSuppressionApplicationService,
@@ -68,42 +69,28 @@ class CanonicalEntitlementAlertRetryService:
                 dry_run=True,
             )
 
-        retried_count = 0
-        sent_count = 0
-        failed_count = 0
-
-        for event in candidates:
-            attempt_number = CanonicalEntitlementAlertRetryService._next_attempt_number(
-                db, alert_event_id=event.id
-            )
-            outcome = CanonicalEntitlementAlertDeliveryRuntime.deliver_payload(
-                event.payload,
-                log_message="ops_alert_retry_log_delivery",
-                delivered_at=effective_now,
-            )
-
-            if outcome.status == "sent":
-                sent_count += 1
-            else:
-                failed_count += 1
-
-            CanonicalEntitlementAlertDeliveryRuntime.add_delivery_attempt(
-                db=db,
-                alert_event=event,
-                attempt_number=attempt_number,
-                request_id=request_id,
+        attempt_numbers = CanonicalEntitlementAlertRetryService._next_attempt_numbers(
+            db, alert_event_ids=[event.id for event in candidates]
+        )
+        deliveries = [
+            PendingAlertDelivery(
+                alert_event_id=event.id,
+                attempt_number=attempt_numbers[event.id],
                 payload=event.payload,
-                outcome=outcome,
             )
-            CanonicalEntitlementAlertDeliveryRuntime.apply_delivery_state(
-                alert_event=event,
-                outcome=outcome,
-                attempt_number=attempt_number,
-                updated_at=effective_now,
-            )
-            retried_count += 1
+            for event in candidates
+        ]
+        outcomes = CanonicalEntitlementAlertDeliveryRuntime.deliver_pending(
+            db,
+            deliveries,
+            log_message="ops_alert_retry_log_delivery",
+            delivered_at=effective_now,
+            request_id=request_id,
+        )
+        sent_count = sum(1 for outcome in outcomes if outcome.status == "sent")
+        retried_count = len(outcomes)
+        failed_count = retried_count - sent_count
 
-        db.flush()
         return AlertRetryRunResult(
             candidate_count=len(candidates),
             retried_count=retried_count,
@@ -196,13 +183,17 @@ class CanonicalEntitlementAlertRetryService:
         return results
 
     @staticmethod
-    def _next_attempt_number(db: Session, *, alert_event_id: int) -> int:
-        max_attempt = db.execute(
-            select(
-                func.max(CanonicalEntitlementMutationAlertDeliveryAttemptModel.attempt_number)
-            ).where(
-                CanonicalEntitlementMutationAlertDeliveryAttemptModel.alert_event_id
-                == alert_event_id
-            )
-        ).scalar_one()
-        return (max_attempt or 0) + 1
+    def _next_attempt_numbers(db: Session, *, alert_event_ids: list[int]) -> dict[int, int]:
+        """Calcule en une requête le prochain numéro de tentative de chaque alerte."""
+        attempt_model = CanonicalEntitlementMutationAlertDeliveryAttemptModel
+        next_numbers = dict.fromkeys(alert_event_ids, 1)
+        if not alert_event_ids:
+            return next_numbers
+        rows = db.execute(
+            select(attempt_model.alert_event_id, func.max(attempt_model.attempt_number))
+            .where(attempt_model.alert_event_id.in_(alert_event_ids))
+            .group_by(attempt_model.alert_event_id)
+        ).all()
+        for alert_event_id, max_attempt in rows:
+            next_numbers[alert_event_id] = (max_attempt or 0) + 1
+        return next_numbers
@@ -26,6 +26,7 @@ from app.services.canonical_entitlement.audit.review_queue import (
 )
 from app.services.canonical_entitlement.shared.alert_delivery_runtime import (
     CanonicalEntitlementAlertDeliveryRuntime,
+    PendingAlertDelivery,
 )
 from app.services.canonical_entitlement.suppression.application import (
     CanonicalEntitlementAlertSuppressionApplicationService,
@@ -36,6 +37,9 @@ from app.services.canonical_entitlement.suppression.rule import (
 
 logger = logging.getLogger(__name__)
 
+# Erreur portée par une alerte créée dont la livraison initiale n'a pas encore abouti.
+PENDING_DELIVERY_ERROR = "delivery_pending"
+
 
 @dataclass
 class AlertRunResult:
@@ -73,31 +77,15 @@ class CanonicalEntitlementAlertService:
             page=1,
             page_size=1,
         )
-        max_sql_rows = max(settings.ops_review_queue_alert_max_candidates, limit or 0, 1)
         active_rules = CanonicalEntitlementAlertSuppressionRuleService.load_active_rules(db)
 
-        # 1. Charger tous les candidats potentiels (SLA status is not None)
-        # On ne filtre pas encore sur sla_status=overdue/due_soon via SQL pour réutiliser
-        # le service read-only qui charge aussi les reviews et calcule le SLA.
-        all_rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
-            db,
-            now_utc=now_utc,
-            max_sql_rows=max_sql_rows,
+        # Candidats `due_soon`/`overdue` hors `closed`/`expected`, lus sur la review
+        # queue matérialisée (échéances indexées comparées à `now_utc`).
+        if limit is None:
+            limit = max(settings.ops_review_queue_alert_max_candidates, 1)
+        candidates = CanonicalEntitlementReviewQueueService.list_sla_alert_candidates(
+            db, now_utc=now_utc, limit=limit
         )
-
-        # 2. Filtrer les candidats
-        candidates: list[ReviewQueueRow] = []
-        for row in all_rows:
-            # Filtrer sla_status in {"due_soon", "overdue"}
-            if row.sla_status not in {"due_soon", "overdue"}:
-                continue
-            # Exclusion : effective_review_status in {"closed", "expected"}
-            if row.effective_review_status in {"closed", "expected"}:
-                continue
-            candidates.append(row)
-
-        if limit is not None:
-            candidates = candidates[:limit]
         candidate_count = len(candidates)
 
         if candidate_count == 0:
@@ -117,6 +105,7 @@ class CanonicalEntitlementAlertService:
         emitted_count = 0
         skipped_duplicate_count = 0
         failed_count = 0
+        deliveries: list[PendingAlertDelivery] = []
 
         for row in candidates:
             dedupe_key = CanonicalEntitlementAlertService._build_dedupe_key(row)
@@ -128,10 +117,12 @@ class CanonicalEntitlementAlertService:
                 emitted_count += 1
                 continue
 
-            # 4. Tentative d'émission (avec savepoint pour IntegrityError)
+            # 4. Création de l'event (avec savepoint pour IntegrityError)
             try:
                 with db.begin_nested():
-                    # Créer l'event initial (pending delivery)
+                    # Event initial "en attente": `failed` retryable tant que la
+                    # livraison n'a pas abouti, pour qu'un arrêt pendant la phase
+                    # réseau le laisse au job de retry.
                     alert_kind = "sla_due_soon" if row.sla_status == "due_soon" else "sla_overdue"
 
                     payload = CanonicalEntitlementAlertService._build_payload(row, request_id)
@@ -151,11 +142,14 @@ class CanonicalEntitlementAlertService:
                         sla_target_seconds_snapshot=row.sla_target_seconds,
                         due_at_snapshot=row.due_at,
                         age_seconds_snapshot=row.age_seconds,
-                        delivery_channel="log",  # Default, updated below
-                        last_delivery_status="sent",  # Default, updated below
+                        delivery_channel=(
+                            "webhook" if settings.ops_review_queue_alert_webhook_url else "log"
+                        ),
+                        last_delivery_status="failed",
+                        last_delivery_error=PENDING_DELIVERY_ERROR,
                         request_id=request_id,
                         payload=payload,
-                        delivery_attempt_count=1,
+                        delivery_attempt_count=0,
                     )
                     db.add(event)
                     db.flush()
@@ -165,23 +159,11 @@ class CanonicalEntitlementAlertService:
                         active_rules=active_rules,
                         request_id=request_id,
                     )
-
-                    # 5. Delivery
-                    outcome = CanonicalEntitlementAlertDeliveryRuntime.deliver_payload(
-                        payload,
-                        log_message="ops_review_queue_alert_log_delivery",
-                        delivered_at=now_utc,
-                    )
-                    CanonicalEntitlementAlertDeliveryRuntime.apply_delivery_state(
-                        alert_event=event,
-                        outcome=outcome,
-                        attempt_number=1,
-                        updated_at=now_utc,
+                    deliveries.append(
+                        PendingAlertDelivery(
+                            alert_event_id=event.id, attempt_number=1, payload=payload
+                        )
                     )
-                    if outcome.status == "sent":
-                        emitted_count += 1
-                    else:
-                        failed_count += 1
 
             except IntegrityError:
                 # Race condition handled
@@ -194,6 +176,18 @@ class CanonicalEntitlementAlertService:
                 failed_count += 1
                 continue
 
+        # 5. Delivery concurrente hors transaction, puis synchronisation groupée des états.
+        outcomes = CanonicalEntitlementAlertDeliveryRuntime.deliver_pending(
+            db,
+            deliveries,
+            log_message="ops_review_queue_alert_log_delivery",
+            delivered_at=now_utc,
+            record_attempts=False,
+        )
+        sent_count = sum(1 for outcome in outcomes if outcome.status == "sent")
+        emitted_count += sent_count
+        failed_count += len(outcomes) - sent_count
+
         return AlertRunResult(
             sql_count=sql_count,
             candidate_count=candidate_count,
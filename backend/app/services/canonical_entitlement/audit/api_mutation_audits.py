@@ -12,6 +12,13 @@ from sqlalchemy.orm import Session
 from app.core.auth_context import AuthenticatedUser
 from app.core.exceptions import ApplicationError
 from app.core.rate_limit import RateLimitError, check_rate_limit
+from app.infra.db.keyset import (
+    CountMode,
+    InvalidCursorError,
+    KeysetCursor,
+    decode_cursor,
+    next_cursor_for,
+)
 from app.infra.db.models.entitlement_mutation.alert.handling import (
     CanonicalEntitlementMutationAlertHandlingModel,
 )
@@ -36,7 +43,6 @@ ReviewStatusLiteral = Literal[
     "pending_review", "acknowledged", "expected", "investigating", "closed"
 ]
 PersistedReviewStatusLiteral = WritableReviewStatusLiteral
-_DIFF_FILTER_MAX = 10_000
 from app.services.api_contracts.ops.entitlement_mutation_audits import (
     AlertHandlingState,
     ReviewState,
@@ -64,6 +70,8 @@ def build_mutation_audit_list_response(
     changed_field_filter: str | None,
     review_status_filter: ReviewStatusLiteral | None,
     include_payloads: bool,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
 ) -> Any:
     """Construit la réponse de liste des mutations en dehors du routeur HTTP."""
     role_error = _ensure_ops_role(current_user, request_id)
@@ -74,7 +82,16 @@ def build_mutation_audit_list_response(
     if limit_error is not None:
         return limit_error
 
-    sql_filter_kwargs: dict[str, Any] = dict(
+    keyset_cursor = _decode_cursor_param(cursor, request_id)
+
+    # Les filtres diff et revue portent sur les colonnes écrites avec l'audit:
+    # pagination SQL, sans plafond sur le volume filtré.
+    items, total_count = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
+        db,
+        page=page,
+        page_size=page_size,
+        cursor=keyset_cursor,
+        count_mode=count_mode,
         plan_id=plan_id,
         plan_code=plan_code,
         feature_code=feature_code,
@@ -84,112 +101,46 @@ def build_mutation_audit_list_response(
         request_id=request_id_filter,
         date_from=date_from,
         date_to=date_to,
+        risk_level=risk_level_filter,
+        change_kind=change_kind_filter,
+        changed_field=changed_field_filter,
+        review_status=review_status_filter,
     )
-
-    has_diff_or_review_filter = any(
-        [risk_level_filter, change_kind_filter, changed_field_filter, review_status_filter]
-    )
-
-    if not has_diff_or_review_filter:
-        items, total_count = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-            db,
-            page=page,
-            page_size=page_size,
-            **sql_filter_kwargs,
-        )
-        audit_ids = [audit.id for audit in items]
-        reviews_by_id = _load_reviews_by_audit_ids(db, audit_ids)
-
-        return {
-            "data": {
-                "items": [
-                    _to_item(
-                        item,
-                        include_payloads=include_payloads,
-                        review_record=reviews_by_id.get(item.id),
-                    )
-                    for item in items
-                ],
-                "total_count": total_count,
-                "page": page,
-                "page_size": page_size,
-            },
-            "meta": {"request_id": request_id},
-        }
-
-    _, sql_count = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-        db,
-        page=1,
-        page_size=1,
-        **sql_filter_kwargs,
-    )
-
-    if sql_count > _DIFF_FILTER_MAX:
-        return _raise_error(
-            request_id=request_id,
-            code="diff_filter_result_set_too_large",
-            message=(
-                f"Too many results to apply diff filter ({sql_count} > {_DIFF_FILTER_MAX}). "
-                "Add SQL filters to narrow the result set."
-            ),
-            details={"sql_count": sql_count, "max_allowed": _DIFF_FILTER_MAX},
-        )
-
-    all_items, _ = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-        db,
-        page=1,
-        page_size=_DIFF_FILTER_MAX,
-        **sql_filter_kwargs,
-    )
-
-    all_audit_ids = [audit.id for audit in all_items]
-    reviews_by_id = _load_reviews_by_audit_ids(db, all_audit_ids)
-
-    filtered: list[tuple[Any, Any, CanonicalEntitlementMutationAuditReviewModel | None]] = []
-    for item in all_items:
-        diff = CanonicalEntitlementMutationDiffService.compute_diff(
-            item.before_payload or {}, item.after_payload or {}
-        )
-        if risk_level_filter and diff.risk_level != risk_level_filter:
-            continue
-        if change_kind_filter and diff.change_kind != change_kind_filter:
-            continue
-        if changed_field_filter and changed_field_filter not in diff.changed_fields:
-            continue
-        review_record = reviews_by_id.get(item.id)
-        if review_status_filter is not None:
-            effective_status = (
-                review_record.review_status
-                if review_record is not None
-                else ("pending_review" if diff.risk_level == "high" else None)
-            )
-            if effective_status != review_status_filter:
-                continue
-        filtered.append((item, diff, review_record))
-
-    total_count = len(filtered)
-    start = (page - 1) * page_size
-    page_items = filtered[start : start + page_size]
+    reviews_by_id = _load_reviews_by_audit_ids(db, [audit.id for audit in items])
 
     return {
         "data": {
             "items": [
-                _to_item_with_diff(
+                _to_item(
                     item,
-                    diff=diff,
                     include_payloads=include_payloads,
-                    review_record=review_record,
+                    review_record=reviews_by_id.get(item.id),
                 )
-                for item, diff, review_record in page_items
+                for item in items
             ],
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor_for(items, page_size=page_size, sort_attr="occurred_at"),
         },
         "meta": {"request_id": request_id},
     }
 
 
+def _decode_cursor_param(cursor: str | None, request_id: str) -> KeysetCursor | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError:
+        return _raise_error(
+            request_id=request_id,
+            code="invalid_cursor",
+            message="cursor is invalid",
+            details={"field": "cursor"},
+        )
+
+
 def _raise_error(
     *,
     request_id: str,
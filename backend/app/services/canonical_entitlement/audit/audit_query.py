@@ -4,13 +4,21 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, exists, or_, select
 from sqlalchemy.orm import Session
 
+from app.infra.db.keyset import CountMode, KeysetCursor, count_rows, keyset_after
 from app.infra.db.models.canonical_entitlement_mutation_audit import (
     CanonicalEntitlementMutationAuditModel,
 )
+from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+    CanonicalEntitlementMutationAuditChangedFieldModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.review import (
+    CanonicalEntitlementMutationAuditReviewModel,
+)
 
 
 class CanonicalEntitlementMutationAuditQueryService:
@@ -29,7 +37,20 @@ class CanonicalEntitlementMutationAuditQueryService:
         request_id: str | None = None,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
-    ) -> tuple[list[CanonicalEntitlementMutationAuditModel], int]:
+        risk_level: str | None = None,
+        change_kind: str | None = None,
+        changed_field: str | None = None,
+        review_status: str | None = None,
+        incident_key: str | None = None,
+        cursor: KeysetCursor | None = None,
+        count_mode: CountMode = "exact",
+    ) -> tuple[list[CanonicalEntitlementMutationAuditModel], int | None]:
+        """Pagine les audits; les filtres diff et revue portent sur les colonnes matérialisées.
+
+        `review_status` filtre le statut effectif: sans revue, un audit `high` est
+        `pending_review`. Avec `cursor`, la page reprend après `(occurred_at, id)` et
+        `page` est ignoré; `count_mode` rend le total optionnel ou estimé.
+        """
         q = select(CanonicalEntitlementMutationAuditModel)
         if plan_id is not None:
             q = q.where(CanonicalEntitlementMutationAuditModel.plan_id == plan_id)
@@ -49,18 +70,44 @@ class CanonicalEntitlementMutationAuditQueryService:
             q = q.where(CanonicalEntitlementMutationAuditModel.occurred_at >= date_from)
         if date_to is not None:
             q = q.where(CanonicalEntitlementMutationAuditModel.occurred_at <= date_to)
+        if risk_level is not None:
+            q = q.where(CanonicalEntitlementMutationAuditModel.risk_level == risk_level)
+        if change_kind is not None:
+            q = q.where(CanonicalEntitlementMutationAuditModel.change_kind == change_kind)
+        if changed_field is not None:
+            q = q.where(
+                exists().where(
+                    CanonicalEntitlementMutationAuditChangedFieldModel.audit_id
+                    == CanonicalEntitlementMutationAuditModel.id,
+                    CanonicalEntitlementMutationAuditChangedFieldModel.field_path == changed_field,
+                )
+            )
+        if review_status is not None:
+            q = q.where(_effective_review_status_clause(review_status))
+        if incident_key is not None:
+            q = q.where(
+                _review_exists(
+                    CanonicalEntitlementMutationAuditReviewModel.incident_key == incident_key
+                )
+            )
 
-        count_q = select(func.count()).select_from(q.subquery())
-        total_count = db.scalar(count_q) or 0
+        total_count = count_rows(db, q, count_mode)
 
-        q = (
-            q.order_by(
-                CanonicalEntitlementMutationAuditModel.occurred_at.desc(),
-                CanonicalEntitlementMutationAuditModel.id.desc(),
-            )
-            .offset((page - 1) * page_size)
-            .limit(page_size)
+        q = q.order_by(
+            CanonicalEntitlementMutationAuditModel.occurred_at.desc(),
+            CanonicalEntitlementMutationAuditModel.id.desc(),
         )
+        if cursor is not None:
+            q = q.where(
+                keyset_after(
+                    CanonicalEntitlementMutationAuditModel.occurred_at,
+                    CanonicalEntitlementMutationAuditModel.id,
+                    cursor,
+                )
+            )
+        else:
+            q = q.offset((page - 1) * page_size)
+        q = q.limit(page_size)
         items = list(db.scalars(q).all())
         return items, total_count
 
@@ -69,3 +116,23 @@ class CanonicalEntitlementMutationAuditQueryService:
         db: Session, audit_id: int
     ) -> CanonicalEntitlementMutationAuditModel | None:
         return db.get(CanonicalEntitlementMutationAuditModel, audit_id)
+
+
+def _review_exists(*criteria: Any) -> Any:
+    return exists().where(
+        CanonicalEntitlementMutationAuditReviewModel.audit_id
+        == CanonicalEntitlementMutationAuditModel.id,
+        *criteria,
+    )
+
+
+def _effective_review_status_clause(review_status: str) -> Any:
+    reviewed_with_status = _review_exists(
+        CanonicalEntitlementMutationAuditReviewModel.review_status == review_status
+    )
+    if review_status != "pending_review":
+        return reviewed_with_status
+    return or_(
+        reviewed_with_status,
+        and_(~_review_exists(), CanonicalEntitlementMutationAuditModel.risk_level == "high"),
+    )
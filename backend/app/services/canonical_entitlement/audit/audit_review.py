@@ -17,6 +17,9 @@ from app.infra.db.models.entitlement_mutation.audit.review import (
 from app.infra.db.models.entitlement_mutation.audit.review_event import (
     CanonicalEntitlementMutationAuditReviewEventModel,
 )
+from app.services.canonical_entitlement.audit.review_queue import (
+    CanonicalEntitlementReviewQueueService,
+)
 
 
 class AuditNotFoundError(Exception):
@@ -98,6 +101,9 @@ class CanonicalEntitlementMutationAuditReviewService:
             review.review_version += 1
             review.updated_at = now
 
+        # Le statut effectif et les échéances SLA suivent la revue courante.
+        CanonicalEntitlementReviewQueueService.refresh_entry(audit, review)
+
         event = CanonicalEntitlementMutationAuditReviewEventModel(
             audit_id=audit_id,
             event_type="created" if is_creation else "updated",
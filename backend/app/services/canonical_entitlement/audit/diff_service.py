@@ -1,9 +1,24 @@
 # Service de calcul du diff canonique des mutations entitlement.
-"""Calcule un diff stable et un niveau de risque pour les mutations canoniques."""
+"""Calcule un diff stable et un niveau de risque pour les mutations canoniques.
+
+Le diff est matérialisé à l'écriture sur l'audit (`change_kind`, `risk_level`, table
+des champs modifiés) pour que les filtres de lecture restent en SQL.
+"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.infra.db.models.canonical_entitlement_mutation_audit import (
+    CanonicalEntitlementMutationAuditModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+    CanonicalEntitlementMutationAuditChangedFieldModel,
+)
 
 
 @dataclass
@@ -37,6 +52,20 @@ class CanonicalEntitlementMutationDiffService:
             return CanonicalEntitlementMutationDiffService._diff_created(after)
         return CanonicalEntitlementMutationDiffService._diff_updated(before, after)
 
+    @staticmethod
+    def apply_to_audit(audit: CanonicalEntitlementMutationAuditModel) -> MutationDiffResult:
+        """Calcule le diff d'un audit et le recopie dans ses colonnes indexées."""
+        diff = CanonicalEntitlementMutationDiffService.compute_diff(
+            audit.before_payload or {}, audit.after_payload or {}
+        )
+        audit.change_kind = diff.change_kind
+        audit.risk_level = diff.risk_level
+        audit.changed_field_rows = [
+            CanonicalEntitlementMutationAuditChangedFieldModel(field_path=path)
+            for path in diff.changed_fields
+        ]
+        return diff
+
     @staticmethod
     def _quota_key(q: dict) -> tuple:
         return (
@@ -150,3 +179,14 @@ class CanonicalEntitlementMutationDiffService:
 
         # LOW
         return "low"
+
+
+@event.listens_for(Session, "before_flush")
+def _apply_diff_to_new_audits(session: Session, _flush_context: Any, _instances: Any) -> None:
+    """Complète les audits insérés hors `CanonicalEntitlementMutationService`."""
+    for instance in list(session.new):
+        if (
+            isinstance(instance, CanonicalEntitlementMutationAuditModel)
+            and instance.risk_level is None
+        ):
+            CanonicalEntitlementMutationDiffService.apply_to_audit(instance)
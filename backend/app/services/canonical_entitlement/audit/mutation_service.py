@@ -22,6 +22,12 @@ from app.infra.db.models.product_entitlements import (
     PlanFeatureQuotaModel,
     SourceOrigin,
 )
+from app.services.canonical_entitlement.audit.diff_service import (
+    CanonicalEntitlementMutationDiffService,
+)
+from app.services.canonical_entitlement.audit.review_queue import (
+    CanonicalEntitlementReviewQueueService,
+)
 from app.services.entitlement.feature_scope_registry import (
     FeatureScope,
     UnknownFeatureCodeError,
@@ -160,20 +166,22 @@ class CanonicalEntitlementMutationService:
         after_payload = CanonicalEntitlementMutationService._snapshot_binding_by_id(db, binding.id)
 
         if before_payload != after_payload:
-            db.add(
-                CanonicalEntitlementMutationAuditModel(
-                    operation="upsert_plan_feature_configuration",
-                    plan_id=plan.id,
-                    plan_code_snapshot=plan.plan_code,
-                    feature_code=feature_code,
-                    actor_type=mutation_context.actor_type,
-                    actor_identifier=mutation_context.actor_identifier,
-                    request_id=mutation_context.request_id,
-                    source_origin=source_origin.value,
-                    before_payload=before_payload,
-                    after_payload=after_payload,
-                )
+            audit = CanonicalEntitlementMutationAuditModel(
+                operation="upsert_plan_feature_configuration",
+                plan_id=plan.id,
+                plan_code_snapshot=plan.plan_code,
+                feature_code=feature_code,
+                actor_type=mutation_context.actor_type,
+                actor_identifier=mutation_context.actor_identifier,
+                request_id=mutation_context.request_id,
+                source_origin=source_origin.value,
+                before_payload=before_payload,
+                after_payload=after_payload,
             )
+            # Diff calculé une fois ici, puis filtré en SQL par les lectures ops.
+            CanonicalEntitlementMutationDiffService.apply_to_audit(audit)
+            CanonicalEntitlementReviewQueueService.refresh_entry(audit, None)
+            db.add(audit)
             db.flush()
 
         return binding
@@ -1,5 +1,10 @@
 # Service de construction de la review queue entitlement mutation.
-"""Compose les lignes SLA à partir des audits, des reviews et du diff canonique."""
+"""Lit la review queue matérialisée et maintient ses lignes SLA à l'écriture.
+
+Chaque audit porte une entrée (statut effectif, cible SLA, échéances) recalculée à
+sa création et à chaque revue. Le statut SLA se déduit en SQL par comparaison des
+échéances à `now`: listes, synthèse et candidats d'alerte sont des requêtes indexées.
+"""
 
 from __future__ import annotations
 
@@ -7,15 +12,20 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Literal
 
-from sqlalchemy import select
+from sqlalchemy import and_, case, event, func, or_, select
 from sqlalchemy.orm import Session
 
+from app.core.datetime_provider import utc_now
+from app.infra.db.models.canonical_entitlement_mutation_audit import (
+    CanonicalEntitlementMutationAuditModel,
+)
 from app.infra.db.models.entitlement_mutation.audit.review import (
     CanonicalEntitlementMutationAuditReviewModel,
 )
-from app.services.canonical_entitlement.audit.audit_query import (
-    CanonicalEntitlementMutationAuditQueryService,
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
 )
+from app.services.canonical_entitlement.audit.audit_query import _review_exists
 from app.services.canonical_entitlement.audit.diff_service import (
     CanonicalEntitlementMutationDiffService,
 )
@@ -86,91 +96,286 @@ class CanonicalEntitlementReviewQueueService:
         date_from: datetime | None = None,
         date_to: datetime | None = None,
         sla_status: str | None = None,
-        max_sql_rows: int = 10000,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[ReviewQueueRow]:
-        sql_kwargs = dict(
+        """Retourne les lignes triées par priorité métier, paginées en SQL."""
+        entry = CanonicalEntitlementMutationReviewQueueEntryModel
+        audit_model = CanonicalEntitlementMutationAuditModel
+        q = CanonicalEntitlementReviewQueueService._filter_entries(
+            select(audit_model, entry, _sla_status_clause(now_utc).label("sla_status")).join(
+                entry, entry.audit_id == audit_model.id
+            ),
+            now_utc=now_utc,
+            risk_level=risk_level,
+            effective_review_status=effective_review_status,
+            feature_code=feature_code,
+            actor_type=actor_type,
+            actor_identifier=actor_identifier,
+            incident_key=incident_key,
+            date_from=date_from,
+            date_to=date_to,
+            sla_status=sla_status,
+            join_audit=False,
+        ).order_by(entry.status_priority, entry.occurred_at, entry.audit_id)
+        if offset:
+            q = q.offset(offset)
+        if limit is not None:
+            q = q.limit(limit)
+        return CanonicalEntitlementReviewQueueService._to_rows(db, db.execute(q).all(), now_utc)
+
+    @staticmethod
+    def count_review_queue_rows(
+        db: Session,
+        *,
+        now_utc: datetime,
+        risk_level: str | None = None,
+        effective_review_status: str | None = None,
+        feature_code: str | None = None,
+        actor_type: str | None = None,
+        actor_identifier: str | None = None,
+        incident_key: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        sla_status: str | None = None,
+    ) -> int:
+        entry = CanonicalEntitlementMutationReviewQueueEntryModel
+        q = CanonicalEntitlementReviewQueueService._filter_entries(
+            select(func.count()).select_from(entry),
+            now_utc=now_utc,
+            risk_level=risk_level,
+            effective_review_status=effective_review_status,
+            feature_code=feature_code,
+            actor_type=actor_type,
+            actor_identifier=actor_identifier,
+            incident_key=incident_key,
+            date_from=date_from,
+            date_to=date_to,
+            sla_status=sla_status,
+        )
+        return db.scalar(q) or 0
+
+    @staticmethod
+    def get_review_queue_summary(
+        db: Session,
+        *,
+        now_utc: datetime,
+        risk_level: str | None = None,
+        effective_review_status: str | None = None,
+        feature_code: str | None = None,
+        actor_type: str | None = None,
+        actor_identifier: str | None = None,
+        incident_key: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        sla_status: str | None = None,
+    ) -> ReviewQueueSummarySnapshot:
+        """Agrège les compteurs de la review queue en une seule requête SQL."""
+        entry = CanonicalEntitlementMutationReviewQueueEntryModel
+        status = entry.effective_review_status
+
+        def _count_where(condition: Any) -> Any:
+            return func.count(case((condition, 1)))
+
+        q = CanonicalEntitlementReviewQueueService._filter_entries(
+            select(
+                func.count().label("total_count"),
+                _count_where(status == "pending_review").label("pending_review_count"),
+                _count_where(status == "investigating").label("investigating_count"),
+                _count_where(status == "acknowledged").label("acknowledged_count"),
+                _count_where(status == "closed").label("closed_count"),
+                _count_where(status == "expected").label("expected_count"),
+                _count_where(status.is_(None)).label("no_review_count"),
+                _count_where(and_(entry.risk_level == "high", status == "pending_review")).label(
+                    "high_unreviewed_count"
+                ),
+                _count_where(_sla_status_condition("overdue", now_utc)).label("overdue_count"),
+                _count_where(_sla_status_condition("due_soon", now_utc)).label("due_soon_count"),
+                func.min(case((status == "pending_review", entry.occurred_at))).label(
+                    "oldest_pending_at"
+                ),
+            ).select_from(entry),
+            now_utc=now_utc,
+            risk_level=risk_level,
+            effective_review_status=effective_review_status,
             feature_code=feature_code,
             actor_type=actor_type,
             actor_identifier=actor_identifier,
+            incident_key=incident_key,
             date_from=date_from,
             date_to=date_to,
+            sla_status=sla_status,
+        )
+        row = db.execute(q).one()
+        oldest_pending_age = None
+        if row.oldest_pending_at is not None:
+            oldest_pending_at = CanonicalEntitlementReviewQueueService._normalize_occurred_at(
+                row.oldest_pending_at
+            )
+            oldest_pending_age = int((now_utc - oldest_pending_at).total_seconds())
+        return ReviewQueueSummarySnapshot(
+            pending_review_count=row.pending_review_count,
+            investigating_count=row.investigating_count,
+            acknowledged_count=row.acknowledged_count,
+            closed_count=row.closed_count,
+            expected_count=row.expected_count,
+            no_review_count=row.no_review_count,
+            high_unreviewed_count=row.high_unreviewed_count,
+            total_count=row.total_count,
+            overdue_count=row.overdue_count,
+            due_soon_count=row.due_soon_count,
+            oldest_pending_age_seconds=oldest_pending_age,
         )
 
-        all_items, _ = CanonicalEntitlementMutationAuditQueryService.list_mutation_audits(
-            db, page=1, page_size=max_sql_rows, **sql_kwargs
+    @staticmethod
+    def list_sla_alert_candidates(
+        db: Session, *, now_utc: datetime, limit: int
+    ) -> list[ReviewQueueRow]:
+        """Retourne les audits `due_soon`/`overdue` encore ouverts, par priorité métier."""
+        entry = CanonicalEntitlementMutationReviewQueueEntryModel
+        audit_model = CanonicalEntitlementMutationAuditModel
+        q = (
+            select(audit_model, entry, _sla_status_clause(now_utc).label("sla_status"))
+            .join(entry, entry.audit_id == audit_model.id)
+            .where(
+                entry.due_soon_at < now_utc,
+                or_(
+                    entry.effective_review_status.is_(None),
+                    entry.effective_review_status.not_in(("closed", "expected")),
+                ),
+            )
+            .order_by(entry.status_priority, entry.occurred_at, entry.audit_id)
+            .limit(limit)
         )
+        return CanonicalEntitlementReviewQueueService._to_rows(db, db.execute(q).all(), now_utc)
 
-        if not all_items:
-            return []
+    @staticmethod
+    def refresh_entry(
+        audit: CanonicalEntitlementMutationAuditModel,
+        review_record: CanonicalEntitlementMutationAuditReviewModel | None,
+    ) -> CanonicalEntitlementMutationReviewQueueEntryModel:
+        """Recalcule l'entrée de review queue d'un audit à partir de sa revue courante."""
+        if audit.risk_level is None:
+            CanonicalEntitlementMutationDiffService.apply_to_audit(audit)
+        if audit.occurred_at is None:
+            audit.occurred_at = utc_now()
+        occurred_at = CanonicalEntitlementReviewQueueService._normalize_occurred_at(
+            audit.occurred_at
+        )
+        eff_status = CanonicalEntitlementReviewQueueService._compute_review_state_status(
+            audit.risk_level, review_record
+        )
+        target = _SLA_TARGETS.get((audit.risk_level, eff_status))
+
+        entry = audit.review_queue_entry
+        if entry is None:
+            entry = CanonicalEntitlementMutationReviewQueueEntryModel()
+            audit.review_queue_entry = entry
+        entry.occurred_at = occurred_at
+        entry.risk_level = audit.risk_level
+        entry.effective_review_status = eff_status
+        entry.status_priority = _STATUS_PRIORITY.get(eff_status, _STATUS_PRIORITY[None])
+        entry.sla_target_seconds = target
+        if target is None:
+            entry.due_at = None
+            entry.due_soon_at = None
+        else:
+            entry.due_at = occurred_at + timedelta(seconds=target)
+            entry.due_soon_at = entry.due_at - timedelta(seconds=int(target * _SLA_DUE_SOON_RATIO))
+        return entry
 
-        # Load reviews
-        audit_ids = [a.id for a in all_items]
-        reviews_by_id = {}
-        if audit_ids:
-            result = db.execute(
+    @staticmethod
+    def _filter_entries(
+        q: Any,
+        *,
+        now_utc: datetime,
+        risk_level: str | None,
+        effective_review_status: str | None,
+        feature_code: str | None,
+        actor_type: str | None,
+        actor_identifier: str | None,
+        incident_key: str | None,
+        date_from: datetime | None,
+        date_to: datetime | None,
+        sla_status: str | None,
+        join_audit: bool = True,
+    ) -> Any:
+        entry = CanonicalEntitlementMutationReviewQueueEntryModel
+        audit_model = CanonicalEntitlementMutationAuditModel
+        if risk_level is not None:
+            q = q.where(entry.risk_level == risk_level)
+        if effective_review_status is not None:
+            q = q.where(entry.effective_review_status == effective_review_status)
+        if date_from is not None:
+            q = q.where(entry.occurred_at >= date_from)
+        if date_to is not None:
+            q = q.where(entry.occurred_at <= date_to)
+        if sla_status is not None:
+            q = q.where(_sla_status_condition(sla_status, now_utc))
+        audit_criteria: list[Any] = []
+        if feature_code is not None:
+            audit_criteria.append(audit_model.feature_code == feature_code)
+        if actor_type is not None:
+            audit_criteria.append(audit_model.actor_type == actor_type)
+        if actor_identifier is not None:
+            audit_criteria.append(audit_model.actor_identifier == actor_identifier)
+        if incident_key is not None:
+            audit_criteria.append(
+                _review_exists(
+                    CanonicalEntitlementMutationAuditReviewModel.incident_key == incident_key
+                )
+            )
+        if not audit_criteria:
+            return q
+        if join_audit:
+            q = q.join(audit_model, audit_model.id == entry.audit_id)
+        return q.where(*audit_criteria)
+
+    @staticmethod
+    def _to_rows(db: Session, results: list[Any], now_utc: datetime) -> list[ReviewQueueRow]:
+        if not results:
+            return []
+        audit_ids = [audit.id for audit, _, _ in results]
+        reviews_by_id = {
+            review.audit_id: review
+            for review in db.scalars(
                 select(CanonicalEntitlementMutationAuditReviewModel).where(
                     CanonicalEntitlementMutationAuditReviewModel.audit_id.in_(audit_ids)
                 )
             )
-            reviews_by_id = {r.audit_id: r for r in result.scalars().all()}
-
+        }
         rows: list[ReviewQueueRow] = []
-        for audit in all_items:
+        for audit, entry, sla_status in results:
+            # Diff recalculé pour la seule page servie (changed_fields, quotas).
             diff = CanonicalEntitlementMutationDiffService.compute_diff(
                 audit.before_payload or {}, audit.after_payload or {}
             )
-
-            if risk_level and diff.risk_level != risk_level:
-                continue
-
-            review_record = reviews_by_id.get(audit.id)
-            eff_status = CanonicalEntitlementReviewQueueService._compute_review_state_status(
-                diff.risk_level, review_record
+            occurred_at = CanonicalEntitlementReviewQueueService._normalize_occurred_at(
+                audit.occurred_at
             )
-
-            if effective_review_status and eff_status != effective_review_status:
-                continue
-
-            if incident_key:
-                if review_record is None or review_record.incident_key != incident_key:
-                    continue
-
-            occurred_at = audit.occurred_at
-            if occurred_at.tzinfo is None:
-                occurred_at = occurred_at.replace(tzinfo=timezone.utc)
-
             age_seconds = int((now_utc - occurred_at).total_seconds())
-            sla_data = CanonicalEntitlementReviewQueueService._compute_sla(
-                diff.risk_level, eff_status, occurred_at, now_utc
+            due_at = (
+                CanonicalEntitlementReviewQueueService._normalize_occurred_at(entry.due_at)
+                if entry.due_at is not None
+                else None
             )
-
-            if sla_status and sla_data["sla_status"] != sla_status:
-                continue
-
+            overdue_seconds = None
+            if sla_status == "overdue" and due_at is not None:
+                overdue_seconds = max(int((now_utc - due_at).total_seconds()), 0)
             rows.append(
                 ReviewQueueRow(
                     audit=audit,
                     diff=diff,
-                    review_record=review_record,
-                    effective_review_status=eff_status,
-                    sla_target_seconds=sla_data["sla_target_seconds"],
-                    due_at=sla_data["due_at"],
-                    sla_status=sla_data["sla_status"],
-                    overdue_seconds=sla_data["overdue_seconds"],
+                    review_record=reviews_by_id.get(audit.id),
+                    effective_review_status=entry.effective_review_status,
+                    sla_target_seconds=entry.sla_target_seconds,
+                    due_at=due_at,
+                    sla_status=sla_status,
+                    overdue_seconds=overdue_seconds,
                     age_seconds=age_seconds,
                     age_hours=round(age_seconds / 3600, 2),
                 )
             )
-
-        rows.sort(
-            key=lambda row: (
-                _STATUS_PRIORITY.get(row.effective_review_status, _STATUS_PRIORITY[None]),
-                CanonicalEntitlementReviewQueueService._normalize_occurred_at(
-                    row.audit.occurred_at
-                ),
-                row.audit.id,
-            )
-        )
         return rows
 
     @staticmethod
@@ -271,3 +476,45 @@ class CanonicalEntitlementReviewQueueService:
         if occurred_at.tzinfo is None:
             return occurred_at.replace(tzinfo=timezone.utc)
         return occurred_at
+
+
+def _sla_status_condition(sla_status: str, now_utc: datetime) -> Any:
+    entry = CanonicalEntitlementMutationReviewQueueEntryModel
+    if sla_status == "overdue":
+        return entry.due_at <= now_utc
+    if sla_status == "due_soon":
+        return and_(entry.due_soon_at < now_utc, entry.due_at > now_utc)
+    return entry.due_soon_at >= now_utc
+
+
+def _sla_status_clause(now_utc: datetime) -> Any:
+    entry = CanonicalEntitlementMutationReviewQueueEntryModel
+    return case(
+        (entry.due_at.is_(None), None),
+        (entry.due_at <= now_utc, "overdue"),
+        (entry.due_soon_at < now_utc, "due_soon"),
+        else_="within_sla",
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_review_queue_entries(session: Session, _flush_context: Any, _instances: Any) -> None:
+    """Tient la review queue à jour pour les audits et revues écrits hors services."""
+    with session.no_autoflush:
+        for instance in list(session.new):
+            if (
+                isinstance(instance, CanonicalEntitlementMutationAuditModel)
+                and instance.review_queue_entry is None
+            ):
+                CanonicalEntitlementReviewQueueService.refresh_entry(instance, None)
+        touched_reviews = [*session.new, *session.dirty, *session.deleted]
+        for instance in touched_reviews:
+            if not isinstance(instance, CanonicalEntitlementMutationAuditReviewModel):
+                continue
+            if instance.audit_id is None:
+                continue
+            audit = session.get(CanonicalEntitlementMutationAuditModel, instance.audit_id)
+            if audit is None or audit in session.deleted:
+                continue
+            review_record = None if instance in session.deleted else instance
+            CanonicalEntitlementReviewQueueService.refresh_entry(audit, review_record)
@@ -1,15 +1,21 @@
 # Primitives partagées de livraison d'alertes entitlement mutation.
-"""Mutualise la livraison webhook/log et la synchronisation du state de delivery."""
+"""Mutualise la livraison webhook/log et la synchronisation du state de delivery.
+
+Les livraisons webhook passent par le moteur concurrent `app.infra.webhooks.delivery_engine`.
+"""
 
 from __future__ import annotations
 
-import json
 import logging
-import urllib.request
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
 from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
 from app.infra.db.models.entitlement_mutation.alert.alert_event import (
@@ -18,6 +24,7 @@ from app.infra.db.models.entitlement_mutation.alert.alert_event import (
 from app.infra.db.models.entitlement_mutation.alert.delivery_attempt import (
     CanonicalEntitlementMutationAlertDeliveryAttemptModel,
 )
+from app.infra.webhooks.delivery_engine import post_json_webhook, run_webhook_batch
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +40,15 @@ class AlertDeliveryOutcome:
     is_retryable: bool
 
 
+@dataclass(frozen=True)
+class PendingAlertDelivery:
+    """Livraison préparée: alerte cible, numéro de tentative et payload figé."""
+
+    alert_event_id: int
+    attempt_number: int
+    payload: dict[str, Any]
+
+
 class CanonicalEntitlementAlertDeliveryRuntime:
     """Centralise les primitives DRY de delivery pour les services d'alertes."""
 
@@ -45,37 +61,111 @@ class CanonicalEntitlementAlertDeliveryRuntime:
     ) -> AlertDeliveryOutcome:
         """Livre un payload via webhook si configuré, sinon via log applicatif."""
 
+        return CanonicalEntitlementAlertDeliveryRuntime.deliver_payloads(
+            [payload],
+            log_message=log_message,
+            delivered_at=delivered_at,
+        )[0]
+
+    @staticmethod
+    def deliver_payloads(
+        payloads: Sequence[dict[str, Any]],
+        *,
+        log_message: str,
+        delivered_at: datetime | None = None,
+    ) -> list[AlertDeliveryOutcome]:
+        """Livre un lot en parallèle via webhook si configuré, sinon via log applicatif."""
+
         effective_delivered_at = delivered_at or datetime_provider.utcnow()
-        if settings.ops_review_queue_alert_webhook_url:
-            success, error_message = CanonicalEntitlementAlertDeliveryRuntime._deliver_webhook(
-                settings.ops_review_queue_alert_webhook_url,
-                payload,
-            )
-            if success:
-                return AlertDeliveryOutcome(
-                    channel="webhook",
+        webhook_url = settings.ops_review_queue_alert_webhook_url
+        if not webhook_url:
+            for payload in payloads:
+                logger.info("%s payload=%s", log_message, payload)
+            return [
+                AlertDeliveryOutcome(
+                    channel="log",
                     status="sent",
                     error=None,
                     delivered_at=effective_delivered_at,
                     is_retryable=False,
                 )
-            return AlertDeliveryOutcome(
+                for _ in payloads
+            ]
+
+        results = run_webhook_batch(
+            webhook_url,
+            payloads,
+            send=CanonicalEntitlementAlertDeliveryRuntime._deliver_webhook,
+        )
+        return [
+            AlertDeliveryOutcome(
                 channel="webhook",
-                status="failed",
-                error=error_message,
-                delivered_at=None,
-                is_retryable=True,
+                status="sent" if success else "failed",
+                error=None if success else error_message,
+                delivered_at=effective_delivered_at if success else None,
+                is_retryable=not success,
             )
+            for success, error_message in results
+        ]
 
-        logger.info("%s payload=%s", log_message, payload)
-        return AlertDeliveryOutcome(
-            channel="log",
-            status="sent",
-            error=None,
-            delivered_at=effective_delivered_at,
-            is_retryable=False,
+    @staticmethod
+    def deliver_pending(
+        db: Session,
+        deliveries: Sequence[PendingAlertDelivery],
+        *,
+        log_message: str,
+        delivered_at: datetime,
+        request_id: str | None = None,
+        record_attempts: bool = True,
+    ) -> list[AlertDeliveryOutcome]:
+        """Livre un lot préparé puis écrit tentatives et états en une seule passe.
+
+        La préparation est commitée avant la phase réseau: aucune transaction ni
+        connexion n'est conservée pendant les appels webhook. Les alertes sont
+        rechargées en une requête à l'issue de la livraison.
+        """
+
+        if not deliveries:
+            return []
+        db.commit()
+        outcomes = CanonicalEntitlementAlertDeliveryRuntime.deliver_payloads(
+            [delivery.payload for delivery in deliveries],
+            log_message=log_message,
+            delivered_at=delivered_at,
         )
 
+        model = CanonicalEntitlementMutationAlertEventModel
+        events_by_id = {
+            event.id: event
+            for event in db.scalars(
+                select(model).where(
+                    model.id.in_([delivery.alert_event_id for delivery in deliveries])
+                )
+            )
+        }
+        for delivery, outcome in zip(deliveries, outcomes, strict=True):
+            event = events_by_id.get(delivery.alert_event_id)
+            if event is None:
+                # Alerte supprimée pendant la phase réseau: rien à synchroniser.
+                continue
+            if record_attempts:
+                CanonicalEntitlementAlertDeliveryRuntime.add_delivery_attempt(
+                    db=db,
+                    alert_event=event,
+                    attempt_number=delivery.attempt_number,
+                    request_id=request_id,
+                    payload=delivery.payload,
+                    outcome=outcome,
+                )
+            CanonicalEntitlementAlertDeliveryRuntime.apply_delivery_state(
+                alert_event=event,
+                outcome=outcome,
+                attempt_number=delivery.attempt_number,
+                updated_at=delivered_at,
+            )
+        db.flush()
+        return outcomes
+
     @staticmethod
     def add_delivery_attempt(
         *,
@@ -127,20 +217,11 @@ class CanonicalEntitlementAlertDeliveryRuntime:
             alert_event.first_delivered_at = outcome.delivered_at
 
     @staticmethod
-    def _deliver_webhook(url: str, payload: dict[str, Any]) -> tuple[bool, str | None]:
-        """Exécute la livraison webhook synchrone avec timeout borné."""
-
-        try:
-            data = json.dumps(payload).encode("utf-8")
-            req = urllib.request.Request(
-                url,
-                data=data,
-                headers={"Content-Type": "application/json"},
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=10) as response:
-                if 200 <= response.status < 300:
-                    return True, None
-                return False, f"HTTP {response.status}"
-        except Exception as error:  # pragma: no cover - dépend des erreurs I/O runtime
-            return False, str(error)
+    async def _deliver_webhook(
+        client: httpx.AsyncClient,
+        url: str,
+        payload: dict[str, Any],
+    ) -> tuple[bool, str | None]:
+        """Exécute la livraison webhook sur le client mutualisé du lot."""
+
+        return await post_json_webhook(client, url, payload)
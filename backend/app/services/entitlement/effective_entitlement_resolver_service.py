@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from types import MappingProxyType
 from typing import Any
 
 from sqlalchemy import select
@@ -30,7 +33,25 @@ from app.services.entitlement.entitlement_types import (
     UsageState,
 )
 from app.services.entitlement.feature_scope_registry import FEATURE_SCOPE_REGISTRY, FeatureScope
+from app.services.entitlement.snapshot_cache import (
+    B2B_SUBJECT,
+    B2C_SUBJECT,
+    CachedPlanBinding,
+    CachedSubjectContext,
+    entitlement_snapshot_cache,
+)
 from app.services.quota.usage_service import QuotaUsageService
+from app.services.quota.window_resolver import QuotaWindowResolver
+
+
+def _flush_pending_writes(db: Session) -> None:
+    """Rend visibles les écritures en attente avant toute lecture en cache.
+
+    Sans cache, la première requête du snapshot déclenchait l'autoflush; une lecture
+    servie par le cache doit produire la même visibilité et les mêmes invalidations.
+    """
+    if db.autoflush and (db.new or db.dirty or db.deleted):
+        db.flush()
 
 
 class EffectiveEntitlementResolverService:
@@ -61,6 +82,11 @@ class EffectiveEntitlementResolverService:
         if not registered_codes:
             return []
 
+        cached_codes = entitlement_snapshot_cache.get_features(scope.value)
+        if cached_codes is not None:
+            return list(cached_codes)
+
+        token = entitlement_snapshot_cache.begin()
         try:
             existing_codes = set(
                 db.scalars(
@@ -74,44 +100,61 @@ class EffectiveEntitlementResolverService:
             return registered_codes
 
         if not existing_codes:
-            return registered_codes
-        return [code for code in registered_codes if code in existing_codes]
+            available_codes = registered_codes
+        else:
+            available_codes = [code for code in registered_codes if code in existing_codes]
+        entitlement_snapshot_cache.set_features(scope.value, tuple(available_codes), token)
+        return available_codes
 
     @staticmethod
     def resolve_b2c_user_snapshot(
         db: Session, *, app_user_id: int
     ) -> EffectiveEntitlementsSnapshot:
         """Résout un snapshot complet pour un utilisateur B2C."""
+        _flush_pending_writes(db)
         features = EffectiveEntitlementResolverService._get_available_feature_codes(
             db,
             scope=FeatureScope.B2C,
         )
 
+        context = EffectiveEntitlementResolverService._resolve_b2c_subject_context(
+            db, app_user_id=app_user_id
+        )
+        if not context.eligible:
+            return EffectiveEntitlementResolverService._not_eligible_snapshot(
+                subject_type=B2C_SUBJECT,
+                subject_id=app_user_id,
+                features=features,
+            )
+
+        return EffectiveEntitlementResolverService._resolve_snapshot(
+            db,
+            subject_type=B2C_SUBJECT,
+            subject_id=app_user_id,
+            plan_code=context.plan_code,
+            billing_status=context.billing_status,
+            plan_id=context.plan_id,
+            features=features,
+            scope=FeatureScope.B2C,
+        )
+
+    @staticmethod
+    def _resolve_b2c_subject_context(db: Session, *, app_user_id: int) -> CachedSubjectContext:
+        """Résout l'éligibilité et le plan canonique d'un utilisateur B2C."""
+        subject_key = (B2C_SUBJECT, app_user_id)
+        cached = entitlement_snapshot_cache.get_subject_context(subject_key)
+        if cached is not None:
+            return cached
+
+        token = entitlement_snapshot_cache.begin()
         # 1. Validation éligibilité (existence utilisateur)
         user = db.get(UserModel, app_user_id)
         if not user:
-            entitlements = {
-                f_code: EffectiveFeatureAccess(
-                    granted=False,
-                    reason_code=EffectiveEntitlementResolverService.REASON_SUBJECT_NOT_ELIGIBLE,
-                    access_mode=None,
-                    variant_code=None,
-                    quota_limit=None,
-                    quota_used=None,
-                    quota_remaining=None,
-                    period_unit=None,
-                    period_value=None,
-                    reset_mode=None,
-                )
-                for f_code in features
-            }
-            return EffectiveEntitlementsSnapshot(
-                subject_type="b2c_user",
-                subject_id=app_user_id,
-                plan_code="none",
-                billing_status="none",
-                entitlements=entitlements,
+            context = CachedSubjectContext(
+                eligible=False, plan_code="none", billing_status="none", plan_id=None
             )
+            entitlement_snapshot_cache.set_subject_context(subject_key, context, token)
+            return context
 
         # 2. Résolution billing/plan
         sub = BillingService.get_subscription_status_readonly(db, user_id=app_user_id)
@@ -134,71 +177,208 @@ class EffectiveEntitlementResolverService:
                 if canonical_plan is not None:
                     break
 
-        # 5. Résolution globale
-        return EffectiveEntitlementResolverService._resolve_snapshot(
-            db,
-            subject_type="b2c_user",
-            subject_id=app_user_id,
+        context = CachedSubjectContext(
+            eligible=True,
             plan_code=plan_code,
             billing_status=billing_status,
-            canonical_plan=canonical_plan,
-            features=features,
-            scope=FeatureScope.B2C,
+            plan_id=canonical_plan.id if canonical_plan is not None else None,
         )
+        entitlement_snapshot_cache.set_subject_context(subject_key, context, token)
+        return context
 
     @staticmethod
     def resolve_b2b_account_snapshot(
         db: Session, *, enterprise_account_id: int
     ) -> EffectiveEntitlementsSnapshot:
         """Résout un snapshot complet pour un compte B2B."""
+        _flush_pending_writes(db)
         features = EffectiveEntitlementResolverService._get_available_feature_codes(
             db,
             scope=FeatureScope.B2B,
         )
 
-        # 1. Chargement compte
-        account = db.get(EnterpriseAccountModel, enterprise_account_id)
-        if not account or account.status != "active":
-            entitlements = {
-                f_code: EffectiveFeatureAccess(
-                    granted=False,
-                    reason_code=EffectiveEntitlementResolverService.REASON_SUBJECT_NOT_ELIGIBLE,
-                    access_mode=None,
-                    variant_code=None,
-                    quota_limit=None,
-                    quota_used=None,
-                    quota_remaining=None,
-                    period_unit=None,
-                    period_value=None,
-                    reset_mode=None,
-                )
-                for f_code in features
-            }
-            return EffectiveEntitlementsSnapshot(
-                subject_type="b2b_account",
+        context = EffectiveEntitlementResolverService._resolve_b2b_subject_context(
+            db, enterprise_account_id=enterprise_account_id
+        )
+        if not context.eligible:
+            return EffectiveEntitlementResolverService._not_eligible_snapshot(
+                subject_type=B2B_SUBJECT,
                 subject_id=enterprise_account_id,
-                plan_code="none",
-                billing_status="none",
-                entitlements=entitlements,
+                features=features,
             )
 
-        # 2. Résolution plan canonique
-        canonical_plan = resolve_b2b_canonical_plan(db, enterprise_account_id)
-        plan_code = canonical_plan.plan_code if canonical_plan else "none"
-        billing_status = "active"  # Pour B2B actif, on considère le billing OK pour le snapshot
-
-        # 4. Résolution globale
         return EffectiveEntitlementResolverService._resolve_snapshot(
             db,
-            subject_type="b2b_account",
+            subject_type=B2B_SUBJECT,
             subject_id=enterprise_account_id,
-            plan_code=plan_code,
-            billing_status=billing_status,
-            canonical_plan=canonical_plan,
+            plan_code=context.plan_code,
+            billing_status=context.billing_status,
+            plan_id=context.plan_id,
             features=features,
             scope=FeatureScope.B2B,
         )
 
+    @staticmethod
+    def _resolve_b2b_subject_context(
+        db: Session, *, enterprise_account_id: int
+    ) -> CachedSubjectContext:
+        """Résout l'éligibilité et le plan canonique d'un compte B2B."""
+        subject_key = (B2B_SUBJECT, enterprise_account_id)
+        cached = entitlement_snapshot_cache.get_subject_context(subject_key)
+        if cached is not None:
+            return cached
+
+        token = entitlement_snapshot_cache.begin()
+        # 1. Chargement compte
+        account = db.get(EnterpriseAccountModel, enterprise_account_id)
+        if not account or account.status != "active":
+            context = CachedSubjectContext(
+                eligible=False, plan_code="none", billing_status="none", plan_id=None
+            )
+            entitlement_snapshot_cache.set_subject_context(subject_key, context, token)
+            return context
+
+        # 2. Résolution plan canonique
+        canonical_plan = resolve_b2b_canonical_plan(db, enterprise_account_id)
+        context = CachedSubjectContext(
+            eligible=True,
+            plan_code=canonical_plan.plan_code if canonical_plan else "none",
+            # Pour B2B actif, on considère le billing OK pour le snapshot
+            billing_status="active",
+            plan_id=canonical_plan.id if canonical_plan else None,
+        )
+        entitlement_snapshot_cache.set_subject_context(subject_key, context, token)
+        return context
+
+    @staticmethod
+    def _not_eligible_snapshot(
+        *,
+        subject_type: str,
+        subject_id: int,
+        features: list[str],
+    ) -> EffectiveEntitlementsSnapshot:
+        """Snapshot refusant toutes les features à un sujet inexistant ou inactif."""
+        entitlements = {
+            f_code: EffectiveFeatureAccess(
+                granted=False,
+                reason_code=EffectiveEntitlementResolverService.REASON_SUBJECT_NOT_ELIGIBLE,
+                access_mode=None,
+                variant_code=None,
+                quota_limit=None,
+                quota_used=None,
+                quota_remaining=None,
+                period_unit=None,
+                period_value=None,
+                reset_mode=None,
+            )
+            for f_code in features
+        }
+        return EffectiveEntitlementsSnapshot(
+            subject_type=subject_type,
+            subject_id=subject_id,
+            plan_code="none",
+            billing_status="none",
+            entitlements=entitlements,
+        )
+
+    @staticmethod
+    def _load_plan_bindings(db: Session, *, plan_id: int) -> Mapping[str, CachedPlanBinding]:
+        """Charge en deux requêtes les bindings d'un plan et leurs quotas."""
+        cached = entitlement_snapshot_cache.get_plan_bindings(plan_id)
+        if cached is not None:
+            return cached
+
+        token = entitlement_snapshot_cache.begin()
+        binding_rows = db.execute(
+            select(PlanFeatureBindingModel, FeatureCatalogModel.feature_code)
+            .join(FeatureCatalogModel)
+            .where(PlanFeatureBindingModel.plan_id == plan_id)
+        ).all()
+        quotas_by_binding: dict[int, list[QuotaDefinition]] = {}
+        binding_ids = [binding.id for binding, _ in binding_rows]
+        if binding_ids:
+            quota_rows = db.scalars(
+                select(PlanFeatureQuotaModel)
+                .where(PlanFeatureQuotaModel.plan_feature_binding_id.in_(binding_ids))
+                .order_by(PlanFeatureQuotaModel.id)
+            ).all()
+            for q in quota_rows:
+                quotas_by_binding.setdefault(q.plan_feature_binding_id, []).append(
+                    QuotaDefinition(
+                        quota_key=q.quota_key,
+                        quota_limit=q.quota_limit,
+                        period_unit=q.period_unit.value,
+                        period_value=q.period_value,
+                        reset_mode=q.reset_mode.value,
+                    )
+                )
+
+        bindings = MappingProxyType(
+            {
+                f_code: CachedPlanBinding(
+                    binding_id=binding.id,
+                    is_enabled=binding.is_enabled,
+                    access_mode=binding.access_mode,
+                    variant_code=binding.variant_code,
+                    quotas=tuple(quotas_by_binding.get(binding.id, ())),
+                )
+                for binding, f_code in binding_rows
+            }
+        )
+        entitlement_snapshot_cache.set_plan_bindings(plan_id, bindings, token)
+        return bindings
+
+    @staticmethod
+    def _get_usages(
+        db: Session,
+        *,
+        scope: FeatureScope,
+        subject_id: int,
+        quotas: list[tuple[str, QuotaDefinition]],
+        ref_dt: datetime,
+    ) -> list[UsageState]:
+        """Lit l'usage des quotas demandés: cache d'abord, puis un lot unique en base."""
+        subject_key = (B2C_SUBJECT if scope == FeatureScope.B2C else B2B_SUBJECT, subject_id)
+        usages: list[UsageState | None] = [
+            entitlement_snapshot_cache.get_usage(subject_key, f_code, q_def, ref_dt)
+            for f_code, q_def in quotas
+        ]
+        missing = [index for index, usage in enumerate(usages) if usage is None]
+        if missing:
+            token = entitlement_snapshot_cache.begin()
+            to_load = [quotas[index] for index in missing]
+            if scope == FeatureScope.B2C:
+                loaded = QuotaUsageService.get_usages(
+                    db, user_id=subject_id, quotas=to_load, ref_dt=ref_dt
+                )
+            else:
+                loaded = EnterpriseQuotaUsageService.get_usages(
+                    db, account_id=subject_id, quotas=to_load, ref_dt=ref_dt
+                )
+            for index, usage in zip(missing, loaded, strict=True):
+                usages[index] = usage
+                entitlement_snapshot_cache.set_usage(subject_key, usage, token)
+        return [usage for usage in usages if usage is not None]
+
+    @staticmethod
+    def _has_unsupported_window(quotas: Sequence[QuotaDefinition]) -> bool:
+        """Un quota glissant n'est calculable que sur une unité de durée fixe."""
+        return any(
+            q.reset_mode == "rolling" and not QuotaWindowResolver.supports_rolling(q.period_unit)
+            for q in quotas
+        )
+
+    @staticmethod
+    def _is_metered(binding: CachedPlanBinding, *, billing_active: bool) -> bool:
+        """Indique si la résolution d'un binding doit lire ses compteurs d'usage."""
+        return (
+            billing_active
+            and binding.is_enabled
+            and binding.access_mode == AccessMode.QUOTA
+            and bool(binding.quotas)
+            and not EffectiveEntitlementResolverService._has_unsupported_window(binding.quotas)
+        )
+
     @staticmethod
     def _resolve_snapshot(
         db: Session,
@@ -207,7 +387,7 @@ class EffectiveEntitlementResolverService:
         subject_id: int,
         plan_code: str,
         billing_status: str,
-        canonical_plan: PlanCatalogModel | None,
+        plan_id: int | None,
         features: list[str],
         scope: FeatureScope,
     ) -> EffectiveEntitlementsSnapshot:
@@ -215,21 +395,38 @@ class EffectiveEntitlementResolverService:
         entitlements: dict[str, EffectiveFeatureAccess] = {}
 
         # Chargement en lot des bindings si plan présent
-        bindings_map: dict[str, PlanFeatureBindingModel] = {}
-        if canonical_plan:
-            stmt = (
-                select(PlanFeatureBindingModel, FeatureCatalogModel.feature_code)
-                .join(FeatureCatalogModel)
-                .where(
-                    PlanFeatureBindingModel.plan_id == canonical_plan.id,
-                    FeatureCatalogModel.feature_code.in_(features),
-                )
+        bindings_map: Mapping[str, CachedPlanBinding] = {}
+        if plan_id is not None:
+            bindings_map = EffectiveEntitlementResolverService._load_plan_bindings(
+                db, plan_id=plan_id
             )
-            for b, f_code in db.execute(stmt):
-                bindings_map[f_code] = b
 
         ref_dt = datetime_provider.utcnow()
 
+        # Lecture groupée des compteurs de toutes les features mesurées du snapshot
+        billing_active = EffectiveEntitlementResolverService._is_billing_active(
+            subject_type=subject_type,
+            billing_status=billing_status,
+        )
+        metered_quotas = [
+            (f_code, q_def)
+            for f_code in features
+            if (binding := bindings_map.get(f_code)) is not None
+            and EffectiveEntitlementResolverService._is_metered(
+                binding, billing_active=billing_active
+            )
+            for q_def in binding.quotas
+        ]
+        usage_by_feature: dict[str, list[UsageState]] = {}
+        for usage in EffectiveEntitlementResolverService._get_usages(
+            db,
+            scope=scope,
+            subject_id=subject_id,
+            quotas=metered_quotas,
+            ref_dt=ref_dt,
+        ):
+            usage_by_feature.setdefault(usage.feature_code, []).append(usage)
+
         for f_code in features:
             binding = bindings_map.get(f_code)
 
@@ -264,10 +461,7 @@ class EffectiveEntitlementResolverService:
                 )
                 continue
 
-            if not EffectiveEntitlementResolverService._is_billing_active(
-                subject_type=subject_type,
-                billing_status=billing_status,
-            ):
+            if not billing_active:
                 entitlements[f_code] = EffectiveFeatureAccess(
                     granted=False,
                     reason_code=EffectiveEntitlementResolverService.REASON_BILLING_INACTIVE,
@@ -298,13 +492,9 @@ class EffectiveEntitlementResolverService:
                 continue
 
             # Cas QUOTA
-            quotas = db.scalars(
-                select(PlanFeatureQuotaModel).where(
-                    PlanFeatureQuotaModel.plan_feature_binding_id == binding.id
-                )
-            ).all()
+            quotas = binding.quotas
 
-            if not quotas or any(q.reset_mode.value == "rolling" for q in quotas):
+            if not quotas or EffectiveEntitlementResolverService._has_unsupported_window(quotas):
                 entitlements[f_code] = EffectiveFeatureAccess(
                     granted=False,
                     reason_code=EffectiveEntitlementResolverService.REASON_BINDING_DISABLED,
@@ -319,32 +509,7 @@ class EffectiveEntitlementResolverService:
                 )
                 continue
 
-            usage_states: list[UsageState] = []
-            for q in quotas:
-                q_def = QuotaDefinition(
-                    quota_key=q.quota_key,
-                    quota_limit=q.quota_limit,
-                    period_unit=q.period_unit.value,
-                    period_value=q.period_value,
-                    reset_mode=q.reset_mode.value,
-                )
-                if scope == FeatureScope.B2C:
-                    usage = QuotaUsageService.get_usage(
-                        db,
-                        user_id=subject_id,
-                        feature_code=f_code,
-                        quota=q_def,
-                        ref_dt=ref_dt,
-                    )
-                else:
-                    usage = EnterpriseQuotaUsageService.get_usage(
-                        db,
-                        account_id=subject_id,
-                        feature_code=f_code,
-                        quota=q_def,
-                        ref_dt=ref_dt,
-                    )
-                usage_states.append(usage)
+            usage_states = usage_by_feature[f_code]
 
             # Synthèse
             summary = EffectiveEntitlementResolverService._summarize_usage(usage_states)
@@ -0,0 +1,428 @@
+# Commentaire global: cache process-local versionné des briques du snapshot d'entitlements.
+"""Cache versionné des données de plan, du contexte sujet et des compteurs d'usage.
+
+Le snapshot effectif n'est jamais caché tel quel: il est recomposé à chaque appel à
+partir de trois niveaux invalidés indépendamment.
+
+- `plan`: features actives par scope et bindings/quotas par plan canonique;
+- `subject`: éligibilité, plan et statut billing d'un sujet B2C ou B2B;
+- `usage`: état de consommation d'un quota, borné par la fin de sa fenêtre.
+
+Les écritures ORM sur les tables sources invalident le cache à chaque flush puis à
+nouveau au commit ou rollback. Chaque lecture prend un jeton de séquence avant
+d'interroger la base: une valeur calculée pendant une invalidation concurrente
+n'est pas stockée. Le TTL borne la fraîcheur entre processus.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.infra.db.models.product_entitlements import AccessMode
+from app.infra.observability.metrics import increment_counter
+from app.services.entitlement.entitlement_types import QuotaDefinition, UsageState
+
+CACHE_HITS_METRIC = "entitlement_snapshot_cache_hits_total"
+CACHE_MISSES_METRIC = "entitlement_snapshot_cache_misses_total"
+CACHE_INVALIDATIONS_METRIC = "entitlement_snapshot_cache_invalidations_total"
+
+B2C_SUBJECT = "b2c_user"
+B2B_SUBJECT = "b2b_account"
+
+SubjectKey = tuple[str, int]
+UsageKey = tuple[str, str, int, str, int, str]
+
+# Tables dont une écriture change les bindings, les quotas ou le catalogue.
+_PLAN_TABLES = frozenset(
+    {"feature_catalog", "plan_catalog", "plan_feature_bindings", "plan_feature_quotas"}
+)
+# Table -> (type de sujet, colonne portant l'identifiant du sujet).
+_SUBJECT_TABLES: dict[str, tuple[str, str]] = {
+    "users": (B2C_SUBJECT, "id"),
+    "stripe_billing_profiles": (B2C_SUBJECT, "user_id"),
+    "user_subscriptions": (B2C_SUBJECT, "user_id"),
+    "enterprise_accounts": (B2B_SUBJECT, "id"),
+    "enterprise_account_billing_plans": (B2B_SUBJECT, "enterprise_account_id"),
+}
+_USAGE_TABLES: dict[str, tuple[str, str]] = {
+    "feature_usage_counters": (B2C_SUBJECT, "user_id"),
+    "enterprise_feature_usage_counters": (B2B_SUBJECT, "enterprise_account_id"),
+}
+_PENDING_INFO_KEY = "entitlement_snapshot_cache_pending"
+# Option d'exécution par laquelle une écriture en masse désigne le sujet qu'elle touche.
+ENTITLEMENT_CACHE_SUBJECT_OPTION = "entitlement_cache_subject"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPlanBinding:
+    """Binding d'un plan détaché de la session ORM."""
+
+    binding_id: int
+    is_enabled: bool
+    access_mode: AccessMode
+    variant_code: str | None
+    quotas: tuple[QuotaDefinition, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedSubjectContext:
+    """Éligibilité et plan canonique résolus pour un sujet."""
+
+    eligible: bool
+    plan_code: str
+    billing_status: str
+    plan_id: int | None
+
+
+class EntitlementSnapshotCache:
+    """Conserve les briques du snapshot et arbitre les écritures concurrentes."""
+
+    def __init__(
+        self,
+        *,
+        plan_ttl_seconds: float,
+        subject_ttl_seconds: float,
+        usage_ttl_seconds: float,
+        max_subjects: int,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Configure les durées de vie par niveau et la borne mémoire par sujet."""
+        self._plan_ttl_seconds = plan_ttl_seconds
+        self._subject_ttl_seconds = subject_ttl_seconds
+        self._usage_ttl_seconds = usage_ttl_seconds
+        self._max_subjects = max_subjects
+        self._clock = clock
+        self._lock = Lock()
+        self._sequence = 0
+        self._plan_mark = 0
+        self._marks_floor = 0
+        self._subject_marks: OrderedDict[SubjectKey, int] = OrderedDict()
+        self._usage_marks: OrderedDict[SubjectKey, int] = OrderedDict()
+        self._features: dict[str, tuple[float, tuple[str, ...]]] = {}
+        self._plans: OrderedDict[int, tuple[float, Mapping[str, CachedPlanBinding]]] = OrderedDict()
+        self._subjects: OrderedDict[SubjectKey, tuple[float, CachedSubjectContext]] = OrderedDict()
+        self._usage: OrderedDict[SubjectKey, dict[UsageKey, tuple[float, UsageState]]] = (
+            OrderedDict()
+        )
+
+    def begin(self) -> int:
+        """Retourne le jeton à présenter lors du stockage d'une valeur lue en base."""
+        with self._lock:
+            return self._sequence
+
+    def get_features(self, scope: str) -> tuple[str, ...] | None:
+        """Retourne les features actives d'un scope."""
+        with self._lock:
+            value = self._get_fresh(self._features, scope)
+        _record_lookup("plan", value is not None)
+        return value
+
+    def set_features(self, scope: str, feature_codes: tuple[str, ...], token: int) -> None:
+        """Stocke les features actives d'un scope."""
+        with self._lock:
+            if self._plan_ttl_seconds <= 0 or self._plan_mark > token:
+                return
+            self._features[scope] = (self._clock() + self._plan_ttl_seconds, feature_codes)
+
+    def get_plan_bindings(self, plan_id: int) -> Mapping[str, CachedPlanBinding] | None:
+        """Retourne les bindings d'un plan indexés par code de feature."""
+        with self._lock:
+            value = self._get_fresh(self._plans, plan_id)
+        _record_lookup("plan", value is not None)
+        return value
+
+    def set_plan_bindings(
+        self,
+        plan_id: int,
+        bindings: Mapping[str, CachedPlanBinding],
+        token: int,
+    ) -> None:
+        """Stocke les bindings d'un plan."""
+        with self._lock:
+            if self._plan_ttl_seconds <= 0 or self._plan_mark > token:
+                return
+            self._store(self._plans, plan_id, (self._clock() + self._plan_ttl_seconds, bindings))
+
+    def get_subject_context(self, key: SubjectKey) -> CachedSubjectContext | None:
+        """Retourne le contexte d'éligibilité et de plan d'un sujet."""
+        with self._lock:
+            value = self._get_fresh(self._subjects, key)
+        _record_lookup("subject", value is not None)
+        return value
+
+    def set_subject_context(
+        self,
+        key: SubjectKey,
+        context: CachedSubjectContext,
+        token: int,
+    ) -> None:
+        """Stocke le contexte d'un sujet si ni lui ni les plans n'ont changé depuis le jeton."""
+        with self._lock:
+            if (
+                self._subject_ttl_seconds <= 0
+                or self._plan_mark > token
+                or self._mark_of(self._subject_marks, key) > token
+            ):
+                return
+            self._store(self._subjects, key, (self._clock() + self._subject_ttl_seconds, context))
+
+    def get_usage(
+        self,
+        key: SubjectKey,
+        feature_code: str,
+        quota: QuotaDefinition,
+        ref_dt: datetime,
+    ) -> UsageState | None:
+        """Retourne l'usage caché d'un quota tant que `ref_dt` reste dans sa fenêtre."""
+        with self._lock:
+            value = None
+            entries = self._usage.get(key)
+            if entries is not None:
+                usage_key = _usage_key(feature_code, quota)
+                entry = entries.get(usage_key)
+                if entry is not None:
+                    expires_at, state = entry
+                    if expires_at > self._clock() and _covers(state, ref_dt):
+                        value = state
+                        self._usage.move_to_end(key)
+                    else:
+                        entries.pop(usage_key, None)
+        _record_lookup("usage", value is not None)
+        return value
+
+    def set_usage(self, key: SubjectKey, state: UsageState, token: int) -> None:
+        """Stocke l'usage d'un quota si le sujet n'a pas consommé depuis le jeton."""
+        with self._lock:
+            if self._usage_ttl_seconds <= 0 or self._mark_of(self._usage_marks, key) > token:
+                return
+            quota = QuotaDefinition(
+                quota_key=state.quota_key,
+                quota_limit=state.quota_limit,
+                period_unit=state.period_unit,
+                period_value=state.period_value,
+                reset_mode=state.reset_mode,
+            )
+            entries = self._usage.get(key)
+            if entries is None:
+                entries = {}
+                self._store(self._usage, key, entries)
+            else:
+                self._usage.move_to_end(key)
+            entries[_usage_key(state.feature_code, quota)] = (
+                self._clock() + self._usage_ttl_seconds,
+                state,
+            )
+
+    def invalidate_plans(self) -> None:
+        """Oublie le catalogue, les bindings et les contextes sujet qui en dépendent."""
+        with self._lock:
+            self._sequence += 1
+            self._plan_mark = self._sequence
+            self._features.clear()
+            self._plans.clear()
+            self._subjects.clear()
+        increment_counter(CACHE_INVALIDATIONS_METRIC, labels={"tier": "plan"})
+
+    def invalidate_subject(self, subject_type: str, subject_id: int) -> None:
+        """Oublie le contexte et l'usage d'un sujet."""
+        key = (subject_type, subject_id)
+        with self._lock:
+            self._sequence += 1
+            self._mark(self._subject_marks, key)
+            self._mark(self._usage_marks, key)
+            self._subjects.pop(key, None)
+            self._usage.pop(key, None)
+        increment_counter(CACHE_INVALIDATIONS_METRIC, labels={"tier": "subject"})
+
+    def invalidate_usage(self, subject_type: str, subject_id: int) -> None:
+        """Oublie les compteurs d'un sujet sans toucher à son plan."""
+        key = (subject_type, subject_id)
+        with self._lock:
+            self._sequence += 1
+            self._mark(self._usage_marks, key)
+            self._usage.pop(key, None)
+        increment_counter(CACHE_INVALIDATIONS_METRIC, labels={"tier": "usage"})
+
+    def clear(self) -> None:
+        """Vide tous les niveaux et rejette les lectures encore en cours."""
+        with self._lock:
+            self._sequence += 1
+            self._plan_mark = self._sequence
+            self._marks_floor = self._sequence
+            self._subject_marks.clear()
+            self._usage_marks.clear()
+            self._features.clear()
+            self._plans.clear()
+            self._subjects.clear()
+            self._usage.clear()
+
+    def _get_fresh(self, entries: dict[Any, tuple[float, Any]], key: Any) -> Any | None:
+        """Lit une entrée non expirée sous verrou."""
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            entries.pop(key, None)
+            return None
+        if isinstance(entries, OrderedDict):
+            entries.move_to_end(key)
+        return value
+
+    def _store(self, entries: OrderedDict[Any, Any], key: Any, value: Any) -> None:
+        """Insère une entrée et évince les moins récemment lues au-delà de la borne."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self._max_subjects:
+            entries.popitem(last=False)
+
+    def _mark(self, marks: OrderedDict[SubjectKey, int], key: SubjectKey) -> None:
+        """Date l'invalidation d'un sujet; les marques évincées relèvent le plancher."""
+        marks[key] = self._sequence
+        marks.move_to_end(key)
+        while len(marks) > self._max_subjects:
+            _, evicted = marks.popitem(last=False)
+            self._marks_floor = max(self._marks_floor, evicted)
+
+    def _mark_of(self, marks: OrderedDict[SubjectKey, int], key: SubjectKey) -> int:
+        """Retourne la dernière invalidation connue d'un sujet."""
+        return max(marks.get(key, 0), self._marks_floor)
+
+
+def _usage_key(feature_code: str, quota: QuotaDefinition) -> UsageKey:
+    return (
+        feature_code,
+        quota.quota_key,
+        quota.quota_limit,
+        quota.period_unit,
+        quota.period_value,
+        quota.reset_mode,
+    )
+
+
+def _covers(state: UsageState, ref_dt: datetime) -> bool:
+    """Indique si la fenêtre du compteur caché contient encore l'instant de référence."""
+    if ref_dt < state.window_start:
+        return False
+    return state.window_end is None or ref_dt < state.window_end
+
+
+def _record_lookup(tier: str, hit: bool) -> None:
+    increment_counter(CACHE_HITS_METRIC if hit else CACHE_MISSES_METRIC, labels={"tier": tier})
+
+
+entitlement_snapshot_cache = EntitlementSnapshotCache(
+    plan_ttl_seconds=settings.entitlement_plan_cache_ttl_seconds,
+    subject_ttl_seconds=settings.entitlement_subject_cache_ttl_seconds,
+    usage_ttl_seconds=settings.entitlement_usage_cache_ttl_seconds,
+    max_subjects=settings.entitlement_snapshot_cache_max_subjects,
+)
+
+
+def invalidate_entitlement_subject(subject_type: str, subject_id: int) -> None:
+    """Invalide le contexte et l'usage cachés d'un sujet."""
+    entitlement_snapshot_cache.invalidate_subject(subject_type, subject_id)
+
+
+def invalidate_entitlement_plans() -> None:
+    """Invalide le catalogue et les bindings cachés."""
+    entitlement_snapshot_cache.invalidate_plans()
+
+
+def reset_entitlement_snapshot_cache() -> None:
+    """Vide complètement le cache des snapshots d'entitlements."""
+    entitlement_snapshot_cache.clear()
+
+
+def _collect_flush_invalidations(session: Session) -> set[tuple[Any, ...]]:
+    """Déduit les invalidations des objets ORM écrits par un flush."""
+    invalidations: set[tuple[Any, ...]] = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table_name = getattr(type(instance), "__tablename__", None)
+        if table_name in _PLAN_TABLES:
+            invalidations.add(("plans",))
+            continue
+        for tier, tables in (("subject", _SUBJECT_TABLES), ("usage", _USAGE_TABLES)):
+            target = tables.get(table_name)
+            if target is None:
+                continue
+            subject_type, id_attribute = target
+            subject_id = _loaded_value(instance, id_attribute)
+            if subject_id is None:
+                invalidations.add(("all",))
+            else:
+                invalidations.add((tier, subject_type, subject_id))
+    return invalidations
+
+
+def _loaded_value(instance: Any, attribute: str) -> Any | None:
+    """Lit un attribut déjà chargé sans déclencher de requête pendant le flush."""
+    state = inspect(instance)
+    value = state.dict.get(attribute)
+    if value is None and attribute == "id" and state.identity:
+        return state.identity[0]
+    return value
+
+
+def _apply_invalidations(invalidations: set[tuple[Any, ...]]) -> None:
+    """Applique des invalidations déduites des écritures d'une session."""
+    if ("all",) in invalidations:
+        entitlement_snapshot_cache.clear()
+        return
+    for invalidation in invalidations:
+        if invalidation[0] == "plans":
+            entitlement_snapshot_cache.invalidate_plans()
+        elif invalidation[0] == "subject":
+            entitlement_snapshot_cache.invalidate_subject(invalidation[1], invalidation[2])
+        else:
+            entitlement_snapshot_cache.invalidate_usage(invalidation[1], invalidation[2])
+
+
+def _remember(session: Session, invalidations: set[tuple[Any, ...]]) -> None:
+    """Applique tout de suite et rejoue au commit/rollback pour les lecteurs concurrents."""
+    if not invalidations:
+        return
+    _apply_invalidations(invalidations)
+    session.info.setdefault(_PENDING_INFO_KEY, set()).update(invalidations)
+
+
+@event.listens_for(Session, "after_flush")
+def _on_after_flush(session: Session, flush_context: Any) -> None:
+    _remember(session, _collect_flush_invalidations(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(orm_execute_state: ORMExecuteState) -> None:
+    if not (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        return
+    table_name = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+    subject = orm_execute_state.execution_options.get(ENTITLEMENT_CACHE_SUBJECT_OPTION)
+    if table_name in _PLAN_TABLES:
+        _remember(orm_execute_state.session, {("plans",)})
+    elif subject is not None and table_name in _USAGE_TABLES:
+        _remember(orm_execute_state.session, {("usage", *subject)})
+    elif subject is not None and table_name in _SUBJECT_TABLES:
+        _remember(orm_execute_state.session, {("subject", *subject)})
+    elif table_name in _SUBJECT_TABLES or table_name in _USAGE_TABLES:
+        # Une écriture en masse ne désigne pas ses sujets: tout le cache est oublié.
+        _remember(orm_execute_state.session, {("all",)})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _on_transaction_end(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INFO_KEY, None)
+    if pending:
+        _apply_invalidations(pending)
@@ -0,0 +1,398 @@
+# Commentaire global: index spatial hors ligne des lieux connus (géocodage inverse, timezone).
+"""Index spatial compact des lieux déjà résolus et d'un jeu de villes optionnel.
+
+Les points sont triés par cellule d'une grille régulière et sérialisés dans un buffer
+binaire (`build_place_index_buffer`), écrit sur disque puis ouvert par `mmap`: les
+processus d'un même hôte partagent les pages, et seules les métadonnées des points
+effectivement retournés sont décodées.
+
+Format (little-endian):
+
+- en-tête `_HEADER`: magic, taille de cellule (degrés), nombre de points, nombre de
+  cellules, offset des métadonnées;
+- table des cellules `_CELL` (ilat, ilon, premier point, nombre de points);
+- points `_POINT` (lat, lon, offset et longueur de leurs métadonnées JSON);
+- métadonnées JSON utf-8 concaténées.
+
+Sources: lignes `geo_place_resolved` (snapshot Nominatim complet, timezone éventuelle)
+et, si `GEO_PLACE_INDEX_CITIES_PATH` est renseigné, un fichier de villes au format
+GeoNames (`cities15000.txt`), qui apporte la timezone IANA de chaque ville.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infra.db.models.geo_place_resolved import GeoPlaceResolvedModel
+from app.infra.observability.metrics import increment_counter, set_gauge
+
+logger = logging.getLogger(__name__)
+
+INDEX_LOOKUPS_METRIC = "geo_place_index_lookups_total"
+INDEX_SIZE_METRIC = "geo_place_index_points"
+
+_MAGIC = b"GPIDX001"
+_HEADER = struct.Struct("<8sdIIQ")
+_CELL = struct.Struct("<hhII")
+_POINT = struct.Struct("<ddII")
+_EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEGREE = 111.2
+_DEFAULT_CELL_DEGREES = 1.0
+# Lieux résolus après le chargement de l'index, cherchés linéairement.
+_MAX_RECENT_PLACES = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedPlace:
+    """Point de l'index et ses métadonnées."""
+
+    latitude: float
+    longitude: float
+    label: str
+    timezone_iana: str | None = None
+    # Snapshot `GeocodingSearchResult` (alias JSON) si le lieu vient de Nominatim.
+    snapshot: dict[str, Any] | None = None
+    language: str | None = None
+
+    def to_meta(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "tz": self.timezone_iana,
+            "snapshot": self.snapshot,
+            "lang": self.language,
+        }
+
+    @classmethod
+    def from_meta(cls, latitude: float, longitude: float, meta: dict[str, Any]) -> IndexedPlace:
+        return cls(
+            latitude=latitude,
+            longitude=longitude,
+            label=meta["label"],
+            timezone_iana=meta.get("tz"),
+            snapshot=meta.get("snapshot"),
+            language=meta.get("lang"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PlaceIndexHit:
+    place: IndexedPlace
+    distance_km: float
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell_of(lat: float, lon: float, cell_degrees: float) -> tuple[int, int]:
+    lon_cells = math.ceil(360 / cell_degrees)
+    ilat = int(math.floor((lat + 90.0) / cell_degrees))
+    ilon = int(math.floor((lon + 180.0) / cell_degrees)) % lon_cells
+    return ilat, ilon
+
+
+def build_place_index_buffer(
+    places: Iterable[IndexedPlace], *, cell_degrees: float = _DEFAULT_CELL_DEGREES
+) -> bytes:
+    """Sérialise les lieux dans le format binaire de l'index."""
+    by_cell: dict[tuple[int, int], list[IndexedPlace]] = {}
+    for place in places:
+        by_cell.setdefault(_cell_of(place.latitude, place.longitude, cell_degrees), []).append(
+            place
+        )
+
+    cells = bytearray()
+    points = bytearray()
+    metas = bytearray()
+    count = 0
+    for (ilat, ilon), cell_places in sorted(by_cell.items()):
+        cells += _CELL.pack(ilat, ilon, count, len(cell_places))
+        for place in cell_places:
+            meta = json.dumps(place.to_meta(), separators=(",", ":")).encode("utf-8")
+            points += _POINT.pack(place.latitude, place.longitude, len(metas), len(meta))
+            metas += meta
+            count += 1
+
+    meta_offset = _HEADER.size + len(cells) + len(points)
+    header = _HEADER.pack(_MAGIC, cell_degrees, count, len(by_cell), meta_offset)
+    return bytes(header + cells + points + metas)
+
+
+class PlaceIndex:
+    """Recherche du plus proche voisin sur un buffer binaire (bytes ou mmap)."""
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        magic, cell_degrees, count, cell_count, meta_offset = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError("invalid place index buffer")
+        self._buffer = buffer
+        self._cell_degrees = cell_degrees
+        self._count = count
+        self._meta_offset = meta_offset
+        self._points_offset = _HEADER.size + cell_count * _CELL.size
+        self._cells: dict[tuple[int, int], tuple[int, int]] = {}
+        for position in range(cell_count):
+            ilat, ilon, start, size = _CELL.unpack_from(
+                buffer, _HEADER.size + position * _CELL.size
+            )
+            self._cells[(ilat, ilon)] = (start, size)
+
+    @classmethod
+    def open(cls, path: Path) -> PlaceIndex:
+        with path.open("rb") as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        *,
+        max_km: float,
+        predicate: Callable[[IndexedPlace], bool] | None = None,
+    ) -> PlaceIndexHit | None:
+        """Plus proche lieu à moins de `max_km` (et satisfaisant `predicate`)."""
+        candidates: list[tuple[float, int]] = []
+        for start, size in self._cells_around(lat, lon, max_km):
+            for position in range(start, start + size):
+                point_lat, point_lon, _, _ = _POINT.unpack_from(
+                    self._buffer, self._points_offset + position * _POINT.size
+                )
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= max_km:
+                    candidates.append((distance, position))
+        for distance, position in sorted(candidates):
+            place = self._place_at(position)
+            if predicate is None or predicate(place):
+                return PlaceIndexHit(place=place, distance_km=distance)
+        return None
+
+    def _place_at(self, position: int) -> IndexedPlace:
+        lat, lon, meta_start, meta_size = _POINT.unpack_from(
+            self._buffer, self._points_offset + position * _POINT.size
+        )
+        start = self._meta_offset + meta_start
+        meta = json.loads(bytes(self._buffer[start : start + meta_size]))
+        return IndexedPlace.from_meta(lat, lon, meta)
+
+    def _cells_around(self, lat: float, lon: float, max_km: float) -> Iterator[tuple[int, int]]:
+        cell_degrees = self._cell_degrees
+        lat_span = max_km / _KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(min(89.0, abs(lat) + lat_span))), 1e-3)
+        lon_span = min(180.0, max_km / (_KM_PER_DEGREE * cos_lat))
+        lon_cells = math.ceil(360 / cell_degrees)
+        min_ilat, _ = _cell_of(max(-90.0, lat - lat_span), lon, cell_degrees)
+        max_ilat, _ = _cell_of(min(90.0, lat + lat_span), lon, cell_degrees)
+        first_ilon = int(math.floor((lon - lon_span + 180.0) / cell_degrees))
+        last_ilon = int(math.floor((lon + lon_span + 180.0) / cell_degrees))
+        seen_ilon: set[int] = set()
+        for raw_ilon in range(first_ilon, last_ilon + 1):
+            ilon = raw_ilon % lon_cells
+            if ilon in seen_ilon:
+                continue
+            seen_ilon.add(ilon)
+            for ilat in range(min_ilat, max_ilat + 1):
+                cell = self._cells.get((ilat, ilon))
+                if cell is not None:
+                    yield cell
+
+
+class GeoPlaceIndexService:
+    """Index partagé par processus, chargé au démarrage et complété à chaud."""
+
+    def __init__(self) -> None:
+        self._index: PlaceIndex | None = None
+        self._recent: deque[IndexedPlace] = deque(maxlen=_MAX_RECENT_PLACES)
+        self._lock = Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._index is not None
+
+    def load(self, places: Iterable[IndexedPlace], *, path: Path | None = None) -> int:
+        """Construit l'index; l'écrit et le mappe en mémoire si `path` est fourni."""
+        buffer = build_place_index_buffer(places)
+        if path is None:
+            index = PlaceIndex(buffer)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Écriture atomique: un autre processus peut mapper l'ancien fichier.
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+                handle.write(buffer)
+            os.replace(handle.name, path)
+            index = PlaceIndex.open(path)
+        with self._lock:
+            self._index = index
+            self._recent.clear()
+        set_gauge(INDEX_SIZE_METRIC, len(index))
+        return len(index)
+
+    def remember(self, place: IndexedPlace) -> None:
+        """Ajoute un lieu résolu après le chargement, sans reconstruire l'index."""
+        with self._lock:
+            self._recent.append(place)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        *,
+        max_km: float,
+        predicate: Callable[[IndexedPlace], bool] | None = None,
+    ) -> PlaceIndexHit | None:
+        with self._lock:
+            index = self._index
+            recent = list(self._recent)
+        best = index.nearest(lat, lon, max_km=max_km, predicate=predicate) if index else None
+        for place in recent:
+            distance = haversine_km(lat, lon, place.latitude, place.longitude)
+            if distance > max_km or (best is not None and distance >= best.distance_km):
+                continue
+            if predicate is None or predicate(place):
+                best = PlaceIndexHit(place=place, distance_km=distance)
+        return best
+
+    def reverse(self, lat: float, lon: float, lang: str | None = None) -> dict[str, Any] | None:
+        """Snapshot Nominatim du lieu résolu le plus proche, ou None (repli Nominatim)."""
+
+        def has_snapshot(place: IndexedPlace) -> bool:
+            if place.snapshot is None:
+                return False
+            return lang is None or place.language is None or place.language == lang
+
+        hit = self.nearest(
+            lat, lon, max_km=settings.geo_place_index_reverse_max_km, predicate=has_snapshot
+        )
+        _record_lookup("reverse", hit is not None)
+        return hit.place.snapshot if hit is not None else None
+
+    def timezone_at(self, lat: float, lon: float) -> str | None:
+        """Timezone IANA du lieu connu le plus proche qui en porte une."""
+        hit = self.nearest(
+            lat,
+            lon,
+            max_km=settings.geo_place_index_timezone_max_km,
+            predicate=lambda place: place.timezone_iana is not None,
+        )
+        _record_lookup("timezone", hit is not None)
+        return hit.place.timezone_iana if hit is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+            self._recent.clear()
+
+
+def _record_lookup(kind: str, hit: bool) -> None:
+    increment_counter(
+        INDEX_LOOKUPS_METRIC, 1.0, labels={"kind": kind, "result": "hit" if hit else "miss"}
+    )
+
+
+def indexed_place_from_model(model: GeoPlaceResolvedModel) -> IndexedPlace:
+    """Convertit une ligne `geo_place_resolved`; le snapshot exige les champs Nominatim."""
+    snapshot: dict[str, Any] | None = None
+    if (
+        model.provider == "nominatim"
+        and model.osm_type
+        and model.osm_id is not None
+        and model.place_type
+        and model.place_class
+    ):
+        snapshot = {
+            "provider": "nominatim",
+            "provider_place_id": model.provider_place_id,
+            "osm_type": model.osm_type,
+            "osm_id": model.osm_id,
+            "type": model.place_type,
+            "class": model.place_class,
+            "display_name": model.display_name,
+            "lat": float(model.latitude),
+            "lon": float(model.longitude),
+            "importance": model.importance or 0.0,
+            "place_rank": model.place_rank or 0,
+            "address": {
+                "country_code": model.country_code.lower() if model.country_code else None,
+                "country": model.country,
+                "state": model.state,
+                "county": model.county,
+                "city": model.city,
+                "postcode": model.postcode,
+            },
+        }
+    return IndexedPlace(
+        latitude=float(model.latitude),
+        longitude=float(model.longitude),
+        label=model.display_name,
+        timezone_iana=model.timezone_iana,
+        snapshot=snapshot,
+        language=model.query_language,
+    )
+
+
+def iter_resolved_places(db: Session, *, batch_size: int = 5000) -> Iterator[IndexedPlace]:
+    for model in db.scalars(select(GeoPlaceResolvedModel).execution_options(yield_per=batch_size)):
+        yield indexed_place_from_model(model)
+
+
+def iter_geonames_cities(path: Path) -> Iterator[IndexedPlace]:
+    """Lit un fichier GeoNames (colonnes nom=1, lat=4, lon=5, pays=8, timezone=17)."""
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) < 18:
+                continue
+            try:
+                latitude, longitude = float(columns[4]), float(columns[5])
+            except ValueError:
+                continue
+            yield IndexedPlace(
+                latitude=latitude,
+                longitude=longitude,
+                label=f"{columns[1]}, {columns[8]}",
+                timezone_iana=columns[17] or None,
+            )
+
+
+def warm_geo_place_index(session_factory: Callable[[], Session] | None = None) -> int:
+    """Charge l'index depuis la base et le jeu de villes configuré; retourne sa taille."""
+    if session_factory is None:
+        from app.infra.db.session import SessionLocal
+
+        session_factory = SessionLocal
+
+    def places() -> Iterator[IndexedPlace]:
+        with session_factory() as db:
+            yield from iter_resolved_places(db)
+        if settings.geo_place_index_cities_path:
+            yield from iter_geonames_cities(Path(settings.geo_place_index_cities_path))
+
+    index_path = Path(settings.geo_place_index_path) if settings.geo_place_index_path else None
+    size = geo_place_index.load(places(), path=index_path)
+    logger.info("geo_place_index_loaded points=%d mmap=%s", size, index_path is not None)
+    return size
+
+
+geo_place_index = GeoPlaceIndexService()
@@ -0,0 +1,306 @@
+# Commentaire global: niveau mémoire du cache de recherche géocodage et purge du niveau DB.
+"""Cache process-local des recherches géocodage, devant `geocoding_query_cache`.
+
+- les entrées gardent les `GeocodingSearchResult` déjà validés: un hit ne reparse pas
+  `response_json`; la taille (LRU) et la durée de vie sont bornées;
+- une recherche dont le jeu de résultats est complet (moins de `limit` résultats) sert
+  de candidats aux saisies qui la prolongent ("Paris" -> "Paris Fr"), filtrés sur les
+  mots de la requête;
+- `GeocodingQueryCachePurger` supprime périodiquement les lignes DB expirées.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
+from app.infra.observability.metrics import increment_counter, set_gauge
+
+if TYPE_CHECKING:
+    from app.services.geocoding_service import GeocodingSearchResult
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS_METRIC = "geocoding_cache_lookups_total"
+CACHE_HIT_RATIO_METRIC = "geocoding_cache_hit_ratio"
+CACHE_PURGED_METRIC = "geocoding_cache_purged_rows_total"
+
+MEMORY_TIER = "memory"
+DB_TIER = "db"
+
+_MIN_PREFIX_LENGTH = 2
+_TOKEN_SEPARATORS = re.compile(r"[\s,;/()'-]+")
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents, pour comparer saisie et libellés."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tokens(text: str) -> list[str]:
+    return [token for token in _TOKEN_SEPARATORS.split(_fold(text)) if token]
+
+
+def _matches_query(result: GeocodingSearchResult, query_tokens: list[str]) -> bool:
+    """Chaque mot saisi doit commencer un mot du libellé ou de l'adresse."""
+    address = result.address
+    label_tokens = _tokens(
+        " ".join(
+            value
+            for value in (
+                result.display_name,
+                address.city,
+                address.county,
+                address.state,
+                address.country,
+                address.postcode,
+            )
+            if value
+        )
+    )
+    return all(any(label.startswith(token) for label in label_tokens) for token in query_tokens)
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    results: tuple[GeocodingSearchResult, ...]
+    expires_at: float
+    complete: bool
+    prefix_key: tuple[str, str | None, str | None]
+
+
+class HitRatioTracker:
+    """Compte hits et lookups par niveau et publie le ratio en jauge."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._counts: dict[str, list[int]] = {}
+
+    def record(self, tier: str, result: str) -> None:
+        hit = result != "miss"
+        increment_counter(CACHE_LOOKUPS_METRIC, 1.0, labels={"tier": tier, "result": result})
+        with self._lock:
+            counts = self._counts.setdefault(tier, [0, 0])
+            counts[0] += int(hit)
+            counts[1] += 1
+            ratio = counts[0] / counts[1]
+        set_gauge(CACHE_HIT_RATIO_METRIC, ratio, labels={"tier": tier})
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class GeocodingMemoryCache:
+    """LRU borné en taille et en durée des résultats de recherche déjà validés."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Dernière recherche complète par (requête, pays, langue), pour la réutilisation.
+        self._complete_by_prefix: dict[tuple[str, str | None, str | None], str] = {}
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def get(self, query_key: str) -> list[GeocodingSearchResult] | None:
+        with self._lock:
+            entry = self._entries.get(query_key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                self._drop(query_key)
+                return None
+            self._entries.move_to_end(query_key)
+            return list(entry.results)
+
+    def put(
+        self,
+        query_key: str,
+        results: list[GeocodingSearchResult],
+        *,
+        query: str,
+        limit: int,
+        country_code: str | None,
+        lang: str | None,
+        ttl_seconds: float,
+    ) -> None:
+        """Stocke un jeu de résultats pour au plus `ttl_seconds` et la TTL mémoire."""
+        if not self.enabled:
+            return
+        prefix_key = (_fold(query), country_code, lang)
+        entry = _Entry(
+            results=tuple(results),
+            expires_at=self._clock() + min(ttl_seconds, self._ttl_seconds),
+            complete=0 < len(results) < limit,
+            prefix_key=prefix_key,
+        )
+        with self._lock:
+            self._drop(query_key)
+            self._entries[query_key] = entry
+            if entry.complete:
+                self._complete_by_prefix[prefix_key] = query_key
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def find_prefix_candidates(
+        self,
+        query: str,
+        limit: int,
+        *,
+        country_code: str | None,
+        lang: str | None,
+    ) -> list[GeocodingSearchResult] | None:
+        """Filtre le jeu complet de la plus longue saisie préfixe déjà en cache.
+
+        Retourne None si aucun préfixe complet n'est en cache ou si aucun candidat ne
+        correspond: la recherche passe alors aux niveaux suivants.
+        """
+        folded = _fold(query)
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return None
+        now = self._clock()
+        with self._lock:
+            for end in range(len(folded) - 1, _MIN_PREFIX_LENGTH - 1, -1):
+                query_key = self._complete_by_prefix.get((folded[:end], country_code, lang))
+                entry = self._entries.get(query_key) if query_key else None
+                if entry is None or entry.expires_at <= now:
+                    continue
+                matches = [r for r in entry.results if _matches_query(r, query_tokens)]
+                if matches:
+                    self._entries.move_to_end(query_key)
+                    return matches[:limit]
+                return None
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._complete_by_prefix.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, query_key: str) -> None:
+        entry = self._entries.pop(query_key, None)
+        if entry is not None and self._complete_by_prefix.get(entry.prefix_key) == query_key:
+            del self._complete_by_prefix[entry.prefix_key]
+
+
+def purge_expired_geocoding_cache(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """Supprime par lots les lignes expirées de `geocoding_query_cache`."""
+    if now is None:
+        now = datetime_provider.utcnow()
+    model = GeocodingQueryCacheModel
+    purged = 0
+    while True:
+        expired_ids = (
+            select(model.id).where(model.expires_at <= now).order_by(model.id).limit(batch_size)
+        )
+        deleted = db.execute(
+            delete(model).where(model.id.in_(expired_ids)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+        purged += deleted
+        if deleted < batch_size:
+            break
+    if purged:
+        increment_counter(CACHE_PURGED_METRIC, float(purged))
+    return purged
+
+
+class GeocodingQueryCachePurger:
+    """Boucle asyncio de purge du niveau DB, démarrée et arrêtée par le lifespan."""
+
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        self._batch_size = batch_size
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+
+    def run_once(self) -> int:
+        try:
+            with self._open_session() as db:
+                return purge_expired_geocoding_cache(db, batch_size=self._batch_size)
+        except Exception:
+            logger.exception("geocoding_cache_purge_failed")
+            return 0
+
+    def start(self, *, interval_seconds: float) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._purge_periodically(interval_seconds))
+
+    async def aclose(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _purge_periodically(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.run_once)
+
+    def _open_session(self) -> Session:
+        if self._session_factory is None:
+            from app.infra.db.session import SessionLocal
+
+            return SessionLocal()
+        return self._session_factory()
+
+
+geocoding_memory_cache = GeocodingMemoryCache(
+    max_entries=settings.geocoding_memory_cache_max_entries,
+    ttl_seconds=settings.geocoding_memory_cache_ttl_seconds,
+)
+geocoding_cache_hit_ratio = HitRatioTracker()
+geocoding_query_cache_purger = GeocodingQueryCachePurger(
+    batch_size=settings.geocoding_cache_purge_batch_size
+)
+
+
+def reset_geocoding_memory_cache() -> None:
+    """Vide le niveau mémoire et les compteurs de ratio (tests)."""
+    geocoding_memory_cache.clear()
+    geocoding_cache_hit_ratio.reset()
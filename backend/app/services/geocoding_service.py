@@ -2,20 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import logging
 import math
-import urllib.error
 import urllib.parse
-import urllib.request
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
+from app.infra.geocoding.nominatim_client import (
+    NominatimClientError,
+    NominatimRateLimitedError,
+    nominatim_client,
+)
+from app.services.geocoding.place_index import geo_place_index
+from app.services.geocoding.query_cache import (
+    DB_TIER,
+    MEMORY_TIER,
+    geocoding_cache_hit_ratio,
+    geocoding_memory_cache,
+)
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -195,39 +206,85 @@ def _build_query_key(
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
+def _remaining_seconds(expires_at: datetime, now: datetime) -> float:
+    """Durée de vie restante d'une ligne de cache (SQLite peut la rendre naïve)."""
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (expires_at - now).total_seconds())
+
+
+async def _fetch_nominatim(url: str, params: dict[str, str], *, flight_key: str) -> bytes:
+    """Appel Nominatim via le client partagé, erreurs traduites en GeocodingServiceError."""
+    try:
+        return await nominatim_client.get(url, params, flight_key=flight_key)
+    except NominatimRateLimitedError as err:
+        raise GeocodingServiceError(
+            code="geocoding_rate_limited",
+            message=err.message,
+        ) from err
+    except NominatimClientError as err:
+        raise GeocodingServiceError(
+            code="geocoding_provider_unavailable",
+            message=err.message,
+        ) from err
+
+
 class GeocodingService:
     """Client Nominatim côté serveur — proxy géocodage."""
 
     @staticmethod
     def derive_timezone(*, lat: float, lon: float) -> str | None:
-        global _timezone_finder_instance
+        """Timezone IANA: polygones `TimezoneFinder` d'abord, index local en repli.
 
+        L'index ne donne que la timezone du lieu connu le plus proche, fausse près
+        d'une frontière de fuseau: il ne sert que si `TimezoneFinder` est indisponible
+        ou ne couvre pas le point.
+        """
         try:
-            if _timezone_finder_instance is None:
-                from timezonefinder import TimezoneFinder
-
-                _timezone_finder_instance = TimezoneFinder()
-            return _timezone_finder_instance.timezone_at(lng=lon, lat=lat)
+            timezone_iana = GeocodingService._timezone_finder().timezone_at(lng=lon, lat=lat)
         except Exception:
             logger.warning(
                 "geocoding_timezone_derivation_unavailable lat=%s lon=%s",
                 lat,
                 lon,
             )
-            return None
+            timezone_iana = None
+        if timezone_iana is not None:
+            return timezone_iana
+        return geo_place_index.timezone_at(lat, lon)
+
+    @staticmethod
+    def warm_timezone_finder() -> bool:
+        """Construit `TimezoneFinder` au démarrage plutôt qu'à la première requête."""
+        try:
+            GeocodingService._timezone_finder()
+        except Exception:
+            logger.info("geocoding_timezone_finder_unavailable")
+            return False
+        return True
+
+    @staticmethod
+    def _timezone_finder() -> Any:
+        global _timezone_finder_instance
+
+        if _timezone_finder_instance is None:
+            from timezonefinder import TimezoneFinder
+
+            _timezone_finder_instance = TimezoneFinder()
+        return _timezone_finder_instance
 
     @staticmethod
-    def _build_nominatim_search_url(params: str) -> str:
+    def _build_nominatim_search_url() -> str:
         base_url = _normalize_nominatim_base_url(settings.nominatim_url)
-        return f"{base_url}/search?{params}"
+        return f"{base_url}/search"
 
     @staticmethod
-    def _build_nominatim_reverse_url(params: str) -> str:
+    def _build_nominatim_reverse_url() -> str:
         base_url = _normalize_nominatim_base_url(settings.nominatim_url)
-        return f"{base_url}/reverse?{params}"
+        return f"{base_url}/reverse"
 
     @classmethod
-    def reverse(
+    async def reverse(
         cls,
         lat: float,
         lon: float,
@@ -243,6 +300,11 @@ class GeocodingService:
         Raises:
             GeocodingServiceError: rate_limited, provider_unavailable, ou réponse invalide.
         """
+        # Un lieu déjà résolu à proximité évite l'appel réseau.
+        snapshot = geo_place_index.reverse(lat, lon, lang)
+        if snapshot is not None:
+            return GeocodingSearchResult.model_validate(snapshot)
+
         payload = {
             "lat": str(lat),
             "lon": str(lon),
@@ -251,34 +313,11 @@ class GeocodingService:
         }
         if lang:
             payload["accept-language"] = lang
-        params = urllib.parse.urlencode(payload)
-        url = cls._build_nominatim_reverse_url(params)
-        user_agent = f"{settings.nominatim_user_agent} (contact: {settings.nominatim_contact})"
-
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": user_agent, "Accept": "application/json"},
+        url = cls._build_nominatim_reverse_url()
+        raw_bytes = await _fetch_nominatim(
+            url, payload, flight_key=f"reverse:{urllib.parse.urlencode(payload)}"
         )
 
-        try:
-            with urllib.request.urlopen(req, timeout=settings.nominatim_timeout_seconds) as resp:
-                raw_bytes = resp.read()
-        except urllib.error.HTTPError as err:
-            if err.code == 429:
-                raise GeocodingServiceError(
-                    code="geocoding_rate_limited",
-                    message="Nominatim rate limit exceeded",
-                ) from err
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message=f"Nominatim returned HTTP {err.code}",
-            ) from err
-        except urllib.error.URLError as err:
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message="Nominatim service unavailable",
-            ) from err
-
         try:
             raw_data = json.loads(raw_bytes.decode("utf-8"))
             return _map_nominatim_result(raw_data)
@@ -289,7 +328,7 @@ class GeocodingService:
             ) from err
 
     @classmethod
-    def search(
+    async def search(
         cls,
         query: str,
         limit: int,
@@ -315,36 +354,13 @@ class GeocodingService:
             payload["countrycodes"] = country_code
         if lang:
             payload["accept-language"] = lang
-        params = urllib.parse.urlencode(payload)
-        url = cls._build_nominatim_search_url(params)
-        user_agent = f"{settings.nominatim_user_agent} (contact: {settings.nominatim_contact})"
-
-        # AC4: Timeout strict et retries=0. urllib.request.Request n'implémente
-        # pas de retry par défaut, garantissant le respect de la contrainte.
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": user_agent, "Accept": "application/json"},
+        # Les requêtes identiques en vol partagent un seul appel amont.
+        raw_bytes = await _fetch_nominatim(
+            cls._build_nominatim_search_url(),
+            payload,
+            flight_key=_build_query_key(query, limit, country_code=country_code, lang=lang),
         )
 
-        try:
-            with urllib.request.urlopen(req, timeout=settings.nominatim_timeout_seconds) as resp:
-                raw_bytes = resp.read()
-        except urllib.error.HTTPError as err:
-            if err.code == 429:
-                raise GeocodingServiceError(
-                    code="geocoding_rate_limited",
-                    message="Nominatim rate limit exceeded",
-                ) from err
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message=f"Nominatim returned HTTP {err.code}",
-            ) from err
-        except urllib.error.URLError as err:
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message="Nominatim service unavailable",
-            ) from err
-
         try:
             raw_data = json.loads(raw_bytes.decode("utf-8"))
             if not isinstance(raw_data, list):
@@ -357,7 +373,7 @@ class GeocodingService:
             ) from err
 
     @classmethod
-    def search_with_cache(
+    async def search_with_cache(
         cls,
         db: Session,
         query: str,
@@ -366,8 +382,10 @@ class GeocodingService:
         country_code: str | None = None,
         lang: str | None = None,
     ) -> list[GeocodingSearchResult]:
-        """Recherche avec couche cache DB (geocoding_query_cache).
+        """Recherche avec cache à deux niveaux : mémoire (LRU) puis DB (geocoding_query_cache).
 
+        Le niveau mémoire sert aussi les saisies qui prolongent une recherche complète
+        déjà en cache. Les résultats vides sont mis en cache avec une TTL plus courte.
         Séparation stricte : le cache n'interagit jamais avec geo_place_resolved.
         Les logs utilisent query_key (hash) — jamais la requête brute.
 
@@ -379,10 +397,6 @@ class GeocodingService:
             country_code: Code pays optionnel pour la clé de cache.
             lang: Langue optionnelle pour la clé de cache.
         """
-        from sqlalchemy import select
-
-        from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
-
         # Defensive reset: some tests may disable this logger globally.
         logger.disabled = False
 
@@ -396,57 +410,125 @@ class GeocodingService:
         )
 
         if not nocache:
-            now = datetime_provider.utcnow()
-            cached = db.execute(
-                select(GeocodingQueryCacheModel)
-                .where(GeocodingQueryCacheModel.query_key == query_key)
-                .where(GeocodingQueryCacheModel.expires_at > now)
-            ).scalar_one_or_none()
-
+            memory_hit = geocoding_memory_cache.get(query_key)
+            if memory_hit is not None:
+                geocoding_cache_hit_ratio.record(MEMORY_TIER, "hit")
+                logger.info("geocoding_cache_hit query_key=%s tier=memory", query_key)
+                return memory_hit
+            if settings.geocoding_prefix_reuse_enabled:
+                candidates = geocoding_memory_cache.find_prefix_candidates(
+                    query, limit, country_code=country_code, lang=lang
+                )
+                if candidates is not None:
+                    geocoding_cache_hit_ratio.record(MEMORY_TIER, "prefix_hit")
+                    logger.info("geocoding_cache_hit query_key=%s tier=prefix", query_key)
+                    return candidates
+            geocoding_cache_hit_ratio.record(MEMORY_TIER, "miss")
+
+            # Les phases DB tournent hors de la boucle d'événements: la session est
+            # synchrone et une requête lente bloquerait toutes les coroutines du worker.
+            cached = await asyncio.to_thread(cls._read_db_cache, db, query_key)
             if cached is not None:
-                logger.info("geocoding_cache_hit query_key=%s", query_key)
-                try:
-                    raw_data = json.loads(cached.response_json)
-                    if not isinstance(raw_data, list):
-                        raise ValueError("invalid cached payload")
-                    return [GeocodingSearchResult.model_validate(d) for d in raw_data]
-                except (json.JSONDecodeError, TypeError, ValueError, ValidationError):
-                    logger.warning(
-                        "geocoding_cache_corrupt query_key=%s",
-                        query_key,
-                    )
+                results, ttl_seconds = cached
+                geocoding_cache_hit_ratio.record(DB_TIER, "hit")
+                geocoding_memory_cache.put(
+                    query_key,
+                    results,
+                    query=query,
+                    limit=limit,
+                    country_code=country_code,
+                    lang=lang,
+                    ttl_seconds=ttl_seconds,
+                )
+                return results
+            geocoding_cache_hit_ratio.record(DB_TIER, "miss")
 
         logger.info("geocoding_cache_miss query_key=%s nocache=%s", query_key, nocache)
-        results = cls.search(query, limit, country_code=country_code, lang=lang)
+        results = await cls.search(query, limit, country_code=country_code, lang=lang)
 
         if not nocache:
-            expires_at = datetime_provider.utcnow() + timedelta(
-                seconds=settings.geocoding_cache_ttl_seconds
+            # Cache négatif : un résultat vide est conservé moins longtemps.
+            ttl_seconds = (
+                settings.geocoding_cache_ttl_seconds
+                if results
+                else min(
+                    settings.geocoding_negative_cache_ttl_seconds,
+                    settings.geocoding_cache_ttl_seconds,
+                )
             )
+            expires_at = datetime_provider.utcnow() + timedelta(seconds=ttl_seconds)
             serialized = json.dumps([r.model_dump(mode="json") for r in results])
 
-            # Upsert : met à jour si entrée existante (même key, TTL expiré), insère sinon.
-            existing = db.execute(
-                select(GeocodingQueryCacheModel).where(
-                    GeocodingQueryCacheModel.query_key == query_key
-                )
-            ).scalar_one_or_none()
-
-            if existing is not None:
-                existing.response_json = serialized
-                existing.expires_at = expires_at
-            else:
-                db.add(
-                    GeocodingQueryCacheModel(
-                        query_key=query_key,
-                        response_json=serialized,
-                        expires_at=expires_at,
-                    )
-                )
-            db.commit()
+            await asyncio.to_thread(cls._write_db_cache, db, query_key, serialized, expires_at)
+            geocoding_memory_cache.put(
+                query_key,
+                results,
+                query=query,
+                limit=limit,
+                country_code=country_code,
+                lang=lang,
+                ttl_seconds=ttl_seconds,
+            )
 
         return results
 
+    @staticmethod
+    def _read_db_cache(
+        db: Session, query_key: str
+    ) -> tuple[list[GeocodingSearchResult], float] | None:
+        """Lit une entrée valide de geocoding_query_cache et sa durée de vie restante."""
+        from sqlalchemy import select
+
+        from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
+
+        now = datetime_provider.utcnow()
+        cached = db.execute(
+            select(GeocodingQueryCacheModel)
+            .where(GeocodingQueryCacheModel.query_key == query_key)
+            .where(GeocodingQueryCacheModel.expires_at > now)
+        ).scalar_one_or_none()
+        if cached is None:
+            return None
+
+        logger.info("geocoding_cache_hit query_key=%s", query_key)
+        try:
+            raw_data = json.loads(cached.response_json)
+            if not isinstance(raw_data, list):
+                raise ValueError("invalid cached payload")
+            results = [GeocodingSearchResult.model_validate(d) for d in raw_data]
+        except (json.JSONDecodeError, TypeError, ValueError, ValidationError):
+            logger.warning(
+                "geocoding_cache_corrupt query_key=%s",
+                query_key,
+            )
+            return None
+        return results, _remaining_seconds(cached.expires_at, now)
+
+    @staticmethod
+    def _write_db_cache(db: Session, query_key: str, serialized: str, expires_at: datetime) -> None:
+        """Insère ou rafraîchit l'entrée geocoding_query_cache d'une requête."""
+        from sqlalchemy import select
+
+        from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
+
+        # Upsert : met à jour si entrée existante (même key, TTL expiré), insère sinon.
+        existing = db.execute(
+            select(GeocodingQueryCacheModel).where(GeocodingQueryCacheModel.query_key == query_key)
+        ).scalar_one_or_none()
+
+        if existing is not None:
+            existing.response_json = serialized
+            existing.expires_at = expires_at
+        else:
+            db.add(
+                GeocodingQueryCacheModel(
+                    query_key=query_key,
+                    response_json=serialized,
+                    expires_at=expires_at,
+                )
+            )
+        db.commit()
+
     @staticmethod
     def _build_nominatim_details_url() -> str:
         parsed = urllib.parse.urlparse(_normalize_nominatim_base_url(settings.nominatim_url))
@@ -493,7 +575,7 @@ class GeocodingService:
         return _map_nominatim_result(mapped)
 
     @classmethod
-    def resolve_place_snapshot(
+    async def resolve_place_snapshot(
         cls,
         *,
         provider: str,
@@ -506,41 +588,15 @@ class GeocodingService:
                 details={"provider": provider},
             )
 
-        details_url = cls._build_nominatim_details_url()
-        params = urllib.parse.urlencode(
+        raw_bytes = await _fetch_nominatim(
+            cls._build_nominatim_details_url(),
             {
                 "place_id": str(provider_place_id),
                 "format": "json",
                 "addressdetails": "1",
-            }
+            },
+            flight_key=f"details:{provider_place_id}",
         )
-        url = f"{details_url}?{params}"
-        user_agent = f"{settings.nominatim_user_agent} (contact: {settings.nominatim_contact})"
-
-        # AC4: Timeout strict et retries=0.
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": user_agent, "Accept": "application/json"},
-        )
-
-        try:
-            with urllib.request.urlopen(req, timeout=settings.nominatim_timeout_seconds) as resp:
-                raw_bytes = resp.read()
-        except urllib.error.HTTPError as err:
-            if err.code == 429:
-                raise GeocodingServiceError(
-                    code="geocoding_rate_limited",
-                    message="Nominatim rate limit exceeded",
-                ) from err
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message=f"Nominatim returned HTTP {err.code}",
-            ) from err
-        except urllib.error.URLError as err:
-            raise GeocodingServiceError(
-                code="geocoding_provider_unavailable",
-                message="Nominatim service unavailable",
-            ) from err
 
         try:
             raw_data = json.loads(raw_bytes.decode("utf-8"))
@@ -19,6 +19,8 @@ def _record_export_audit(
     export_type: str,
     count: int,
     filters: dict,
+    *,
+    completed: bool = True,
 ):
     AuditService.record_event(
         db,
@@ -34,6 +36,7 @@ def _record_export_audit(
                 "export_type": export_type,
                 "filters": filters,
                 "record_count": count,
+                "completed": completed,
             },
         ),
     )
@@ -5,6 +5,9 @@ from __future__ import annotations
 
 import logging
 
+from app.core.exceptions import ApplicationError
+from app.infra.db.keyset import InvalidCursorError, KeysetCursor, decode_cursor
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,3 +18,17 @@ def _mask_email(email: str) -> str:
 
     visible_prefix = local_part[:3]
     return f"{visible_prefix}***@{domain}"
+
+
+def _decode_cursor(cursor: str | None, request_id: str) -> KeysetCursor | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError as error:
+        raise ApplicationError(
+            request_id=request_id,
+            code="invalid_cursor",
+            message="cursor is invalid",
+            details={"field": "cursor"},
+        ) from error
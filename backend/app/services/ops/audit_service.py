@@ -11,12 +11,20 @@ import logging
 from datetime import datetime
 
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.datetime_provider import datetime_provider
 from app.core.sensitive_data import Sink, sanitize_payload
 from app.domain.audit.safe_details import to_safe_details
+from app.infra.db.keyset import (
+    CountMode,
+    InvalidCursorError,
+    count_rows,
+    decode_cursor,
+    keyset_after,
+    next_cursor_for,
+)
 from app.infra.db.models.audit_event import AuditEventModel
 from app.infra.observability.metrics import increment_counter
 
@@ -60,9 +68,10 @@ class AuditEventListData(BaseModel):
     """Modèle pour la liste paginée d'événements d'audit."""
 
     events: list[AuditEventData]
-    total: int
+    total: int | None
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 class AuditEventCreatePayload(BaseModel):
@@ -88,6 +97,8 @@ class AuditEventListFilters(BaseModel):
     date_to: datetime | None = None
     limit: int = 50
     offset: int = 0
+    cursor: str | None = None
+    count_mode: CountMode = "exact"
 
 
 class AuditService:
@@ -190,6 +201,9 @@ class AuditService:
         """
         Liste les événements d'audit avec filtres et pagination.
 
+        Avec `cursor`, la page reprend après `(created_at, id)` du dernier événement
+        servi et `offset` est ignoré; `count_mode` rend le total estimé ou absent.
+
         Args:
             db: Session de base de données.
             filters: Critères de filtrage et paramètres de pagination.
@@ -213,42 +227,45 @@ class AuditService:
                 details={"field": "offset"},
             )
 
-        query = select(AuditEventModel)
-        count_query = select(func.count(AuditEventModel.id))
+        cursor = None
+        if filters.cursor is not None:
+            try:
+                cursor = decode_cursor(filters.cursor)
+            except InvalidCursorError as error:
+                raise AuditServiceError(
+                    code="audit_validation_error",
+                    message="audit pagination is invalid",
+                    details={"field": "cursor"},
+                ) from error
 
+        query = select(AuditEventModel)
         if filters.action is not None:
             query = query.where(AuditEventModel.action == filters.action)
-            count_query = count_query.where(AuditEventModel.action == filters.action)
         if filters.status is not None:
             query = query.where(AuditEventModel.status == filters.status)
-            count_query = count_query.where(AuditEventModel.status == filters.status)
         if filters.target_user_id is not None:
-            target_id = str(filters.target_user_id)
             query = query.where(
                 AuditEventModel.target_type == "user",
-                AuditEventModel.target_id == target_id,
-            )
-            count_query = count_query.where(
-                AuditEventModel.target_type == "user",
-                AuditEventModel.target_id == target_id,
+                AuditEventModel.target_id == str(filters.target_user_id),
             )
         if filters.date_from is not None:
             query = query.where(AuditEventModel.created_at >= filters.date_from)
-            count_query = count_query.where(AuditEventModel.created_at >= filters.date_from)
         if filters.date_to is not None:
             query = query.where(AuditEventModel.created_at <= filters.date_to)
-            count_query = count_query.where(AuditEventModel.created_at <= filters.date_to)
+        total = count_rows(db, query, filters.count_mode)
 
-        query = (
-            query.order_by(AuditEventModel.created_at.desc(), AuditEventModel.id.desc())
-            .limit(filters.limit)
-            .offset(filters.offset)
-        )
-        events = db.scalars(query).all()
-        total = int(db.scalar(count_query) or 0)
+        query = query.order_by(AuditEventModel.created_at.desc(), AuditEventModel.id.desc())
+        if cursor is not None:
+            query = query.where(
+                keyset_after(AuditEventModel.created_at, AuditEventModel.id, cursor)
+            )
+        else:
+            query = query.offset(filters.offset)
+        events = list(db.scalars(query.limit(filters.limit)).all())
         return AuditEventListData(
             events=[AuditService._to_data(event) for event in events],
             total=total,
             limit=filters.limit,
             offset=filters.offset,
+            next_cursor=next_cursor_for(events, page_size=filters.limit, sort_attr="created_at"),
         )
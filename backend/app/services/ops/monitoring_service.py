@@ -17,9 +17,10 @@ from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
 from app.infra.db.models.audit_event import AuditEventModel
 from app.infra.observability.metrics import (
+    DurationHistogram,
     get_counter_sum_in_window,
     get_counter_sums_by_prefix_in_window,
-    get_duration_values_by_prefix_in_window,
+    get_duration_histograms_by_prefix_in_window,
 )
 
 WINDOWS: dict[str, timedelta] = {
@@ -96,24 +97,6 @@ class OpsMonitoringPricingKpisData(BaseModel):
     variants: list[OpsMonitoringPricingKpisVariantItem]
 
 
-def _percentile(values: list[float], q: float) -> float:
-    """Calcule un percentile sur une liste de valeurs."""
-    if not values:
-        return 0.0
-    if len(values) == 1:
-        return float(values[0])
-    normalized = sorted(values)
-    position = (len(normalized) - 1) * max(0.0, min(1.0, q))
-    lower_index = int(position)
-    upper_index = min(lower_index + 1, len(normalized) - 1)
-    if lower_index == upper_index:
-        return float(normalized[lower_index])
-    fraction = position - lower_index
-    lower = normalized[lower_index]
-    upper = normalized[upper_index]
-    return float(lower + (upper - lower) * fraction)
-
-
 class OpsMonitoringService:
     """
     Service de monitoring opérationnel.
@@ -176,10 +159,11 @@ class OpsMonitoringService:
             "http_requests_server_errors_total|", duration
         )
 
-        latency_map = get_duration_values_by_prefix_in_window(
+        latency = DurationHistogram()
+        for histogram in get_duration_histograms_by_prefix_in_window(
             "http_request_duration_seconds|", duration
-        )
-        latency_values = [value for values in latency_map.values() for value in values]
+        ).values():
+            latency.merge(histogram)
 
         requests_total = int(sum(request_counts.values()))
         errors_4xx_total = int(sum(error_4xx_counts.values()))
@@ -190,7 +174,7 @@ class OpsMonitoringService:
             if requests_total > 0
             else 100.0
         )
-        p95_latency_ms = _percentile(latency_values, 0.95) * 1000.0
+        p95_latency_ms = latency.percentile(0.95) * 1000.0
 
         quota_exceeded_total = int(
             get_counter_sum_in_window("quota_exceeded_total", duration)
@@ -0,0 +1,183 @@
+# Commentaire global: worker d'arrière-plan des demandes RGPD (export et suppression).
+"""Exécute hors requête HTTP les demandes de vie privée mises en file.
+
+- les endpoints créent la demande en `requested` et répondent immédiatement;
+- le worker claim la plus ancienne demande (`FOR UPDATE SKIP LOCKED` sur
+  PostgreSQL), la passe en `processing` et la traite dans sa propre session;
+- la suppression purge par lots et publie sa progression dans `result_data`
+  après chaque lot commité; un claim abandonné (aucune progression depuis
+  `stale_claim_seconds`) est repris et la purge reprend là où elle s'était arrêtée;
+- l'export est écrit dans une archive NDJSON gzip téléchargeable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.models.privacy import UserPrivacyRequestModel
+from app.infra.observability.metrics import increment_counter, observe_duration
+from app.services.privacy_service import (
+    PrivacyService,
+    PrivacyServiceError,
+    privacy_export_artifact_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIVACY_JOB_LAG_METRIC = "privacy_job_lag_seconds"
+PRIVACY_JOB_ERRORS_METRIC = "privacy_job_worker_errors_total"
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class PrivacyJobRunner:
+    """Boucle asyncio qui vide la file des demandes RGPD, une demande à la fois."""
+
+    def __init__(self, session_factory: Callable[[], Session] | None = None) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+
+    @staticmethod
+    def claim_next(
+        db: Session, *, now_utc: datetime, stale_claim_seconds: float
+    ) -> UserPrivacyRequestModel | None:
+        """
+        Passe en `processing` la plus ancienne demande prête.
+        Le commit appartient à l'appelant: il libère le verrou `SKIP LOCKED`.
+        """
+        model = UserPrivacyRequestModel
+        stale_claim = and_(
+            model.status == "processing",
+            model.updated_at < now_utc - timedelta(seconds=stale_claim_seconds),
+        )
+        request = db.scalar(
+            select(model)
+            .where(or_(model.status == "requested", stale_claim))
+            .order_by(model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if request is None:
+            return None
+        request.status = "processing"
+        request.updated_at = now_utc
+        db.flush()
+        return request
+
+    def run_once(self) -> int:
+        """Claim puis traite une demande; retourne le nombre de demandes traitées."""
+        with self._open_session() as db:
+            now_utc = datetime_provider.utcnow()
+            request = self.claim_next(
+                db,
+                now_utc=now_utc,
+                stale_claim_seconds=settings.privacy_job_stale_claim_seconds,
+            )
+            if request is None:
+                db.rollback()
+                return 0
+            privacy_request_id = request.id
+            request_kind = request.request_kind
+            observe_duration(
+                PRIVACY_JOB_LAG_METRIC,
+                max((_as_utc(now_utc) - _as_utc(request.requested_at)).total_seconds(), 0.0),
+            )
+            db.commit()
+
+            start = monotonic()
+            try:
+                self._execute(db, request)
+                db.commit()
+            except Exception as error:
+                db.rollback()
+                reason = (
+                    error.code
+                    if isinstance(error, PrivacyServiceError)
+                    else "privacy_request_failed"
+                )
+                increment_counter("privacy_request_failures_total", 1.0)
+                logger.exception(
+                    "privacy_job_failed privacy_request_id=%s kind=%s",
+                    privacy_request_id,
+                    request_kind,
+                )
+                failed = db.get(UserPrivacyRequestModel, privacy_request_id)
+                if failed is not None:
+                    PrivacyService._mark_failed(failed, reason=reason)
+                    db.commit()
+                return 1
+
+            increment_counter(f"privacy_{request_kind}_requests_total", 1.0)
+            observe_duration(f"privacy_{request_kind}_seconds", monotonic() - start)
+            logger.info(
+                "privacy_%s_completed request_id=%s user_id=%s privacy_request_id=%s",
+                request_kind,
+                request.request_data.get("request_id"),
+                request.user_id,
+                privacy_request_id,
+            )
+        return 1
+
+    @staticmethod
+    def _execute(db: Session, request: UserPrivacyRequestModel) -> None:
+        if request.request_kind == "export":
+            PrivacyService.execute_export(db, request, artifact_dir=privacy_export_artifact_dir())
+            return
+
+        def publish_progress(entity: str, deleted_rows: dict[str, int]) -> None:
+            # Chaque lot est commité: verrous courts et progression visible via GET /delete.
+            request.result_data = {
+                "progress": {"current_entity": entity, "deleted_rows": dict(deleted_rows)}
+            }
+            db.commit()
+
+        PrivacyService.execute_delete(db, request, on_chunk=publish_progress)
+
+    def start(self, *, interval_seconds: float) -> None:
+        """Démarre la boucle de polling dans la boucle asyncio courante."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._poll(interval_seconds))
+
+    async def aclose(self) -> None:
+        """Arrête la boucle; une demande en cours termine dans son thread."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _poll(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                processed = await asyncio.to_thread(self.run_once)
+            except Exception:
+                increment_counter(PRIVACY_JOB_ERRORS_METRIC, 1.0)
+                logger.exception("privacy_job_poll_failed")
+                processed = 0
+            if processed == 0:
+                await asyncio.sleep(interval_seconds)
+
+    def _open_session(self) -> Session:
+        if self._session_factory is None:
+            from app.infra.db.session import SessionLocal
+
+            return SessionLocal()
+        return self._session_factory()
+
+
+privacy_job_runner = PrivacyJobRunner()
@@ -7,15 +7,24 @@ utilisateur conformément aux obligations RGPD.
 
 from __future__ import annotations
 
+import gzip
+import json
 import logging
-from datetime import datetime
+import tempfile
+from collections.abc import Callable
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
 from time import monotonic
-from uuid import uuid4
+from typing import Any
+from uuid import UUID, uuid4
 
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.datetime_provider import datetime_provider
 from app.core.security import hash_password
 from app.infra.db.models.audit_event import AuditEventModel
@@ -36,6 +45,49 @@ from app.infra.observability.metrics import increment_counter, observe_duration
 
 logger = logging.getLogger(__name__)
 
+# Ordre de purge compatible avec les clés étrangères (PRAGMA foreign_keys=ON).
+_PURGE_ORDER: tuple[tuple[str, Any], ...] = (
+    ("user_token_usage_logs", UserTokenUsageLogModel),
+    ("feature_usage_counters", FeatureUsageCounterModel),
+    ("user_refresh_tokens", UserRefreshTokenModel),
+    ("stripe_billing_profiles", StripeBillingProfileModel),
+    ("user_birth_profiles", UserBirthProfileModel),
+    ("user_daily_quota_usages", UserDailyQuotaUsageModel),
+    ("payment_attempts", PaymentAttemptModel),
+    ("subscription_plan_changes", SubscriptionPlanChangeModel),
+    ("user_subscriptions", UserSubscriptionModel),
+)
+
+# Historiques exportés ligne à ligne; le préfixe sert aussi de clé de compteur.
+_EXPORT_SECTIONS: tuple[tuple[str, Any], ...] = (
+    ("subscriptions", UserSubscriptionModel),
+    ("payment_attempts", PaymentAttemptModel),
+    ("quota_usage", UserDailyQuotaUsageModel),
+)
+
+
+def privacy_export_artifact_dir() -> Path:
+    """Répertoire des archives d'export RGPD (`PRIVACY_EXPORT_ARTIFACT_DIR`)."""
+    if settings.privacy_export_artifact_dir:
+        return Path(settings.privacy_export_artifact_dir)
+    return Path(tempfile.gettempdir()) / "privacy-exports"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, Decimal | UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _row_to_dict(row: Any) -> dict[str, object]:
+    return {attr.key: getattr(row, attr.key) for attr in sa_inspect(row).mapper.column_attrs}
+
+
+def _dump_export_line(section: str, data: object) -> str:
+    return json.dumps({"section": section, "data": data}, default=_json_default) + "\n"
+
 
 class PrivacyServiceError(Exception):
     """Exception levée lors d'erreurs de traitement vie privée."""
@@ -117,9 +169,11 @@ class PrivacyService:
     ) -> dict[str, object]:
         """Résume les données de résultat pour les preuves de conformité."""
         if request_kind == "export":
+            has_artifact = isinstance(result_data.get("artifact"), dict)
             return {
-                "contains_user_data": isinstance(result_data.get("user"), dict),
-                "birth_profile_present": result_data.get("birth_profile") is not None,
+                "contains_user_data": isinstance(result_data.get("user"), dict) or has_artifact,
+                "birth_profile_present": result_data.get("birth_profile") is not None
+                or bool(result_data.get("birth_profile_present", False)),
                 "subscriptions_count": int(result_data.get("subscriptions_count", 0)),
                 "payment_attempts_count": int(result_data.get("payment_attempts_count", 0)),
                 "quota_usage_count": int(result_data.get("quota_usage_count", 0)),
@@ -231,44 +285,40 @@ class PrivacyService:
         return PrivacyService._to_request_data(request)
 
     @staticmethod
-    def request_export(db: Session, *, user_id: int, request_id: str) -> PrivacyRequestData:
+    def _open_request(
+        db: Session,
+        *,
+        user_id: int,
+        request_id: str,
+        request_kind: str,
+    ) -> tuple[UserPrivacyRequestModel, bool]:
         """
-        Exécute une demande d'export de données RGPD.
-
-        Opération idempotente : retourne l'export existant si déjà complété.
-
-        Args:
-            db: Session de base de données.
-            user_id: Identifiant de l'utilisateur.
-            request_id: Identifiant de corrélation de la requête.
-
-        Returns:
-            Données de la demande d'export.
+        Réutilise la dernière demande complétée ou crée une demande `requested`.
 
-        Raises:
-            PrivacyServiceError: Si un export est déjà en cours.
+        Retourne la demande et un booléen indiquant une réutilisation idempotente.
         """
-        start = monotonic()
-        latest = PrivacyService._get_latest_request(db, user_id=user_id, request_kind="export")
+        latest = PrivacyService._get_latest_request(db, user_id=user_id, request_kind=request_kind)
         if latest is not None and latest.status == "completed":
             logger.info(
-                "privacy_export_idempotent_reuse request_id=%s user_id=%s privacy_request_id=%s",
+                "privacy_%s_idempotent_reuse request_id=%s user_id=%s privacy_request_id=%s",
+                request_kind,
                 request_id,
                 user_id,
                 latest.id,
             )
-            return PrivacyService._to_request_data(latest)
+            return latest, True
         if latest is not None and latest.status in {"requested", "processing"}:
             increment_counter("privacy_request_failures_total", 1.0)
+            article = "an" if request_kind == "export" else "a"
             raise PrivacyServiceError(
                 code="privacy_request_conflict",
-                message="an export request is already in progress",
-                details={"request_kind": "export"},
+                message=f"{article} {request_kind} request is already in progress",
+                details={"request_kind": request_kind},
             )
 
         request = UserPrivacyRequestModel(
             user_id=user_id,
-            request_kind="export",
+            request_kind=request_kind,
             status="requested",
             request_data={"request_id": request_id},
             result_data={},
@@ -276,63 +326,17 @@ class PrivacyService:
         )
         db.add(request)
         db.flush()
-        request.status = "processing"
-        db.flush()
-        try:
-            user = db.get(UserModel, user_id)
-            if user is None:
-                raise PrivacyServiceError(
-                    code="privacy_request_invalid",
-                    message="user does not exist",
-                    details={"user_id": str(user_id)},
-                )
+        return request, False
 
-            birth_profile = db.scalar(
-                select(UserBirthProfileModel)
-                .where(UserBirthProfileModel.user_id == user_id)
-                .limit(1)
-            )
-            subscriptions = db.scalars(
-                select(UserSubscriptionModel).where(UserSubscriptionModel.user_id == user_id)
-            ).all()
-            payment_attempts = db.scalars(
-                select(PaymentAttemptModel).where(PaymentAttemptModel.user_id == user_id)
-            ).all()
-            quota_usage = db.scalars(
-                select(UserDailyQuotaUsageModel).where(UserDailyQuotaUsageModel.user_id == user_id)
-            ).all()
-
-            request.status = "completed"
-            request.completed_at = datetime_provider.utcnow()
-            request.result_data = {
-                "user": {
-                    "id": user.id,
-                    "email": user.email,
-                    "role": user.role,
-                    "created_at": user.created_at.isoformat(),
-                },
-                "birth_profile": (
-                    {
-                        "birth_date": (
-                            birth_profile.birth_date.isoformat()
-                            if birth_profile.birth_date is not None
-                            else None
-                        ),
-                        "birth_year": birth_profile.birth_year,
-                        "birth_month": birth_profile.birth_month,
-                        "birth_day": birth_profile.birth_day,
-                        "birth_date_precision": birth_profile.birth_date_precision,
-                        "birth_time": birth_profile.birth_time,
-                        "birth_place": birth_profile.birth_place,
-                        "birth_timezone": birth_profile.birth_timezone,
-                    }
-                    if birth_profile is not None
-                    else None
-                ),
-                "subscriptions_count": len(subscriptions),
-                "payment_attempts_count": len(payment_attempts),
-                "quota_usage_count": len(quota_usage),
-            }
+    @staticmethod
+    def _run_request(
+        db: Session,
+        request: UserPrivacyRequestModel,
+        execute: Callable[[], None],
+    ) -> None:
+        """Exécute une demande `processing` et la marque en échec si l'exécution lève."""
+        try:
+            execute()
             db.flush()
         except PrivacyServiceError as error:
             increment_counter("privacy_request_failures_total", 1.0)
@@ -345,10 +349,52 @@ class PrivacyService:
             db.flush()
             raise PrivacyServiceError(
                 code="privacy_request_failed",
-                message="privacy export request failed",
+                message=f"privacy {request.request_kind} request failed",
                 details={},
             ) from error
 
+    @staticmethod
+    def _get_request_user(db: Session, request: UserPrivacyRequestModel) -> UserModel:
+        user = db.get(UserModel, request.user_id)
+        if user is None:
+            raise PrivacyServiceError(
+                code="privacy_request_invalid",
+                message="user does not exist",
+                details={"user_id": str(request.user_id)},
+            )
+        return user
+
+    @staticmethod
+    def request_export(db: Session, *, user_id: int, request_id: str) -> PrivacyRequestData:
+        """
+        Exécute une demande d'export de données RGPD.
+
+        Opération idempotente : retourne l'export existant si déjà complété.
+        Avec `PRIVACY_JOBS_ENABLED`, la demande est seulement mise en file (`requested`)
+        et produite par le worker `PrivacyJobRunner` sous forme d'archive téléchargeable.
+
+        Args:
+            db: Session de base de données.
+            user_id: Identifiant de l'utilisateur.
+            request_id: Identifiant de corrélation de la requête.
+
+        Returns:
+            Données de la demande d'export.
+
+        Raises:
+            PrivacyServiceError: Si un export est déjà en cours.
+        """
+        start = monotonic()
+        request, reused = PrivacyService._open_request(
+            db, user_id=user_id, request_id=request_id, request_kind="export"
+        )
+        if reused or settings.privacy_jobs_enabled:
+            return PrivacyService._to_request_data(request)
+
+        request.status = "processing"
+        db.flush()
+        PrivacyService._run_request(db, request, lambda: PrivacyService.execute_export(db, request))
+
         increment_counter("privacy_export_requests_total", 1.0)
         observe_duration("privacy_export_seconds", monotonic() - start)
         logger.info(
@@ -360,51 +406,175 @@ class PrivacyService:
         return PrivacyService._to_request_data(request)
 
     @staticmethod
-    def _purge_user_owned_data(db: Session, *, user_id: int) -> list[str]:
+    def execute_export(
+        db: Session,
+        request: UserPrivacyRequestModel,
+        *,
+        artifact_dir: Path | None = None,
+    ) -> None:
         """
-        Supprime les données personnelles rattachées à un compte avant anonymisation.
+        Produit l'export d'une demande `processing` et la passe en `completed`.
 
-        L'ordre respecte les contraintes de clés étrangères SQLite (PRAGMA foreign_keys=ON).
+        Sans `artifact_dir`, le résumé est conservé dans `result_data`. Avec
+        `artifact_dir`, les données sont écrites au fil de l'eau dans une archive
+        NDJSON gzip et `result_data` ne garde que les compteurs et la référence
+        de l'archive.
         """
-        deleted_entities: list[str] = []
-
-        db.execute(delete(UserTokenUsageLogModel).where(UserTokenUsageLogModel.user_id == user_id))
-        deleted_entities.append("user_token_usage_logs")
-
-        db.execute(
-            delete(FeatureUsageCounterModel).where(FeatureUsageCounterModel.user_id == user_id)
+        user_id = request.user_id
+        user = PrivacyService._get_request_user(db, request)
+        birth_profile = db.scalar(
+            select(UserBirthProfileModel).where(UserBirthProfileModel.user_id == user_id).limit(1)
         )
-        deleted_entities.append("feature_usage_counters")
-
-        db.execute(delete(UserRefreshTokenModel).where(UserRefreshTokenModel.user_id == user_id))
-        deleted_entities.append("user_refresh_tokens")
-
-        db.execute(
-            delete(StripeBillingProfileModel).where(StripeBillingProfileModel.user_id == user_id)
+        user_data: dict[str, object] = {
+            "id": user.id,
+            "email": user.email,
+            "role": user.role,
+            "created_at": user.created_at.isoformat(),
+        }
+        birth_data = (
+            {
+                "birth_date": (
+                    birth_profile.birth_date.isoformat()
+                    if birth_profile.birth_date is not None
+                    else None
+                ),
+                "birth_year": birth_profile.birth_year,
+                "birth_month": birth_profile.birth_month,
+                "birth_day": birth_profile.birth_day,
+                "birth_date_precision": birth_profile.birth_date_precision,
+                "birth_time": birth_profile.birth_time,
+                "birth_place": birth_profile.birth_place,
+                "birth_timezone": birth_profile.birth_timezone,
+            }
+            if birth_profile is not None
+            else None
         )
-        deleted_entities.append("stripe_billing_profiles")
 
-        db.execute(delete(UserBirthProfileModel).where(UserBirthProfileModel.user_id == user_id))
-        deleted_entities.append("user_birth_profiles")
+        if artifact_dir is None:
+            counts = {
+                f"{section}_count": db.scalar(
+                    select(func.count()).select_from(model).where(model.user_id == user_id)
+                )
+                or 0
+                for section, model in _EXPORT_SECTIONS
+            }
+            result_data: dict[str, object] = {
+                "user": user_data,
+                "birth_profile": birth_data,
+                **counts,
+            }
+        else:
+            artifact = PrivacyService._write_export_artifact(
+                db,
+                request,
+                artifact_dir=artifact_dir,
+                header={"user": user_data, "birth_profile": birth_data},
+            )
+            result_data = {
+                "birth_profile_present": birth_data is not None,
+                **artifact.pop("counts"),
+                "artifact": artifact,
+            }
 
-        db.execute(
-            delete(UserDailyQuotaUsageModel).where(UserDailyQuotaUsageModel.user_id == user_id)
-        )
-        deleted_entities.append("user_daily_quota_usages")
+        request.status = "completed"
+        request.completed_at = datetime_provider.utcnow()
+        request.result_data = result_data
 
-        db.execute(delete(PaymentAttemptModel).where(PaymentAttemptModel.user_id == user_id))
-        deleted_entities.append("payment_attempts")
+    @staticmethod
+    def _write_export_artifact(
+        db: Session,
+        request: UserPrivacyRequestModel,
+        *,
+        artifact_dir: Path,
+        header: dict[str, object],
+    ) -> dict[str, Any]:
+        """Écrit l'archive d'export ligne à ligne, sans matérialiser les historiques."""
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"privacy-export-{request.id}-{uuid4().hex}.ndjson.gz"
+        target = artifact_dir / filename
+        partial = target.with_name(f"{filename}.partial")
+        counts: dict[str, int] = {}
+        records = 0
+        try:
+            with gzip.open(partial, "wt", encoding="utf-8") as stream:
+                for section, data in header.items():
+                    stream.write(_dump_export_line(section, data))
+                    records += 1
+                for section, model in _EXPORT_SECTIONS:
+                    count = 0
+                    rows = db.scalars(
+                        select(model)
+                        .where(model.user_id == request.user_id)
+                        .order_by(model.id)
+                        .execution_options(yield_per=settings.privacy_purge_chunk_size)
+                    )
+                    for row in rows:
+                        stream.write(_dump_export_line(section, _row_to_dict(row)))
+                        count += 1
+                    counts[f"{section}_count"] = count
+                    records += count
+            partial.replace(target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return {
+            "filename": filename,
+            "format": "ndjson",
+            "compression": "gzip",
+            "size_bytes": target.stat().st_size,
+            "record_count": records,
+            "counts": counts,
+        }
 
-        db.execute(
-            delete(SubscriptionPlanChangeModel).where(
-                SubscriptionPlanChangeModel.user_id == user_id
-            )
+    @staticmethod
+    def get_export_artifact_path(db: Session, *, user_id: int) -> Path:
+        """Chemin de l'archive de la dernière demande d'export complétée."""
+        request = PrivacyService._get_latest_request(db, user_id=user_id, request_kind="export")
+        artifact = request.result_data.get("artifact") if request is not None else None
+        if request is not None and request.status == "completed" and isinstance(artifact, dict):
+            path = privacy_export_artifact_dir() / str(artifact.get("filename", ""))
+            if path.is_file():
+                return path
+        raise PrivacyServiceError(
+            code="privacy_not_found",
+            message="privacy export artifact was not found",
+            details={"request_kind": "export"},
         )
-        deleted_entities.append("subscription_plan_changes")
 
-        db.execute(delete(UserSubscriptionModel).where(UserSubscriptionModel.user_id == user_id))
-        deleted_entities.append("user_subscriptions")
+    @staticmethod
+    def _purge_user_owned_data(
+        db: Session,
+        *,
+        user_id: int,
+        chunk_size: int | None = None,
+        on_chunk: Callable[[str, dict[str, int]], None] | None = None,
+    ) -> list[str]:
+        """
+        Supprime les données personnelles rattachées à un compte avant anonymisation.
 
+        L'ordre respecte les contraintes de clés étrangères SQLite (PRAGMA foreign_keys=ON).
+        Chaque table est purgée par lots de `chunk_size` lignes (clé primaire) pour
+        borner la durée des verrous; `on_chunk(entité, lignes supprimées par entité)`
+        est appelé après chaque lot et peut committer pour publier la progression.
+        """
+        batch = chunk_size or settings.privacy_purge_chunk_size
+        deleted_entities: list[str] = []
+        deleted_rows: dict[str, int] = {}
+        for entity, model in _PURGE_ORDER:
+            deleted_rows.setdefault(entity, 0)
+            while True:
+                ids = db.scalars(
+                    select(model.id).where(model.user_id == user_id).limit(batch)
+                ).all()
+                if not ids:
+                    break
+                db.execute(delete(model).where(model.id.in_(ids)))
+                deleted_rows[entity] += len(ids)
+                if on_chunk is not None:
+                    on_chunk(entity, deleted_rows)
+                if len(ids) < batch:
+                    break
+            deleted_entities.append(entity)
         return deleted_entities
 
     @staticmethod
@@ -414,6 +584,7 @@ class PrivacyService:
 
         Supprime toutes les données utilisateur et anonymise le compte.
         Opération idempotente : retourne la suppression existante si déjà complétée.
+        Avec `PRIVACY_JOBS_ENABLED`, la demande est mise en file et purgée par le worker.
 
         Args:
             db: Session de base de données.
@@ -427,76 +598,15 @@ class PrivacyService:
             PrivacyServiceError: Si une suppression est déjà en cours.
         """
         start = monotonic()
-        latest = PrivacyService._get_latest_request(db, user_id=user_id, request_kind="delete")
-        if latest is not None and latest.status == "completed":
-            logger.info(
-                "privacy_delete_idempotent_reuse request_id=%s user_id=%s privacy_request_id=%s",
-                request_id,
-                user_id,
-                latest.id,
-            )
-            return PrivacyService._to_request_data(latest)
-        if latest is not None and latest.status in {"requested", "processing"}:
-            increment_counter("privacy_request_failures_total", 1.0)
-            raise PrivacyServiceError(
-                code="privacy_request_conflict",
-                message="a delete request is already in progress",
-                details={"request_kind": "delete"},
-            )
-
-        request = UserPrivacyRequestModel(
-            user_id=user_id,
-            request_kind="delete",
-            status="requested",
-            request_data={"request_id": request_id},
-            result_data={},
-            error_reason=None,
+        request, reused = PrivacyService._open_request(
+            db, user_id=user_id, request_id=request_id, request_kind="delete"
         )
-        db.add(request)
-        db.flush()
+        if reused or settings.privacy_jobs_enabled:
+            return PrivacyService._to_request_data(request)
+
         request.status = "processing"
         db.flush()
-        try:
-            user = db.get(UserModel, user_id)
-            if user is None:
-                raise PrivacyServiceError(
-                    code="privacy_request_invalid",
-                    message="user does not exist",
-                    details={"user_id": str(user_id)},
-                )
-
-            deleted_entities = PrivacyService._purge_user_owned_data(db, user_id=user_id)
-
-            deleted_timestamp = int(datetime_provider.utcnow().timestamp())
-            anonymized_email = f"deleted-user-{user_id}-{deleted_timestamp}@deleted.local"
-            user.email = anonymized_email
-            user.password_hash = hash_password(uuid4().hex)
-            user.role = "user"
-            user.detected_locale = None
-            user.detected_country_code = None
-            user.detected_timezone = None
-
-            request.status = "completed"
-            request.completed_at = datetime_provider.utcnow()
-            request.result_data = {
-                "account_anonymized": True,
-                "deleted_entities": deleted_entities,
-            }
-            db.flush()
-        except PrivacyServiceError as error:
-            increment_counter("privacy_request_failures_total", 1.0)
-            PrivacyService._mark_failed(request, reason=error.code)
-            db.flush()
-            raise
-        except Exception as error:
-            increment_counter("privacy_request_failures_total", 1.0)
-            PrivacyService._mark_failed(request, reason="privacy_request_failed")
-            db.flush()
-            raise PrivacyServiceError(
-                code="privacy_request_failed",
-                message="privacy delete request failed",
-                details={},
-            ) from error
+        PrivacyService._run_request(db, request, lambda: PrivacyService.execute_delete(db, request))
 
         increment_counter("privacy_delete_requests_total", 1.0)
         observe_duration("privacy_delete_seconds", monotonic() - start)
@@ -508,6 +618,51 @@ class PrivacyService:
         )
         return PrivacyService._to_request_data(request)
 
+    @staticmethod
+    def execute_delete(
+        db: Session,
+        request: UserPrivacyRequestModel,
+        *,
+        on_chunk: Callable[[str, dict[str, int]], None] | None = None,
+    ) -> None:
+        """Purge et anonymise le compte d'une demande `processing`, puis la complète."""
+        user_id = request.user_id
+        user = PrivacyService._get_request_user(db, request)
+        deleted_entities = PrivacyService._purge_user_owned_data(
+            db, user_id=user_id, on_chunk=on_chunk
+        )
+        PrivacyService._remove_export_artifacts(db, user_id=user_id)
+
+        deleted_timestamp = int(datetime_provider.utcnow().timestamp())
+        anonymized_email = f"deleted-user-{user_id}-{deleted_timestamp}@deleted.local"
+        user.email = anonymized_email
+        user.password_hash = hash_password(uuid4().hex)
+        user.role = "user"
+        user.detected_locale = None
+        user.detected_country_code = None
+        user.detected_timezone = None
+
+        request.status = "completed"
+        request.completed_at = datetime_provider.utcnow()
+        request.result_data = {
+            "account_anonymized": True,
+            "deleted_entities": deleted_entities,
+        }
+
+    @staticmethod
+    def _remove_export_artifacts(db: Session, *, user_id: int) -> None:
+        """Supprime les archives d'export encore présentes pour le compte."""
+        exports = db.scalars(
+            select(UserPrivacyRequestModel).where(
+                UserPrivacyRequestModel.user_id == user_id,
+                UserPrivacyRequestModel.request_kind == "export",
+            )
+        ).all()
+        for export in exports:
+            artifact = export.result_data.get("artifact")
+            if isinstance(artifact, dict) and artifact.get("filename"):
+                (privacy_export_artifact_dir() / str(artifact["filename"])).unlink(missing_ok=True)
+
     @staticmethod
     def get_compliance_evidence(
         db: Session, *, user_id: int, max_audit_events: int = 50
@@ -0,0 +1,147 @@
+# Commentaire global: consommation de quota en une instruction UPSERT conditionnelle.
+"""Incrémente un compteur d'usage de façon atomique, sans verrou applicatif.
+
+Une seule instruction crée le compteur de la fenêtre ou l'incrémente, et seulement si
+la limite reste respectée:
+
+    INSERT ... ON CONFLICT (<clé composite>) DO UPDATE
+        SET used_count = used_count + :n
+        WHERE used_count + :n <= :limit
+    RETURNING ...
+
+PostgreSQL et SQLite (>= 3.35) partagent cette syntaxe. Les autres dialectes gardent
+le chemin historique verrouillé (`SELECT ... FOR UPDATE`).
+
+L'appelant apprend aussi si l'appel a créé le compteur: PostgreSQL le dit dans le
+`RETURNING` (`xmax = 0` pour une ligne insérée); SQLite n'a pas d'équivalent, la
+création y passe donc d'abord par `INSERT ... ON CONFLICT DO NOTHING`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.datetime_provider import datetime_provider
+from app.services.entitlement.entitlement_types import QuotaDefinition
+from app.services.entitlement.snapshot_cache import ENTITLEMENT_CACHE_SUBJECT_OPTION
+from app.services.quota.window_resolver import QuotaWindow
+
+_UPSERT_BUILDERS: dict[str, Callable[..., Any]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+_IDENTITY_COLUMNS = ("feature_code", "quota_key", "period_unit", "period_value", "reset_mode")
+# Expression `RETURNING` vraie pour une ligne que l'UPSERT vient d'insérer.
+_INSERTED_MARKERS: dict[str, str] = {"postgresql": "xmax = 0"}
+
+
+def supports_atomic_consume(db: Session) -> bool:
+    """Indique si le dialecte de la session accepte l'UPSERT conditionnel."""
+    return db.get_bind().dialect.name in _UPSERT_BUILDERS
+
+
+def upsert_consume_counter(
+    db: Session,
+    model: Any,
+    *,
+    subject_column: str,
+    subject_id: int,
+    subject_cache_key: tuple[str, int],
+    feature_code: str,
+    quota: QuotaDefinition,
+    window: QuotaWindow,
+    amount: int,
+    carried_over: int = 0,
+) -> tuple[Any | None, bool]:
+    """Consomme `amount` et retourne `(compteur à jour, créé par cet appel)`.
+
+    Le compteur vaut None si la limite est atteinte. C'est celui de la session
+    (`populate_existing`): une instance déjà chargée reflète la nouvelle valeur sans
+    relecture. `carried_over` est l'usage déjà compté hors de ce compteur
+    (sous-fenêtres précédentes d'un quota glissant).
+    """
+    limit = quota.quota_limit - carried_over
+    if amount > limit:
+        return None, False
+
+    dialect_name = db.get_bind().dialect.name
+    now = datetime_provider.utcnow()
+    insert = _UPSERT_BUILDERS[dialect_name]
+    used_count = model.used_count
+    stmt = insert(model).values(
+        {
+            subject_column: subject_id,
+            "feature_code": feature_code,
+            "quota_key": quota.quota_key,
+            "period_unit": quota.period_unit,
+            "period_value": quota.period_value,
+            "reset_mode": quota.reset_mode,
+            "window_start": window.window_start,
+            "window_end": window.window_end,
+            "used_count": amount,
+            "created_at": now,
+            "updated_at": now,
+        }
+    )
+    index_elements = [subject_column, *_IDENTITY_COLUMNS, "window_start"]
+    execution_options = {
+        "populate_existing": True,
+        ENTITLEMENT_CACHE_SUBJECT_OPTION: subject_cache_key,
+    }
+    marker = _INSERTED_MARKERS.get(dialect_name)
+    if marker is None:
+        created = db.scalars(
+            stmt.on_conflict_do_nothing(index_elements=index_elements).returning(model),
+            execution_options=execution_options,
+        ).one_or_none()
+        if created is not None:
+            return created, True
+
+    upsert = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={"used_count": used_count + amount, "updated_at": now},
+        where=used_count + amount <= limit,
+    )
+    if marker is None:
+        return db.scalars(
+            upsert.returning(model), execution_options=execution_options
+        ).one_or_none(), False
+    row = db.execute(
+        upsert.returning(model, literal_column(marker).label("inserted")),
+        execution_options=execution_options,
+    ).one_or_none()
+    if row is None:
+        return None, False
+    return row[0], bool(row.inserted)
+
+
+def read_counter_used(
+    db: Session,
+    model: Any,
+    *,
+    subject_column: str,
+    subject_id: int,
+    feature_code: str,
+    quota: QuotaDefinition,
+    window: QuotaWindow,
+) -> int:
+    """Relit la consommation courante pour documenter un refus de quota."""
+    used = db.scalar(
+        select(model.used_count)
+        .where(
+            getattr(model, subject_column) == subject_id,
+            model.feature_code == feature_code,
+            model.quota_key == quota.quota_key,
+            model.period_unit == quota.period_unit,
+            model.period_value == quota.period_value,
+            model.reset_mode == quota.reset_mode,
+            model.window_start == window.window_start,
+        )
+        .limit(1)
+    )
+    return used or 0
@@ -0,0 +1,75 @@
+# Commentaire global: lecture des compteurs de quotas glissants par sous-fenêtres.
+"""Agrège les sous-fenêtres d'un quota glissant.
+
+Un quota glissant est stocké comme une ligne de compteur par sous-fenêtre fixe, dans
+les mêmes tables que les fenêtres calendaires (`reset_mode="rolling"`). L'usage courant
+est la somme d'au plus `QuotaWindowResolver.ROLLING_BUCKET_COUNT` lignes: aucune lecture
+d'événement brut.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.services.entitlement.entitlement_types import QuotaDefinition
+from app.services.quota.window_resolver import QuotaWindow, RollingQuotaWindow
+
+
+def read_rolling_used(
+    db: Session,
+    model: Any,
+    *,
+    subject_column: str,
+    subject_id: int,
+    feature_code: str,
+    quota: QuotaDefinition,
+    start: datetime,
+    end: datetime,
+) -> int:
+    """Somme les sous-fenêtres d'un quota glissant commençant dans [start, end)."""
+    used = db.scalar(
+        select(func.coalesce(func.sum(model.used_count), 0)).where(
+            getattr(model, subject_column) == subject_id,
+            model.feature_code == feature_code,
+            model.quota_key == quota.quota_key,
+            model.period_unit == quota.period_unit,
+            model.period_value == quota.period_value,
+            model.reset_mode == quota.reset_mode,
+            model.window_start >= start,
+            model.window_start < end,
+        )
+    )
+    return int(used or 0)
+
+
+def read_rolling_carried_over(
+    db: Session,
+    model: Any,
+    *,
+    subject_column: str,
+    subject_id: int,
+    feature_code: str,
+    quota: QuotaDefinition,
+    window: QuotaWindow,
+) -> int:
+    """Usage des sous-fenêtres précédant la courante; 0 hors quota glissant.
+
+    Ces sous-fenêtres sont closes: seule la courante est encore incrémentée, ce qui
+    permet de borner la consommation par une condition sur son seul compteur.
+    """
+    if not isinstance(window, RollingQuotaWindow):
+        return 0
+    return read_rolling_used(
+        db,
+        model,
+        subject_column=subject_column,
+        subject_id=subject_id,
+        feature_code=feature_code,
+        quota=quota,
+        start=window.window_start,
+        end=window.bucket_start,
+    )
@@ -1,6 +1,8 @@
+from collections.abc import Sequence
 from datetime import datetime, timezone
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, and_, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -12,7 +14,18 @@ from app.services.entitlement.feature_scope_registry import (
     FeatureScope,
     require_feature_scope,
 )
-from app.services.quota.window_resolver import QuotaWindow, QuotaWindowResolver
+from app.services.entitlement.snapshot_cache import B2C_SUBJECT
+from app.services.quota.atomic_consume import (
+    read_counter_used,
+    supports_atomic_consume,
+    upsert_consume_counter,
+)
+from app.services.quota.rolling_counters import read_rolling_carried_over, read_rolling_used
+from app.services.quota.window_resolver import (
+    QuotaWindow,
+    QuotaWindowResolver,
+    RollingQuotaWindow,
+)
 
 
 class QuotaExhaustedError(Exception):
@@ -26,9 +39,117 @@ class QuotaExhaustedError(Exception):
         )
 
 
+def build_usage_state(
+    feature_code: str,
+    quota: QuotaDefinition,
+    window: QuotaWindow,
+    used: int,
+) -> UsageState:
+    """Construit l'état d'usage d'un quota à partir de sa fenêtre et du compteur lu."""
+    return UsageState(
+        feature_code=feature_code,
+        quota_key=quota.quota_key,
+        quota_limit=quota.quota_limit,
+        used=used,
+        remaining=max(0, quota.quota_limit - used),
+        exhausted=used >= quota.quota_limit,
+        period_unit=quota.period_unit,
+        period_value=quota.period_value,
+        reset_mode=quota.reset_mode,
+        window_start=window.window_start,
+        window_end=window.window_end,
+    )
+
+
+UsageLookupKey = tuple[str, str, str, int, str, datetime]
+
+
+def usage_lookup_key(
+    feature_code: str, quota: QuotaDefinition, window_start: datetime
+) -> UsageLookupKey:
+    """Clé d'appariement d'un quota demandé avec un compteur chargé en lot."""
+    return (
+        feature_code,
+        quota.quota_key,
+        quota.period_unit,
+        quota.period_value,
+        quota.reset_mode,
+        _as_utc(window_start),
+    )
+
+
+def counter_lookup_key(counter: Any) -> UsageLookupKey:
+    """Clé d'appariement d'un compteur B2C ou B2B, insensible au stockage tz-naïf."""
+    return (
+        counter.feature_code,
+        counter.quota_key,
+        _enum_value(counter.period_unit),
+        counter.period_value,
+        _enum_value(counter.reset_mode),
+        _as_utc(counter.window_start),
+    )
+
+
+def counter_window_filter(model: Any, windows: Sequence[QuotaWindow]) -> ColumnElement[bool]:
+    """Filtre SQL des compteurs couvrant un lot de fenêtres, glissantes comprises."""
+    fixed_starts = {w.window_start for w in windows if not isinstance(w, RollingQuotaWindow)}
+    rolling_starts = [w.window_start for w in windows if isinstance(w, RollingQuotaWindow)]
+    window_filter = model.window_start.in_(fixed_starts)
+    if rolling_starts:
+        window_filter = or_(
+            window_filter,
+            and_(model.reset_mode == "rolling", model.window_start >= min(rolling_starts)),
+        )
+    return window_filter
+
+
+def build_usage_states(
+    counters: Sequence[Any],
+    quotas: Sequence[tuple[str, QuotaDefinition]],
+    windows: Sequence[QuotaWindow],
+) -> list[UsageState]:
+    """Apparie des compteurs chargés en lot aux quotas demandés, dans leur ordre."""
+    used_by_key: dict[UsageLookupKey, int] = {}
+    for counter in counters:
+        key = counter_lookup_key(counter)
+        used_by_key[key] = used_by_key.get(key, 0) + counter.used_count
+
+    states: list[UsageState] = []
+    for (feature_code, quota), window in zip(quotas, windows, strict=True):
+        if isinstance(window, RollingQuotaWindow):
+            identity = usage_lookup_key(feature_code, quota, window.window_start)[:-1]
+            used = sum(
+                count
+                for key, count in used_by_key.items()
+                if key[:-1] == identity and window.window_start <= key[-1] < window.window_end
+            )
+        else:
+            used = used_by_key.get(usage_lookup_key(feature_code, quota, window.window_start), 0)
+        states.append(build_usage_state(feature_code, quota, window, used))
+    return states
+
+
+def _enum_value(value: object) -> str:
+    return str(getattr(value, "value", value))
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 class QuotaUsageService:
     _ANNIVERSARY_ANCHORED_FEATURES = frozenset({"horoscope_daily"})
 
+    @staticmethod
+    def _is_anniversary_anchored(feature_code: str, quota: QuotaDefinition) -> bool:
+        return (
+            feature_code in QuotaUsageService._ANNIVERSARY_ANCHORED_FEATURES
+            and quota.quota_key == "tokens"
+            and quota.period_unit in {"day", "week", "month"}
+        )
+
     @staticmethod
     def _resolve_billing_cycle_anchor(
         db: Session,
@@ -38,18 +159,26 @@ class QuotaUsageService:
         quota: QuotaDefinition,
         ref_dt: datetime,
     ) -> tuple[datetime | None, datetime | None]:
-        if (
-            feature_code not in QuotaUsageService._ANNIVERSARY_ANCHORED_FEATURES
-            or quota.quota_key != "tokens"
-            or quota.period_unit not in {"day", "week", "month"}
-        ):
+        if not QuotaUsageService._is_anniversary_anchored(feature_code, quota):
             return None, None
 
-        profile = db.scalar(
+        profile = QuotaUsageService._load_billing_profile(db, user_id=user_id)
+        return QuotaUsageService._anchor_from_profile(profile, ref_dt=ref_dt)
+
+    @staticmethod
+    def _load_billing_profile(db: Session, *, user_id: int) -> StripeBillingProfileModel | None:
+        return db.scalar(
             select(StripeBillingProfileModel)
             .where(StripeBillingProfileModel.user_id == user_id)
             .limit(1)
         )
+
+    @staticmethod
+    def _anchor_from_profile(
+        profile: StripeBillingProfileModel | None,
+        *,
+        ref_dt: datetime,
+    ) -> tuple[datetime | None, datetime | None]:
         if (
             profile is None
             or profile.current_period_start is None
@@ -100,6 +229,19 @@ class QuotaUsageService:
             anchor_end=anchor_end,
         )
 
+        if isinstance(window, RollingQuotaWindow):
+            used = read_rolling_used(
+                db,
+                FeatureUsageCounterModel,
+                subject_column="user_id",
+                subject_id=user_id,
+                feature_code=feature_code,
+                quota=quota,
+                start=window.window_start,
+                end=window.window_end,
+            )
+            return build_usage_state(feature_code, quota, window, used)
+
         counter = db.scalar(
             select(FeatureUsageCounterModel)
             .where(
@@ -114,23 +256,61 @@ class QuotaUsageService:
             .limit(1)
         )
 
-        used = counter.used_count if counter else 0
-        remaining = max(0, quota.quota_limit - used)
-        exhausted = used >= quota.quota_limit
+        return build_usage_state(feature_code, quota, window, counter.used_count if counter else 0)
 
-        return UsageState(
-            feature_code=feature_code,
-            quota_key=quota.quota_key,
-            quota_limit=quota.quota_limit,
-            used=used,
-            remaining=remaining,
-            exhausted=exhausted,
-            period_unit=quota.period_unit,
-            period_value=quota.period_value,
-            reset_mode=quota.reset_mode,
-            window_start=window.window_start,
-            window_end=window.window_end,
-        )
+    @staticmethod
+    def get_usages(
+        db: Session,
+        *,
+        user_id: int,
+        quotas: Sequence[tuple[str, QuotaDefinition]],
+        ref_dt: datetime | None = None,
+    ) -> list[UsageState]:
+        """
+        Lit l'usage de plusieurs quotas d'un utilisateur en une requête de compteurs.
+
+        Le profil Stripe servant d'ancre de cycle n'est chargé qu'une fois, et seulement
+        si un des quotas est ancré sur l'anniversaire de facturation. L'ordre du
+        résultat suit celui de `quotas`.
+        """
+        for feature_code, _ in quotas:
+            require_feature_scope(feature_code, FeatureScope.B2C)
+        if not quotas:
+            return []
+
+        if ref_dt is None:
+            ref_dt = datetime_provider.utcnow()
+
+        anchor_start, anchor_end = None, None
+        if any(QuotaUsageService._is_anniversary_anchored(f, q) for f, q in quotas):
+            profile = QuotaUsageService._load_billing_profile(db, user_id=user_id)
+            anchor_start, anchor_end = QuotaUsageService._anchor_from_profile(
+                profile, ref_dt=ref_dt
+            )
+
+        windows: list[QuotaWindow] = []
+        for feature_code, quota in quotas:
+            anchored = QuotaUsageService._is_anniversary_anchored(feature_code, quota)
+            windows.append(
+                QuotaWindowResolver.compute_window(
+                    quota.period_unit,
+                    quota.period_value,
+                    quota.reset_mode,
+                    ref_dt,
+                    anchor_start=anchor_start if anchored else None,
+                    anchor_end=anchor_end if anchored else None,
+                )
+            )
+
+        counters = db.scalars(
+            select(FeatureUsageCounterModel).where(
+                FeatureUsageCounterModel.user_id == user_id,
+                FeatureUsageCounterModel.feature_code.in_({f for f, _ in quotas}),
+                FeatureUsageCounterModel.quota_key.in_({q.quota_key for _, q in quotas}),
+                counter_window_filter(FeatureUsageCounterModel, windows),
+            )
+        ).all()
+        return build_usage_states(counters, quotas, windows)
 
     @staticmethod
     def consume(
@@ -166,14 +346,39 @@ class QuotaUsageService:
             anchor_end=anchor_end,
         )
 
+        carried_over = read_rolling_carried_over(
+            db,
+            FeatureUsageCounterModel,
+            subject_column="user_id",
+            subject_id=user_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=window,
+        )
+
+        if supports_atomic_consume(db):
+            return QuotaUsageService._consume_atomic(
+                db,
+                user_id=user_id,
+                feature_code=feature_code,
+                quota=quota,
+                window=window,
+                amount=amount,
+                carried_over=carried_over,
+            )
+
         counter = QuotaUsageService._find_or_create_counter(
-            db, user_id=user_id, feature_code=feature_code, quota=quota, window=window
+            db,
+            user_id=user_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=QuotaWindowResolver.counter_window(window),
         )
 
-        if counter.used_count + amount > quota.quota_limit:
+        if counter.used_count + carried_over + amount > quota.quota_limit:
             raise QuotaExhaustedError(
                 quota_key=quota.quota_key,
-                used=counter.used_count,
+                used=counter.used_count + carried_over,
                 limit=quota.quota_limit,
                 feature_code=feature_code,
             )
@@ -181,23 +386,7 @@ class QuotaUsageService:
         counter.used_count += amount
         db.flush()
 
-        used = counter.used_count
-        remaining = max(0, quota.quota_limit - used)
-        exhausted = used >= quota.quota_limit
-
-        return UsageState(
-            feature_code=feature_code,
-            quota_key=quota.quota_key,
-            quota_limit=quota.quota_limit,
-            used=used,
-            remaining=remaining,
-            exhausted=exhausted,
-            period_unit=quota.period_unit,
-            period_value=quota.period_value,
-            reset_mode=quota.reset_mode,
-            window_start=window.window_start,
-            window_end=window.window_end,
-        )
+        return build_usage_state(feature_code, quota, window, counter.used_count + carried_over)
 
     @staticmethod
     def consume_up_to_limit(
@@ -239,32 +428,72 @@ class QuotaUsageService:
             anchor_end=anchor_end,
         )
 
+        carried_over = read_rolling_carried_over(
+            db,
+            FeatureUsageCounterModel,
+            subject_column="user_id",
+            subject_id=user_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=window,
+        )
         counter = QuotaUsageService._find_or_create_counter(
-            db, user_id=user_id, feature_code=feature_code, quota=quota, window=window
+            db,
+            user_id=user_id,
+            feature_code=feature_code,
+            quota=quota,
+            window=QuotaWindowResolver.counter_window(window),
         )
 
-        remaining_capacity = max(0, quota.quota_limit - counter.used_count)
+        remaining_capacity = max(0, quota.quota_limit - carried_over - counter.used_count)
         applied_amount = min(amount, remaining_capacity)
         counter.used_count += applied_amount
         db.flush()
 
-        used = counter.used_count
-        remaining = max(0, quota.quota_limit - used)
-        exhausted = used >= quota.quota_limit
+        return build_usage_state(feature_code, quota, window, counter.used_count + carried_over)
 
-        return UsageState(
+    @staticmethod
+    def _consume_atomic(
+        db: Session,
+        *,
+        user_id: int,
+        feature_code: str,
+        quota: QuotaDefinition,
+        window: QuotaWindow,
+        amount: int,
+        carried_over: int,
+    ) -> UsageState:
+        """Consomme en une instruction UPSERT conditionnelle, sans verrou de ligne."""
+        counter_window = QuotaWindowResolver.counter_window(window)
+        counter, _ = upsert_consume_counter(
+            db,
+            FeatureUsageCounterModel,
+            subject_column="user_id",
+            subject_id=user_id,
+            subject_cache_key=(B2C_SUBJECT, user_id),
             feature_code=feature_code,
-            quota_key=quota.quota_key,
-            quota_limit=quota.quota_limit,
-            used=used,
-            remaining=remaining,
-            exhausted=exhausted,
-            period_unit=quota.period_unit,
-            period_value=quota.period_value,
-            reset_mode=quota.reset_mode,
-            window_start=window.window_start,
-            window_end=window.window_end,
+            quota=quota,
+            window=counter_window,
+            amount=amount,
+            carried_over=carried_over,
         )
+        if counter is None:
+            raise QuotaExhaustedError(
+                quota_key=quota.quota_key,
+                used=carried_over
+                + read_counter_used(
+                    db,
+                    FeatureUsageCounterModel,
+                    subject_column="user_id",
+                    subject_id=user_id,
+                    feature_code=feature_code,
+                    quota=quota,
+                    window=counter_window,
+                ),
+                limit=quota.quota_limit,
+                feature_code=feature_code,
+            )
+        return build_usage_state(feature_code, quota, window, counter.used_count + carried_over)
 
     @staticmethod
     def _find_or_create_counter(
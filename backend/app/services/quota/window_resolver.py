@@ -8,9 +8,58 @@ class QuotaWindow:
     window_end: datetime | None  # None uniquement si reset_mode="lifetime"
 
 
+@dataclass(frozen=True)
+class RollingQuotaWindow(QuotaWindow):
+    """Fenêtre glissante découpée en sous-fenêtres fixes alignées sur l'époque.
+
+    `window_start` est le début de la plus ancienne sous-fenêtre comptée et `window_end`
+    la fin de la sous-fenêtre courante: l'ensemble compté reste identique tant que
+    l'instant de référence ne change pas de sous-fenêtre. Les compteurs sont stockés
+    par sous-fenêtre (`bucket_start`/`bucket_end`).
+    """
+
+    bucket_start: datetime
+    bucket_end: datetime
+
+
 class QuotaWindowResolver:
     UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
     WEEK_ANCHOR = datetime(1969, 12, 29, tzinfo=timezone.utc)  # Lundi précédant l'époque
+    # Sous-fenêtres par fenêtre glissante: 24h glissantes sont comptées heure par heure.
+    ROLLING_BUCKET_COUNT = 24
+    ROLLING_PERIOD_DURATIONS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+    @staticmethod
+    def supports_rolling(period_unit: str) -> bool:
+        """Une fenêtre glissante exige une unité de durée fixe."""
+        return period_unit in QuotaWindowResolver.ROLLING_PERIOD_DURATIONS
+
+    @staticmethod
+    def counter_window(window: QuotaWindow) -> QuotaWindow:
+        """Fenêtre du compteur à incrémenter: la sous-fenêtre courante si glissante."""
+        if isinstance(window, RollingQuotaWindow):
+            return QuotaWindow(window_start=window.bucket_start, window_end=window.bucket_end)
+        return window
+
+    @staticmethod
+    def compute_rolling_window(
+        period_unit: str, period_value: int, ref_dt: datetime
+    ) -> RollingQuotaWindow:
+        """Calcule la fenêtre glissante contenant `ref_dt` et sa sous-fenêtre courante."""
+        if not QuotaWindowResolver.supports_rolling(period_unit):
+            raise ValueError(f"rolling windows not supported for period_unit: {period_unit}")
+
+        duration = QuotaWindowResolver.ROLLING_PERIOD_DURATIONS[period_unit] * period_value
+        bucket_size = duration / QuotaWindowResolver.ROLLING_BUCKET_COUNT
+        elapsed = ref_dt.astimezone(timezone.utc) - QuotaWindowResolver.UNIX_EPOCH
+        bucket_start = QuotaWindowResolver.UNIX_EPOCH + bucket_size * (elapsed // bucket_size)
+        bucket_end = bucket_start + bucket_size
+        return RollingQuotaWindow(
+            window_start=bucket_end - duration,
+            window_end=bucket_end,
+            bucket_start=bucket_start,
+            bucket_end=bucket_end,
+        )
 
     @staticmethod
     def compute_window(
@@ -28,7 +77,7 @@ class QuotaWindowResolver:
         ref_dt_utc = ref_dt.astimezone(timezone.utc)
 
         if reset_mode == "rolling":
-            raise ValueError("rolling windows not supported in this version")
+            return QuotaWindowResolver.compute_rolling_window(period_unit, period_value, ref_dt)
 
         if reset_mode == "lifetime" or period_unit == "lifetime":
             return QuotaWindow(window_start=QuotaWindowResolver.UNIX_EPOCH, window_end=None)
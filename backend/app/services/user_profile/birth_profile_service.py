@@ -19,6 +19,7 @@ from app.infra.db.models.geo_place_resolved import GeoPlaceResolvedModel
 from app.infra.db.repositories.geo_place_resolved_repository import GeoPlaceResolvedRepository
 from app.infra.db.repositories.user_birth_profile_repository import UserBirthProfileRepository
 from app.infra.db.repositories.user_repository import UserRepository
+from app.services.geocoding_service import GeocodingService
 
 
 class UserBirthProfileServiceError(Exception):
@@ -287,6 +288,17 @@ class UserBirthProfileService:
                     details={"place_resolved_id": str(payload.place_resolved_id)},
                 )
 
+        current_timezone = payload.current_timezone
+        if (
+            current_timezone is None
+            and payload.current_lat is not None
+            and payload.current_lon is not None
+        ):
+            # Dérivée localement (TimezoneFinder puis index des lieux), sans appel réseau.
+            current_timezone = GeocodingService.derive_timezone(
+                lat=payload.current_lat, lon=payload.current_lon
+            )
+
         model = UserBirthProfileRepository(db).upsert(
             user_id=user_id,
             birth_date=payload.birth_date,
@@ -308,7 +320,7 @@ class UserBirthProfileService:
             current_lat=payload.current_lat,
             current_lon=payload.current_lon,
             current_location_display=payload.current_location_display,
-            current_timezone=payload.current_timezone,
+            current_timezone=current_timezone,
         )
         resolved_place = None
         if model.birth_place_resolved_id is not None:
@@ -0,0 +1,70 @@
+"""Helper de test: remplace le client Nominatim partagé par un transport httpx simulé."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import httpx
+
+from app.infra.geocoding.nominatim_client import NominatimClient, NominatimClientConfig
+
+
+class NominatimStub:
+    """Transport simulé qui enregistre les requêtes reçues par Nominatim."""
+
+    def __init__(
+        self,
+        payload: object = None,
+        *,
+        status_code: int = 200,
+        error: Exception | None = None,
+        body: bytes | None = None,
+    ) -> None:
+        self.body = json.dumps(payload).encode("utf-8") if body is None else body
+        self.status_code = status_code
+        self.error = error
+        self.requests: list[httpx.Request] = []
+
+    @property
+    def urls(self) -> list[str]:
+        return [str(request.url) for request in self.requests]
+
+    @property
+    def call_count(self) -> int:
+        return len(self.requests)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(self.status_code, content=self.body)
+
+
+def build_stub_client(stub: NominatimStub, **config: float) -> NominatimClient:
+    """Client sans cadence ni file d'attente, branché sur le transport simulé."""
+    return NominatimClient(
+        NominatimClientConfig(
+            timeout_seconds=1.0,
+            user_agent="horoscope-app/test (contact: test@horoscope.app)",
+            min_interval_seconds=config.get("min_interval_seconds", 0.0),
+            max_queue_wait_seconds=config.get("max_queue_wait_seconds", 0.0),
+        ),
+        transport=httpx.MockTransport(stub),
+    )
+
+
+@contextmanager
+def stub_nominatim(
+    payload: object = None,
+    *,
+    status_code: int = 200,
+    error: Exception | None = None,
+    body: bytes | None = None,
+) -> Iterator[NominatimStub]:
+    """Route les appels de `GeocodingService` vers un `NominatimStub`."""
+    stub = NominatimStub(payload, status_code=status_code, error=error, body=body)
+    with patch("app.services.geocoding_service.nominatim_client", build_stub_client(stub)):
+        yield stub
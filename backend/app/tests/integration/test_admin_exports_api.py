@@ -0,0 +1,118 @@
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.infra.db.base import Base
+from app.infra.db.models.audit_event import AuditEventModel
+from app.infra.db.models.user import UserModel
+from app.main import app
+from app.tests.helpers.db_session import (
+    open_app_test_db_session,
+    reset_app_test_db_session_factory,
+    use_app_test_db_session_factory,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_database(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    database_url = f"sqlite:///{(tmp_path / 'test-admin-exports.db').as_posix()}"
+    test_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        future=True,
+    )
+    test_session_local = sessionmaker(
+        bind=test_engine,
+        autoflush=False,
+        autocommit=False,
+        future=True,
+    )
+    use_app_test_db_session_factory(test_session_local)
+    Base.metadata.create_all(bind=test_engine)
+    try:
+        yield
+    finally:
+        reset_app_test_db_session_factory()
+        test_engine.dispose()
+
+
+@pytest.fixture
+def admin_token():
+    with open_app_test_db_session() as db:
+        from app.core.security import hash_password
+
+        db.add(
+            UserModel(
+                email="admin-exports@example.com",
+                password_hash=hash_password("admin123"),
+                role="admin",
+            )
+        )
+        for index in range(5):
+            db.add(
+                UserModel(
+                    email=f"user-{index}@example.com",
+                    password_hash="hash",
+                    role="user",
+                )
+            )
+        db.commit()
+
+    response = client.post(
+        "/v1/auth/login", json={"email": "admin-exports@example.com", "password": "admin123"}
+    )
+    return response.json()["data"]["tokens"]["access_token"]
+
+
+def _export_audit_counts() -> list[int]:
+    with open_app_test_db_session() as db:
+        events = db.scalars(
+            select(AuditEventModel).where(AuditEventModel.action == "sensitive_data_exported")
+        ).all()
+        return [event.details["record_count"] for event in events]
+
+
+def test_users_export_streams_csv_and_audits_final_row_count(admin_token):
+    response = client.post(
+        "/v1/admin/exports/users",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "users_export.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 6
+    assert {row["email"] for row in rows} >= {"user-0@example.com", "user-4@example.com"}
+    assert _export_audit_counts() == [6]
+
+
+def test_users_export_supports_gzip_ndjson_and_configurable_row_cap(admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "admin_export_max_rows", 3)
+    monkeypatch.setattr(settings, "admin_export_batch_size", 2)
+
+    response = client.post(
+        "/v1/admin/exports/users",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"format": "ndjson", "compression": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert "users_export.csv.gz" not in response.headers["content-disposition"]
+    assert "users_export.ndjson.gz" in response.headers["content-disposition"]
+    lines = gzip.decompress(response.content).decode("utf-8").splitlines()
+    assert [set(json.loads(line)) for line in lines][0] >= {"id", "email", "created_at"}
+    assert len(lines) == 3
+    assert _export_audit_counts() == [3]
@@ -6,12 +6,15 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, delete, select
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import settings
+from app.core.rate_limit import reset_rate_limits
 from app.core.security import create_token
 from app.infra.db.base import Base
 from app.infra.db.models.audit_event import AuditEventModel
 from app.infra.db.models.user import UserModel
 from app.infra.db.models.user_refresh_token import UserRefreshTokenModel
 from app.main import app
+from app.services.auth.password_hasher import PasswordHashingUnavailableError, password_hasher
 from app.tests.helpers.db_session import (
     app_test_engine,
     open_app_test_db_session,
@@ -255,3 +258,52 @@ def test_refresh_success_records_actor_identity_in_audit_event() -> None:
         assert event is not None
         assert event.actor_user_id == user_id
         assert event.actor_role == "user"
+
+
+def test_login_admission_is_limited_per_ip_before_hashing(monkeypatch: object) -> None:
+    _cleanup_users()
+    client.post(
+        "/v1/auth/register",
+        json={"email": "admission@example.com", "password": "strong-pass-123"},
+    )
+    reset_rate_limits()
+    monkeypatch.setattr(settings, "auth_password_attempts_per_ip_per_minute", 2)
+    verify_calls: list[str] = []
+    original_verify = password_hasher.verify
+
+    def _counting_verify(password: str, stored_password_hash: str) -> bool:
+        verify_calls.append(password)
+        return original_verify(password, stored_password_hash)
+
+    monkeypatch.setattr(password_hasher, "verify", _counting_verify)
+    payload = {"email": "admission@example.com", "password": "wrong-password"}
+    try:
+        statuses = [client.post("/v1/auth/login", json=payload).status_code for _ in range(3)]
+        rejected = client.post("/v1/auth/login", json=payload)
+    finally:
+        reset_rate_limits()
+
+    assert statuses == [401, 401, 429]
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"].isdigit()
+    assert len(verify_calls) == 2
+
+
+def test_login_returns_503_when_password_hashing_is_saturated(monkeypatch: object) -> None:
+    _cleanup_users()
+    client.post(
+        "/v1/auth/register",
+        json={"email": "saturated@example.com", "password": "strong-pass-123"},
+    )
+
+    def _saturated(*args: object, **kwargs: object) -> bool:
+        raise PasswordHashingUnavailableError("queue_full")
+
+    monkeypatch.setattr(password_hasher, "verify", _saturated)
+    response = client.post(
+        "/v1/auth/login",
+        json={"email": "saturated@example.com", "password": "strong-pass-123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["error"]["code"] == "password_hashing_unavailable"
@@ -5,11 +5,11 @@ Couvre le comportement HTTP de la route et la couche cache DB (story 19-3).
 
 from __future__ import annotations
 
-import urllib.error
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import delete
@@ -22,6 +22,7 @@ from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
 from app.main import app
 from app.services.geocoding_service import GeocodingServiceError, _build_query_key
 from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+from app.tests.helpers.nominatim import stub_nominatim
 
 client = TestClient(app)
 
@@ -102,26 +103,13 @@ RESOLVE_SNAPSHOT_PARIS = {
 }
 
 
-def _mock_nominatim_response(data: list) -> object:
-    """Simule une réponse urllib.request.urlopen."""
-    import json
-    from unittest.mock import MagicMock
-
-    mock_resp = MagicMock()
-    mock_resp.read.return_value = json.dumps(data).encode("utf-8")
-    mock_resp.__enter__ = lambda s: s
-    mock_resp.__exit__ = MagicMock(return_value=False)
-    return mock_resp
-
-
 # ---------------------------------------------------------------------------
 # Tests succès (comportement HTTP de base)
 # ---------------------------------------------------------------------------
 
 
 def test_search_returns_results_for_valid_query():
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         response = client.get(
             "/v1/geocoding/search",
             params={"q": "Paris, France"},
@@ -143,8 +131,7 @@ def test_search_returns_results_for_valid_query():
 
 
 def test_search_returns_all_required_fields():
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         response = client.get("/v1/geocoding/search", params={"q": "Paris, France"})
 
     result = response.json()["data"]["results"][0]
@@ -171,8 +158,7 @@ def test_search_returns_all_required_fields():
 
 
 def test_search_returns_empty_results_for_unknown_place():
-    mock_resp = _mock_nominatim_response([])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([]):
         response = client.get("/v1/geocoding/search", params={"q": "XyzUnknownPlace123"})
 
     assert response.status_code == 200
@@ -183,68 +169,37 @@ def test_search_returns_empty_results_for_unknown_place():
 
 def test_search_respects_limit_default_5():
     """Vérifie que le limit par défaut est 5."""
-    captured: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _mock_nominatim_response([])
-
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with stub_nominatim([]) as nominatim:
         client.get("/v1/geocoding/search", params={"q": "Berlin limit5 test"})
 
-    assert len(captured) == 1
-    assert "limit=5" in captured[0]
+    assert len(nominatim.urls) == 1
+    assert "limit=5" in nominatim.urls[0]
 
 
 def test_search_clamps_limit_to_10():
-    captured: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _mock_nominatim_response([])
-
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with stub_nominatim([]) as nominatim:
         client.get("/v1/geocoding/search", params={"q": "Rome limit999 test", "limit": "999"})
 
-    assert "limit=10" in captured[0]
+    assert "limit=10" in nominatim.urls[0]
 
 
 def test_search_clamps_limit_to_1():
-    captured: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _mock_nominatim_response([])
-
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with stub_nominatim([]) as nominatim:
         client.get("/v1/geocoding/search", params={"q": "Rome limit0 test", "limit": "0"})
 
-    assert "limit=1" in captured[0]
+    assert "limit=1" in nominatim.urls[0]
 
 
 def test_search_sends_jsonv2_and_addressdetails():
-    captured: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _mock_nominatim_response([])
-
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with stub_nominatim([]) as nominatim:
         client.get("/v1/geocoding/search", params={"q": "Lyon jsonv2 test"})
 
-    url = captured[0]
+    url = nominatim.urls[0]
     assert "format=jsonv2" in url
     assert "addressdetails=1" in url
 
 
-def test_reverse_returns_expected_payload_for_authenticated_user(monkeypatch):
-    captured_urls: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured_urls.append(req.full_url)
-        return _mock_nominatim_response(NOMINATIM_PARIS)
-
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+def test_reverse_returns_expected_payload_for_authenticated_user():
     register = client.post(
         "/v1/auth/register",
         json={"email": "geocoding-reverse-user@example.com", "password": "strong-pass-123"},
@@ -252,16 +207,17 @@ def test_reverse_returns_expected_payload_for_authenticated_user(monkeypatch):
     assert register.status_code == 200
     access_token = register.json()["data"]["tokens"]["access_token"]
 
-    response = client.post(
-        "/v1/geocoding/reverse",
-        params={"lang": "fr"},
-        headers={"Authorization": f"Bearer {access_token}"},
-        json={"lat": 48.8566, "lon": 2.3522},
-    )
+    with stub_nominatim(NOMINATIM_PARIS) as nominatim:
+        response = client.post(
+            "/v1/geocoding/reverse",
+            params={"lang": "fr"},
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={"lat": 48.8566, "lon": 2.3522},
+        )
 
     assert response.status_code == 200
-    assert len(captured_urls) == 1
-    assert "/search/reverse?" not in captured_urls[0]
+    assert len(nominatim.urls) == 1
+    assert "/search/reverse?" not in nominatim.urls[0]
     data = response.json()["data"]
     assert data["display_name"] == "Paris, Île-de-France, France"
     assert data["city"] == "Paris"
@@ -291,17 +247,11 @@ def test_search_rejects_empty_query():
 
 def test_search_normalizes_query_whitespace():
     """Une requête avec espaces multiples est normalisée avant validation."""
-    captured: list[str] = []
-
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _mock_nominatim_response([])
-
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with stub_nominatim([]) as nominatim:
         response = client.get("/v1/geocoding/search", params={"q": "  Paris   France  "})
 
     assert response.status_code == 200
-    assert "Paris+France" in captured[0] or "Paris%20France" in captured[0]
+    assert "Paris+France" in nominatim.urls[0] or "Paris%20France" in nominatim.urls[0]
 
 
 def test_search_missing_q_returns_422():
@@ -340,9 +290,8 @@ def test_search_returns_503_on_nominatim_unavailable():
 
 
 def test_search_returns_503_on_nominatim_timeout():
-    """Timeout Nominatim → URLError → GeocodingServiceError → 503."""
-    url_error = urllib.error.URLError(reason="timed out")
-    with patch("urllib.request.urlopen", side_effect=url_error):
+    """Timeout Nominatim → httpx.TimeoutException → GeocodingServiceError → 503."""
+    with stub_nominatim(error=httpx.ReadTimeout("timed out")):
         response = client.get("/v1/geocoding/search", params={"q": "Paris timeout test"})
 
     assert response.status_code == 503
@@ -373,17 +322,16 @@ def test_error_response_includes_request_id():
 def test_cache_hit_does_not_call_nominatim():
     """AC1 : un hit cache valide évite l'appel Nominatim."""
     # Premier appel : cache miss → Nominatim appelé, résultat mis en cache
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         r1 = client.get("/v1/geocoding/search", params={"q": "Paris cache hit test"})
     assert r1.status_code == 200
 
     # Deuxième appel : même query → cache hit, Nominatim PAS appelé
-    with patch("urllib.request.urlopen") as mock_urlopen:
+    with stub_nominatim([]) as nominatim:
         r2 = client.get("/v1/geocoding/search", params={"q": "Paris cache hit test"})
 
     assert r2.status_code == 200
-    mock_urlopen.assert_not_called()
+    assert nominatim.call_count == 0
     assert r2.json()["data"]["results"][0]["display_name"] == "Paris, Île-de-France, France"
 
 
@@ -403,27 +351,22 @@ def test_cache_miss_after_ttl_expiration_calls_nominatim():
         db.commit()
 
     # Appel avec la même requête: entrée expirée => Nominatim doit être appelé
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp) as mock_urlopen:
+    with stub_nominatim([NOMINATIM_PARIS]) as nominatim:
         response = client.get("/v1/geocoding/search", params={"q": query})
 
     assert response.status_code == 200
-    mock_urlopen.assert_called_once()
+    assert nominatim.call_count == 1
     assert response.json()["data"]["results"][0]["display_name"] == "Paris, Île-de-France, France"
 
 
 def test_nocache_bypasses_cache_and_calls_nominatim():
     """AC6 : nocache=true bypass le cache, appelle Nominatim directement."""
     # Premier appel : peuple le cache
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         client.get("/v1/geocoding/search", params={"q": "Paris nocache test"})
 
     # Deuxième appel avec nocache=true : Nominatim DOIT être appelé même si cache valide
-    with patch(
-        "urllib.request.urlopen",
-        return_value=_mock_nominatim_response([NOMINATIM_PARIS]),
-    ) as mock_urlopen:
+    with stub_nominatim([NOMINATIM_PARIS]) as nominatim:
         response = client.get(
             "/v1/geocoding/search",
             params={"q": "Paris nocache test", "nocache": "true"},
@@ -431,7 +374,7 @@ def test_nocache_bypasses_cache_and_calls_nominatim():
         )
 
     assert response.status_code == 200
-    mock_urlopen.assert_called_once()
+    assert nominatim.call_count == 1
 
 
 def test_nocache_rejected_without_admin_or_support_ops():
@@ -446,8 +389,7 @@ def test_nocache_rejected_without_admin_or_support_ops():
 
 def test_cache_written_after_miss():
     """AC1/AC4 : après un miss, les résultats sont écrits dans le cache."""
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         client.get("/v1/geocoding/search", params={"q": "Paris cache write test"})
 
     with open_app_test_db_session() as db:
@@ -478,8 +420,7 @@ def test_cache_separation_from_geo_place_resolved():
     assert GeocodingQueryCacheModel.__tablename__ != "geo_place_resolved"
 
     # Une opération de cache ne touche que geocoding_query_cache
-    mock_resp = _mock_nominatim_response([NOMINATIM_PARIS])
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim([NOMINATIM_PARIS]):
         response = client.get("/v1/geocoding/search", params={"q": "Paris separation test"})
 
     assert response.status_code == 200
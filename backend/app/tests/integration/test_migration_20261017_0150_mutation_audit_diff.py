@@ -0,0 +1,98 @@
+"""Valide le backfill du diff des audits de mutation par la migration 0150."""
+
+import json
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.canonical_entitlement.audit.diff_service import (
+    CanonicalEntitlementMutationDiffService,
+)
+from app.tests.helpers.db_session import build_sqlite_test_engine
+
+_QUOTA = {"quota_key": "calls", "period_unit": "day", "period_value": 1, "reset_mode": "calendar"}
+_PAYLOADS = [
+    ({}, {"access_mode": "quota", "quotas": [{**_QUOTA, "quota_limit": 10}]}),
+    (
+        {"is_enabled": True, "access_mode": "quota", "quotas": [{**_QUOTA, "quota_limit": 10}]},
+        {"is_enabled": False, "access_mode": "quota", "quotas": [{**_QUOTA, "quota_limit": 5}]},
+    ),
+    (
+        {"access_mode": "quota", "quotas": [{**_QUOTA, "quota_limit": 10}]},
+        {"access_mode": "quota", "quotas": [{**_QUOTA, "quota_limit": 20}]},
+    ),
+    ({"access_mode": "unlimited"}, {"access_mode": "unlimited"}),
+]
+
+
+def _alembic_config() -> Config:
+    """Construit la configuration Alembic backend pour une base temporaire."""
+    backend_root = Path(__file__).resolve().parents[3]
+    config = Config(str(backend_root / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_root / "migrations"))
+    return config
+
+
+def test_migration_0150_backfills_diff_of_existing_audits(
+    monkeypatch: object, tmp_path: Path
+) -> None:
+    """Les audits antérieurs restent visibles des filtres SQL dès l'upgrade."""
+    db_path = tmp_path / "migration-20261017-0150-mutation-audit-diff.db"
+    database_url = f"sqlite:///{db_path.as_posix()}"
+    monkeypatch.setattr(settings, "database_url", database_url)
+    config = _alembic_config()
+
+    command.upgrade(config, "20260623_0149")
+
+    engine = build_sqlite_test_engine(database_url)
+    with engine.begin() as connection:
+        for audit_id, (before, after) in enumerate(_PAYLOADS, start=1):
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO canonical_entitlement_mutation_audits (
+                        id, occurred_at, operation, plan_id, plan_code_snapshot, feature_code,
+                        actor_type, actor_identifier, source_origin, before_payload, after_payload
+                    ) VALUES (
+                        :id, '2026-10-01 00:00:00', 'upsert_plan_feature_configuration', 1,
+                        'premium', 'astrologer_chat', 'script', 'seed', 'manual',
+                        :before_payload, :after_payload
+                    )
+                    """
+                ),
+                {
+                    "id": audit_id,
+                    "before_payload": json.dumps(before),
+                    "after_payload": json.dumps(after),
+                },
+            )
+
+    command.upgrade(config, "20261017_0150")
+
+    with engine.connect() as connection:
+        columns = {
+            row.id: (row.change_kind, row.risk_level)
+            for row in connection.execute(
+                text(
+                    "SELECT id, change_kind, risk_level FROM canonical_entitlement_mutation_audits"
+                )
+            )
+        }
+        changed_fields: dict[int, list[str]] = {}
+        for row in connection.execute(
+            text(
+                "SELECT audit_id, field_path "
+                "FROM canonical_entitlement_mutation_audit_changed_fields "
+                "ORDER BY audit_id, field_path"
+            )
+        ):
+            changed_fields.setdefault(row.audit_id, []).append(row.field_path)
+
+    for audit_id, (before, after) in enumerate(_PAYLOADS, start=1):
+        diff = CanonicalEntitlementMutationDiffService.compute_diff(before, after)
+        assert columns[audit_id] == (diff.change_kind, diff.risk_level)
+        assert changed_fields.get(audit_id, []) == diff.changed_fields
+    assert columns[2][1] == "high"
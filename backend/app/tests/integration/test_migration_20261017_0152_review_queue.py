@@ -0,0 +1,112 @@
+"""Valide le remplissage de la review queue matérialisée par la migration 0152."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.tests.helpers.db_session import build_sqlite_test_engine
+
+_OCCURRED_AT = datetime(2026, 10, 1, tzinfo=timezone.utc)
+_AUDITS = {
+    # audit_id: (before_payload, after_payload, review_status)
+    1: ({"is_enabled": True}, {"is_enabled": False}, None),
+    2: ({"is_enabled": True}, {"is_enabled": False}, "investigating"),
+    3: ({}, {"access_mode": "unlimited"}, None),
+    4: ({"access_mode": "unlimited"}, {"access_mode": "unlimited"}, None),
+}
+
+
+def _alembic_config() -> Config:
+    """Construit la configuration Alembic backend pour une base temporaire."""
+    backend_root = Path(__file__).resolve().parents[3]
+    config = Config(str(backend_root / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_root / "migrations"))
+    return config
+
+
+def _as_utc(value: str | None) -> datetime | None:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def test_migration_0152_fills_review_queue_for_existing_audits(
+    monkeypatch: object, tmp_path: Path
+) -> None:
+    """Les audits en attente restent dans la queue et les alertes SLA dès l'upgrade."""
+    db_path = tmp_path / "migration-20261017-0152-review-queue.db"
+    database_url = f"sqlite:///{db_path.as_posix()}"
+    monkeypatch.setattr(settings, "database_url", database_url)
+    config = _alembic_config()
+
+    command.upgrade(config, "20260623_0149")
+
+    engine = build_sqlite_test_engine(database_url)
+    with engine.begin() as connection:
+        for audit_id, (before, after, review_status) in _AUDITS.items():
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO canonical_entitlement_mutation_audits (
+                        id, occurred_at, operation, plan_id, plan_code_snapshot, feature_code,
+                        actor_type, actor_identifier, source_origin, before_payload, after_payload
+                    ) VALUES (
+                        :id, :occurred_at, 'upsert_plan_feature_configuration', 1,
+                        'premium', 'astrologer_chat', 'script', 'seed', 'manual',
+                        :before_payload, :after_payload
+                    )
+                    """
+                ),
+                {
+                    "id": audit_id,
+                    "occurred_at": _OCCURRED_AT.replace(tzinfo=None).isoformat(" "),
+                    "before_payload": json.dumps(before),
+                    "after_payload": json.dumps(after),
+                },
+            )
+            if review_status is not None:
+                connection.execute(
+                    text(
+                        """
+                        INSERT INTO canonical_entitlement_mutation_audit_reviews (
+                            audit_id, review_status, reviewed_at, review_version,
+                            created_at, updated_at
+                        ) VALUES (
+                            :audit_id, :review_status, '2026-10-01 01:00:00', 1,
+                            '2026-10-01 01:00:00', '2026-10-01 01:00:00'
+                        )
+                        """
+                    ),
+                    {"audit_id": audit_id, "review_status": review_status},
+                )
+
+    command.upgrade(config, "20261017_0152")
+
+    with engine.connect() as connection:
+        entries = {
+            row.audit_id: row
+            for row in connection.execute(
+                text("SELECT * FROM canonical_entitlement_mutation_review_queue_entries")
+            )
+        }
+
+    assert set(entries) == set(_AUDITS)
+    pending = entries[1]
+    assert (pending.risk_level, pending.effective_review_status) == ("high", "pending_review")
+    assert pending.status_priority == 0
+    assert pending.sla_target_seconds == 14_400
+    assert _as_utc(pending.due_at) == _OCCURRED_AT + timedelta(hours=4)
+    assert _as_utc(pending.due_soon_at) == _OCCURRED_AT + timedelta(seconds=11_520)
+    investigating = entries[2]
+    assert investigating.effective_review_status == "investigating"
+    assert investigating.sla_target_seconds == 86_400
+    medium = entries[3]
+    assert (medium.risk_level, medium.effective_review_status) == ("medium", None)
+    assert medium.sla_target_seconds == 86_400
+    low = entries[4]
+    assert (low.risk_level, low.status_priority, low.due_at) == ("low", 5, None)
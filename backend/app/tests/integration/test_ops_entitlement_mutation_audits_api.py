@@ -7,7 +7,7 @@ from fastapi.testclient import TestClient
 from pydantic import ValidationError
 from sqlalchemy import delete
 
-from app.core.rate_limit import RateLimitError
+from app.core.rate_limit import RateLimitError, reset_rate_limits
 from app.core.security import create_access_token
 from app.infra.db.base import Base
 from app.infra.db.models.canonical_entitlement_mutation_audit import (
@@ -26,6 +26,7 @@ client = TestClient(app)
 
 
 def _cleanup_tables() -> None:
+    reset_rate_limits()
     Base.metadata.drop_all(bind=app_test_engine())
     Base.metadata.create_all(bind=app_test_engine())
     with open_app_test_db_session() as db:
@@ -684,11 +685,13 @@ def test_filter_invalid_change_kind_returns_422() -> None:
     assert response.status_code == 422
 
 
-def test_filter_returns_400_when_diff_scope_is_too_large(monkeypatch: object) -> None:
+def test_diff_filters_run_in_sql_without_scope_cap(monkeypatch: object) -> None:
     _cleanup_tables()
     ops_token = _register_user_with_role_and_token("ops-too-large@example.com", "ops")
+    calls: list[dict[str, object]] = []
 
     def _list_mutation_audits(*args: object, **kwargs: object) -> tuple[list[object], int]:
+        calls.append(kwargs)
         return [], 10_001
 
     monkeypatch.setattr(
@@ -699,13 +702,14 @@ def test_filter_returns_400_when_diff_scope_is_too_large(monkeypatch: object) ->
 
     response = client.get(
         "/v1/ops/entitlements/mutation-audits",
-        params={"risk_level": "high"},
+        params={"risk_level": "high", "changed_field": "binding.is_enabled"},
         headers={"Authorization": f"Bearer {ops_token}"},
     )
-    assert response.status_code == 400
-    payload = response.json()["error"]
-    assert payload["code"] == "diff_filter_result_set_too_large"
-    assert payload["details"] == {"sql_count": 10001, "max_allowed": 10000}
+    assert response.status_code == 200
+    assert response.json()["data"]["total_count"] == 10_001
+    assert len(calls) == 1
+    assert calls[0]["risk_level"] == "high"
+    assert calls[0]["changed_field"] == "binding.is_enabled"
 
 
 # ---------------------------------------------------------------------------
@@ -1475,44 +1479,45 @@ def test_review_queue_summary_unauthenticated_returns_401() -> None:
     assert response.status_code == 401
 
 
-def test_review_queue_returns_400_when_diff_scope_is_too_large(monkeypatch: object) -> None:
+def test_review_queue_reads_materialized_queue_without_scope_cap(monkeypatch: object) -> None:
     _cleanup_tables()
-    ops_token = _register_user_with_role_and_token("ops-too-large@example.com", "ops")
-
-    def _list_mutation_audits(*args: object, **kwargs: object) -> tuple[list[object], int]:
-        return [], 10_001
-
+    ops_token = _register_user_with_role_and_token("ops-large-queue@example.com", "ops")
     monkeypatch.setattr(
         "app.api.v1.routers.ops.entitlement_mutation_audits."
-        "CanonicalEntitlementMutationAuditQueryService.list_mutation_audits",
-        _list_mutation_audits,
+        "CanonicalEntitlementReviewQueueService.count_review_queue_rows",
+        lambda *args, **kwargs: 10_001,
     )
 
     response = client.get(
         "/v1/ops/entitlements/mutation-audits/review-queue",
         headers={"Authorization": f"Bearer {ops_token}"},
     )
-    assert response.status_code == 400
+    assert response.status_code == 200
+    assert response.json()["data"]["total_count"] == 10_001
 
 
-def test_review_queue_summary_returns_400_when_diff_scope_is_too_large(monkeypatch: object) -> None:
+def test_review_queue_summary_counts_pending_reviews_after_review_post() -> None:
     _cleanup_tables()
-    ops_token = _register_user_with_role_and_token("ops-too-large@example.com", "ops")
-
-    def _list_mutation_audits(*args: object, **kwargs: object) -> tuple[list[object], int]:
-        return [], 10_001
+    ops_token = _register_user_with_role_and_token("ops-queue-sync@example.com", "ops")
+    with open_app_test_db_session() as db:
+        audit = _seed_audit(db, before_payload=_HIGH_RISK_BEFORE, after_payload=_HIGH_RISK_AFTER)
+        db.commit()
+        audit_id = audit.id
 
-    monkeypatch.setattr(
-        "app.api.v1.routers.ops.entitlement_mutation_audits."
-        "CanonicalEntitlementMutationAuditQueryService.list_mutation_audits",
-        _list_mutation_audits,
+    review_response = client.post(
+        f"/v1/ops/entitlements/mutation-audits/{audit_id}/review",
+        json={"review_status": "closed"},
+        headers={"Authorization": f"Bearer {ops_token}"},
     )
+    assert review_response.status_code == 201
 
     response = client.get(
         "/v1/ops/entitlements/mutation-audits/review-queue/summary",
         headers={"Authorization": f"Bearer {ops_token}"},
     )
-    assert response.status_code == 400
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["pending_review_count"], data["closed_count"]) == (0, 1)
 
 
 # ---------------------------------------------------------------------------
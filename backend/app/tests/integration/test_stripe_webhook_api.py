@@ -17,6 +17,7 @@ from app.infra.db.models.stripe_webhook_event import StripeWebhookEventModel
 from app.main import app
 from app.services.auth_service import AuthService
 from app.services.billing.service import BillingService
+from app.services.billing.stripe_webhook_inbox import StripeWebhookInboxWorkerPool
 from app.tests.helpers.db_session import open_app_test_db_session
 
 client = TestClient(app)
@@ -519,3 +520,43 @@ async def test_webhook_invalidates_billing_cache_for_next_read():
     assert after.subscription_status == "active"
     assert after.plan is not None
     assert after.plan.code == "basic"
+
+
+@pytest.mark.asyncio
+async def test_webhook_inbox_acks_before_processing_and_worker_applies_event():
+    event_id = _unique_id("evt_inbox")
+    payload = (
+        f'{{"id": "{event_id}", "object": "event", "type": "invoice.paid", "livemode": false, '
+        f'"data": {{"object": {{"id": "in_inbox_123", "customer": "cus_inbox_123"}}}}}}'
+    ).encode()
+    secret = "whsec_test"
+    headers = {"stripe-signature": _sign_payload(payload, secret)}
+
+    with (
+        patch("app.core.config.settings.stripe_webhook_secret", secret),
+        patch("app.core.config.settings.stripe_webhook_inbox_enabled", True),
+        patch(
+            "app.services.billing.stripe_billing_profile_service.StripeBillingProfileService.get_by_stripe_customer_id"
+        ) as mock_get_profile,
+        patch(
+            "app.services.billing.stripe_billing_profile_service.StripeBillingProfileService.update_from_event_payload"
+        ) as mock_update,
+    ):
+        mock_get_profile.return_value.user_id = 42
+        response = client.post("/v1/billing/stripe-webhook", content=payload, headers=headers)
+        duplicate = client.post("/v1/billing/stripe-webhook", content=payload, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "received"}
+        assert duplicate.json() == {"status": "duplicate_ignored"}
+        mock_update.assert_not_called()
+
+        workers = StripeWebhookInboxWorkerPool(session_factory=open_app_test_db_session)
+        assert workers.run_once() >= 1
+
+    mock_update.assert_called_once()
+    assert mock_update.call_args.args[2]["id"] == event_id
+    with open_app_test_db_session() as db:
+        record = db.query(StripeWebhookEventModel).filter_by(stripe_event_id=event_id).one()
+        assert record.status == "processed"
+        assert record.processing_attempts == 1
@@ -1,14 +1,17 @@
-# Commentaire global: tests du proxy Mercure du client Astral.
-"""Couvre le comportement du proxy SSE Mercure du client Astral."""
+# Commentaire global: tests du proxy Mercure et du pool HTTP du client Astral.
+"""Couvre le proxy SSE Mercure et le pool HTTP partagé du client Astral."""
 
 from __future__ import annotations
 
 import logging
 from collections.abc import AsyncIterator
 
+import httpx
 import pytest
 
+import app.infra.observability.metrics as metrics
 from app.infra.astral.client import AstralClient, AstralClientConfig
+from app.infra.astral.http_pool import POOL_IN_USE_METRIC, AstralHttpPool, AstralHttpPoolConfig
 
 
 class _FakeMercureResponse:
@@ -152,3 +155,72 @@ async def test_stream_mercure_events_keeps_api_key_fallback_headers(
 async def _never_disconnected() -> bool:
     """Indique que le client reste connecté pendant le test."""
     return False
+
+
+@pytest.mark.asyncio
+async def test_job_calls_reuse_shared_pool_and_publish_stats() -> None:
+    """Les appels jobs empruntent le client partagé au lieu d'en créer un par appel."""
+    metrics.reset_metrics()
+    seen_paths: list[str] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen_paths.append(request.url.path)
+        return httpx.Response(200, json={"run_id": "run-123", "status": "queued"})
+
+    pool = AstralHttpPool()
+    await pool.open(
+        AstralHttpPoolConfig(timeout_seconds=5),
+        transport=httpx.MockTransport(_handler),
+    )
+    client = AstralClient(_config(), pool=pool)
+    try:
+        shared_client = pool._client
+        submitted = await client.submit_job({"service_code": "x"}, idempotency_key="key-1")
+        status = await client.get_job_status("run-123")
+
+        assert submitted["run_id"] == "run-123"
+        assert status["status"] == "queued"
+        assert seen_paths == ["/v1/jobs", "/v1/jobs/run-123"]
+        assert pool._client is shared_client
+        assert pool.stats().in_use == 0
+        assert metrics.get_gauge(POOL_IN_USE_METRIC) == 0.0
+    finally:
+        await pool.aclose()
+
+    assert not pool.is_open
+
+
+@pytest.mark.asyncio
+async def test_job_calls_fall_back_to_short_lived_client_when_pool_closed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Sans lifespan (scripts, tests), le client garde un repli court-vivant."""
+    created: list[float | None] = []
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"run_id": "run-1", "status": "running"})
+    )
+    real_async_client = httpx.AsyncClient
+
+    def _factory(timeout: float | None = None) -> httpx.AsyncClient:
+        created.append(timeout)
+        return real_async_client(transport=transport, timeout=timeout)
+
+    monkeypatch.setattr("app.infra.astral.client.httpx.AsyncClient", _factory)
+    client = AstralClient(_config(), pool=AstralHttpPool())
+
+    status = await client.get_job_status("run-1")
+
+    assert status["status"] == "running"
+    assert created == [5]
+
+
+def _config() -> AstralClientConfig:
+    """Construit une configuration Astral de test."""
+    return AstralClientConfig(
+        jobs_api_url="http://astral.local",
+        gateway_url="http://gateway.local",
+        mercure_url="http://mercure.local/.well-known/mercure",
+        mercure_auth_token=None,
+        api_key="jobs-secret",
+        timeout_seconds=5,
+    )
@@ -0,0 +1,116 @@
+# Commentaire global: tests du cache court et de la coalescence du polling Astral.
+"""Couvre le single-flight et le TTL du cache de statut des jobs Astral."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.services.astral.job_status_cache import AstralJobStatusCache
+
+
+class _ManualClock:
+    """Horloge monotone pilotée par le test."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _SlowFetcher:
+    """Compte les appels amont et bloque jusqu'à libération explicite."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> dict[str, Any]:
+        self.calls += 1
+        await self.release.wait()
+        return {"run_id": "run-1", "status": "running", "call": self.calls}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_polls_share_one_upstream_call() -> None:
+    """Des pollings simultanés du même job ne déclenchent qu'un appel amont."""
+    cache = AstralJobStatusCache(ttl_seconds=2.0, max_entries=10)
+    fetcher = _SlowFetcher()
+
+    polls = [asyncio.create_task(cache.get_or_fetch("run-1", fetcher)) for _ in range(20)]
+    await asyncio.sleep(0)
+    fetcher.release.set()
+    results = await asyncio.gather(*polls)
+
+    assert fetcher.calls == 1
+    assert all(result["call"] == 1 for result in results)
+    results[0]["status"] = "mutated"
+    assert (await cache.get_or_fetch("run-1", fetcher))["status"] == "running"
+    assert fetcher.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_status_expires_after_ttl() -> None:
+    """Une entrée expirée relance un appel amont."""
+    clock = _ManualClock()
+    cache = AstralJobStatusCache(ttl_seconds=2.0, max_entries=10, clock=clock)
+    fetcher = _SlowFetcher()
+    fetcher.release.set()
+
+    await cache.get_or_fetch("run-1", fetcher)
+    clock.now += 1.0
+    await cache.get_or_fetch("run-1", fetcher)
+    assert fetcher.calls == 1
+
+    clock.now += 1.5
+    refreshed = await cache.get_or_fetch("run-1", fetcher)
+    assert fetcher.calls == 2
+    assert refreshed["call"] == 2
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_shared_but_not_cached() -> None:
+    """Une erreur amont est propagée aux pollings en attente sans être mise en cache."""
+    cache = AstralJobStatusCache(ttl_seconds=2.0, max_entries=10)
+    calls = 0
+
+    async def _failing() -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        cache.get_or_fetch("run-1", _failing),
+        cache.get_or_fetch("run-1", _failing),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("run-1", _failing)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_by_max_entries() -> None:
+    """Les jobs les moins récemment lus sont évincés au-delà de la borne."""
+    cache = AstralJobStatusCache(ttl_seconds=60.0, max_entries=2)
+    fetched: list[str] = []
+
+    def _fetcher(run_id: str):
+        async def _fetch() -> dict[str, Any]:
+            fetched.append(run_id)
+            return {"run_id": run_id, "status": "queued"}
+
+        return _fetch
+
+    for run_id in ("run-1", "run-2", "run-3"):
+        await cache.get_or_fetch(run_id, _fetcher(run_id))
+    await cache.get_or_fetch("run-1", _fetcher("run-1"))
+
+    assert fetched == ["run-1", "run-2", "run-3", "run-1"]
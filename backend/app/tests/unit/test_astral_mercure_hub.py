@@ -0,0 +1,156 @@
+# Commentaire global: tests du hub de fan-out Mercure Astral.
+"""Couvre le partage de la souscription amont Mercure entre abonnés locaux."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.infra.astral.mercure_hub import SLOW_CONSUMER_EVENT, MercureFanoutHub
+
+
+class _ControlledUpstream:
+    """Flux amont dont les morceaux sont poussés par le test."""
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+        self.chunks: asyncio.Queue[bytes | None] = asyncio.Queue()
+
+    def open(self) -> AsyncIterator[bytes]:
+        """Ouvre une nouvelle souscription amont simulée."""
+        self.opened += 1
+        return self._stream()
+
+    async def _stream(self) -> AsyncIterator[bytes]:
+        try:
+            while (chunk := await self.chunks.get()) is not None:
+                yield chunk
+        finally:
+            self.closed += 1
+
+
+async def _never_disconnected() -> bool:
+    """Indique que le client reste connecté pendant le test."""
+    return False
+
+
+async def _collect(stream: AsyncIterator[bytes], into: list[bytes]) -> None:
+    """Consomme un flux d'abonné jusqu'à sa fin."""
+    async for event in stream:
+        into.append(event)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_of_same_topic_share_one_upstream() -> None:
+    """N onglets sur le même job n'ouvrent qu'une souscription amont."""
+    hub = MercureFanoutHub(queue_size=8, idle_check_seconds=5.0)
+    upstream = _ControlledUpstream()
+    received: list[list[bytes]] = [[], [], []]
+
+    consumers = [
+        asyncio.create_task(
+            _collect(
+                hub.subscribe(
+                    "topic-a",
+                    open_upstream=upstream.open,
+                    is_disconnected=_never_disconnected,
+                ),
+                into,
+            )
+        )
+        for into in received
+    ]
+    await asyncio.sleep(0)
+    assert hub.subscriber_count("topic-a") == 3
+
+    await upstream.chunks.put(b'data: {"step"')
+    await upstream.chunks.put(b': 1}\n\ndata: {"step": 2}\n\n')
+    await upstream.chunks.put(None)
+    await asyncio.gather(*consumers)
+
+    assert upstream.opened == 1
+    assert upstream.closed == 1
+    for events in received:
+        assert events == [b'data: {"step": 1}\n\n', b'data: {"step": 2}\n\n']
+    assert hub.subscriber_count("topic-a") == 0
+
+
+@pytest.mark.asyncio
+async def test_upstream_is_closed_when_last_subscriber_leaves() -> None:
+    """Le départ du dernier abonné ferme la souscription amont."""
+    hub = MercureFanoutHub(queue_size=8, idle_check_seconds=5.0)
+    upstream = _ControlledUpstream()
+    stream = hub.subscribe(
+        "topic-b", open_upstream=upstream.open, is_disconnected=_never_disconnected
+    )
+
+    await upstream.chunks.put(b"data: first\n\n")
+    assert await anext(stream) == b"data: first\n\n"
+    await stream.aclose()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert upstream.closed == 1
+    assert hub.subscriber_count("topic-b") == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_without_blocking_others() -> None:
+    """Un abonné qui ne lit plus est déconnecté au lieu de ralentir le topic."""
+    hub = MercureFanoutHub(queue_size=2, idle_check_seconds=5.0)
+    upstream = _ControlledUpstream()
+    slow = hub.subscribe(
+        "topic-c", open_upstream=upstream.open, is_disconnected=_never_disconnected
+    )
+    fast_events: list[bytes] = []
+    slow_first = asyncio.create_task(anext(slow))
+    await asyncio.sleep(0)
+    fast = asyncio.create_task(
+        _collect(
+            hub.subscribe(
+                "topic-c",
+                open_upstream=upstream.open,
+                is_disconnected=_never_disconnected,
+            ),
+            fast_events,
+        )
+    )
+    await asyncio.sleep(0)
+
+    for index in range(4):
+        await upstream.chunks.put(f"data: {index}\n\n".encode())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+    await upstream.chunks.put(None)
+    await fast
+
+    assert await slow_first == b"data: 0\n\n"
+    assert [event async for event in slow] == [SLOW_CONSUMER_EVENT]
+    assert fast_events == [f"data: {index}\n\n".encode() for index in range(4)]
+    assert upstream.opened == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_subscriber_leaves_when_client_disconnected() -> None:
+    """Sans trafic, la déconnexion du navigateur est détectée par la sonde d'inactivité."""
+    hub = MercureFanoutHub(queue_size=2, idle_check_seconds=0.01)
+    upstream = _ControlledUpstream()
+
+    async def _disconnected() -> bool:
+        return True
+
+    events = [
+        event
+        async for event in hub.subscribe(
+            "topic-d",
+            open_upstream=upstream.open,
+            is_disconnected=_disconnected,
+        )
+    ]
+    await asyncio.sleep(0)
+
+    assert events == []
+    assert hub.subscriber_count("topic-d") == 0
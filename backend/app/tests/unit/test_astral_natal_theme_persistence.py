@@ -431,3 +431,38 @@ async def test_premium_user_can_reuse_included_basic_theme(
     assert cached_basic["cached"] is True
     assert cached_basic["run_id"] == basic_theme["run_id"]
     assert len(fake_client.submitted_payloads) == 1
+
+
+@pytest.mark.asyncio
+async def test_polling_unchanged_status_does_not_rewrite_persisted_theme(
+    db_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Un polling qui ne change pas le statut ne réécrit pas la ligne persistée."""
+    fake_client = FakeAstralClient()
+    monkeypatch.setattr(
+        AstralIntegrationService,
+        "_resolve_user_plan",
+        staticmethod(lambda *_: "free"),
+    )
+    service = AstralIntegrationService(client=fake_client)  # type: ignore[arg-type]
+    submitted = await service.submit_job(
+        db=db_session,
+        user=_user(),
+        command=AstralJobCommand(
+            product="natal_full",
+            plan="free",
+            client_request_id="unchanged-status-request",
+        ),
+    )
+    run_id = submitted["run_id"]
+    fake_client.status_payloads[run_id] = {"run_id": run_id, "status": "queued", "progress": 10}
+
+    polled = await service.get_job_status(run_id, db=db_session, user=_user())
+
+    row = db_session.scalars(
+        select(UserAstralNatalThemeModel).where(UserAstralNatalThemeModel.run_id == run_id)
+    ).one()
+    assert polled["progress"] == 10
+    assert row.status == "queued"
+    assert "progress" not in row.response_payload
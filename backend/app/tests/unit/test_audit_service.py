@@ -93,3 +93,48 @@ def test_list_events_rejects_invalid_limit() -> None:
                 filters=AuditEventListFilters(limit=0, offset=0),
             )
     assert error.value.code == "audit_validation_error"
+
+
+def test_list_events_cursor_walks_pages_without_offset() -> None:
+    _cleanup_tables()
+    same_instant = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with open_app_test_db_session() as db:
+        for index in range(5):
+            db.add(
+                AuditEventModel(
+                    request_id=f"rid-{index}",
+                    actor_role="ops",
+                    action="privacy_export",
+                    target_type="user",
+                    status="success",
+                    details={},
+                    created_at=same_instant if index < 3 else same_instant + timedelta(hours=1),
+                )
+            )
+        db.commit()
+
+    seen: list[int] = []
+    cursor = None
+    with open_app_test_db_session() as db:
+        while True:
+            page = AuditService.list_events(
+                db,
+                filters=AuditEventListFilters(limit=2, cursor=cursor, count_mode="none"),
+            )
+            seen.extend(event.event_id for event in page.events)
+            assert page.total is None
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        by_offset = AuditService.list_events(db, filters=AuditEventListFilters(limit=10))
+
+    assert seen == [event.event_id for event in by_offset.events]
+    assert by_offset.total == 5
+
+
+def test_list_events_rejects_invalid_cursor() -> None:
+    _cleanup_tables()
+    with open_app_test_db_session() as db:
+        with pytest.raises(AuditServiceError) as error:
+            AuditService.list_events(db, filters=AuditEventListFilters(cursor="not-a-cursor"))
+    assert error.value.details == {"field": "cursor"}
@@ -1,7 +1,11 @@
+import hashlib
+import threading
+import time
 from datetime import UTC, datetime, timedelta
 
 import jwt
-from sqlalchemy import delete
+import pytest
+from sqlalchemy import delete, select
 
 from app.core.security import (
     SecurityError,
@@ -10,10 +14,14 @@ from app.core.security import (
     create_token,
     decode_token,
     hash_password,
+    jwt_key_id,
+    password_needs_rehash,
     verify_password,
 )
 from app.infra.db.base import Base
 from app.infra.db.models.user import UserModel
+from app.infra.observability.metrics import get_metrics_snapshot, reset_metrics
+from app.services.auth.password_hasher import PasswordHasher, PasswordHashingUnavailableError
 from app.services.auth_service import AuthService, AuthServiceError
 from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
 
@@ -122,3 +130,120 @@ def test_login_invalid_credentials() -> None:
             assert error.code == "invalid_credentials"
         else:
             raise AssertionError("Expected AuthServiceError")
+
+
+def _legacy_hash(password: str) -> str:
+    salt = bytes(range(16))
+    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
+    return f"{salt.hex()}${hashed.hex()}"
+
+
+def test_password_hashes_are_versioned_and_legacy_hashes_still_verify(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    password_hash = hash_password("super-secret-password", iterations=2_000)
+    assert password_hash.startswith("pbkdf2_sha256$2000$")
+    assert verify_password("super-secret-password", password_hash)
+
+    legacy_hash = _legacy_hash("super-secret-password")
+    assert verify_password("super-secret-password", legacy_hash)
+    assert password_needs_rehash(legacy_hash)
+
+    monkeypatch.setattr("app.core.security.settings.password_hash_iterations", 2_000)
+    assert not password_needs_rehash(password_hash)
+    monkeypatch.setattr("app.core.security.settings.password_hash_iterations", 3_000)
+    assert password_needs_rehash(password_hash)
+
+
+def test_login_upgrades_legacy_password_hash() -> None:
+    _cleanup_users()
+    with open_app_test_db_session() as db:
+        db.add(
+            UserModel(
+                email="legacy@example.com",
+                password_hash=_legacy_hash("strong-pass-123"),
+                role="user",
+            )
+        )
+        db.commit()
+        AuthService.login(db, email="legacy@example.com", password="strong-pass-123")
+        db.commit()
+        upgraded = db.scalar(select(UserModel.password_hash))
+
+    assert upgraded is not None
+    assert not password_needs_rehash(upgraded)
+    assert verify_password("strong-pass-123", upgraded)
+
+
+def test_password_hasher_runs_in_process_pool_and_rejects_when_queue_is_full() -> None:
+    reset_metrics()
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout_seconds=10)
+    try:
+        assert hasher.verify("pool-password", hasher.hash("pool-password"))
+
+        blocker = threading.Thread(target=hasher._run, args=("verify", time.sleep, 0.5))
+        blocker.start()
+        deadline = time.monotonic() + 5
+        while hasher.pending == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(PasswordHashingUnavailableError):
+            hasher.verify("pool-password", "invalid-hash")
+        blocker.join()
+    finally:
+        hasher.shutdown()
+
+    counters = get_metrics_snapshot()["counters"]
+    assert counters["password_hash_rejected_total{reason=queue_full}"] == 1
+
+
+def test_password_hasher_counts_timed_out_tasks_until_they_finish() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout_seconds=10)
+    try:
+        hasher.hash("warm-up")
+        hasher._timeout_seconds = 0.2
+        with pytest.raises(PasswordHashingUnavailableError):
+            hasher._run("verify", time.sleep, 1.5)
+        # La tâche expirée tourne encore: elle garde sa place dans la borne.
+        assert hasher.pending == 1
+        with pytest.raises(PasswordHashingUnavailableError) as exc_info:
+            hasher.verify("pool-password", "invalid-hash")
+        assert exc_info.value.details == {"reason": "queue_full"}
+        deadline = time.monotonic() + 5
+        while hasher.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_access_tokens_carry_kid_and_are_verified_with_a_single_key(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from app.core import security as security_module
+
+    monkeypatch.setattr(security_module.settings, "jwt_secret_key", "jwt-current-key")
+    monkeypatch.setattr(
+        security_module.settings, "jwt_previous_secret_keys", ["jwt-old-1", "jwt-old-2"]
+    )
+    token = create_access_token("1", "user")
+    assert jwt.get_unverified_header(token)["kid"] == jwt_key_id("jwt-current-key")
+
+    decode_calls: list[str] = []
+    original_decode = jwt.decode
+
+    def _counting_decode(token_value: str, key: str, **kwargs: object) -> dict:
+        decode_calls.append(key)
+        return original_decode(token_value, key, **kwargs)
+
+    monkeypatch.setattr(security_module.jwt, "decode", _counting_decode)
+    monkeypatch.setattr(security_module.settings, "jwt_secret_key", "jwt-rotated-key")
+    monkeypatch.setattr(
+        security_module.settings, "jwt_previous_secret_keys", ["jwt-old-1", "jwt-current-key"]
+    )
+    assert decode_token(token, expected_type="access")["sub"] == "1"
+    assert decode_calls == ["jwt-current-key"]
+
+    monkeypatch.setattr(security_module.settings, "jwt_previous_secret_keys", ["jwt-old-1"])
+    with pytest.raises(SecurityError) as retired:
+        decode_token(token, expected_type="access")
+    assert retired.value.code == "invalid_token"
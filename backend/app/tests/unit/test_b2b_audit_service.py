@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from sqlalchemy.orm import Session
 
+from app.infra.db.base import Base
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_billing import (
     EnterpriseAccountBillingPlanModel,
@@ -11,14 +12,18 @@ from app.infra.db.models.enterprise_billing import (
 )
 from app.infra.db.models.product_entitlements import (
     AccessMode,
+    Audience,
+    FeatureCatalogModel,
     PeriodUnit,
     PlanCatalogModel,
     PlanFeatureBindingModel,
     PlanFeatureQuotaModel,
     ResetMode,
+    SourceOrigin,
 )
-from app.services.b2b.audit_service import B2BAuditEntry, B2BAuditService
+from app.services.b2b.audit_service import B2BAuditService
 from app.services.entitlement.entitlement_types import UsageState
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
 
 
 @pytest.fixture
@@ -211,145 +216,177 @@ def test_audit_zero_quota_falls_back_to_manual_review(
     assert entry.manual_review_required is True
 
 
-def test_list_audit_pagination_and_filtering(db_session: MagicMock) -> None:
-    account_a = EnterpriseAccountModel(id=1, company_name="A", admin_user_id=10, status="active")
-    account_b = EnterpriseAccountModel(id=2, company_name="B", admin_user_id=20, status="active")
+def _reset_tables() -> None:
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
 
-    accounts_result = MagicMock()
-    accounts_result.all.return_value = [account_a, account_b]
 
-    account_plans_result = MagicMock()
-    account_plans_result.all.return_value = [
-        EnterpriseAccountBillingPlanModel(enterprise_account_id=1, plan_id=100),
-        EnterpriseAccountBillingPlanModel(enterprise_account_id=2, plan_id=200),
-    ]
+def _seed_account(db: Session, feature: FeatureCatalogModel, name: str, mode: str) -> int:
+    """Crée un compte actif dont le droit `b2b_api_access` suit le scénario `mode`."""
+    account = EnterpriseAccountModel(company_name=name, admin_user_id=None, status="active")
+    db.add(account)
+    db.flush()
+    if mode == "no_plan":
+        return account.id
 
-    enterprise_plans_result = MagicMock()
-    enterprise_plans_result.all.return_value = []
-
-    canonical_plans_result = MagicMock()
-    canonical_plans_result.all.return_value = []
-
-    db_session.scalars.side_effect = [
-        accounts_result,
-        account_plans_result,
-        enterprise_plans_result,
-        canonical_plans_result,
-    ] * 4
-
-    with patch.object(B2BAuditService, "_audit_account") as mock_audit:
-        canonical_entry = B2BAuditEntry(
-            account_id=1,
-            company_name="A",
-            enterprise_plan_id=None,
-            enterprise_plan_code=None,
-            canonical_plan_id=None,
-            canonical_plan_code=None,
-            feature_code="b2b_api_access",
-            resolution_source="canonical_quota",
-            reason="quota_binding_active",
-            binding_status="quota",
-            quota_limit=10,
-            remaining=5,
-            window_end=None,
-            admin_user_id_present=True,
-            manual_review_required=False,
+    enterprise_plan = EnterpriseBillingPlanModel(
+        code=f"ent-{name}",
+        display_name=name,
+        monthly_fixed_cents=0,
+        included_monthly_units=0 if mode == "zero_units" else 100,
+    )
+    db.add(enterprise_plan)
+    db.flush()
+    db.add(
+        EnterpriseAccountBillingPlanModel(
+            enterprise_account_id=account.id, plan_id=enterprise_plan.id
         )
-        fallback_entry = B2BAuditEntry(
-            account_id=2,
-            company_name="B",
-            enterprise_plan_id=None,
-            enterprise_plan_code=None,
-            canonical_plan_id=None,
-            canonical_plan_code=None,
-            feature_code="b2b_api_access",
-            resolution_source="settings_fallback",
-            reason="no_canonical_plan",
-            binding_status=None,
-            quota_limit=None,
-            remaining=None,
-            window_end=None,
-            admin_user_id_present=True,
-            manual_review_required=False,
+    )
+    if mode == "no_canonical":
+        return account.id
+
+    canonical_plan = PlanCatalogModel(
+        plan_code=f"b2b-{name}",
+        plan_name=name,
+        audience=Audience.B2B,
+        source_type=SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+        source_id=enterprise_plan.id,
+        is_active=mode != "inactive_canonical",
+    )
+    db.add(canonical_plan)
+    db.flush()
+    if mode in {"no_binding", "zero_units", "inactive_canonical"}:
+        return account.id
+
+    binding = PlanFeatureBindingModel(
+        plan_id=canonical_plan.id,
+        feature_id=feature.id,
+        access_mode={
+            "unlimited": AccessMode.UNLIMITED,
+            "disabled": AccessMode.DISABLED,
+        }.get(mode, AccessMode.QUOTA),
+        is_enabled=mode != "not_enabled",
+    )
+    db.add(binding)
+    db.flush()
+    if mode == "quota":
+        db.add(
+            PlanFeatureQuotaModel(
+                plan_feature_binding_id=binding.id,
+                quota_key="calls",
+                quota_limit=100,
+                period_unit=PeriodUnit.MONTH,
+                period_value=1,
+                reset_mode=ResetMode.CALENDAR,
+            )
         )
-        mock_audit.side_effect = [canonical_entry, fallback_entry] * 4
+        db.flush()
+    return account.id
+
 
-        items, total = B2BAuditService.list_b2b_entitlement_audit(db_session)
+def _seed_accounts(modes: list[tuple[str, str]]) -> list[int]:
+    _reset_tables()
+    with open_app_test_db_session() as db:
+        feature = FeatureCatalogModel(
+            feature_code=B2BAuditService.FEATURE_CODE, feature_name="B2B API", is_metered=True
+        )
+        db.add(feature)
+        db.flush()
+        account_ids = [_seed_account(db, feature, name, mode) for name, mode in modes]
+        db.commit()
+    return account_ids
+
+
+def test_list_audit_pagination_and_filtering() -> None:
+    account_a, account_b = _seed_accounts([("A", "quota"), ("B", "no_canonical")])
+
+    with open_app_test_db_session() as db:
+        items, total = B2BAuditService.list_b2b_entitlement_audit(db)
         assert total == 2
         assert len(items) == 2
+        assert items[0].resolution_source == "canonical_quota"
+        assert items[0].remaining == 100
 
         items, total = B2BAuditService.list_b2b_entitlement_audit(
-            db_session,
+            db,
             resolution_source_filter="settings_fallback",
         )
         assert total == 1
-        assert items[0].account_id == 2
+        assert items[0].account_id == account_b
 
         items, total = B2BAuditService.list_b2b_entitlement_audit(
-            db_session,
+            db,
             blocker_only=True,
         )
         assert total == 1
-        assert items[0].account_id == 2
+        assert items[0].account_id == account_b
 
         items, total = B2BAuditService.list_b2b_entitlement_audit(
-            db_session,
+            db,
             page=2,
             page_size=1,
         )
         assert total == 2
         assert len(items) == 1
-        assert items[0].account_id == 2
+        assert items[0].account_id == account_b
 
 
-def test_list_audit_blocker_only_excludes_canonical_disabled(db_session: MagicMock) -> None:
-    account = EnterpriseAccountModel(
-        id=1, company_name="Disabled", admin_user_id=10, status="active"
-    )
+def test_list_audit_blocker_only_excludes_canonical_disabled() -> None:
+    _seed_accounts([("Disabled", "disabled")])
 
-    accounts_result = MagicMock()
-    accounts_result.all.return_value = [account]
+    with open_app_test_db_session() as db:
+        items, total = B2BAuditService.list_b2b_entitlement_audit(
+            db,
+            blocker_only=True,
+        )
 
-    account_plans_result = MagicMock()
-    account_plans_result.all.return_value = []
+    assert total == 0
+    assert items == []
 
-    enterprise_plans_result = MagicMock()
-    enterprise_plans_result.all.return_value = []
 
-    db_session.scalars.side_effect = [
-        accounts_result,
-        account_plans_result,
-        enterprise_plans_result,
+def test_sql_classification_matches_account_evaluation() -> None:
+    modes = [
+        "quota",
+        "unlimited",
+        "disabled",
+        "not_enabled",
+        "quota_without_rows",
+        "no_binding",
+        "zero_units",
+        "no_canonical",
+        "inactive_canonical",
+        "no_plan",
     ]
+    _seed_accounts([(mode, mode) for mode in modes])
+
+    with open_app_test_db_session() as db:
+        classified = dict(db.execute(B2BAuditService._classified_accounts_query()).all())
+        evaluated = B2BAuditService._evaluate_account_ids(db, sorted(classified))
+
+    assert len(evaluated) == len(modes)
+    assert {entry.account_id: entry.resolution_source for entry in evaluated} == classified
+
+
+def test_iter_audit_streams_keyset_chunks_on_worker_sessions() -> None:
+    account_ids = _seed_accounts(
+        [(f"acct-{index}", "quota" if index % 2 else "no_canonical") for index in range(7)]
+    )
 
-    with (
-        patch.object(B2BAuditService, "_prefetch_canonical_plans", return_value={}),
-        patch.object(B2BAuditService, "_prefetch_bindings", return_value={}),
-        patch.object(B2BAuditService, "_prefetch_quotas", return_value={}),
-        patch.object(B2BAuditService, "_audit_account") as mock_audit,
-    ):
-        mock_audit.return_value = B2BAuditEntry(
-            account_id=1,
-            company_name="Disabled",
-            enterprise_plan_id=None,
-            enterprise_plan_code=None,
-            canonical_plan_id=10,
-            canonical_plan_code="disabled-plan",
-            feature_code="b2b_api_access",
-            resolution_source="canonical_disabled",
-            reason="disabled_by_plan",
-            binding_status="disabled",
-            quota_limit=None,
-            remaining=None,
-            window_end=None,
-            admin_user_id_present=True,
-            manual_review_required=False,
+    streamed = list(
+        B2BAuditService.iter_b2b_entitlement_audit(
+            chunk_size=2, workers=3, session_factory=open_app_test_db_session
         )
+    )
+    assert [entry.account_id for entry in streamed] == account_ids
 
-        items, total = B2BAuditService.list_b2b_entitlement_audit(
-            db_session,
+    blockers = list(
+        B2BAuditService.iter_b2b_entitlement_audit(
             blocker_only=True,
+            start_after_account_id=account_ids[2],
+            chunk_size=1,
+            workers=2,
+            session_factory=open_app_test_db_session,
         )
-
-    assert total == 0
-    assert items == []
+    )
+    assert [entry.account_id for entry in blockers] == [account_ids[4], account_ids[6]]
+    assert {entry.resolution_source for entry in blockers} == {"settings_fallback"}
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from sqlalchemy.orm import Session
 
+from app.infra.db.base import Base
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_billing import (
     EnterpriseAccountBillingPlanModel,
@@ -23,6 +24,7 @@ from app.services.b2b.entitlement_repair_service import (
     B2BEntitlementRepairService,
     RepairValidationError,
 )
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
 
 
 @pytest.fixture
@@ -454,3 +456,49 @@ def test_classify_zero_units_not_eligible(db):
             db, canonical_plan_id=200, access_mode="unlimited", quota_limit=None
         )
     assert excinfo.value.code == "canonical_plan_not_zero_units_eligible"
+
+
+def test_run_auto_repair_resumes_from_checkpoint_in_keyset_chunks():
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    with open_app_test_db_session() as session:
+        session.add(
+            FeatureCatalogModel(
+                feature_code=B2BEntitlementRepairService.FEATURE_CODE,
+                feature_name="B2B API",
+                is_metered=True,
+            )
+        )
+        shared_plan = EnterpriseBillingPlanModel(
+            code="SHARED", display_name="Shared", monthly_fixed_cents=0, included_monthly_units=50
+        )
+        session.add(shared_plan)
+        session.flush()
+        account_ids = []
+        for index in range(3):
+            account = EnterpriseAccountModel(company_name=f"Co {index}", status="active")
+            session.add(account)
+            session.flush()
+            session.add(
+                EnterpriseAccountBillingPlanModel(
+                    enterprise_account_id=account.id, plan_id=shared_plan.id
+                )
+            )
+            account_ids.append(account.id)
+        session.commit()
+
+    with open_app_test_db_session() as session:
+        first = B2BEntitlementRepairService.run_auto_repair(session, max_accounts=2, chunk_size=1)
+    assert first.accounts_scanned == 2
+    assert first.next_account_id == account_ids[1]
+    assert (first.plans_created, first.bindings_created, first.quotas_created) == (1, 1, 1)
+    assert first.skipped_already_canonical == 1
+
+    with open_app_test_db_session() as session:
+        resumed = B2BEntitlementRepairService.run_auto_repair(
+            session, start_after_account_id=first.next_account_id, chunk_size=1
+        )
+    assert resumed.accounts_scanned == 1
+    assert resumed.next_account_id is None
+    assert resumed.skipped_already_canonical == 1
+    assert resumed.plans_created == 0
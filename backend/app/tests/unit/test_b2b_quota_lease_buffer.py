@@ -0,0 +1,201 @@
+# Commentaire global: tests du métrage B2B par baux de quota en écriture différée.
+"""Couvre la réservation par blocs, le flush et le mode bail du gate B2B."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.infra.db.base import Base
+from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+from app.infra.db.models.enterprise_billing import EnterpriseAccountBillingPlanModel
+from app.infra.db.models.enterprise_feature_usage_counters import (
+    EnterpriseFeatureUsageCounterModel,
+)
+from app.infra.db.models.product_entitlements import (
+    AccessMode,
+    Audience,
+    FeatureCatalogModel,
+    PeriodUnit,
+    PlanCatalogModel,
+    PlanFeatureBindingModel,
+    PlanFeatureQuotaModel,
+    ResetMode,
+    SourceOrigin,
+)
+from app.services.b2b.api_entitlement_gate import (
+    B2BApiEntitlementGate,
+    B2BApiQuotaExceededError,
+)
+from app.services.b2b.quota_lease_buffer import EnterpriseQuotaLeaseBuffer
+from app.services.b2b.reconciliation_service import B2BReconciliationService
+from app.services.entitlement.entitlement_types import QuotaDefinition
+from app.services.quota.usage_service import QuotaExhaustedError
+
+UTC = timezone.utc
+REF_DT = datetime(2026, 3, 15, 10, 0, tzinfo=UTC)
+FEATURE = "b2b_api_access"
+
+
+def _quota(limit: int) -> QuotaDefinition:
+    return QuotaDefinition(
+        quota_key="calls",
+        quota_limit=limit,
+        period_unit="month",
+        period_value=1,
+        reset_mode="calendar",
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'lease.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        db.add(EnterpriseAccountModel(id=1, company_name="ACME", status="active"))
+        db.commit()
+    return factory
+
+
+def _used_in_db(factory) -> list[int]:
+    with factory() as db:
+        return list(db.scalars(select(EnterpriseFeatureUsageCounterModel.used_count)).all())
+
+
+def test_consumptions_are_served_from_one_reserved_block(session_factory, engine) -> None:
+    buffer = EnterpriseQuotaLeaseBuffer(lease_size=50, session_factory=session_factory)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    states = [
+        buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(1000), ref_dt=REF_DT)
+        for _ in range(30)
+    ]
+
+    assert [state.used for state in states] == list(range(1, 31))
+    assert sum("enterprise_feature_usage_counters" in sql for sql in statements) == 1
+    assert _used_in_db(session_factory) == [50]
+    assert buffer.outstanding_units() == 20
+
+
+def test_flush_releases_unused_units_for_reconciliation(session_factory) -> None:
+    buffer = EnterpriseQuotaLeaseBuffer(lease_size=50, session_factory=session_factory)
+    for _ in range(7):
+        buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(1000), ref_dt=REF_DT)
+
+    assert buffer.flush() == 43
+
+    assert _used_in_db(session_factory) == [7]
+    assert buffer.outstanding_units() == 0
+    with session_factory() as db:
+        usage = B2BReconciliationService._usage_by_period(
+            db, account_id=1, period_start=None, period_end=None
+        )
+    assert usage == {(1, date(2026, 3, 1), date(2026, 3, 31)): {"usage_units": 7, "usage_rows": 1}}
+
+
+def test_failed_flush_keeps_leases_for_the_next_flush(session_factory, monkeypatch) -> None:
+    buffer = EnterpriseQuotaLeaseBuffer(lease_size=50, session_factory=session_factory)
+    for _ in range(7):
+        buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(1000), ref_dt=REF_DT)
+
+    def failing_release(*_args) -> None:
+        # Un appel arrive pendant le flush: il ouvre un nouveau bail pour le compteur.
+        buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(1000), ref_dt=REF_DT)
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(buffer, "_release", failing_release)
+    assert buffer.flush() == 0
+    assert _used_in_db(session_factory) == [100]
+    assert buffer.outstanding_units() == 92
+
+    monkeypatch.undo()
+    state = buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(1000), ref_dt=REF_DT)
+    assert state.used == 9
+    assert buffer.flush() == 91
+    assert _used_in_db(session_factory) == [9]
+
+
+def test_leases_never_exceed_limit_across_processes(session_factory) -> None:
+    """Deux processus se partagent 10 unités avec des baux de 4."""
+    first = EnterpriseQuotaLeaseBuffer(lease_size=4, session_factory=session_factory)
+    second = EnterpriseQuotaLeaseBuffer(lease_size=4, session_factory=session_factory)
+    served = 0
+    refused = 0
+    for _ in range(10):
+        for buffer in (first, second):
+            try:
+                buffer.consume(account_id=1, feature_code=FEATURE, quota=_quota(10), ref_dt=REF_DT)
+                served += 1
+            except QuotaExhaustedError:
+                refused += 1
+        assert _used_in_db(session_factory)[0] <= 10
+
+    first.flush()
+    second.flush()
+    assert served == 10
+    assert refused == 10
+    assert _used_in_db(session_factory) == [10]
+
+
+def _seed_quota_plan(factory, *, limit: int) -> None:
+    with factory() as db:
+        plan = PlanCatalogModel(
+            plan_code="b2b_lease",
+            plan_name="B2B Lease",
+            audience=Audience.B2B,
+            source_type=SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+            source_id=300,
+        )
+        feature = FeatureCatalogModel(feature_code=FEATURE, feature_name="API Access")
+        db.add_all([plan, feature])
+        db.flush()
+        db.add(EnterpriseAccountBillingPlanModel(enterprise_account_id=1, plan_id=300))
+        binding = PlanFeatureBindingModel(
+            plan_id=plan.id, feature_id=feature.id, access_mode=AccessMode.QUOTA, is_enabled=True
+        )
+        db.add(binding)
+        db.flush()
+        db.add(
+            PlanFeatureQuotaModel(
+                plan_feature_binding_id=binding.id,
+                quota_key="calls",
+                quota_limit=limit,
+                period_unit=PeriodUnit.MONTH,
+                period_value=1,
+                reset_mode=ResetMode.CALENDAR,
+            )
+        )
+        db.commit()
+
+
+def test_gate_serves_reserved_units_in_lease_mode(session_factory, monkeypatch) -> None:
+    """Le compteur en base est plein dès la réservation, mais le bail sert encore."""
+    _seed_quota_plan(session_factory, limit=3)
+    buffer = EnterpriseQuotaLeaseBuffer(lease_size=3, session_factory=session_factory)
+    monkeypatch.setattr(settings, "b2b_quota_lease_enabled", True)
+    monkeypatch.setattr(
+        "app.services.b2b.api_entitlement_gate.enterprise_quota_lease_buffer", buffer
+    )
+
+    with session_factory() as db:
+        results = [B2BApiEntitlementGate.check_and_consume(db, account_id=1) for _ in range(3)]
+        with pytest.raises(B2BApiQuotaExceededError):
+            B2BApiEntitlementGate.check_and_consume(db, account_id=1)
+
+    assert [result.usage_states[0].used for result in results] == [1, 2, 3]
+    assert _used_in_db(session_factory) == [3]
@@ -1,6 +1,8 @@
 from datetime import date, datetime, timezone
+from types import SimpleNamespace
 
-from sqlalchemy import delete, select
+import pytest
+from sqlalchemy import delete, event, select, update
 
 from app.infra.db.base import Base
 from app.infra.db.models.audit_event import AuditEventModel
@@ -14,6 +16,9 @@ from app.infra.db.models.enterprise_billing import (
 from app.infra.db.models.enterprise_feature_usage_counters import (
     EnterpriseFeatureUsageCounterModel,
 )
+from app.infra.db.models.enterprise_reconciliation_ledger import (
+    EnterpriseReconciliationLedgerEntryModel,
+)
 from app.infra.db.models.product_entitlements import (
     FeatureUsageCounterModel,
     PeriodUnit,
@@ -23,15 +28,27 @@ from app.infra.db.models.user import UserModel
 from app.services.auth_service import AuthService
 from app.services.b2b.billing_service import B2BBillingService
 from app.services.b2b.enterprise_credentials_service import EnterpriseCredentialsService
+from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+from app.services.b2b.quota_lease_buffer import EnterpriseQuotaLeaseBuffer
 from app.services.b2b.reconciliation_service import (
     B2BReconciliationService,
     ReconciliationActionCode,
     ReconciliationActionPayload,
+    ReconciliationIssueListData,
     ReconciliationSeverity,
     ReconciliationStatus,
 )
+from app.services.entitlement.entitlement_types import QuotaDefinition
 from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
 
+MONTHLY_QUOTA = QuotaDefinition(
+    quota_key="b2b_api_access_monthly",
+    quota_limit=10_000,
+    period_unit="month",
+    period_value=1,
+    reset_mode="calendar",
+)
+
 
 def _cleanup_tables() -> None:
     Base.metadata.drop_all(bind=app_test_engine())
@@ -248,3 +265,185 @@ def test_reconciliation_ignores_non_calendar_monthly_counters() -> None:
 
     assert listed.total == 1
     assert listed.items[0].usage_measured_units == 4
+
+
+def _list_all() -> ReconciliationIssueListData:
+    with open_app_test_db_session() as db:
+        return B2BReconciliationService.list_issues(db, limit=100, offset=0)
+
+
+def test_ledger_tracks_usage_cycles_and_actions_like_a_full_recompute() -> None:
+    _cleanup_tables()
+    account_id, _ = _create_enterprise_context("reco-ledger-incremental@example.com")
+    other_account_id, _ = _create_enterprise_context("reco-ledger-other@example.com")
+    _seed_usage(account_id, date(2026, 1, 10), used_count=3)
+
+    with open_app_test_db_session() as db:
+        for ref_dt in (datetime(2026, 1, 20, tzinfo=timezone.utc),) * 4 + (
+            datetime(2026, 2, 3, tzinfo=timezone.utc),
+        ):
+            EnterpriseQuotaUsageService.consume(
+                db,
+                account_id=other_account_id,
+                feature_code="b2b_api_access",
+                quota=MONTHLY_QUOTA,
+                ref_dt=ref_dt,
+            )
+        db.commit()
+        B2BBillingService.close_cycle(
+            db,
+            account_id=account_id,
+            period_start=date(2026, 1, 1),
+            period_end=date(2026, 1, 31),
+            closed_by_user_id=None,
+        )
+        db.commit()
+    # Usage arrivé après la clôture: écart mineur sur un cycle existant.
+    with open_app_test_db_session() as db:
+        counter = db.scalar(
+            select(EnterpriseFeatureUsageCounterModel).where(
+                EnterpriseFeatureUsageCounterModel.enterprise_account_id == account_id
+            )
+        )
+        counter.used_count += 2
+        db.commit()
+
+    buffer = EnterpriseQuotaLeaseBuffer(lease_size=10, session_factory=open_app_test_db_session)
+    for _ in range(3):
+        buffer.consume(
+            account_id=account_id,
+            feature_code="b2b_api_access",
+            quota=MONTHLY_QUOTA,
+            ref_dt=datetime(2026, 3, 2, tzinfo=timezone.utc),
+        )
+    assert buffer.flush() == 7
+
+    with open_app_test_db_session() as db:
+        B2BReconciliationService.execute_action(
+            db,
+            issue_id=f"{other_account_id}:2026-02-01:2026-02-28",
+            payload=ReconciliationActionPayload(action=ReconciliationActionCode.ANNOTATE),
+        )
+        db.add(
+            AuditEventModel(
+                request_id="rid-ledger",
+                actor_user_id=None,
+                actor_role="ops",
+                action="b2b_reconciliation_action",
+                target_type="enterprise_billing_reconciliation",
+                target_id=f"{other_account_id}:2026-02-01:2026-02-28",
+                status="success",
+                details={"action_code": "annotate", "note": "suivi"},
+            )
+        )
+        db.commit()
+
+    incremental = _list_all()
+    by_id = {issue.issue_id: issue for issue in incremental.items}
+    january = by_id[f"{account_id}:2026-01-01:2026-01-31"]
+    assert (january.usage_measured_units, january.billing_consumed_units) == (5, 3)
+    assert january.severity == ReconciliationSeverity.MINOR
+    assert january.mismatch_type == "usage_vs_billing_mismatch"
+    march = by_id[f"{account_id}:2026-03-01:2026-03-31"]
+    assert (march.usage_measured_units, march.severity) == (3, ReconciliationSeverity.MAJOR)
+    annotated = by_id[f"{other_account_id}:2026-02-01:2026-02-28"]
+    assert annotated.status == ReconciliationStatus.INVESTIGATING
+    assert annotated.last_action is not None and annotated.last_action.note == "suivi"
+    assert by_id[f"{other_account_id}:2026-01-01:2026-01-31"].usage_measured_units == 4
+
+    with open_app_test_db_session() as db:
+        B2BReconciliationService.recompute_ledger(db, batch_size=1)
+    assert _list_all().model_dump() == incremental.model_dump()
+
+
+@pytest.mark.parametrize("atomic", [True, False], ids=["atomic", "locking"])
+def test_consume_records_ledger_delta_on_both_paths(monkeypatch, atomic: bool) -> None:
+    _cleanup_tables()
+    account_id, _ = _create_enterprise_context(f"reco-ledger-consume-{atomic}@example.com")
+    # Horloge figée: la création du compteur ne se déduit pas de ses horodatages.
+    frozen = SimpleNamespace(utcnow=lambda: datetime(2026, 4, 2, tzinfo=timezone.utc))
+    monkeypatch.setattr("app.services.quota.atomic_consume.datetime_provider", frozen)
+    monkeypatch.setattr(
+        "app.services.b2b.enterprise_quota_usage_service.supports_atomic_consume",
+        lambda db: atomic,
+    )
+
+    with open_app_test_db_session() as db:
+        for amount in (1, 2, 4):
+            EnterpriseQuotaUsageService.consume(
+                db,
+                account_id=account_id,
+                feature_code="b2b_api_access",
+                quota=MONTHLY_QUOTA,
+                amount=amount,
+                ref_dt=datetime(2026, 4, 20, tzinfo=timezone.utc),
+            )
+        db.commit()
+
+    with open_app_test_db_session() as db:
+        entry = db.scalars(select(EnterpriseReconciliationLedgerEntryModel)).one()
+        assert (entry.usage_units, entry.usage_rows) == (7, 1)
+        incremental = _list_all()
+        B2BReconciliationService.recompute_ledger(db)
+    assert _list_all().model_dump() == incremental.model_dump()
+    with open_app_test_db_session() as db:
+        entry = db.scalars(select(EnterpriseReconciliationLedgerEntryModel)).one()
+        assert (entry.usage_units, entry.usage_rows) == (7, 1)
+
+
+def test_list_issues_pages_and_filters_in_sql_without_reading_sources() -> None:
+    _cleanup_tables()
+    account_id, _ = _create_enterprise_context("reco-ledger-paging@example.com")
+    for month in range(1, 7):
+        _seed_usage(account_id, date(2026, month, 5), used_count=month)
+    with open_app_test_db_session() as db:
+        B2BBillingService.close_cycle(
+            db,
+            account_id=account_id,
+            period_start=date(2026, 2, 1),
+            period_end=date(2026, 2, 28),
+            closed_by_user_id=None,
+        )
+        db.commit()
+
+    statements: list[str] = []
+
+    def _record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(app_test_engine(), "before_cursor_execute", _record)
+    try:
+        with open_app_test_db_session() as db:
+            page = B2BReconciliationService.list_issues(
+                db, account_id=account_id, limit=2, offset=1
+            )
+            resolved = B2BReconciliationService.list_issues(
+                db, severity=ReconciliationSeverity.NONE, limit=20, offset=0
+            )
+    finally:
+        event.remove(app_test_engine(), "before_cursor_execute", _record)
+
+    assert page.total == 6
+    assert [issue.period_start.month for issue in page.items] == [2, 3]
+    assert [issue.period_start.month for issue in resolved.items] == [2]
+    assert not any("enterprise_feature_usage_counters" in sql for sql in statements)
+    assert not any("audit_events" in sql for sql in statements)
+
+
+def test_recompute_repairs_drift_from_bulk_writes() -> None:
+    _cleanup_tables()
+    account_id, _ = _create_enterprise_context("reco-ledger-drift@example.com")
+    _seed_usage(account_id, date(2026, 7, 5), used_count=4)
+
+    with open_app_test_db_session() as db:
+        # Écriture en masse hors des chemins suivis: le ledger ne la voit pas.
+        db.execute(
+            update(EnterpriseFeatureUsageCounterModel).values(used_count=9),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    assert _list_all().items[0].usage_measured_units == 4
+
+    with open_app_test_db_session() as db:
+        assert B2BReconciliationService.recompute_ledger(db) == 1
+    assert _list_all().items[0].usage_measured_units == 9
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.infra.db.base import Base
+from app.infra.db.models.canonical_entitlement_mutation_audit import (
+    CanonicalEntitlementMutationAuditModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.changed_field import (
+    CanonicalEntitlementMutationAuditChangedFieldModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
+)
+from scripts.backfill_mutation_audit_diffs import (
+    backfill_mutation_audit_diffs,
+    count_pending_audits,
+)
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _insert_legacy_audit(db: Session, before: dict, after: dict) -> None:
+    # Insertion Core: contourne le calcul à l'écriture, comme l'historique existant.
+    db.execute(
+        insert(CanonicalEntitlementMutationAuditModel).values(
+            occurred_at=datetime.now(timezone.utc),
+            operation="upsert_plan_feature_configuration",
+            plan_id=1,
+            plan_code_snapshot="basic",
+            feature_code="horoscope_daily",
+            actor_type="script",
+            actor_identifier="legacy.py",
+            source_origin="manual",
+            before_payload=before,
+            after_payload=after,
+        )
+    )
+    db.commit()
+
+
+def test_backfill_materializes_diff_for_legacy_audits_in_batches(db):
+    _insert_legacy_audit(db, {}, {"access_mode": "quota", "quotas": []})
+    for _ in range(2):
+        _insert_legacy_audit(
+            db,
+            {"is_enabled": True, "access_mode": "unlimited", "quotas": []},
+            {"is_enabled": True, "access_mode": "quota", "quotas": []},
+        )
+    assert count_pending_audits(db) == 3
+
+    assert backfill_mutation_audit_diffs(db, batch_size=2) == 3
+
+    audits = db.scalars(
+        select(CanonicalEntitlementMutationAuditModel).order_by(
+            CanonicalEntitlementMutationAuditModel.id
+        )
+    ).all()
+    assert [(a.change_kind, a.risk_level) for a in audits] == [
+        ("binding_created", "high"),
+        ("binding_updated", "high"),
+        ("binding_updated", "high"),
+    ]
+    assert db.scalars(
+        select(CanonicalEntitlementMutationAuditChangedFieldModel.field_path)
+    ).all() == [
+        "binding.access_mode",
+        "binding.access_mode",
+    ]
+    assert (
+        db.scalars(
+            select(CanonicalEntitlementMutationReviewQueueEntryModel.effective_review_status)
+        ).all()
+        == ["pending_review"] * 3
+    )
+    assert count_pending_audits(db) == 0
+    assert backfill_mutation_audit_diffs(db) == 0
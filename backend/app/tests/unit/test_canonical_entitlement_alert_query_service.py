@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
 
+from app.infra.db.keyset import KeysetCursor
 from app.infra.db.models.canonical_entitlement_mutation_audit import (
     CanonicalEntitlementMutationAuditModel,
 )
@@ -222,6 +223,32 @@ def test_list_alert_events_filter_by_delivery_status(db_session: Session) -> Non
     assert [row.event.id for row in rows] == [failed_event.id]
 
 
+def test_list_alert_events_cursor_resumes_after_last_event(db_session: Session) -> None:
+    audit = _seed_audit(db_session)
+    same_instant = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    events = [
+        _seed_alert_event(
+            db_session, audit_id=audit.id, dedupe_suffix=f"e{index}", created_at=same_instant
+        )
+        for index in range(3)
+    ]
+
+    first_page, total_count = CanonicalEntitlementAlertQueryService.list_alert_events(
+        db_session, page_size=2, count_mode="none"
+    )
+    last = first_page[-1].event
+    second_page, _ = CanonicalEntitlementAlertQueryService.list_alert_events(
+        db_session,
+        page_size=2,
+        cursor=KeysetCursor(sort_value=last.created_at, row_id=last.id),
+    )
+
+    assert total_count is None
+    assert [row.event.id for row in first_page + second_page] == [
+        event.id for event in reversed(events)
+    ]
+
+
 def test_list_alert_events_filter_by_alert_kind(db_session: Session) -> None:
     first_audit = _seed_audit(db_session)
     second_audit = _seed_audit(db_session)
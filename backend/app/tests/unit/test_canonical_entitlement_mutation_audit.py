@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import pytest
-from sqlalchemy import create_engine, delete, select
+from sqlalchemy import create_engine, delete, event, select
 from sqlalchemy.orm import Session
 
 from app.infra.db.base import Base
@@ -27,6 +27,12 @@ from app.services.canonical_entitlement.audit.mutation_service import (
 @pytest.fixture()
 def engine():
     engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_conn, _connection_record):  # type: ignore[misc]
+        # Comme l'engine applicatif: les ON DELETE CASCADE des tables d'audit s'appliquent.
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
     Base.metadata.create_all(engine)
     yield engine
 
@@ -302,3 +308,43 @@ def test_audit_row_is_rolled_back_with_transaction(engine, db, b2c_plan, chat_fe
             len(verification_session.scalars(select(CanonicalEntitlementMutationAuditModel)).all())
             == 0
         )
+
+
+def test_audit_row_materializes_diff_columns(db, b2c_plan, chat_feature):
+    # GIVEN: existing unlimited binding
+    CanonicalEntitlementMutationService.upsert_plan_feature_configuration(
+        db,
+        plan=b2c_plan,
+        feature_code="horoscope_daily",
+        is_enabled=True,
+        access_mode=AccessMode.UNLIMITED,
+        quotas=[],
+        source_origin=SourceOrigin.MANUAL,
+        mutation_context=_TEST_CONTEXT,
+    )
+
+    # WHEN: disable it
+    CanonicalEntitlementMutationService.upsert_plan_feature_configuration(
+        db,
+        plan=b2c_plan,
+        feature_code="horoscope_daily",
+        is_enabled=False,
+        access_mode=AccessMode.DISABLED,
+        quotas=[],
+        source_origin=SourceOrigin.MANUAL,
+        mutation_context=_TEST_CONTEXT,
+    )
+
+    # THEN
+    created, updated = db.scalars(
+        select(CanonicalEntitlementMutationAuditModel).order_by(
+            CanonicalEntitlementMutationAuditModel.id
+        )
+    ).all()
+    assert (created.change_kind, created.risk_level) == ("binding_created", "medium")
+    assert created.changed_field_rows == []
+    assert (updated.change_kind, updated.risk_level) == ("binding_updated", "high")
+    assert [row.field_path for row in updated.changed_field_rows] == [
+        "binding.access_mode",
+        "binding.is_enabled",
+    ]
@@ -1,34 +1,56 @@
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
-import pytest
 from sqlalchemy.orm import Session
 
+from app.infra.db.base import Base
+from app.infra.db.models.canonical_entitlement_mutation_audit import (
+    CanonicalEntitlementMutationAuditModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
+)
+from app.services.canonical_entitlement.audit.audit_review import (
+    CanonicalEntitlementMutationAuditReviewService,
+)
 from app.services.canonical_entitlement.audit.review_queue import (
     CanonicalEntitlementReviewQueueService,
 )
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+
+
+def _reset_schema() -> None:
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+
+
+def _seed_audit(db: Session, *, occurred_at: datetime) -> CanonicalEntitlementMutationAuditModel:
+    # `binding.is_enabled` modifié: risque high, donc `pending_review` sans revue.
+    audit = CanonicalEntitlementMutationAuditModel(
+        occurred_at=occurred_at,
+        operation="upsert_plan_feature_configuration",
+        plan_id=1,
+        plan_code_snapshot="premium",
+        feature_code="astrologer_chat",
+        actor_type="script",
+        actor_identifier="test.py",
+        source_origin="manual",
+        before_payload={"is_enabled": True, "access_mode": "quota", "quotas": []},
+        after_payload={"is_enabled": False, "access_mode": "quota", "quotas": []},
+    )
+    db.add(audit)
+    db.flush()
+    return audit
 
 
-def test_build_review_queue_rows_empty(db_session: Session):
-    # Setup
-    now_utc = datetime.now(timezone.utc)
-
-    # Mock CanonicalEntitlementMutationAuditQueryService
-    with pytest.MonkeyPatch.context() as mp:
-        mock_query = MagicMock()
-        mock_query.list_mutation_audits.return_value = ([], 0)
-        mp.setattr(
-            "app.services.canonical_entitlement.audit.review_queue.CanonicalEntitlementMutationAuditQueryService",
-            mock_query,
-        )
-
-        # Execute
+def test_build_review_queue_rows_empty():
+    _reset_schema()
+    with open_app_test_db_session() as db:
         rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
-            db_session, now_utc=now_utc
+            db, now_utc=datetime.now(timezone.utc)
         )
 
-        # Verify
-        assert rows == []
+    assert rows == []
 
 
 def test_summarize_review_queue_rows_empty():
@@ -97,44 +119,88 @@ def test_compute_review_state_status():
     assert res is None
 
 
-def test_build_review_queue_rows_returns_business_sorted_rows(
-    db_session: Session, monkeypatch: pytest.MonkeyPatch
-):
-    older_audit = MagicMock()
-    older_audit.id = 1
-    older_audit.occurred_at = datetime(2026, 3, 29, 7, 0, tzinfo=timezone.utc)
-    older_audit.before_payload = {}
-    older_audit.after_payload = {"is_enabled": False}
-
-    newer_audit = MagicMock()
-    newer_audit.id = 2
-    newer_audit.occurred_at = datetime(2026, 3, 29, 8, 0, tzinfo=timezone.utc)
-    newer_audit.before_payload = {}
-    newer_audit.after_payload = {"is_enabled": False}
-
-    mock_query = MagicMock()
-    mock_query.list_mutation_audits.return_value = ([newer_audit, older_audit], 2)
-    monkeypatch.setattr(
-        "app.services.canonical_entitlement.audit.review_queue."
-        "CanonicalEntitlementMutationAuditQueryService",
-        mock_query,
-    )
+def test_build_review_queue_rows_returns_business_sorted_rows():
+    _reset_schema()
+    with open_app_test_db_session() as db:
+        newer = _seed_audit(db, occurred_at=datetime(2026, 3, 29, 8, 30, tzinfo=timezone.utc))
+        older = _seed_audit(db, occurred_at=datetime(2026, 3, 29, 7, 0, tzinfo=timezone.utc))
+        reviewed = _seed_audit(db, occurred_at=datetime(2026, 3, 29, 6, 0, tzinfo=timezone.utc))
+        CanonicalEntitlementMutationAuditReviewService.upsert_review(
+            db,
+            audit_id=reviewed.id,
+            review_status="acknowledged",
+            reviewed_by_user_id=None,
+            review_comment=None,
+            incident_key=None,
+        )
+        db.commit()
 
-    mock_diff = MagicMock()
-    mock_diff.risk_level = "high"
-    monkeypatch.setattr(
-        "app.services.canonical_entitlement.audit.review_queue."
-        "CanonicalEntitlementMutationDiffService.compute_diff",
-        lambda before_payload, after_payload: mock_diff,
-    )
+        rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
+            db,
+            now_utc=datetime(2026, 3, 29, 12, 0, tzinfo=timezone.utc),
+        )
 
-    reviews_result = MagicMock()
-    reviews_result.scalars.return_value.all.return_value = []
-    monkeypatch.setattr(db_session, "execute", lambda statement: reviews_result)
+    assert [row.audit.id for row in rows] == [older.id, newer.id, reviewed.id]
+    assert [row.sla_status for row in rows] == ["overdue", "due_soon", None]
+    assert rows[0].overdue_seconds == 3600
+
+
+def test_review_queue_entry_follows_audit_creation_and_reviews():
+    _reset_schema()
+    occurred_at = datetime(2026, 3, 29, 8, 0, tzinfo=timezone.utc)
+    with open_app_test_db_session() as db:
+        audit = _seed_audit(db, occurred_at=occurred_at)
+        db.commit()
+        entry = db.get(CanonicalEntitlementMutationReviewQueueEntryModel, audit.id)
+        assert (entry.effective_review_status, entry.sla_target_seconds) == (
+            "pending_review",
+            14_400,
+        )
 
-    rows = CanonicalEntitlementReviewQueueService.build_review_queue_rows(
-        db_session,
-        now_utc=datetime(2026, 3, 29, 12, 0, tzinfo=timezone.utc),
-    )
+        CanonicalEntitlementMutationAuditReviewService.upsert_review(
+            db,
+            audit_id=audit.id,
+            review_status="investigating",
+            reviewed_by_user_id=None,
+            review_comment=None,
+            incident_key="INC-1",
+        )
+        db.commit()
+        db.refresh(entry)
+
+    assert entry.effective_review_status == "investigating"
+    assert entry.sla_target_seconds == 86_400
+    assert entry.due_at.replace(tzinfo=timezone.utc) == occurred_at + timedelta(days=1)
+
+
+def test_summary_and_alert_candidates_are_sql_queries_on_the_queue():
+    _reset_schema()
+    now = datetime(2026, 3, 29, 12, 0, tzinfo=timezone.utc)
+    with open_app_test_db_session() as db:
+        overdue = _seed_audit(db, occurred_at=now - timedelta(hours=5))
+        due_soon = _seed_audit(db, occurred_at=now - timedelta(hours=3, minutes=30))
+        _seed_audit(db, occurred_at=now - timedelta(minutes=5))
+        closed = _seed_audit(db, occurred_at=now - timedelta(hours=6))
+        CanonicalEntitlementMutationAuditReviewService.upsert_review(
+            db,
+            audit_id=closed.id,
+            review_status="closed",
+            reviewed_by_user_id=None,
+            review_comment=None,
+            incident_key=None,
+        )
+        db.commit()
+
+        summary = CanonicalEntitlementReviewQueueService.get_review_queue_summary(db, now_utc=now)
+        candidates = CanonicalEntitlementReviewQueueService.list_sla_alert_candidates(
+            db, now_utc=now, limit=10
+        )
+        overdue_count = CanonicalEntitlementReviewQueueService.count_review_queue_rows(
+            db, now_utc=now, sla_status="overdue"
+        )
 
-    assert [row.audit.id for row in rows] == [1, 2]
+    assert (summary.total_count, summary.pending_review_count, summary.closed_count) == (4, 3, 1)
+    assert (summary.overdue_count, summary.due_soon_count) == (1, 1)
+    assert summary.oldest_pending_age_seconds == 5 * 3600
+    assert [row.audit.id for row in candidates] == [overdue.id, due_soon.id]
+    assert overdue_count == 1
@@ -1,10 +1,14 @@
-from sqlalchemy import delete
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, event, select
 
 from app.infra.db.base import Base
 from app.infra.db.models.enterprise_account import EnterpriseAccountModel
 from app.infra.db.models.enterprise_api_credential import EnterpriseApiCredentialModel
 from app.infra.db.models.user import UserModel
 from app.services.auth_service import AuthService
+from app.services.b2b.api_key_cache import CachedApiKeyAuth, EnterpriseApiKeyCache
 from app.services.b2b.enterprise_credentials_service import (
     EnterpriseCredentialsService,
     EnterpriseCredentialsServiceError,
@@ -91,3 +95,103 @@ def test_authenticate_api_key_rejects_invalid_key() -> None:
             assert error.code == "invalid_api_key"
         else:
             raise AssertionError("expected EnterpriseCredentialsServiceError")
+
+
+def _count_statements(operation) -> int:
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(app_test_engine(), "before_cursor_execute", _count)
+    try:
+        operation()
+    finally:
+        event.remove(app_test_engine(), "before_cursor_execute", _count)
+    return statements
+
+
+def test_authenticate_api_key_serves_repeated_key_from_cache() -> None:
+    _cleanup_tables()
+    admin_user_id, _ = _register_enterprise_admin_with_account("b2b-auth-cache@example.com")
+    with open_app_test_db_session() as db:
+        created = EnterpriseCredentialsService.create_credential(db, admin_user_id=admin_user_id)
+        db.commit()
+
+    with open_app_test_db_session() as db:
+
+        def authenticate() -> None:
+            EnterpriseCredentialsService.authenticate_api_key(db, api_key=created.api_key)
+
+        assert _count_statements(authenticate) == 1
+        with patch.object(
+            EnterpriseCredentialsService, "_candidate_hashes", side_effect=AssertionError
+        ):
+            assert _count_statements(authenticate) == 0
+
+
+def test_authenticate_api_key_cache_is_invalidated_by_rotation_and_suspension() -> None:
+    _cleanup_tables()
+    admin_user_id, _ = _register_enterprise_admin_with_account("b2b-auth-rotate@example.com")
+    with open_app_test_db_session() as db:
+        created = EnterpriseCredentialsService.create_credential(db, admin_user_id=admin_user_id)
+        db.commit()
+    with open_app_test_db_session() as db:
+        EnterpriseCredentialsService.authenticate_api_key(db, api_key=created.api_key)
+    with open_app_test_db_session() as db:
+        rotated = EnterpriseCredentialsService.rotate_credential(db, admin_user_id=admin_user_id)
+        db.commit()
+
+    with open_app_test_db_session() as db:
+        with pytest.raises(EnterpriseCredentialsServiceError) as revoked:
+            EnterpriseCredentialsService.authenticate_api_key(db, api_key=created.api_key)
+        assert revoked.value.code == "revoked_api_key"
+        EnterpriseCredentialsService.authenticate_api_key(db, api_key=rotated.api_key)
+
+    with open_app_test_db_session() as db:
+        account = db.scalar(
+            select(EnterpriseAccountModel).where(
+                EnterpriseAccountModel.admin_user_id == admin_user_id
+            )
+        )
+        account.status = "inactive"
+        db.commit()
+    with open_app_test_db_session() as db:
+        with pytest.raises(EnterpriseCredentialsServiceError) as inactive:
+            EnterpriseCredentialsService.authenticate_api_key(db, api_key=rotated.api_key)
+        assert inactive.value.code == "enterprise_account_inactive"
+
+
+def test_api_key_cache_drops_reads_started_before_invalidation_and_shared_bumps() -> None:
+    now = [0.0]
+    cache = EnterpriseApiKeyCache(
+        ttl_seconds=30.0, max_entries=2, version_check_seconds=1.0, clock=lambda: now[0]
+    )
+    entry = CachedApiKeyAuth(
+        account_id=1,
+        credential_id=2,
+        key_prefix="b2b_prefix",
+        credential_status="active",
+        account_status="active",
+    )
+
+    token = cache.begin()
+    cache.invalidate()
+    cache.set("stale", entry, token)
+    assert cache.get("stale") is None
+
+    for digest in ("a", "b", "c"):
+        cache.set(digest, entry, cache.begin())
+    assert cache.get("a") is None
+    assert len(cache) == 2
+
+    shared = [5]
+    cache.sync_shared_version(lambda: shared[0])
+    assert cache.get("c") == entry
+    shared[0] = 6
+    cache.sync_shared_version(lambda: shared[0])
+    assert cache.get("c") == entry
+    now[0] = 1.5
+    cache.sync_shared_version(lambda: shared[0])
+    assert cache.get("c") is None
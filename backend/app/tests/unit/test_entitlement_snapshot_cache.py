@@ -0,0 +1,207 @@
+# Commentaire global: tests du cache versionné des snapshots d'entitlements.
+"""Couvre le chemin chaud sans requête et les invalidations par écriture ORM."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import app.infra.observability.metrics as metrics
+from app.infra.db.base import Base
+from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+from app.infra.db.models.enterprise_billing import EnterpriseAccountBillingPlanModel
+from app.infra.db.models.product_entitlements import (
+    AccessMode,
+    Audience,
+    FeatureCatalogModel,
+    PeriodUnit,
+    PlanCatalogModel,
+    PlanFeatureBindingModel,
+    PlanFeatureQuotaModel,
+    ResetMode,
+    SourceOrigin,
+)
+from app.services.b2b.api_entitlement_gate import B2BApiEntitlementGate
+from app.services.entitlement.effective_entitlement_resolver_service import (
+    EffectiveEntitlementResolverService,
+)
+from app.services.entitlement.entitlement_types import QuotaDefinition, UsageState
+from app.services.entitlement.snapshot_cache import (
+    B2B_SUBJECT,
+    CACHE_HITS_METRIC,
+    EntitlementSnapshotCache,
+)
+
+ACCOUNT_ID = 20
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def _count_statements(engine) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    return statements
+
+
+def _seed_b2b_quota_plan(db: Session) -> PlanFeatureBindingModel:
+    """Crée un compte B2B actif rattaché à un plan `b2b_api_access` de 3 appels."""
+    db.add(EnterpriseAccountModel(id=ACCOUNT_ID, company_name="ACME", status="active"))
+    plan = PlanCatalogModel(
+        plan_code="b2b_silver",
+        plan_name="B2B Silver",
+        audience=Audience.B2B,
+        source_type=SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+        source_id=200,
+    )
+    feature = FeatureCatalogModel(feature_code="b2b_api_access", feature_name="API Access")
+    db.add_all([plan, feature])
+    db.flush()
+    db.add(EnterpriseAccountBillingPlanModel(enterprise_account_id=ACCOUNT_ID, plan_id=200))
+    binding = PlanFeatureBindingModel(
+        plan_id=plan.id,
+        feature_id=feature.id,
+        access_mode=AccessMode.QUOTA,
+        is_enabled=True,
+    )
+    db.add(binding)
+    db.flush()
+    db.add(
+        PlanFeatureQuotaModel(
+            plan_feature_binding_id=binding.id,
+            quota_key="api_calls",
+            quota_limit=3,
+            period_unit=PeriodUnit.MONTH,
+            period_value=1,
+            reset_mode=ResetMode.CALENDAR,
+        )
+    )
+    db.commit()
+    return binding
+
+
+def _resolve(db: Session):
+    return EffectiveEntitlementResolverService.resolve_b2b_account_snapshot(
+        db, enterprise_account_id=ACCOUNT_ID
+    ).entitlements["b2b_api_access"]
+
+
+def test_warm_snapshot_is_served_without_queries(db, engine) -> None:
+    """Un second snapshot du même sujet ne touche plus la base."""
+    _seed_b2b_quota_plan(db)
+    cold = _resolve(db)
+    metrics.reset_metrics()
+    statements = _count_statements(engine)
+
+    warm = _resolve(db)
+
+    assert statements == []
+    assert warm == cold
+    assert warm.quota_used == 0
+    snapshot = metrics.get_metrics_snapshot()
+    assert snapshot["counters"][f"{CACHE_HITS_METRIC}{{tier=plan}}"] == 2.0
+    assert snapshot["counters"][f"{CACHE_HITS_METRIC}{{tier=usage}}"] == 1.0
+
+
+def test_quota_consumption_invalidates_only_usage(db, engine) -> None:
+    """Consommer relit les compteurs du sujet sans recharger son plan."""
+    _seed_b2b_quota_plan(db)
+    _resolve(db)
+
+    B2BApiEntitlementGate.check_and_consume(db, account_id=ACCOUNT_ID)
+    db.commit()
+    statements = _count_statements(engine)
+    access = _resolve(db)
+
+    assert access.quota_used == 1
+    assert access.quota_remaining == 2
+    assert len(statements) == 1
+    assert "enterprise_feature_usage_counters" in statements[0]
+
+
+def test_binding_mutation_invalidates_cached_plan(db) -> None:
+    """Désactiver un binding est visible au snapshot suivant."""
+    binding = _seed_b2b_quota_plan(db)
+    assert _resolve(db).granted is True
+
+    binding.is_enabled = False
+    db.commit()
+
+    access = _resolve(db)
+    assert access.granted is False
+    assert access.reason_code == EffectiveEntitlementResolverService.REASON_BINDING_DISABLED
+
+
+def test_account_deactivation_invalidates_subject_before_commit(db) -> None:
+    """Une écriture non encore flushée est vue comme sans cache (autoflush)."""
+    _seed_b2b_quota_plan(db)
+    _resolve(db)
+
+    db.get(EnterpriseAccountModel, ACCOUNT_ID).status = "inactive"
+
+    access = _resolve(db)
+    assert access.reason_code == EffectiveEntitlementResolverService.REASON_SUBJECT_NOT_ELIGIBLE
+    db.rollback()
+    assert _resolve(db).granted is True
+
+
+def test_value_read_during_concurrent_invalidation_is_not_stored() -> None:
+    """Un compteur lu avant une consommation concurrente n'est pas mis en cache."""
+    cache = EntitlementSnapshotCache(
+        plan_ttl_seconds=60.0,
+        subject_ttl_seconds=5.0,
+        usage_ttl_seconds=5.0,
+        max_subjects=10,
+    )
+    now = datetime.now(timezone.utc)
+    state = UsageState(
+        feature_code="b2b_api_access",
+        quota_key="api_calls",
+        quota_limit=3,
+        used=0,
+        remaining=3,
+        exhausted=False,
+        period_unit="month",
+        period_value=1,
+        reset_mode="lifetime",
+        window_start=now,
+        window_end=None,
+    )
+    key = (B2B_SUBJECT, ACCOUNT_ID)
+    quota = _quota_of(state)
+
+    token = cache.begin()
+    cache.invalidate_usage(B2B_SUBJECT, ACCOUNT_ID)
+    cache.set_usage(key, state, token)
+    assert cache.get_usage(key, state.feature_code, quota, now) is None
+
+    cache.set_usage(key, state, cache.begin())
+    assert cache.get_usage(key, state.feature_code, quota, now) == state
+
+
+def _quota_of(state: UsageState) -> QuotaDefinition:
+    return QuotaDefinition(
+        quota_key=state.quota_key,
+        quota_limit=state.quota_limit,
+        period_unit=state.period_unit,
+        period_value=state.period_value,
+        reset_mode=state.reset_mode,
+    )
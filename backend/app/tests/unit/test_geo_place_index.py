@@ -0,0 +1,147 @@
+"""Tests unitaires de l'index spatial local : plus proche voisin, mmap et replis."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from app.infra.db.base import Base
+from app.infra.db.repositories.user_repository import UserRepository
+from app.services.geocoding.place_index import (
+    GeoPlaceIndexService,
+    IndexedPlace,
+    PlaceIndex,
+    build_place_index_buffer,
+    geo_place_index,
+    iter_geonames_cities,
+)
+from app.services.geocoding_service import GeocodingService
+from app.services.user_profile.birth_profile_service import BirthInput, UserBirthProfileService
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+from app.tests.helpers.nominatim import stub_nominatim
+
+PARIS_SNAPSHOT = {
+    "provider": "nominatim",
+    "provider_place_id": 88,
+    "osm_type": "relation",
+    "osm_id": 7444,
+    "type": "city",
+    "class": "boundary",
+    "display_name": "Paris, Île-de-France, France",
+    "lat": 48.8566,
+    "lon": 2.3522,
+    "importance": 0.9,
+    "place_rank": 16,
+    "address": {"country_code": "fr", "country": "France", "city": "Paris"},
+}
+
+
+def _places() -> list[IndexedPlace]:
+    return [
+        IndexedPlace(48.8566, 2.3522, "Paris", "Europe/Paris", PARIS_SNAPSHOT, "fr"),
+        IndexedPlace(45.7640, 4.8357, "Lyon, FR", "Europe/Paris"),
+        IndexedPlace(-36.8485, 174.7633, "Auckland, NZ", "Pacific/Auckland"),
+        IndexedPlace(-17.7134, 178.0650, "Fiji, FJ", "Pacific/Fiji"),
+    ]
+
+
+def test_nearest_searches_neighbour_cells_and_wraps_longitude():
+    index = PlaceIndex(build_place_index_buffer(_places()))
+
+    lyon = index.nearest(45.75, 4.85, max_km=10.0)
+    across_dateline = index.nearest(-17.7, -179.9, max_km=300.0)
+
+    assert len(index) == 4
+    assert lyon is not None and lyon.place.label == "Lyon, FR"
+    assert lyon.distance_km < 2.0
+    assert across_dateline is not None
+    assert across_dateline.place.timezone_iana == "Pacific/Fiji"
+    assert index.nearest(0.0, 0.0, max_km=50.0) is None
+
+
+def test_index_file_is_memory_mapped_and_overlay_holds_new_places(tmp_path):
+    service = GeoPlaceIndexService()
+
+    assert service.load(_places(), path=tmp_path / "places.idx") == 4
+    service.remember(IndexedPlace(43.2965, 5.3698, "Marseille, FR", "Europe/Paris"))
+
+    assert (tmp_path / "places.idx").stat().st_size > 0
+    assert service.nearest(43.3, 5.37, max_km=5.0).place.label == "Marseille, FR"
+    assert service.timezone_at(-36.85, 174.76) == "Pacific/Auckland"
+
+
+def test_geonames_file_provides_timezones(tmp_path):
+    columns = ["0"] * 19
+    columns[1], columns[4], columns[5] = "Tokyo", "35.6895", "139.69171"
+    columns[8], columns[17] = "JP", "Asia/Tokyo"
+    cities = tmp_path / "cities.txt"
+    cities.write_text("\t".join(columns) + "\nbroken line\n", encoding="utf-8")
+
+    assert list(iter_geonames_cities(cities)) == [
+        IndexedPlace(35.6895, 139.69171, "Tokyo, JP", "Asia/Tokyo")
+    ]
+
+
+async def test_reverse_serves_index_hit_without_calling_nominatim():
+    geo_place_index.load(_places())
+
+    with stub_nominatim({}) as nominatim:
+        result = await GeocodingService.reverse(48.857, 2.352, lang="fr")
+
+    assert result.display_name == "Paris, Île-de-France, France"
+    assert result.class_ == "boundary"
+    assert nominatim.call_count == 0
+
+
+async def test_reverse_falls_back_to_nominatim_on_miss_or_other_language():
+    geo_place_index.load(_places())
+
+    nominatim_payload = {**PARIS_SNAPSHOT, "place_id": 88, "display_name": "Paris, France"}
+    with stub_nominatim(nominatim_payload) as nominatim:
+        # Lyon n'a pas de snapshot Nominatim : seule la timezone est servie par l'index.
+        await GeocodingService.reverse(45.764, 4.8357)
+        await GeocodingService.reverse(48.857, 2.352, lang="en")
+
+    assert nominatim.call_count == 2
+
+
+def test_derive_timezone_prefers_polygons_and_falls_back_to_index(monkeypatch):
+    # Elvas (Lisbonne) est à 10 km de Badajoz (Madrid): le plus proche voisin se trompe.
+    geo_place_index.load([IndexedPlace(38.8794, -6.9707, "Badajoz, ES", "Europe/Madrid")])
+
+    class _Finder:
+        def timezone_at(self, *, lng: float, lat: float) -> str | None:
+            return "Europe/Lisbon" if lng < -7.0 else None
+
+    monkeypatch.setattr(GeocodingService, "_timezone_finder", staticmethod(_Finder))
+    assert GeocodingService.derive_timezone(lat=38.8815, lon=-7.1628) == "Europe/Lisbon"
+    # Point hors polygones: l'index sert de repli.
+    assert GeocodingService.derive_timezone(lat=38.88, lon=-6.97) == "Europe/Madrid"
+
+    def _unavailable() -> None:
+        raise ModuleNotFoundError("timezonefinder")
+
+    monkeypatch.setattr(GeocodingService, "_timezone_finder", staticmethod(_unavailable))
+    assert GeocodingService.derive_timezone(lat=38.8815, lon=-7.1628) == "Europe/Madrid"
+
+
+def test_birth_profile_derives_missing_current_timezone():
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    geo_place_index.load(_places())
+
+    with open_app_test_db_session() as db:
+        user = UserRepository(db).create("tz@example.com", "hash", "user")
+        profile = UserBirthProfileService.upsert_for_user(
+            db,
+            user.id,
+            BirthInput(
+                birth_date=date(1990, 1, 1),
+                birth_time="12:00",
+                birth_place="Paris",
+                birth_timezone="Europe/Paris",
+                current_lat=-36.85,
+                current_lon=174.76,
+            ),
+        )
+
+    assert profile.current_timezone == "Pacific/Auckland"
@@ -14,11 +14,18 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.infra.db.models.geocoding_query_cache import GeocodingQueryCacheModel
+from app.infra.observability.metrics import get_gauge
+from app.services.geocoding.query_cache import purge_expired_geocoding_cache
 from app.services.geocoding_service import (
     GeocodingSearchResult,
     GeocodingService,
@@ -151,7 +158,7 @@ def test_build_query_key_no_raw_query_in_hash_input():
 # ---------------------------------------------------------------------------
 
 
-def test_cache_hit_returns_cached_data_without_upstream():
+async def test_cache_hit_returns_cached_data_without_upstream():
     """Un hit cache valide retourne les données sans appeler Nominatim."""
     cache_entry = _make_cache_entry([PARIS_RESULT])
 
@@ -162,28 +169,28 @@ def test_cache_hit_returns_cached_data_without_upstream():
     db.execute.return_value = hit_result
 
     with patch.object(GeocodingService, "search") as mock_search:
-        results = GeocodingService.search_with_cache(db, "Paris France", 5)
+        results = await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     mock_search.assert_not_called()
     assert len(results) == 1
     assert results[0].display_name == "Paris, Île-de-France, France"
 
 
-def test_cache_hit_returns_correct_result_fields():
+async def test_cache_hit_returns_correct_result_fields():
     cache_entry = _make_cache_entry([PARIS_RESULT])
     db = MagicMock()
     hit_result = MagicMock()
     hit_result.scalar_one_or_none.return_value = cache_entry
     db.execute.return_value = hit_result
 
-    results = GeocodingService.search_with_cache(db, "Paris France", 5)
+    results = await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     assert results[0].provider == "nominatim"
     assert results[0].lat == pytest.approx(48.8566)
     assert results[0].lon == pytest.approx(2.3522)
 
 
-def test_cache_corrupt_entry_falls_back_to_upstream():
+async def test_cache_corrupt_entry_falls_back_to_upstream():
     cache_entry = MagicMock()
     cache_entry.response_json = "{not-json"
 
@@ -195,7 +202,7 @@ def test_cache_corrupt_entry_falls_back_to_upstream():
     db.execute.side_effect = [hit_result, no_existing]
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]) as mock_search:
-        results = GeocodingService.search_with_cache(db, "Paris France", 5)
+        results = await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     mock_search.assert_called_once_with(
         "Paris France",
@@ -212,7 +219,7 @@ def test_cache_corrupt_entry_falls_back_to_upstream():
 # ---------------------------------------------------------------------------
 
 
-def test_cache_miss_calls_upstream_and_refreshes_cache():
+async def test_cache_miss_calls_upstream_and_refreshes_cache():
     """Un miss cache (TTL expiré) déclenche Nominatim et rafraîchit le cache."""
     expired_entry = _make_cache_entry([PARIS_RESULT], expired=True)
 
@@ -226,7 +233,7 @@ def test_cache_miss_calls_upstream_and_refreshes_cache():
     db.execute.side_effect = [miss_result, upsert_result]
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]) as mock_search:
-        results = GeocodingService.search_with_cache(db, "Paris France", 5)
+        results = await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     mock_search.assert_called_once_with(
         "Paris France",
@@ -241,7 +248,7 @@ def test_cache_miss_calls_upstream_and_refreshes_cache():
     assert len(results) == 1
 
 
-def test_cache_miss_empty_cache_inserts_new_entry():
+async def test_cache_miss_empty_cache_inserts_new_entry():
     """Un miss sur cache vide insère une nouvelle entrée."""
     db = MagicMock()
     miss_result = MagicMock()
@@ -251,7 +258,7 @@ def test_cache_miss_empty_cache_inserts_new_entry():
     db.execute.side_effect = [miss_result, no_existing]
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-        GeocodingService.search_with_cache(db, "Paris France", 5)
+        await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     db.add.assert_called_once()
     db.commit.assert_called_once()
@@ -262,7 +269,7 @@ def test_cache_miss_empty_cache_inserts_new_entry():
 # ---------------------------------------------------------------------------
 
 
-def test_cache_expiry_does_not_affect_geo_place_resolved():
+async def test_cache_expiry_does_not_affect_geo_place_resolved():
     """Garantit que le cache n'interagit jamais avec geo_place_resolved.
 
     Le service ne référence que GeocodingQueryCacheModel — jamais
@@ -280,7 +287,7 @@ def test_cache_expiry_does_not_affect_geo_place_resolved():
     db.execute.side_effect = [miss_result, no_existing]
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-        GeocodingService.search_with_cache(db, "Paris France", 5)
+        await GeocodingService.search_with_cache(db, "Paris France", 5)
 
     # Vérifie que seul GeocodingQueryCacheModel est utilisé (via db.add)
     added_objects = [c.args[0] for c in db.add.call_args_list]
@@ -296,7 +303,7 @@ def test_cache_expiry_does_not_affect_geo_place_resolved():
 # ---------------------------------------------------------------------------
 
 
-def test_logs_use_query_key_not_raw_query(caplog):
+async def test_logs_use_query_key_not_raw_query(caplog):
     """Les logs de géocodage exposent query_key (hash) et n'exposent pas q brut."""
     db = MagicMock()
     miss_result = MagicMock()
@@ -309,7 +316,7 @@ def test_logs_use_query_key_not_raw_query(caplog):
 
     with caplog.at_level(logging.INFO, logger="app.services.geocoding_service"):
         with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-            GeocodingService.search_with_cache(db, raw_query, 5)
+            await GeocodingService.search_with_cache(db, raw_query, 5)
 
     log_text = " ".join(caplog.messages)
 
@@ -321,7 +328,7 @@ def test_logs_use_query_key_not_raw_query(caplog):
     assert expected_key in log_text, f"query_key absent des logs: {log_text}"
 
 
-def test_logs_contain_cache_hit_marker(caplog):
+async def test_logs_contain_cache_hit_marker(caplog):
     cache_entry = _make_cache_entry([PARIS_RESULT])
     db = MagicMock()
     hit_result = MagicMock()
@@ -329,12 +336,12 @@ def test_logs_contain_cache_hit_marker(caplog):
     db.execute.return_value = hit_result
 
     with caplog.at_level(logging.INFO, logger="app.services.geocoding_service"):
-        GeocodingService.search_with_cache(db, "Paris", 5)
+        await GeocodingService.search_with_cache(db, "Paris", 5)
 
     assert "geocoding_cache_hit" in " ".join(caplog.messages)
 
 
-def test_logs_contain_cache_miss_marker(caplog):
+async def test_logs_contain_cache_miss_marker(caplog):
     db = MagicMock()
     miss_result = MagicMock()
     miss_result.scalar_one_or_none.return_value = None
@@ -344,7 +351,7 @@ def test_logs_contain_cache_miss_marker(caplog):
 
     with caplog.at_level(logging.INFO, logger="app.services.geocoding_service"):
         with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-            GeocodingService.search_with_cache(db, "Paris", 5)
+            await GeocodingService.search_with_cache(db, "Paris", 5)
 
     assert "geocoding_cache_miss" in " ".join(caplog.messages)
 
@@ -354,12 +361,12 @@ def test_logs_contain_cache_miss_marker(caplog):
 # ---------------------------------------------------------------------------
 
 
-def test_nocache_bypasses_cache_read():
+async def test_nocache_bypasses_cache_read():
     """nocache=True ignore le cache en lecture."""
     db = MagicMock()
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]) as mock_search:
-        results = GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
+        results = await GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
 
     # Aucun execute pour lire le cache
     db.execute.assert_not_called()
@@ -372,26 +379,132 @@ def test_nocache_bypasses_cache_read():
     assert len(results) == 1
 
 
-def test_nocache_bypasses_cache_write():
+async def test_nocache_bypasses_cache_write():
     """nocache=True ne persiste pas les résultats dans le cache."""
     db = MagicMock()
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-        GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
+        await GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
 
     db.add.assert_not_called()
     db.commit.assert_not_called()
 
 
-def test_nocache_returns_upstream_results():
+async def test_nocache_returns_upstream_results():
     db = MagicMock()
 
     with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
-        results = GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
+        results = await GeocodingService.search_with_cache(db, "Paris France", 5, nocache=True)
 
     assert results == [PARIS_RESULT]
 
 
+# ---------------------------------------------------------------------------
+# Niveau mémoire, cache négatif, réutilisation par préfixe et purge
+# ---------------------------------------------------------------------------
+
+
+def _miss_db() -> MagicMock:
+    db = MagicMock()
+    miss_result = MagicMock()
+    miss_result.scalar_one_or_none.return_value = None
+    db.execute.return_value = miss_result
+    return db
+
+
+async def test_memory_tier_serves_repeat_search_without_db_or_upstream():
+    db = _miss_db()
+    with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]) as mock_search:
+        first = await GeocodingService.search_with_cache(db, "Paris France", 5)
+        db.execute.reset_mock()
+        second = await GeocodingService.search_with_cache(db, "Paris France", 5)
+
+    mock_search.assert_called_once()
+    db.execute.assert_not_called()
+    assert second == first
+    assert get_gauge("geocoding_cache_hit_ratio{tier=memory}") == pytest.approx(0.5)
+    assert get_gauge("geocoding_cache_hit_ratio{tier=db}") == 0.0
+
+
+async def test_db_hit_populates_memory_tier():
+    cache_entry = _make_cache_entry([PARIS_RESULT])
+    db = MagicMock()
+    hit_result = MagicMock()
+    hit_result.scalar_one_or_none.return_value = cache_entry
+    db.execute.return_value = hit_result
+
+    await GeocodingService.search_with_cache(db, "Paris France", 5)
+    db.execute.reset_mock()
+    results = await GeocodingService.search_with_cache(db, "Paris France", 5)
+
+    db.execute.assert_not_called()
+    assert results[0].display_name == "Paris, Île-de-France, France"
+
+
+async def test_empty_results_use_negative_cache_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "geocoding_negative_cache_ttl_seconds", 60)
+    db = _miss_db()
+
+    with patch.object(GeocodingService, "search", return_value=[]):
+        await GeocodingService.search_with_cache(db, "Xyzzy", 5)
+
+    entry = db.add.call_args.args[0]
+    remaining = entry.expires_at - datetime.now(timezone.utc)
+    assert timedelta(seconds=50) < remaining <= timedelta(seconds=60)
+
+
+async def test_longer_query_reuses_complete_prefix_candidates():
+    db = _miss_db()
+    with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]) as mock_search:
+        await GeocodingService.search_with_cache(db, "Paris", 5)
+        refined = await GeocodingService.search_with_cache(db, "Paris Ile-de", 5)
+        assert mock_search.call_count == 1
+        assert refined == [PARIS_RESULT]
+
+        # Aucun candidat ne correspond: la recherche repart vers Nominatim.
+        await GeocodingService.search_with_cache(db, "Paris Texas", 5)
+    assert mock_search.call_count == 2
+
+
+async def test_db_cache_phases_run_off_the_event_loop_thread():
+    db = _miss_db()
+    loop_thread = threading.get_ident()
+    db_threads: list[int] = []
+    db.execute.side_effect = lambda *_: (
+        db_threads.append(threading.get_ident()) or (db.execute.return_value)
+    )
+    db.commit.side_effect = lambda: db_threads.append(threading.get_ident())
+
+    with patch.object(GeocodingService, "search", return_value=[PARIS_RESULT]):
+        await GeocodingService.search_with_cache(db, "Paris France", 5)
+
+    assert len(db_threads) == 3
+    assert loop_thread not in db_threads
+
+
+def test_purge_deletes_only_expired_rows_in_batches():
+    engine = create_engine("sqlite:///:memory:")
+    GeocodingQueryCacheModel.__table__.create(engine)
+    now = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                GeocodingQueryCacheModel(
+                    query_key=f"{index:064d}",
+                    response_json="[]",
+                    expires_at=now + timedelta(minutes=offset),
+                )
+                for index, offset in enumerate([-30, -10, -1, 5])
+            ]
+        )
+        session.commit()
+
+        purged = purge_expired_geocoding_cache(session, now=now, batch_size=2)
+
+        assert purged == 3
+        assert session.scalars(select(GeocodingQueryCacheModel.query_key)).all() == [f"{3:064d}"]
+
+
 # ---------------------------------------------------------------------------
 # AC7 — Séparation explicite des tables (vérification de schéma)
 # ---------------------------------------------------------------------------
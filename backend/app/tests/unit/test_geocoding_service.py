@@ -2,11 +2,7 @@
 
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.request
-from unittest.mock import MagicMock, patch
-
+import httpx
 import pytest
 
 from app.services.geocoding_service import (
@@ -18,6 +14,7 @@ from app.services.geocoding_service import (
     _map_nominatim_result,
     _normalize_nominatim_base_url,
 )
+from app.tests.helpers.nominatim import stub_nominatim
 
 # ---------------------------------------------------------------------------
 # Données de test
@@ -167,68 +164,40 @@ def test_map_nominatim_result_uses_category_when_class_is_missing():
 # ---------------------------------------------------------------------------
 
 
-def _make_urlopen_response(data: object, status: int = 200) -> MagicMock:
-    """Simule une réponse urllib.request.urlopen (context manager)."""
-    body = json.dumps(data).encode("utf-8")
-    mock_resp = MagicMock()
-    mock_resp.read.return_value = body
-    mock_resp.__enter__ = lambda s: s
-    mock_resp.__exit__ = MagicMock(return_value=False)
-    return mock_resp
-
-
-def test_search_returns_mapped_results():
-    payload = [NOMINATIM_RESULT_FULL]
-    mock_resp = _make_urlopen_response(payload)
-
-    with patch("urllib.request.urlopen", return_value=mock_resp):
-        results = GeocodingService.search("Paris, France", 1)
+async def test_search_returns_mapped_results():
+    with stub_nominatim([NOMINATIM_RESULT_FULL]):
+        results = await GeocodingService.search("Paris, France", 1)
 
     assert len(results) == 1
     assert results[0].display_name == "Paris, Île-de-France, France"
     assert abs(results[0].lat - 48.8566) < 0.0001
 
 
-def test_search_returns_empty_list_for_no_results():
-    mock_resp = _make_urlopen_response([])
-
-    with patch("urllib.request.urlopen", return_value=mock_resp):
-        results = GeocodingService.search("XyzUnknownPlace", 5)
+async def test_search_returns_empty_list_for_no_results():
+    with stub_nominatim([]):
+        results = await GeocodingService.search("XyzUnknownPlace", 5)
 
     assert results == []
 
 
-def test_search_forces_jsonv2_and_addressdetails(monkeypatch):
+async def test_search_forces_jsonv2_and_addressdetails():
     """Vérifie que les paramètres jsonv2 et addressdetails=1 sont bien envoyés."""
-    captured_urls: list[str] = []
-
-    def fake_urlopen(req: urllib.request.Request, timeout: int):
-        captured_urls.append(req.full_url)
-        mock_resp = _make_urlopen_response([])
-        return mock_resp
+    with stub_nominatim([]) as nominatim:
+        await GeocodingService.search("Paris", 3)
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-    GeocodingService.search("Paris", 3)
-
-    assert len(captured_urls) == 1
-    url = captured_urls[0]
+    assert len(nominatim.urls) == 1
+    url = nominatim.urls[0]
     assert "format=jsonv2" in url
     assert "addressdetails=1" in url
     assert "limit=3" in url
 
 
-def test_search_sends_user_agent(monkeypatch):
-    captured_headers: list[dict] = []
-
-    def fake_urlopen(req: urllib.request.Request, timeout: int):
-        captured_headers.append(dict(req.headers))
-        return _make_urlopen_response([])
+async def test_search_sends_user_agent():
+    with stub_nominatim([]) as nominatim:
+        await GeocodingService.search("Berlin", 1)
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-    GeocodingService.search("Berlin", 1)
-
-    assert len(captured_headers) == 1
-    user_agent = captured_headers[0].get("User-agent", "")
+    assert len(nominatim.requests) == 1
+    user_agent = nominatim.requests[0].headers.get("User-Agent", "")
     assert "horoscope-app" in user_agent.lower() or "horoscope" in user_agent.lower()
 
 
@@ -237,75 +206,53 @@ def test_search_sends_user_agent(monkeypatch):
 # ---------------------------------------------------------------------------
 
 
-def test_search_raises_rate_limited_on_429():
-    http_error = urllib.error.HTTPError(
-        url="http://nominatim/search",
-        code=429,
-        msg="Too Many Requests",
-        hdrs=None,
-        fp=None,  # type: ignore[arg-type]
-    )
-    with patch("urllib.request.urlopen", side_effect=http_error):
+async def test_search_raises_rate_limited_on_429():
+    with stub_nominatim([], status_code=429):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_rate_limited"
 
 
-def test_search_raises_provider_unavailable_on_503():
-    http_error = urllib.error.HTTPError(
-        url="http://nominatim/search",
-        code=503,
-        msg="Service Unavailable",
-        hdrs=None,
-        fp=None,  # type: ignore[arg-type]
-    )
-    with patch("urllib.request.urlopen", side_effect=http_error):
+async def test_search_raises_provider_unavailable_on_503():
+    with stub_nominatim([], status_code=503):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_provider_unavailable"
 
 
-def test_search_raises_provider_unavailable_on_network_error():
-    url_error = urllib.error.URLError(reason="Connection refused")
-    with patch("urllib.request.urlopen", side_effect=url_error):
+async def test_search_raises_provider_unavailable_on_network_error():
+    with stub_nominatim(error=httpx.ConnectError("Connection refused")):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_provider_unavailable"
 
 
-def test_search_raises_provider_unavailable_on_timeout():
-    timeout_error = urllib.error.URLError(reason="timed out")
-    with patch("urllib.request.urlopen", side_effect=timeout_error):
+async def test_search_raises_provider_unavailable_on_timeout():
+    with stub_nominatim(error=httpx.ReadTimeout("timed out")):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_provider_unavailable"
 
 
-def test_search_raises_provider_unavailable_on_invalid_json():
-    mock_resp = MagicMock()
-    mock_resp.read.return_value = b"not valid json {{{"
-    mock_resp.__enter__ = lambda s: s
-    mock_resp.__exit__ = MagicMock(return_value=False)
-
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+async def test_search_raises_provider_unavailable_on_invalid_json():
+    with stub_nominatim(body=b"not valid json {{{"):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_provider_unavailable"
 
 
-def test_search_raises_provider_unavailable_on_invalid_result_structure():
+async def test_search_raises_provider_unavailable_on_invalid_result_structure():
     # Résultat dont lat/lon est non-numérique
     bad_payload = [{"place_id": 1, "lat": "NaN", "lon": "0", "display_name": "x"}]
-    mock_resp = _make_urlopen_response(bad_payload)
 
-    with patch("urllib.request.urlopen", return_value=mock_resp):
+    with stub_nominatim(bad_payload):
         with pytest.raises(GeocodingServiceError) as exc_info:
-            GeocodingService.search("Paris", 1)
+            await GeocodingService.search("Paris", 1)
 
     assert exc_info.value.code == "geocoding_provider_unavailable"
 
@@ -315,18 +262,12 @@ def test_search_raises_provider_unavailable_on_invalid_result_structure():
 # ---------------------------------------------------------------------------
 
 
-def test_search_respects_limit_parameter(monkeypatch):
+async def test_search_respects_limit_parameter():
     """Vérifie que le paramètre limit est transmis tel quel à Nominatim."""
-    captured: list[str] = []
+    with stub_nominatim([]) as nominatim:
+        await GeocodingService.search("Lyon", 7)
 
-    def fake_urlopen(req, timeout):
-        captured.append(req.full_url)
-        return _make_urlopen_response([])
-
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-    GeocodingService.search("Lyon", 7)
-
-    assert "limit=7" in captured[0]
+    assert "limit=7" in nominatim.urls[0]
 
 
 def test_normalize_nominatim_base_url_accepts_search_endpoint() -> None:
@@ -336,16 +277,10 @@ def test_normalize_nominatim_base_url_accepts_search_endpoint() -> None:
     )
 
 
-def test_reverse_uses_normalized_base_url(monkeypatch):
-    captured_urls: list[str] = []
-
-    def fake_urlopen(req: urllib.request.Request, timeout: int):
-        captured_urls.append(req.full_url)
-        return _make_urlopen_response(NOMINATIM_RESULT_FULL)
-
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-    GeocodingService.reverse(48.8566, 2.3522, "fr")
+async def test_reverse_uses_normalized_base_url():
+    with stub_nominatim(NOMINATIM_RESULT_FULL) as nominatim:
+        await GeocodingService.reverse(48.8566, 2.3522, "fr")
 
-    assert len(captured_urls) == 1
-    assert captured_urls[0].startswith("https://nominatim.openstreetmap.org/reverse?")
-    assert "/search/reverse?" not in captured_urls[0]
+    assert len(nominatim.urls) == 1
+    assert nominatim.urls[0].startswith("https://nominatim.openstreetmap.org/reverse?")
+    assert "/search/reverse?" not in nominatim.urls[0]
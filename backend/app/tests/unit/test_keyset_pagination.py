@@ -0,0 +1,67 @@
+"""Tests unitaires des curseurs opaques et des modes de comptage."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.infra.db.base import Base
+from app.infra.db.keyset import (
+    InvalidCursorError,
+    KeysetCursor,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    next_cursor_for,
+)
+from app.infra.db.models.audit_event import AuditEventModel
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+
+
+def test_cursor_roundtrip_is_opaque_and_url_safe():
+    occurred_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+    token = encode_cursor(occurred_at, 42)
+
+    assert set(token) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+    assert decode_cursor(token) == KeysetCursor(sort_value=occurred_at, row_id=42)
+
+
+@pytest.mark.parametrize("token", ["", "%%%", encode_cursor(datetime.now(), 1)[:-4], "e30"])
+def test_decode_rejects_malformed_tokens(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+def test_next_cursor_only_for_full_pages():
+    at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    items = [SimpleNamespace(id=3, created_at=at), SimpleNamespace(id=2, created_at=at)]
+
+    assert next_cursor_for(items, page_size=3, sort_attr="created_at") is None
+    assert decode_cursor(next_cursor_for(items, page_size=2, sort_attr="created_at")).row_id == 2
+
+
+def test_count_modes_fall_back_to_exact_outside_postgresql():
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    with open_app_test_db_session() as db:
+        for index in range(3):
+            db.add(
+                AuditEventModel(
+                    request_id=f"rid-{index}",
+                    actor_role="ops",
+                    action="login",
+                    target_type="user",
+                    status="error" if index else "success",
+                    details={},
+                )
+            )
+        db.commit()
+        query = select(AuditEventModel).where(AuditEventModel.status == "error")
+
+        assert count_rows(db, query, "exact") == 2
+        assert count_rows(db, query, "estimated") == 2
+        assert count_rows(db, query, "none") is None
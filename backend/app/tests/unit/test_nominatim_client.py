@@ -0,0 +1,89 @@
+"""Tests unitaires du client Nominatim partagé : single-flight, cadence et 429."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.infra.geocoding.nominatim_client import (
+    NominatimClient,
+    NominatimClientConfig,
+    NominatimRateLimitedError,
+    _RequestScheduler,
+)
+from app.services.geocoding_service import GeocodingService
+from app.tests.helpers.nominatim import stub_nominatim
+
+URL = "https://nominatim.test/search"
+
+
+def _client(handler, **config) -> NominatimClient:
+    return NominatimClient(
+        NominatimClientConfig(timeout_seconds=1.0, user_agent="test", **config),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def test_identical_in_flight_queries_share_one_upstream_call():
+    calls: list[httpx.Request] = []
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=b"[]")
+
+    client = _client(slow_handler, min_interval_seconds=0.0)
+
+    bodies = await asyncio.gather(
+        *(client.get(URL, {"q": "Paris"}, flight_key="paris") for _ in range(5)),
+        client.get(URL, {"q": "Lyon"}, flight_key="lyon"),
+    )
+
+    assert bodies == [b"[]"] * 6
+    assert [request.url.params["q"] for request in calls] == ["Paris", "Lyon"]
+
+
+async def test_concurrent_searches_with_same_query_key_call_nominatim_once():
+    with stub_nominatim([]) as nominatim:
+        results = await asyncio.gather(
+            *(GeocodingService.search("Paris", 5, lang="fr") for _ in range(3))
+        )
+
+    assert results == [[], [], []]
+    assert nominatim.call_count == 1
+
+
+def test_scheduler_spaces_requests_and_rejects_beyond_queue_wait():
+    now = [100.0]
+    scheduler = _RequestScheduler(clock=lambda: now[0])
+
+    waits = [scheduler.reserve(min_interval=1.0, max_wait=2.0) for _ in range(3)]
+
+    assert waits == [0.0, 1.0, 2.0]
+    with pytest.raises(NominatimRateLimitedError):
+        scheduler.reserve(min_interval=1.0, max_wait=2.0)
+    now[0] = 103.0
+    assert scheduler.reserve(min_interval=1.0, max_wait=2.0) == 0.0
+
+
+async def test_upstream_429_defers_queue_and_retries_once():
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, content=b"[]"),
+    ]
+    client = _client(lambda request: responses.pop(0), min_interval_seconds=0.0)
+
+    assert await client.get(URL, {"q": "Paris"}, flight_key="paris") == b"[]"
+    assert responses == []
+
+
+async def test_repeated_429_surfaces_rate_limited():
+    client = _client(
+        lambda request: httpx.Response(429, headers={"Retry-After": "0"}),
+        min_interval_seconds=0.0,
+    )
+
+    with pytest.raises(NominatimRateLimitedError):
+        await client.get(URL, {"q": "Paris"}, flight_key="paris")
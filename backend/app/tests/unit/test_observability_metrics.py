@@ -1,24 +1,46 @@
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from time import sleep
 
 import app.infra.observability.metrics as metrics
 
 
-def test_observe_duration_keeps_bounded_metric_storage(monkeypatch: object) -> None:
+def test_observe_duration_keeps_bounded_metric_storage() -> None:
     metrics.reset_metrics()
-    monkeypatch.setattr(metrics, "_MAX_EVENTS_PER_METRIC", 3)
+    name = "http_request_duration_seconds|route=/x"
+    values = [0.001 * (index + 1) for index in range(10_000)]
 
-    metrics.observe_duration("http_request_duration_seconds|route=/x", 0.1)
-    metrics.observe_duration("http_request_duration_seconds|route=/x", 0.2)
-    metrics.observe_duration("http_request_duration_seconds|route=/x", 0.3)
-    metrics.observe_duration("http_request_duration_seconds|route=/x", 0.4)
+    for value in values:
+        metrics.observe_duration(name, value)
 
-    values = metrics.get_duration_values_in_window(
-        "http_request_duration_seconds|route=/x", timedelta(days=1)
-    )
-    assert values == [0.2, 0.3, 0.4]
+    histogram = metrics.get_duration_histogram_in_window(name, timedelta(days=1))
+    assert histogram.count == 10_000
+    assert histogram.maximum == values[-1]
+    assert abs(histogram.percentile(0.95) - values[9_499]) / values[9_499] <= 0.02
+    assert abs(histogram.percentile(0.5) - values[4_999]) / values[4_999] <= 0.02
+    # Une série de 10k durées tient dans quelques centaines de buckets log-linéaires.
+    assert len(histogram.counts) < 500
+
+
+def test_window_sums_exclude_buckets_older_than_window(monkeypatch: object) -> None:
+    metrics.reset_metrics()
+    now = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+    monkeypatch.setattr(metrics, "_utc_now", lambda: now - timedelta(hours=3))
+    metrics.increment_counter("requests_total|route=/x", 5.0)
+    metrics.observe_duration("latency|route=/x", 2.0)
+    monkeypatch.setattr(metrics, "_utc_now", lambda: now)
+    metrics.increment_counter("requests_total|route=/x", 1.0)
+    metrics.observe_duration("latency|route=/x", 0.5)
+
+    assert metrics.get_counter_sum_in_window("requests_total|route=/x", timedelta(hours=1)) == 1.0
+    assert metrics.get_counter_sums_by_prefix_in_window("requests_total|", timedelta(days=1)) == {
+        "requests_total|route=/x": 6.0
+    }
+    histograms = metrics.get_duration_histograms_by_prefix_in_window("latency|", timedelta(hours=1))
+    assert histograms["latency|route=/x"].count == 1
+    assert histograms["latency|route=/x"].percentile(0.95) == 0.5
+    assert metrics.get_metrics_snapshot()["counters"]["requests_total|route=/x"] == 6.0
 
 
 def test_stale_metrics_are_cleaned_from_snapshot(monkeypatch: object) -> None:
@@ -30,7 +52,7 @@ def test_stale_metrics_are_cleaned_from_snapshot(monkeypatch: object) -> None:
 
     sleep(0.01)
     metrics.get_counter_sums_by_prefix_in_window("test", timedelta(seconds=1))
-    metrics.get_duration_values_by_prefix_in_window("test", timedelta(seconds=1))
+    metrics.get_duration_histograms_by_prefix_in_window("test", timedelta(seconds=1))
 
     snapshot = metrics.get_metrics_snapshot()
     assert "test_counter" not in snapshot["counters"]
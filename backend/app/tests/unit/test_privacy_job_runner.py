@@ -0,0 +1,141 @@
+"""Tests unitaires du worker RGPD: mise en file, purge par lots et archive d'export."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.datetime_provider import datetime_provider
+from app.infra.db.base import Base
+from app.infra.db.models.billing import UserDailyQuotaUsageModel
+from app.infra.db.models.privacy import UserPrivacyRequestModel
+from app.infra.db.models.user import UserModel
+from app.services.privacy.job_runner import PrivacyJobRunner
+from app.services.privacy_service import PrivacyService
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "privacy_jobs_enabled", True)
+    monkeypatch.setattr(settings, "privacy_purge_chunk_size", 2)
+    monkeypatch.setattr(settings, "privacy_export_artifact_dir", str(tmp_path))
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    with open_app_test_db_session() as session:
+        yield session
+
+
+def _user_with_quota_history(db, *, days: int) -> int:
+    user = UserModel(email="privacy-job@example.com", password_hash="hash", role="user")
+    db.add(user)
+    db.flush()
+    for offset in range(days):
+        db.add(
+            UserDailyQuotaUsageModel(
+                user_id=user.id, quota_date=date(2026, 1, 1) + timedelta(days=offset), used_count=1
+            )
+        )
+    db.commit()
+    return user.id
+
+
+def _request(db, privacy_request_id: int) -> UserPrivacyRequestModel:
+    db.expire_all()
+    return db.get(UserPrivacyRequestModel, privacy_request_id)
+
+
+def test_delete_is_enqueued_then_purged_in_chunks_by_worker(db, monkeypatch):
+    user_id = _user_with_quota_history(db, days=5)
+
+    queued = PrivacyService.request_delete(db, user_id=user_id, request_id="rid-delete")
+    db.commit()
+    assert queued.status == "requested"
+    assert db.query(UserDailyQuotaUsageModel).count() == 5
+
+    commits: list[dict[str, object]] = []
+    runner = PrivacyJobRunner(session_factory=open_app_test_db_session)
+    original_execute = PrivacyService.execute_delete
+
+    def spy_execute(session, request, *, on_chunk=None):
+        def record(entity, deleted_rows):
+            on_chunk(entity, deleted_rows)
+            commits.append(dict(request.result_data["progress"]))
+
+        original_execute(session, request, on_chunk=record)
+
+    monkeypatch.setattr(PrivacyService, "execute_delete", staticmethod(spy_execute))
+    assert runner.run_once() == 1
+    assert runner.run_once() == 0
+
+    quota_progress = [c["deleted_rows"]["user_daily_quota_usages"] for c in commits]
+    assert quota_progress == [2, 4, 5]
+    completed = _request(db, queued.request_id)
+    assert completed.status == "completed"
+    assert "user_daily_quota_usages" in completed.result_data["deleted_entities"]
+    assert db.query(UserDailyQuotaUsageModel).count() == 0
+    assert db.get(UserModel, user_id).email.startswith("deleted-user-")
+
+
+def test_export_is_streamed_to_downloadable_artifact(db):
+    user_id = _user_with_quota_history(db, days=3)
+
+    queued = PrivacyService.request_export(db, user_id=user_id, request_id="rid-export")
+    db.commit()
+    assert PrivacyJobRunner(session_factory=open_app_test_db_session).run_once() == 1
+
+    completed = _request(db, queued.request_id)
+    assert completed.status == "completed"
+    assert completed.result_data["quota_usage_count"] == 3
+    assert "user" not in completed.result_data
+
+    path = PrivacyService.get_export_artifact_path(db, user_id=user_id)
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        lines = [json.loads(line) for line in stream]
+    assert lines[0] == {
+        "section": "user",
+        "data": {
+            "id": user_id,
+            "email": "privacy-job@example.com",
+            "role": "user",
+            "created_at": lines[0]["data"]["created_at"],
+        },
+    }
+    assert [line["section"] for line in lines].count("quota_usage") == 3
+    summary = PrivacyService._summarize_result_data("export", completed.result_data)
+    assert summary["contains_user_data"] is True
+    assert completed.result_data["artifact"]["record_count"] == len(lines)
+
+
+def test_stale_processing_claim_is_taken_over(db):
+    user_id = _user_with_quota_history(db, days=1)
+    queued = PrivacyService.request_delete(db, user_id=user_id, request_id="rid-stale")
+    db.commit()
+
+    now = datetime_provider.utcnow()
+    assert PrivacyJobRunner.claim_next(db, now_utc=now, stale_claim_seconds=60.0) is not None
+    db.commit()
+    assert PrivacyJobRunner.claim_next(db, now_utc=now, stale_claim_seconds=60.0) is None
+    reclaimed = PrivacyJobRunner.claim_next(
+        db, now_utc=now + timedelta(seconds=61), stale_claim_seconds=60.0
+    )
+    assert reclaimed is not None
+    assert reclaimed.id == queued.request_id
+
+
+def test_inline_mode_still_completes_within_request(db, monkeypatch):
+    monkeypatch.setattr(settings, "privacy_jobs_enabled", False)
+    user_id = _user_with_quota_history(db, days=3)
+
+    export = PrivacyService.request_export(db, user_id=user_id, request_id="rid-inline")
+    delete = PrivacyService.request_delete(db, user_id=user_id, request_id="rid-inline-del")
+
+    assert export.status == "completed"
+    assert export.result_data["user"]["email"] == "privacy-job@example.com"
+    assert export.result_data["quota_usage_count"] == 3
+    assert delete.status == "completed"
+    assert db.query(UserDailyQuotaUsageModel).count() == 0
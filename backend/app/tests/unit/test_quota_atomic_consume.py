@@ -0,0 +1,193 @@
+# Commentaire global: tests de la consommation de quota atomique par UPSERT conditionnel.
+"""Couvre l'instruction UPSERT, son rendu PostgreSQL et l'absence de sur-consommation."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infra.db.base import Base
+from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+from app.infra.db.models.enterprise_feature_usage_counters import (
+    EnterpriseFeatureUsageCounterModel,
+)
+from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+from app.services.entitlement.entitlement_types import QuotaDefinition
+from app.services.quota.usage_service import QuotaExhaustedError
+from app.services.quota.window_resolver import QuotaWindowResolver
+
+UTC = timezone.utc
+REF_DT = datetime(2026, 3, 15, 10, 0, tzinfo=UTC)
+
+
+def _quota(limit: int) -> QuotaDefinition:
+    return QuotaDefinition(
+        quota_key="calls",
+        quota_limit=limit,
+        period_unit="month",
+        period_value=1,
+        reset_mode="calendar",
+    )
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # Fichier partagé: chaque thread ouvre sa propre connexion, comme en production.
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'quota.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        db.add(EnterpriseAccountModel(id=1, company_name="ACME", status="active"))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def _consume_once(factory, quota: QuotaDefinition) -> bool:
+    with factory() as db:
+        try:
+            EnterpriseQuotaUsageService.consume(
+                db, account_id=1, feature_code="b2b_api_access", quota=quota, ref_dt=REF_DT
+            )
+        except QuotaExhaustedError:
+            db.rollback()
+            return False
+        db.commit()
+        return True
+
+
+def test_consume_updates_counter_created_by_orm_path(session_factory) -> None:
+    """L'UPSERT retrouve un compteur existant au lieu d'en créer un second."""
+    quota = _quota(5)
+    window = QuotaWindowResolver.compute_window("month", 1, "calendar", REF_DT)
+    with session_factory() as db:
+        counter = EnterpriseFeatureUsageCounterModel(
+            enterprise_account_id=1,
+            feature_code="b2b_api_access",
+            quota_key="calls",
+            period_unit="month",
+            period_value=1,
+            reset_mode="calendar",
+            window_start=window.window_start,
+            window_end=window.window_end,
+            used_count=3,
+        )
+        db.add(counter)
+        db.commit()
+
+        state = EnterpriseQuotaUsageService.consume(
+            db, account_id=1, feature_code="b2b_api_access", quota=quota, amount=2, ref_dt=REF_DT
+        )
+
+        assert state.used == 5
+        assert state.exhausted is True
+        assert counter.used_count == 5
+        assert db.scalar(select(func.count(EnterpriseFeatureUsageCounterModel.id))) == 1
+
+        with pytest.raises(QuotaExhaustedError) as exc_info:
+            EnterpriseQuotaUsageService.consume(
+                db, account_id=1, feature_code="b2b_api_access", quota=quota, ref_dt=REF_DT
+            )
+        assert exc_info.value.used == 5
+        assert exc_info.value.limit == 5
+
+
+def test_amount_above_limit_is_refused_without_creating_counter(session_factory) -> None:
+    with session_factory() as db:
+        with pytest.raises(QuotaExhaustedError) as exc_info:
+            EnterpriseQuotaUsageService.consume(
+                db,
+                account_id=1,
+                feature_code="b2b_api_access",
+                quota=_quota(2),
+                amount=3,
+                ref_dt=REF_DT,
+            )
+        assert exc_info.value.used == 0
+        assert db.scalar(select(func.count(EnterpriseFeatureUsageCounterModel.id))) == 0
+
+
+def test_postgresql_statement_is_a_conditional_upsert() -> None:
+    """Le rendu PostgreSQL est une instruction unique, sans FOR UPDATE."""
+    from app.services.quota import atomic_consume
+
+    captured: dict[str, object] = {}
+
+    class _Bind:
+        class dialect:
+            name = "postgresql"
+
+    class _Db:
+        def get_bind(self):
+            return _Bind()
+
+        def execute(self, stmt, execution_options=None):
+            captured["stmt"] = stmt
+            captured["options"] = execution_options
+
+            class _Result:
+                def one_or_none(self):
+                    return None
+
+            return _Result()
+
+    window = QuotaWindowResolver.compute_window("month", 1, "calendar", REF_DT)
+    atomic_consume.upsert_consume_counter(
+        _Db(),
+        EnterpriseFeatureUsageCounterModel,
+        subject_column="enterprise_account_id",
+        subject_id=1,
+        subject_cache_key=("b2b_account", 1),
+        feature_code="b2b_api_access",
+        quota=_quota(10),
+        window=window,
+        amount=1,
+    )
+
+    sql = str(captured["stmt"].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (enterprise_account_id, feature_code, quota_key" in sql
+    assert "DO UPDATE SET used_count = (enterprise_feature_usage_counters.used_count +" in sql
+    assert "WHERE enterprise_feature_usage_counters.used_count +" in sql
+    assert "RETURNING" in sql
+    assert "xmax = 0" in sql
+    assert "FOR UPDATE" not in sql
+    assert captured["options"]["populate_existing"] is True
+
+
+def test_parallel_consumption_never_exceeds_limit(session_factory) -> None:
+    """32 workers se disputent 200 appels sur un quota de 50: exactement 50 passent."""
+    quota = _quota(50)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(lambda _: _consume_once(session_factory, quota), range(200)))
+
+    assert results.count(True) == 50
+    with session_factory() as db:
+        counters = db.scalars(select(EnterpriseFeatureUsageCounterModel)).all()
+    assert [counter.used_count for counter in counters] == [50]
+
+
+def test_sessions_without_upsert_support_keep_the_locking_path(monkeypatch) -> None:
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(
+        "app.services.b2b.enterprise_quota_usage_service.supports_atomic_consume",
+        lambda db: False,
+    )
+    with Session(engine) as db:
+        db.add(EnterpriseAccountModel(id=1, company_name="ACME", status="active"))
+        db.commit()
+
+        state = EnterpriseQuotaUsageService.consume(
+            db, account_id=1, feature_code="b2b_api_access", quota=_quota(3), ref_dt=REF_DT
+        )
+
+    assert state.used == 1
@@ -0,0 +1,195 @@
+# Commentaire global: tests des quotas glissants comptés par sous-fenêtres.
+"""Couvre la consommation, l'expiration des sous-fenêtres et le snapshot d'un quota glissant."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.infra.db.base import Base
+from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+from app.infra.db.models.enterprise_billing import EnterpriseAccountBillingPlanModel
+from app.infra.db.models.enterprise_feature_usage_counters import (
+    EnterpriseFeatureUsageCounterModel,
+)
+from app.infra.db.models.product_entitlements import (
+    AccessMode,
+    Audience,
+    FeatureCatalogModel,
+    PeriodUnit,
+    PlanCatalogModel,
+    PlanFeatureBindingModel,
+    PlanFeatureQuotaModel,
+    ResetMode,
+    SourceOrigin,
+)
+from app.infra.db.models.user import UserModel
+from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+from app.services.entitlement.effective_entitlement_resolver_service import (
+    EffectiveEntitlementResolverService,
+)
+from app.services.entitlement.entitlement_types import QuotaDefinition
+from app.services.quota.usage_service import QuotaExhaustedError, QuotaUsageService
+
+UTC = timezone.utc
+T0 = datetime(2026, 3, 15, 10, 15, tzinfo=UTC)
+FEATURE = "b2b_api_access"
+
+ROLLING_DAY = QuotaDefinition(
+    quota_key="calls_24h",
+    quota_limit=5,
+    period_unit="day",
+    period_value=1,
+    reset_mode="rolling",
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(EnterpriseAccountModel(id=1, company_name="ACME", status="active"))
+        session.add(UserModel(id=1, email="rolling@test.com", password_hash="x", role="user"))
+        session.commit()
+        yield session
+
+
+def _consume(db: Session, ref_dt: datetime, amount: int = 1):
+    return EnterpriseQuotaUsageService.consume(
+        db, account_id=1, feature_code=FEATURE, quota=ROLLING_DAY, amount=amount, ref_dt=ref_dt
+    )
+
+
+def test_limit_applies_across_buckets_of_the_trailing_window(db) -> None:
+    _consume(db, T0, amount=3)
+    state = _consume(db, T0 + timedelta(hours=5), amount=2)
+
+    assert state.used == 5
+    assert state.exhausted is True
+    assert state.window_end == datetime(2026, 3, 15, 16, 0, tzinfo=UTC)
+    assert state.window_start == state.window_end - timedelta(days=1)
+    with pytest.raises(QuotaExhaustedError) as exc_info:
+        _consume(db, T0 + timedelta(hours=12))
+    assert exc_info.value.used == 5
+    assert db.scalar(select(func.count(EnterpriseFeatureUsageCounterModel.id))) == 2
+
+
+def test_oldest_bucket_leaves_the_window_after_24_hours(db) -> None:
+    _consume(db, T0, amount=3)
+    _consume(db, T0 + timedelta(hours=5), amount=2)
+
+    # 10h15 le lendemain: la sous-fenêtre 10h-11h de la veille n'est plus comptée.
+    state = _consume(db, T0 + timedelta(days=1))
+    assert state.used == 3
+
+    usage = EnterpriseQuotaUsageService.get_usage(
+        db, account_id=1, feature_code=FEATURE, quota=ROLLING_DAY, ref_dt=T0 + timedelta(days=1)
+    )
+    assert usage.used == 3
+    assert usage.remaining == 2
+
+
+def test_batched_reads_mix_rolling_and_calendar_quotas_in_one_query(db) -> None:
+    monthly = QuotaDefinition(
+        quota_key="calls_month",
+        quota_limit=100,
+        period_unit="month",
+        period_value=1,
+        reset_mode="calendar",
+    )
+    for hours in range(0, 20, 4):
+        _consume(db, T0 + timedelta(hours=hours))
+    EnterpriseQuotaUsageService.consume(
+        db, account_id=1, feature_code=FEATURE, quota=monthly, amount=7, ref_dt=T0
+    )
+    statements: list[str] = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    states = EnterpriseQuotaUsageService.get_usages(
+        db,
+        account_id=1,
+        quotas=[(FEATURE, ROLLING_DAY), (FEATURE, monthly)],
+        ref_dt=T0 + timedelta(hours=20),
+    )
+
+    assert [state.used for state in states] == [5, 7]
+    assert len(statements) == 1
+
+
+def test_b2c_rolling_quota_uses_the_locking_fallback(db, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "app.services.quota.usage_service.supports_atomic_consume", lambda session: False
+    )
+    quota = QuotaDefinition(
+        quota_key="tokens",
+        quota_limit=3,
+        period_unit="week",
+        period_value=1,
+        reset_mode="rolling",
+    )
+    for day in range(3):
+        QuotaUsageService.consume(
+            db,
+            user_id=1,
+            feature_code="horoscope_daily",
+            quota=quota,
+            ref_dt=T0 + timedelta(days=day),
+        )
+
+    with pytest.raises(QuotaExhaustedError):
+        QuotaUsageService.consume(
+            db,
+            user_id=1,
+            feature_code="horoscope_daily",
+            quota=quota,
+            ref_dt=T0 + timedelta(days=6),
+        )
+    state = QuotaUsageService.get_usage(
+        db, user_id=1, feature_code="horoscope_daily", quota=quota, ref_dt=T0 + timedelta(days=7)
+    )
+    assert state.used == 2
+
+
+def test_snapshot_grants_rolling_quota_instead_of_disabling_binding(db) -> None:
+    plan = PlanCatalogModel(
+        plan_code="b2b_rolling",
+        plan_name="B2B Rolling",
+        audience=Audience.B2B,
+        source_type=SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+        source_id=400,
+    )
+    feature = FeatureCatalogModel(feature_code=FEATURE, feature_name="API Access")
+    db.add_all([plan, feature])
+    db.flush()
+    db.add(EnterpriseAccountBillingPlanModel(enterprise_account_id=1, plan_id=400))
+    binding = PlanFeatureBindingModel(
+        plan_id=plan.id, feature_id=feature.id, access_mode=AccessMode.QUOTA, is_enabled=True
+    )
+    db.add(binding)
+    db.flush()
+    db.add(
+        PlanFeatureQuotaModel(
+            plan_feature_binding_id=binding.id,
+            quota_key="calls_24h",
+            quota_limit=5,
+            period_unit=PeriodUnit.DAY,
+            period_value=1,
+            reset_mode=ResetMode.ROLLING,
+        )
+    )
+    db.commit()
+    _consume(db, datetime.now(UTC), amount=2)
+    db.commit()
+
+    access = EffectiveEntitlementResolverService.resolve_b2b_account_snapshot(
+        db, enterprise_account_id=1
+    ).entitlements[FEATURE]
+
+    assert access.granted is True
+    assert access.reset_mode == "rolling"
+    assert access.quota_used == 2
+    assert access.quota_remaining == 3
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from unittest.mock import Mock
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
 
 from app.infra.db.base import Base
@@ -601,3 +601,76 @@ def test_get_usage_tokens_can_use_subscription_anniversary_windows(db_session):
     assert usage_week.window_end == datetime(2026, 5, 1, 10, 0, tzinfo=UTC)
     assert usage_month.window_start == datetime(2026, 4, 17, 10, 0, tzinfo=UTC)
     assert usage_month.window_end == datetime(2026, 5, 17, 10, 0, tzinfo=UTC)
+
+
+def test_get_usages_batches_counters_and_resolves_anchor_once(db_session):
+    db_session.add(
+        StripeBillingProfileModel(
+            user_id=1,
+            stripe_customer_id="cus_test",
+            stripe_subscription_id="sub_test",
+            subscription_status="active",
+            current_period_start=datetime(2026, 4, 17, 10, 0, tzinfo=UTC),
+            current_period_end=datetime(2026, 5, 17, 10, 0, tzinfo=UTC),
+            entitlement_plan="basic",
+        )
+    )
+    db_session.add(
+        FeatureUsageCounterModel(
+            user_id=1,
+            feature_code="horoscope_daily",
+            quota_key="tokens",
+            period_unit="month",
+            period_value=1,
+            reset_mode="calendar",
+            window_start=datetime(2026, 4, 17, 10, 0, tzinfo=UTC),
+            window_end=datetime(2026, 5, 17, 10, 0, tzinfo=UTC),
+            used_count=1200,
+        )
+    )
+    db_session.commit()
+    quotas = [
+        (
+            "horoscope_daily",
+            QuotaDefinition(
+                quota_key="tokens",
+                quota_limit=10000,
+                period_unit="day",
+                period_value=1,
+                reset_mode="calendar",
+            ),
+        ),
+        (
+            "horoscope_daily",
+            QuotaDefinition(
+                quota_key="tokens",
+                quota_limit=200000,
+                period_unit="month",
+                period_value=1,
+                reset_mode="calendar",
+            ),
+        ),
+    ]
+    ref_dt = datetime(2026, 4, 26, 9, 0, tzinfo=UTC)
+    statements: list[str] = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    usages = QuotaUsageService.get_usages(db_session, user_id=1, quotas=quotas, ref_dt=ref_dt)
+
+    assert len(statements) == 2
+    assert usages == [
+        QuotaUsageService.get_usage(
+            db_session, user_id=1, feature_code=feature_code, quota=quota, ref_dt=ref_dt
+        )
+        for feature_code, quota in quotas
+    ]
+    assert [usage.used for usage in usages] == [0, 1200]
+    assert usages[0].window_start == datetime(2026, 4, 25, 10, 0, tzinfo=UTC)
+
+
+def test_get_usages_without_quotas_runs_no_query(db_session):
+    assert QuotaUsageService.get_usages(db_session, user_id=1, quotas=[]) == []
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -99,10 +99,30 @@ def test_naive_ref_dt_raises():
         QuotaWindowResolver.compute_window("day", 1, "calendar", ref_dt)
 
 
-def test_rolling_raises():
+def test_rolling_day_window_trails_24_hourly_buckets():
+    ref_dt = datetime(2026, 3, 15, 10, 30, tzinfo=UTC)
+    window = QuotaWindowResolver.compute_window("day", 1, "rolling", ref_dt)
+    assert window.bucket_start == datetime(2026, 3, 15, 10, 0, tzinfo=UTC)
+    assert window.bucket_end == datetime(2026, 3, 15, 11, 0, tzinfo=UTC)
+    assert window.window_start == datetime(2026, 3, 14, 11, 0, tzinfo=UTC)
+    assert window.window_end == window.bucket_end
+    counter_window = QuotaWindowResolver.counter_window(window)
+    assert counter_window.window_start == window.bucket_start
+    assert counter_window.window_end == window.bucket_end
+
+
+def test_rolling_week_window_uses_seven_hour_buckets():
+    ref_dt = datetime(2026, 3, 15, 10, 30, tzinfo=UTC)
+    window = QuotaWindowResolver.compute_window("week", 1, "rolling", ref_dt)
+    assert window.bucket_end - window.bucket_start == timedelta(hours=7)
+    assert window.window_end - window.window_start == timedelta(weeks=1)
+    assert window.bucket_start <= ref_dt < window.bucket_end
+
+
+def test_rolling_raises_for_variable_length_units():
     ref_dt = datetime(2026, 3, 15, 10, 0, tzinfo=UTC)
     with pytest.raises(ValueError, match="rolling windows not supported"):
-        QuotaWindowResolver.compute_window("day", 1, "rolling", ref_dt)
+        QuotaWindowResolver.compute_window("month", 1, "rolling", ref_dt)
 
 
 def test_week_calendar_period_2():
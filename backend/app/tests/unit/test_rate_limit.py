@@ -1,4 +1,16 @@
-from app.core.rate_limit import RateLimitError, check_rate_limit
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import redis
+
+from app.core.rate_limit import (
+    InMemoryGcraRateLimiter,
+    RateLimitError,
+    check_rate_limit,
+    configure_rate_limiter,
+)
+from app.infra.cache.redis_rate_limiter import GCRA_SCRIPT, RedisGcraRateLimiter
 
 
 def test_rate_limit_retry_after_is_dynamic() -> None:
@@ -11,3 +23,134 @@ def test_rate_limit_retry_after_is_dynamic() -> None:
         assert 1 <= retry_after <= 3
     else:
         raise AssertionError("Expected RateLimitError")
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_gcra_allows_a_burst_then_refills_at_the_configured_rate() -> None:
+    clock = _FakeClock()
+    limiter = InMemoryGcraRateLimiter(clock=clock)
+
+    assert [limiter.acquire("k", limit=3, window_seconds=3) for _ in range(3)] == [None] * 3
+    assert limiter.acquire("k", limit=3, window_seconds=3) == pytest.approx(1.0)
+
+    clock.now += 1.0
+    assert limiter.acquire("k", limit=3, window_seconds=3) is None
+    assert limiter.acquire("k", limit=3, window_seconds=3) == pytest.approx(1.0)
+
+
+def test_gcra_keeps_one_entry_per_key_and_evicts_least_recent() -> None:
+    limiter = InMemoryGcraRateLimiter(max_keys=4, shards=1)
+    for index in range(10):
+        limiter.acquire(f"key-{index}", limit=1, window_seconds=60)
+    limiter.acquire("key-0", limit=1, window_seconds=60)
+
+    assert len(limiter) == 4
+    assert limiter.acquire("key-9", limit=1, window_seconds=60) is not None
+
+
+def test_gcra_admits_exactly_limit_calls_under_contention() -> None:
+    limiter = InMemoryGcraRateLimiter(shards=8)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(
+            executor.map(
+                lambda _: limiter.acquire("shared", limit=100, window_seconds=3600),
+                range(1000),
+            )
+        )
+
+    assert results.count(None) == 100
+
+
+def test_check_rate_limit_uses_the_configured_backend() -> None:
+    clock = _FakeClock()
+    configure_rate_limiter(InMemoryGcraRateLimiter(clock=clock))
+    try:
+        check_rate_limit(key="configured", limit=1, window_seconds=10)
+        with pytest.raises(RateLimitError) as exc_info:
+            check_rate_limit(key="configured", limit=1, window_seconds=10)
+        assert exc_info.value.details["retry_after"] == "10"
+    finally:
+        configure_rate_limiter(None)
+
+
+class _FakeRedis:
+    """Expose `register_script` comme redis-py; le script est simulé en Python."""
+
+    def __init__(self, *, failing: bool = False) -> None:
+        self.failing = failing
+        self.calls: list[tuple[list[str], list[int]]] = []
+        self.tats: dict[str, int] = {}
+        self.now_us = 5_000_000
+
+    def register_script(self, script: str):
+        def _run(keys: list[str], args: list[int]) -> int:
+            self.calls.append((keys, args))
+            if self.failing:
+                raise redis.ConnectionError("down")
+            interval, tolerance = args
+            tat = max(self.tats.get(keys[0], self.now_us), self.now_us)
+            excess = tat + interval - self.now_us - tolerance
+            if excess > 0:
+                return excess
+            self.tats[keys[0]] = tat + interval
+            return 0
+
+        return _run
+
+
+def test_redis_limiter_passes_microsecond_arguments_and_maps_excess() -> None:
+    client = _FakeRedis()
+    limiter = RedisGcraRateLimiter(client, prefix="rl:")
+
+    assert limiter.acquire("k", limit=2, window_seconds=1) is None
+    assert limiter.acquire("k", limit=2, window_seconds=1) is None
+    assert limiter.acquire("k", limit=2, window_seconds=1) == pytest.approx(0.5)
+    assert client.calls[0] == (["rl:k"], [500_000, 1_000_000])
+
+
+def test_redis_limiter_falls_back_to_local_backend_when_unavailable() -> None:
+    limiter = RedisGcraRateLimiter(_FakeRedis(failing=True), fallback=InMemoryGcraRateLimiter())
+
+    assert limiter.acquire("k", limit=1, window_seconds=60) is None
+    assert limiter.acquire("k", limit=1, window_seconds=60) is not None
+
+
+def _lua_capable_redis() -> redis.Redis:
+    """Redis réel (`REDIS_URL`) ou fakeredis avec Lua; sinon le test est ignoré."""
+    from app.core.config import settings
+
+    client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.2)
+    try:
+        client.ping()
+        return client
+    except redis.RedisError:
+        pass
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis()
+
+
+def test_gcra_script_is_ascii_for_lua_5_1() -> None:
+    # Lua 5.1 (Redis) refuse les identifiants non ASCII: le script ne chargerait pas.
+    assert GCRA_SCRIPT.isascii()
+
+
+def test_redis_limiter_runs_the_real_gcra_script() -> None:
+    client = _lua_capable_redis()
+    limiter = RedisGcraRateLimiter(client, prefix=f"rl-test-{uuid.uuid4().hex}:")
+    try:
+        assert limiter.acquire("k", limit=2, window_seconds=60) is None
+        assert limiter.acquire("k", limit=2, window_seconds=60) is None
+        retry_after = limiter.acquire("k", limit=2, window_seconds=60)
+        assert retry_after is not None
+        assert 29 < retry_after <= 30
+    finally:
+        limiter.reset()
@@ -0,0 +1,48 @@
+"""Couvre l'appel de fin de flux des exports, y compris interrompus."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+
+from app.api.v1.response_exports import stream_export_response
+
+
+def _rows(count: int) -> list[dict[str, object]]:
+    return [{"id": index, "email": f"user-{index:05d}@example.com" * 4} for index in range(count)]
+
+
+async def _read(response, chunks: int | None = None) -> int:
+    received = 0
+    async for _chunk in response.body_iterator:
+        received += 1
+        if chunks is not None and received == chunks:
+            break
+    return received
+
+
+def test_complete_export_reports_every_row() -> None:
+    calls: list[tuple[int, bool]] = []
+    response = stream_export_response(
+        _rows(3_000), ["id", "email"], "users_export", on_complete=lambda *args: calls.append(args)
+    )
+
+    asyncio.run(_read(response))
+
+    assert calls == [(3_000, True)]
+
+
+def test_interrupted_export_is_still_reported_with_rows_sent() -> None:
+    calls: list[tuple[int, bool]] = []
+    response = stream_export_response(
+        _rows(3_000), ["id", "email"], "users_export", on_complete=lambda *args: calls.append(args)
+    )
+
+    assert asyncio.run(_read(response, chunks=1)) == 1
+    del response
+    gc.collect()
+
+    assert len(calls) == 1
+    rows_sent, completed = calls[0]
+    assert completed is False
+    assert 0 < rows_sent < 3_000
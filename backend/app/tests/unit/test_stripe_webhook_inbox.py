@@ -0,0 +1,122 @@
+"""Tests unitaires de l'inbox webhook Stripe: réception, claim ordonné et workers."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import stripe
+
+from app.infra.db.base import Base
+from app.infra.db.models.stripe_webhook_event import StripeWebhookEventModel
+from app.services.billing.stripe_webhook_inbox import (
+    StripeWebhookInboxService,
+    StripeWebhookInboxWorkerPool,
+)
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+UPDATE_EVENT_PAYLOAD_PATH = (
+    "app.services.billing.stripe_billing_profile_service."
+    "StripeBillingProfileService.update_from_event_payload"
+)
+GET_BY_CUSTOMER_ID_PATH = (
+    "app.services.billing.stripe_billing_profile_service."
+    "StripeBillingProfileService.get_by_stripe_customer_id"
+)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    with open_app_test_db_session() as session:
+        yield session
+
+
+def _event(event_id: str, customer: str) -> stripe.Event:
+    return stripe.Event.construct_from(
+        {
+            "id": event_id,
+            "object": "event",
+            "type": "invoice.paid",
+            "livemode": False,
+            "data": {"object": {"id": f"in_{event_id}", "customer": customer}},
+        },
+        "sk_test",
+    )
+
+
+def _claim(db, *, now: datetime = NOW) -> list[str]:
+    claimed = StripeWebhookInboxService.claim_batch(
+        db, now_utc=now, limit=10, max_attempts=3, stale_claim_seconds=60.0
+    )
+    db.commit()
+    return [item.stripe_event_id for item in claimed]
+
+
+def _record(db, event_id: str) -> StripeWebhookEventModel:
+    db.expire_all()
+    return db.query(StripeWebhookEventModel).filter_by(stripe_event_id=event_id).one()
+
+
+def test_enqueue_persists_received_event_and_ignores_redelivery(db):
+    assert StripeWebhookInboxService.enqueue(db, _event("evt_1", "cus_a")) == "received"
+    assert StripeWebhookInboxService.enqueue(db, _event("evt_1", "cus_a")) == "duplicate_ignored"
+    db.commit()
+
+    record = _record(db, "evt_1")
+    assert record.status == "received"
+    assert record.processing_attempts == 0
+    assert record.stripe_customer_id == "cus_a"
+    assert record.payload["data"]["object"]["id"] == "in_evt_1"
+
+
+def test_claim_takes_one_event_per_customer_in_arrival_order(db):
+    for event_id, customer in (("evt_a1", "cus_a"), ("evt_a2", "cus_a"), ("evt_b1", "cus_b")):
+        StripeWebhookInboxService.enqueue(db, _event(event_id, customer))
+    db.commit()
+
+    assert _claim(db) == ["evt_a1", "evt_b1"]
+    assert _claim(db) == []
+
+    _record(db, "evt_a1").status = "processed"
+    db.commit()
+
+    assert _claim(db) == ["evt_a2"]
+    assert _record(db, "evt_a2").processing_attempts == 1
+
+
+def test_stale_claim_is_taken_over(db):
+    StripeWebhookInboxService.enqueue(db, _event("evt_stale", "cus_a"))
+    db.commit()
+    assert _claim(db) == ["evt_stale"]
+
+    assert _claim(db, now=NOW + timedelta(seconds=30)) == []
+    assert _claim(db, now=NOW + timedelta(seconds=61)) == ["evt_stale"]
+    assert _record(db, "evt_stale").processing_attempts == 2
+
+
+def test_worker_processes_events_and_reschedules_failures(db):
+    StripeWebhookInboxService.enqueue(db, _event("evt_ok", "cus_ok"))
+    StripeWebhookInboxService.enqueue(db, _event("evt_ko", "cus_ko"))
+    db.commit()
+
+    def update(db_session, user_id, payload):
+        if payload["id"] == "evt_ko":
+            raise RuntimeError("boom")
+
+    workers = StripeWebhookInboxWorkerPool(session_factory=open_app_test_db_session)
+    with patch(GET_BY_CUSTOMER_ID_PATH) as get_profile, patch(UPDATE_EVENT_PAYLOAD_PATH, update):
+        get_profile.return_value.user_id = 42
+        assert workers.run_once() == 2
+        assert workers.run_once() == 0
+
+    processed = _record(db, "evt_ok")
+    failed = _record(db, "evt_ko")
+    assert processed.status == "processed"
+    assert processed.processing_attempts == 1
+    assert failed.status == "failed"
+    assert failed.last_error == "boom"
+    assert failed.available_at is not None
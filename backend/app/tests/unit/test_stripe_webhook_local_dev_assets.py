@@ -144,7 +144,7 @@ def test_docs_are_aligned_with_supported_backend_webhook_perimeter() -> None:
 
 def test_runtime_dispatch_and_resolver_use_canonical_registry() -> None:
     """Bloque le retour de listes locales concurrentes dans le service runtime."""
-    handle_source = inspect.getsource(StripeWebhookService.handle_event)
+    handle_source = inspect.getsource(StripeWebhookService.process_claimed_event)
     resolver_source = inspect.getsource(StripeWebhookService._resolve_user_id)
 
     assert "is_supported_webhook_event(event_type)" in handle_source
@@ -0,0 +1,121 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import delete, event, update
+
+from app.api.dependencies.auth import UserAuthenticationError, require_authenticated_user
+from app.core.security import create_access_token
+from app.infra.db.base import Base
+from app.infra.db.models.user import UserModel
+from app.services.auth.user_status_cache import (
+    CachedUserStatus,
+    UserStatusCache,
+    reset_user_status_cache,
+)
+from app.services.auth_service import AuthService
+from app.tests.helpers.db_session import app_test_engine, open_app_test_db_session
+
+
+def _cleanup_users() -> None:
+    Base.metadata.drop_all(bind=app_test_engine())
+    Base.metadata.create_all(bind=app_test_engine())
+    with open_app_test_db_session() as db:
+        db.execute(delete(UserModel))
+        db.commit()
+    reset_user_status_cache()
+
+
+def _register(email: str) -> tuple[int, str]:
+    with open_app_test_db_session() as db:
+        auth = AuthService.register(db, email=email, password="strong-pass-123")
+        db.commit()
+    return auth.user.id, auth.tokens.access_token
+
+
+def _count_statements(operation) -> int:
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(app_test_engine(), "before_cursor_execute", _count)
+    try:
+        operation()
+    finally:
+        event.remove(app_test_engine(), "before_cursor_execute", _count)
+    return statements
+
+
+def test_authenticated_reads_are_served_from_cache_until_suspension() -> None:
+    _cleanup_users()
+    user_id, access_token = _register("cached-user@example.com")
+
+    with open_app_test_db_session() as db:
+
+        def authenticate() -> None:
+            user = require_authenticated_user(authorization=f"Bearer {access_token}", db=db)
+            assert user.id == user_id
+
+        assert _count_statements(authenticate) == 1
+        assert _count_statements(authenticate) == 0
+
+    with open_app_test_db_session() as db:
+        db.get(UserModel, user_id).is_suspended = True
+        db.commit()
+
+    with open_app_test_db_session() as db:
+        with pytest.raises(UserAuthenticationError) as suspended:
+            require_authenticated_user(authorization=f"Bearer {access_token}", db=db)
+        assert suspended.value.code == "account_suspended"
+
+        db.execute(update(UserModel).where(UserModel.id == user_id).values(is_suspended=False))
+        db.commit()
+        assert require_authenticated_user(authorization=f"Bearer {access_token}", db=db)
+
+
+def test_cached_status_is_ignored_when_token_role_differs() -> None:
+    _cleanup_users()
+    user_id, access_token = _register("role-change@example.com")
+    with open_app_test_db_session() as db:
+        require_authenticated_user(authorization=f"Bearer {access_token}", db=db)
+
+        promoted_token = create_access_token(subject=str(user_id), role="admin")
+        with app_test_engine().begin() as connection:
+            # Écriture hors ORM: aucune invalidation, seul le rôle du jeton la révèle.
+            connection.execute(
+                update(UserModel).where(UserModel.id == user_id).values(role="admin")
+            )
+        user = require_authenticated_user(authorization=f"Bearer {promoted_token}", db=db)
+
+    assert user.role == "admin"
+
+
+def test_user_status_cache_drops_reads_started_before_invalidation() -> None:
+    now = [0.0]
+    cache = UserStatusCache(ttl_seconds=5.0, max_entries=2, clock=lambda: now[0])
+
+    def status(user_id: int) -> CachedUserStatus:
+        return CachedUserStatus(
+            id=user_id,
+            role="user",
+            email=f"{user_id}@example.com",
+            created_at=datetime(2026, 1, 1, tzinfo=UTC),
+            is_suspended=False,
+        )
+
+    token = cache.begin()
+    cache.invalidate({1})
+    cache.set(1, status(1), token)
+    assert cache.get(1) is None
+
+    for user_id in (1, 2, 3):
+        cache.set(user_id, status(user_id), cache.begin())
+    assert cache.get(1) is None
+    assert len(cache) == 2
+
+    cache.invalidate({2})
+    assert cache.get(2) is None
+    assert cache.get(3) == status(3)
+    now[0] = 5.0
+    assert cache.get(3) is None
@@ -0,0 +1,120 @@
+"""Tests unitaires du moteur de livraison webhook: concurrence, backoff et disjoncteur."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.infra.webhooks.delivery_engine import (
+    CIRCUIT_OPEN_ERROR,
+    AlertDeliveryEngineConfig,
+    backoff_delay,
+    deliver_webhooks,
+    run_webhook_batch,
+)
+from app.services.canonical_entitlement.shared.alert_delivery_runtime import (
+    CanonicalEntitlementAlertDeliveryRuntime,
+)
+
+URL = "https://hooks.example.test/ops"
+
+
+def _config(**overrides) -> AlertDeliveryEngineConfig:
+    values = {
+        "concurrency": 4,
+        "max_attempts": 1,
+        "backoff_base_seconds": 0.0,
+        "backoff_max_seconds": 0.0,
+        "circuit_failure_threshold": 100,
+        "circuit_open_seconds": 60.0,
+        "timeout_seconds": 1.0,
+    }
+    values.update(overrides)
+    return AlertDeliveryEngineConfig(**values)
+
+
+def test_batch_runs_concurrently_within_bound_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def send(client, url, payload):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return payload["n"] % 2 == 0, None if payload["n"] % 2 == 0 else "HTTP 500"
+
+    results = run_webhook_batch(
+        URL, [{"n": n} for n in range(10)], send=send, config=_config(concurrency=3)
+    )
+
+    assert peak == 3
+    assert results == [(True, None) if n % 2 == 0 else (False, "HTTP 500") for n in range(10)]
+
+
+def test_failures_are_retried_with_jittered_exponential_backoff():
+    answers = iter([(False, "HTTP 503"), (False, "HTTP 503"), (True, None)])
+    delays: list[float] = []
+
+    async def send(client, url, payload):
+        return next(answers)
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    results = asyncio.run(
+        deliver_webhooks(
+            URL,
+            [{"n": 1}],
+            send=send,
+            config=_config(max_attempts=3, backoff_base_seconds=0.5, backoff_max_seconds=10.0),
+            sleep=sleep,
+        )
+    )
+
+    assert results == [(True, None)]
+    assert len(delays) == 2
+    assert 0.0 <= delays[0] <= 0.5 and 0.0 <= delays[1] <= 1.0
+    assert backoff_delay(6, base_seconds=0.5, max_seconds=4.0, rand=lambda: 1.0) == 4.0
+
+
+def test_circuit_opens_per_destination_after_consecutive_failures():
+    calls: list[str] = []
+
+    async def send(client, url, payload):
+        calls.append(url)
+        return (False, "HTTP 502") if "down" in url else (True, None)
+
+    config = _config(concurrency=1, circuit_failure_threshold=2)
+    down = run_webhook_batch(
+        "https://down.example.test/hook", [{"n": n} for n in range(5)], send=send, config=config
+    )
+    up = run_webhook_batch(URL, [{"n": 1}], send=send, config=config)
+
+    assert down[:2] == [(False, "HTTP 502"), (False, "HTTP 502")]
+    assert down[2:] == [(False, CIRCUIT_OPEN_ERROR)] * 3
+    assert up == [(True, None)]
+    assert len(calls) == 3
+
+
+def test_webhook_sender_posts_json_over_shared_client():
+    received: list[bytes] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.content)
+        return httpx.Response(503 if b"fail" in request.content else 204)
+
+    results = asyncio.run(
+        deliver_webhooks(
+            URL,
+            [{"kind": "ok"}, {"kind": "fail"}],
+            send=CanonicalEntitlementAlertDeliveryRuntime._deliver_webhook,
+            config=_config(),
+            transport=httpx.MockTransport(handler),
+        )
+    )
+
+    assert results == [(True, None), (False, "HTTP 503")]
+    assert sorted(received) == [b'{"kind":"fail"}', b'{"kind":"ok"}']
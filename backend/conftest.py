@@ -119,3 +119,66 @@ def tmp_path(tmp_path_factory: WorkspaceTmpPathFactory) -> Path:
         yield path
     finally:
         shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def _reset_entitlement_snapshot_cache() -> None:
+    """Isole le cache process-local des snapshots d'entitlements entre les tests."""
+    # Import tardif: `app/tests/conftest.py` doit fixer DATABASE_URL avant la config.
+    from app.services.entitlement.snapshot_cache import reset_entitlement_snapshot_cache
+
+    reset_entitlement_snapshot_cache()
+    try:
+        yield
+    finally:
+        reset_entitlement_snapshot_cache()
+
+
+@pytest.fixture(autouse=True)
+def _reset_geocoding_memory_cache() -> None:
+    """Isole le niveau mémoire du cache de recherche géocodage entre les tests."""
+    from app.services.geocoding.query_cache import reset_geocoding_memory_cache
+
+    reset_geocoding_memory_cache()
+    try:
+        yield
+    finally:
+        reset_geocoding_memory_cache()
+
+
+@pytest.fixture(autouse=True)
+def _reset_geo_place_index() -> None:
+    """Isole l'index local des lieux (chargé par le lifespan ou à la résolution)."""
+    from app.services.geocoding.place_index import geo_place_index
+
+    geo_place_index.clear()
+    try:
+        yield
+    finally:
+        geo_place_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_alert_delivery_circuits() -> None:
+    """Referme les disjoncteurs webhook des alertes ops entre les tests."""
+    from app.infra.webhooks.delivery_engine import (
+        reset_alert_delivery_circuits,
+    )
+
+    reset_alert_delivery_circuits()
+    try:
+        yield
+    finally:
+        reset_alert_delivery_circuits()
+
+
+@pytest.fixture(autouse=True)
+def _reset_b2b_api_key_cache() -> None:
+    """Isole le cache process-local des clés API B2B vérifiées entre les tests."""
+    from app.services.b2b.api_key_cache import reset_api_key_cache
+
+    reset_api_key_cache()
+    try:
+        yield
+    finally:
+        reset_api_key_cache()
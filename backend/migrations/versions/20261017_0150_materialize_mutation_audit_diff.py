@@ -0,0 +1,190 @@
+# Commentaire global: migration de matérialisation du diff des audits de mutation.
+"""Materialize canonical entitlement mutation audit diffs.
+
+Revision ID: 20261017_0150
+Revises: 20260623_0149
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_0150"
+down_revision = "20260623_0149"
+branch_labels = None
+depends_on = None
+
+AUDITS_TABLE = "canonical_entitlement_mutation_audits"
+CHANGED_FIELDS_TABLE = "canonical_entitlement_mutation_audit_changed_fields"
+DIFF_COLUMNS = {
+    "change_kind": sa.String(length=32),
+    "risk_level": sa.String(length=16),
+}
+BACKFILL_BATCH_SIZE = 1000
+BINDING_FIELDS = ("is_enabled", "access_mode", "variant_code", "source_origin")
+
+audits_table = sa.table(
+    AUDITS_TABLE,
+    sa.column("id", sa.Integer()),
+    sa.column("before_payload", sa.JSON()),
+    sa.column("after_payload", sa.JSON()),
+    sa.column("change_kind", sa.String()),
+    sa.column("risk_level", sa.String()),
+)
+changed_fields_table = sa.table(
+    CHANGED_FIELDS_TABLE,
+    sa.column("audit_id", sa.Integer()),
+    sa.column("field_path", sa.String()),
+)
+
+
+def _table_names() -> set[str]:
+    """Retourne les tables visibles pour rendre la migration idempotente localement."""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _column_names(table_name: str) -> set[str]:
+    """Retourne les colonnes existantes d'une table."""
+    if table_name not in _table_names():
+        return set()
+    return {str(column["name"]) for column in sa.inspect(op.get_bind()).get_columns(table_name)}
+
+
+def _index_names(table_name: str) -> set[str]:
+    """Retourne les index existants d'une table."""
+    if table_name not in _table_names():
+        return set()
+    return {str(index["name"]) for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def _quota_key(quota: dict) -> tuple:
+    return (
+        quota.get("quota_key"),
+        quota.get("period_unit"),
+        quota.get("period_value"),
+        quota.get("reset_mode"),
+    )
+
+
+def _compute_diff(before: dict, after: dict) -> tuple[str, str, list[str]]:
+    """Copie figée de `CanonicalEntitlementMutationDiffService.compute_diff`.
+
+    Retourne `(change_kind, risk_level, changed_fields)`; la migration n'importe pas
+    le code applicatif, qui peut évoluer après elle.
+    """
+    if not before:
+        access_mode = after.get("access_mode", "")
+        risk = {"quota": "high", "disabled": "low"}.get(access_mode, "medium")
+        return "binding_created", risk, []
+
+    changed_fields = [
+        f"binding.{field}" for field in BINDING_FIELDS if before.get(field) != after.get(field)
+    ]
+    before_map = {_quota_key(quota): quota for quota in before.get("quotas", [])}
+    after_map = {_quota_key(quota): quota for quota in after.get("quotas", [])}
+    added = [key for key in after_map if key not in before_map]
+    removed = [key for key in before_map if key not in after_map]
+    limit_changes: list[tuple[object, object]] = []
+    for key, quota in after_map.items():
+        if key in before_map and before_map[key].get("quota_limit") != quota.get("quota_limit"):
+            limit_changes.append((before_map[key].get("quota_limit"), quota.get("quota_limit")))
+            changed_fields.append(f"quotas[{key[0]},{key[1]},{key[2]},{key[3]}].quota_limit")
+    changed_fields.sort()
+
+    comparable = [(old, new) for old, new in limit_changes if old is not None and new is not None]
+    if (
+        "binding.access_mode" in changed_fields
+        or "binding.is_enabled" in changed_fields
+        or removed
+        or any(new < old for old, new in comparable)
+    ):
+        risk = "high"
+    elif (
+        added
+        or "binding.variant_code" in changed_fields
+        or any(new > old for old, new in comparable)
+    ):
+        risk = "medium"
+    else:
+        risk = "low"
+    return "binding_updated", risk, changed_fields
+
+
+def _backfill_diffs() -> None:
+    """Matérialise le diff des audits existants par lots de clés croissantes."""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                audits_table.c.id,
+                audits_table.c.before_payload,
+                audits_table.c.after_payload,
+            )
+            .where(audits_table.c.risk_level.is_(None), audits_table.c.id > last_id)
+            .order_by(audits_table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        changed_field_rows: list[dict[str, object]] = []
+        for audit_id, before_payload, after_payload in rows:
+            change_kind, risk_level, changed_fields = _compute_diff(
+                before_payload or {}, after_payload or {}
+            )
+            bind.execute(
+                audits_table.update()
+                .where(audits_table.c.id == audit_id)
+                .values(change_kind=change_kind, risk_level=risk_level)
+            )
+            changed_field_rows.extend(
+                {"audit_id": audit_id, "field_path": path} for path in changed_fields
+            )
+        if changed_field_rows:
+            bind.execute(changed_fields_table.insert(), changed_field_rows)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Ajoute les colonnes de diff et la table des champs modifiés, puis les remplit."""
+    if AUDITS_TABLE not in _table_names():
+        return
+    existing_columns = _column_names(AUDITS_TABLE)
+    for column_name, column_type in DIFF_COLUMNS.items():
+        if column_name not in existing_columns:
+            op.add_column(AUDITS_TABLE, sa.Column(column_name, column_type, nullable=True))
+        index_name = f"ix_{AUDITS_TABLE}_{column_name}"
+        if index_name not in _index_names(AUDITS_TABLE):
+            op.create_index(index_name, AUDITS_TABLE, [column_name])
+
+    if CHANGED_FIELDS_TABLE not in _table_names():
+        op.create_table(
+            CHANGED_FIELDS_TABLE,
+            sa.Column("audit_id", sa.Integer(), nullable=False),
+            sa.Column("field_path", sa.String(length=255), nullable=False),
+            sa.ForeignKeyConstraint(["audit_id"], [f"{AUDITS_TABLE}.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("audit_id", "field_path"),
+        )
+    if "ix_cemacf_field_path_audit_id" not in _index_names(CHANGED_FIELDS_TABLE):
+        op.create_index(
+            "ix_cemacf_field_path_audit_id",
+            CHANGED_FIELDS_TABLE,
+            ["field_path", "audit_id"],
+        )
+    _backfill_diffs()
+
+
+def downgrade() -> None:
+    """Retire la table des champs modifiés et les colonnes de diff."""
+    if CHANGED_FIELDS_TABLE in _table_names():
+        op.drop_table(CHANGED_FIELDS_TABLE)
+    existing_columns = _column_names(AUDITS_TABLE)
+    for column_name in DIFF_COLUMNS:
+        index_name = f"ix_{AUDITS_TABLE}_{column_name}"
+        if index_name in _index_names(AUDITS_TABLE):
+            op.drop_index(index_name, table_name=AUDITS_TABLE)
+        if column_name in existing_columns:
+            with op.batch_alter_table(AUDITS_TABLE) as batch_op:
+                batch_op.drop_column(column_name)
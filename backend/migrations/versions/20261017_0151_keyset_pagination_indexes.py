@@ -0,0 +1,50 @@
+# Commentaire global: migration des index composites de pagination par curseur.
+"""Add composite (timestamp, id) indexes for keyset pagination.
+
+Revision ID: 20261017_0151
+Revises: 20261017_0150
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_0151"
+down_revision = "20261017_0150"
+branch_labels = None
+depends_on = None
+
+KEYSET_INDEXES = {
+    "ix_cema_occurred_at_id": ("canonical_entitlement_mutation_audits", ["occurred_at", "id"]),
+    "ix_audit_events_created_at_id": ("audit_events", ["created_at", "id"]),
+    "ix_cemae_created_at_id": ("canonical_entitlement_mutation_alert_events", ["created_at", "id"]),
+    "ix_stripe_webhook_events_received_at_id": ("stripe_webhook_events", ["received_at", "id"]),
+}
+
+
+def _table_names() -> set[str]:
+    """Retourne les tables visibles pour rendre la migration idempotente localement."""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _index_names(table_name: str) -> set[str]:
+    """Retourne les index existants d'une table."""
+    return {str(index["name"]) for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    """Crée les index `(horodatage, id)` utilisés par les listings ops paginés par curseur."""
+    tables = _table_names()
+    for index_name, (table_name, columns) in KEYSET_INDEXES.items():
+        if table_name in tables and index_name not in _index_names(table_name):
+            op.create_index(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    """Retire les index de pagination par curseur."""
+    tables = _table_names()
+    for index_name, (table_name, _) in KEYSET_INDEXES.items():
+        if table_name in tables and index_name in _index_names(table_name):
+            op.drop_index(index_name, table_name=table_name)
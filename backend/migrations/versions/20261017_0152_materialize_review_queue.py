@@ -0,0 +1,182 @@
+# Commentaire global: migration de la review queue matérialisée des audits de mutation.
+"""Materialize the canonical entitlement mutation review queue.
+
+Revision ID: 20261017_0152
+Revises: 20261017_0151
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_0152"
+down_revision = "20261017_0151"
+branch_labels = None
+depends_on = None
+
+AUDITS_TABLE = "canonical_entitlement_mutation_audits"
+REVIEWS_TABLE = "canonical_entitlement_mutation_audit_reviews"
+QUEUE_TABLE = "canonical_entitlement_mutation_review_queue_entries"
+QUEUE_INDEXES = {
+    "ix_cemrqe_priority_occurred_at": ["status_priority", "occurred_at", "audit_id"],
+    "ix_cemrqe_due_soon_at": ["due_soon_at"],
+    f"ix_{QUEUE_TABLE}_risk_level": ["risk_level"],
+    f"ix_{QUEUE_TABLE}_effective_review_status": ["effective_review_status"],
+}
+BACKFILL_BATCH_SIZE = 1000
+# Copie figée des règles de `app.services.canonical_entitlement.audit.review_queue`.
+STATUS_PRIORITY = {
+    "pending_review": 0,
+    "investigating": 1,
+    "acknowledged": 2,
+    "expected": 3,
+    "closed": 4,
+    None: 5,
+}
+SLA_TARGETS = {
+    ("high", "pending_review"): 14_400,
+    ("high", "investigating"): 86_400,
+    ("medium", "pending_review"): 86_400,
+    ("medium", None): 86_400,
+}
+SLA_DUE_SOON_RATIO = 0.20
+
+audits_table = sa.table(
+    AUDITS_TABLE,
+    sa.column("id", sa.Integer()),
+    sa.column("occurred_at", sa.DateTime(timezone=True)),
+    sa.column("risk_level", sa.String()),
+)
+reviews_table = sa.table(
+    REVIEWS_TABLE,
+    sa.column("audit_id", sa.Integer()),
+    sa.column("review_status", sa.String()),
+)
+queue_table = sa.table(
+    QUEUE_TABLE,
+    sa.column("audit_id", sa.Integer()),
+    sa.column("occurred_at", sa.DateTime(timezone=True)),
+    sa.column("risk_level", sa.String()),
+    sa.column("effective_review_status", sa.String()),
+    sa.column("status_priority", sa.Integer()),
+    sa.column("sla_target_seconds", sa.Integer()),
+    sa.column("due_soon_at", sa.DateTime(timezone=True)),
+    sa.column("due_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def _table_names() -> set[str]:
+    """Retourne les tables visibles pour rendre la migration idempotente localement."""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _index_names(table_name: str) -> set[str]:
+    """Retourne les index existants d'une table."""
+    return {str(index["name"]) for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def _queue_entry(
+    audit_id: int,
+    occurred_at: datetime,
+    risk_level: str,
+    review_status: str | None,
+    now: datetime,
+) -> dict[str, object]:
+    """Calcule la ligne SLA d'un audit comme `refresh_entry` au moment de la migration."""
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    if review_status is None and risk_level == "high":
+        review_status = "pending_review"
+    target = SLA_TARGETS.get((risk_level, review_status))
+    due_at = None if target is None else occurred_at + timedelta(seconds=target)
+    return {
+        "audit_id": audit_id,
+        "occurred_at": occurred_at,
+        "risk_level": risk_level,
+        "effective_review_status": review_status,
+        "status_priority": STATUS_PRIORITY.get(review_status, STATUS_PRIORITY[None]),
+        "sla_target_seconds": target,
+        "due_at": due_at,
+        "due_soon_at": (
+            None if due_at is None else due_at - timedelta(seconds=int(target * SLA_DUE_SOON_RATIO))
+        ),
+        "updated_at": now,
+    }
+
+
+def _backfill_queue_entries() -> None:
+    """Crée l'entrée de review queue des audits existants (audit et revue courante).
+
+    Les échéances sont calculées en Python: l'arithmétique de dates diffère entre
+    SQLite et PostgreSQL. Les audits sans diff matérialisé sont laissés au script
+    `scripts/backfill_mutation_audit_diffs.py`.
+    """
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                audits_table.c.id,
+                audits_table.c.occurred_at,
+                audits_table.c.risk_level,
+                reviews_table.c.review_status,
+            )
+            .select_from(
+                audits_table.outerjoin(reviews_table, reviews_table.c.audit_id == audits_table.c.id)
+            )
+            .where(
+                audits_table.c.id > last_id,
+                audits_table.c.risk_level.is_not(None),
+                ~sa.exists().where(queue_table.c.audit_id == audits_table.c.id),
+            )
+            .order_by(audits_table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            queue_table.insert(),
+            [
+                _queue_entry(row.id, row.occurred_at, row.risk_level, row.review_status, now)
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Crée la table de review queue et y inscrit les audits existants."""
+    if AUDITS_TABLE not in _table_names():
+        return
+    if QUEUE_TABLE not in _table_names():
+        op.create_table(
+            QUEUE_TABLE,
+            sa.Column("audit_id", sa.Integer(), nullable=False),
+            sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("risk_level", sa.String(length=16), nullable=False),
+            sa.Column("effective_review_status", sa.String(length=32), nullable=True),
+            sa.Column("status_priority", sa.Integer(), nullable=False),
+            sa.Column("sla_target_seconds", sa.Integer(), nullable=True),
+            sa.Column("due_soon_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(["audit_id"], [f"{AUDITS_TABLE}.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("audit_id"),
+        )
+    existing_indexes = _index_names(QUEUE_TABLE)
+    for index_name, columns in QUEUE_INDEXES.items():
+        if index_name not in existing_indexes:
+            op.create_index(index_name, QUEUE_TABLE, columns)
+    _backfill_queue_entries()
+
+
+def downgrade() -> None:
+    """Supprime la review queue matérialisée."""
+    if QUEUE_TABLE in _table_names():
+        op.drop_table(QUEUE_TABLE)
@@ -0,0 +1,75 @@
+# Commentaire global: migration de l'inbox durable des webhooks Stripe.
+"""Add inbox columns to stripe webhook events.
+
+Revision ID: 20261017_0153
+Revises: 20261017_0152
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_0153"
+down_revision = "20261017_0152"
+branch_labels = None
+depends_on = None
+
+TABLE = "stripe_webhook_events"
+INBOX_COLUMNS = {
+    "payload": sa.JSON(),
+    "stripe_customer_id": sa.String(length=255),
+    "available_at": sa.DateTime(timezone=True),
+    "claimed_at": sa.DateTime(timezone=True),
+}
+INBOX_INDEXES = {
+    "ix_stripe_webhook_events_status_id": ["status", "id"],
+    "ix_stripe_webhook_events_customer_id_id": ["stripe_customer_id", "id"],
+}
+
+
+def _table_names() -> set[str]:
+    """Retourne les tables visibles pour rendre la migration idempotente localement."""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _column_names(table_name: str) -> set[str]:
+    """Retourne les colonnes existantes d'une table."""
+    if table_name not in _table_names():
+        return set()
+    return {str(column["name"]) for column in sa.inspect(op.get_bind()).get_columns(table_name)}
+
+
+def _index_names(table_name: str) -> set[str]:
+    """Retourne les index existants d'une table."""
+    if table_name not in _table_names():
+        return set()
+    return {str(index["name"]) for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    """Ajoute payload, client Stripe et horodatages de claim utilisés par les workers."""
+    if TABLE not in _table_names():
+        return
+    existing_columns = _column_names(TABLE)
+    for column_name, column_type in INBOX_COLUMNS.items():
+        if column_name not in existing_columns:
+            op.add_column(TABLE, sa.Column(column_name, column_type, nullable=True))
+    existing_indexes = _index_names(TABLE)
+    for index_name, columns in INBOX_INDEXES.items():
+        if index_name not in existing_indexes:
+            op.create_index(index_name, TABLE, columns)
+
+
+def downgrade() -> None:
+    """Retire les index et colonnes de l'inbox."""
+    existing_indexes = _index_names(TABLE)
+    for index_name in INBOX_INDEXES:
+        if index_name in existing_indexes:
+            op.drop_index(index_name, table_name=TABLE)
+    existing_columns = _column_names(TABLE)
+    with op.batch_alter_table(TABLE) as batch_op:
+        for column_name in INBOX_COLUMNS:
+            if column_name in existing_columns:
+                batch_op.drop_column(column_name)
@@ -0,0 +1,87 @@
+# Commentaire global: migration du ledger matérialisé de réconciliation B2B.
+"""Add the B2B reconciliation ledger.
+
+Revision ID: 20261017_0154
+Revises: 20261017_0153
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261017_0154"
+down_revision = "20261017_0153"
+branch_labels = None
+depends_on = None
+
+ACCOUNTS_TABLE = "enterprise_accounts"
+LEDGER_TABLE = "enterprise_reconciliation_ledger_entries"
+LEDGER_INDEXES = {
+    "ix_enterprise_reconciliation_ledger_severity_account_period": [
+        "severity",
+        "enterprise_account_id",
+        "period_start",
+    ],
+    "ix_enterprise_reconciliation_ledger_period_start": ["period_start"],
+    f"ix_{LEDGER_TABLE}_status": ["status"],
+}
+
+
+def _table_names() -> set[str]:
+    """Retourne les tables visibles pour rendre la migration idempotente localement."""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _index_names(table_name: str) -> set[str]:
+    """Retourne les index existants d'une table."""
+    return {str(index["name"]) for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    """Crée le ledger (rempli par `scripts/rebuild_b2b_reconciliation_ledger.py`)."""
+    if ACCOUNTS_TABLE not in _table_names():
+        return
+    if LEDGER_TABLE not in _table_names():
+        op.create_table(
+            LEDGER_TABLE,
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("enterprise_account_id", sa.Integer(), nullable=False),
+            sa.Column("period_start", sa.Date(), nullable=False),
+            sa.Column("period_end", sa.Date(), nullable=False),
+            sa.Column("usage_units", sa.Integer(), nullable=False),
+            sa.Column("usage_rows", sa.Integer(), nullable=False),
+            sa.Column("billing_cycle_id", sa.Integer(), nullable=True),
+            sa.Column("billed_units", sa.Integer(), nullable=False),
+            sa.Column("billable_units", sa.Integer(), nullable=True),
+            sa.Column("total_amount_cents", sa.Integer(), nullable=True),
+            sa.Column("mismatch_type", sa.String(length=32), nullable=False),
+            sa.Column("severity", sa.String(length=16), nullable=False),
+            sa.Column("status", sa.String(length=16), nullable=False),
+            sa.Column("last_action_code", sa.String(length=32), nullable=True),
+            sa.Column("last_action_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_action_actor_user_id", sa.Integer(), nullable=True),
+            sa.Column("last_action_note", sa.Text(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["enterprise_account_id"], [f"{ACCOUNTS_TABLE}.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "enterprise_account_id",
+                "period_start",
+                "period_end",
+                name="uq_enterprise_reconciliation_ledger_account_period",
+            ),
+        )
+    existing_indexes = _index_names(LEDGER_TABLE)
+    for index_name, columns in LEDGER_INDEXES.items():
+        if index_name not in existing_indexes:
+            op.create_index(index_name, LEDGER_TABLE, columns)
+
+
+def downgrade() -> None:
+    """Supprime le ledger de réconciliation."""
+    if LEDGER_TABLE in _table_names():
+        op.drop_table(LEDGER_TABLE)
@@ -0,0 +1,124 @@
+"""Backfill des colonnes de diff et de la review queue des audits de mutation.
+
+Les migrations 20261017_0150 et 20261017_0152 matérialisent le diff et l'entrée de
+review queue des audits existants. Ce script reste l'outil de rattrapage des audits
+restés à `risk_level` NULL, qui échappent aux filtres SQL `risk_level`,
+`change_kind`, `changed_field` et `review_status`, ou sans entrée SLA. Il complète
+les deux par lots de clés croissantes et commit chaque lot; il est idempotent et
+peut être relancé après interruption.
+
+Usage:
+    python scripts/backfill_mutation_audit_diffs.py --dry-run
+    python scripts/backfill_mutation_audit_diffs.py --batch-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.infra.db.models.canonical_entitlement_mutation_audit import (
+    CanonicalEntitlementMutationAuditModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.review import (
+    CanonicalEntitlementMutationAuditReviewModel,
+)
+from app.infra.db.models.entitlement_mutation.audit.review_queue_entry import (
+    CanonicalEntitlementMutationReviewQueueEntryModel,
+)
+from app.infra.db.session import SessionLocal
+from app.services.canonical_entitlement.audit.diff_service import (
+    CanonicalEntitlementMutationDiffService,
+)
+from app.services.canonical_entitlement.audit.review_queue import (
+    CanonicalEntitlementReviewQueueService,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def _pending_clause() -> object:
+    model = CanonicalEntitlementMutationAuditModel
+    return or_(
+        model.risk_level.is_(None),
+        ~exists().where(CanonicalEntitlementMutationReviewQueueEntryModel.audit_id == model.id),
+    )
+
+
+def count_pending_audits(db: Session) -> int:
+    return (
+        db.scalar(
+            select(func.count())
+            .select_from(CanonicalEntitlementMutationAuditModel)
+            .where(_pending_clause())
+        )
+        or 0
+    )
+
+
+def backfill_mutation_audit_diffs(db: Session, *, batch_size: int = 1000) -> int:
+    """Matérialise diff et entrée de review queue manquants; retourne le nombre traité."""
+    model = CanonicalEntitlementMutationAuditModel
+    last_id = 0
+    processed = 0
+    while True:
+        audits = list(
+            db.scalars(
+                select(model)
+                .where(_pending_clause(), model.id > last_id)
+                .options(
+                    selectinload(model.changed_field_rows),
+                    selectinload(model.review_queue_entry),
+                )
+                .order_by(model.id)
+                .limit(batch_size)
+            )
+        )
+        if not audits:
+            return processed
+        reviews_by_audit_id = {
+            review.audit_id: review
+            for review in db.scalars(
+                select(CanonicalEntitlementMutationAuditReviewModel).where(
+                    CanonicalEntitlementMutationAuditReviewModel.audit_id.in_(
+                        [audit.id for audit in audits]
+                    )
+                )
+            )
+        }
+        for audit in audits:
+            if audit.risk_level is None:
+                CanonicalEntitlementMutationDiffService.apply_to_audit(audit)
+            CanonicalEntitlementReviewQueueService.refresh_entry(
+                audit, reviews_by_audit_id.get(audit.id)
+            )
+        db.commit()
+        processed += len(audits)
+        last_id = audits[-1].id
+        logger.info("mutation_audit_diff_backfill processed=%d last_id=%d", processed, last_id)
+
+
+def main(*, dry_run: bool, batch_size: int) -> None:
+    with SessionLocal() as db:
+        pending = count_pending_audits(db)
+        print(f"Audits sans diff ou entrée de review queue: {pending}")
+        if dry_run or pending == 0:
+            return
+        processed = backfill_mutation_audit_diffs(db, batch_size=batch_size)
+        print(f"✅ {processed} audit(s) backfillé(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    main(dry_run=args.dry_run, batch_size=args.batch_size)
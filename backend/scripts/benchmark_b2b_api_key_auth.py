@@ -0,0 +1,133 @@
+"""Mesure le coût d'authentification d'une clé API B2B selon le nombre de clés actives.
+
+Usage:
+    python scripts/benchmark_b2b_api_key_auth.py [--keys 1000 10000] [--rounds 500]
+
+Le benchmark monte une base SQLite en mémoire avec N comptes entreprise portant chacun
+un credential actif, puis authentifie des clés tirées au hasard:
+
+- `cold`: cache des clés vérifiées vidé avant chaque appel (requête jointe + HMAC);
+- `warm`: clés déjà vérifiées, servies par le cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+
+def _ensure_backend_root_on_path() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _measure(engine, rounds: int, operation: Callable[[int], object]) -> tuple[float, float, float]:
+    """Retourne (requêtes par appel, latence médiane en µs, p99 en µs)."""
+    from sqlalchemy import event
+
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    durations: list[float] = []
+    try:
+        for index in range(rounds):
+            started = time.perf_counter()
+            operation(index)
+            durations.append((time.perf_counter() - started) * 1_000_000)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    durations.sort()
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    return statements / rounds, statistics.median(durations), p99
+
+
+def _run(key_count: int, rounds: int) -> dict[str, tuple[float, float, float]]:
+    from secrets import token_urlsafe
+
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.core.config import settings
+    from app.infra.db.base import Base
+    from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+    from app.infra.db.models.enterprise_api_credential import EnterpriseApiCredentialModel
+    from app.infra.db.models.user import UserModel
+    from app.services.b2b.api_key_cache import reset_api_key_cache
+    from app.services.b2b.enterprise_credentials_service import EnterpriseCredentialsService
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    api_keys = [f"b2b_{token_urlsafe(32)}" for _ in range(key_count)]
+    try:
+        with Session(engine) as db:
+            db.add(UserModel(id=1, email="bench@example.com", password_hash="x", role="admin"))
+            db.execute(
+                insert(EnterpriseAccountModel),
+                [
+                    {"id": index + 1, "company_name": f"Bench {index}", "status": "active"}
+                    for index in range(key_count)
+                ],
+            )
+            db.execute(
+                insert(EnterpriseApiCredentialModel),
+                [
+                    {
+                        "enterprise_account_id": index + 1,
+                        "key_prefix": api_key[:16],
+                        "secret_hash": EnterpriseCredentialsService._hash_secret(
+                            api_key, settings.api_credentials_secret_key
+                        ),
+                        "status": "active",
+                        "created_by_user_id": 1,
+                    }
+                    for index, api_key in enumerate(api_keys)
+                ],
+            )
+            db.commit()
+            reset_api_key_cache()
+
+            picks = [random.choice(api_keys) for _ in range(rounds)]
+
+            def _authenticate(index: int) -> None:
+                EnterpriseCredentialsService.authenticate_api_key(db, api_key=picks[index])
+
+            def _cold(index: int) -> None:
+                reset_api_key_cache()
+                _authenticate(index)
+
+            results = {"cold": _measure(engine, rounds, _cold)}
+            for index in range(rounds):
+                _authenticate(index)
+            results["warm"] = _measure(engine, rounds, _authenticate)
+            return results
+    finally:
+        reset_api_key_cache()
+        engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    _ensure_backend_root_on_path()
+    print(f"{'keys':>8} {'path':<6} {'queries':>8} {'median_us':>10} {'p99_us':>10}")
+    for key_count in args.keys:
+        for path, (queries, median_us, p99_us) in _run(key_count, args.rounds).items():
+            print(f"{key_count:>8} {path:<6} {queries:>8.1f} {median_us:>10.1f} {p99_us:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Mesure requêtes et latence du snapshot d'entitlements selon le nombre de features mesurées.
+
+Usage:
+    python scripts/benchmark_entitlement_snapshot.py [--features 1 5 10 25 50] [--rounds 50]
+
+Le benchmark monte une base SQLite en mémoire avec un compte B2B dont le plan porte N
+features en mode quota (deux quotas chacune), puis compare:
+
+- `per_quota`: une lecture de compteur par quota (chemin historique);
+- `batched`: la lecture groupée `EnterpriseQuotaUsageService.get_usages`;
+- `snapshot_cold`: snapshot complet avec cache vide à chaque tour;
+- `snapshot_warm`: snapshot complet servi par le cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+
+def _ensure_backend_root_on_path() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _measure(engine, rounds: int, operation: Callable[[], object]) -> tuple[float, float]:
+    """Retourne (requêtes par appel, latence médiane en ms)."""
+    from sqlalchemy import event
+
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    durations: list[float] = []
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            operation()
+            durations.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    return statements / rounds, statistics.median(durations)
+
+
+def _run(feature_count: int, rounds: int) -> dict[str, tuple[float, float]]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.infra.db.base import Base
+    from app.infra.db.models.enterprise_account import EnterpriseAccountModel
+    from app.infra.db.models.enterprise_billing import EnterpriseAccountBillingPlanModel
+    from app.infra.db.models.product_entitlements import (
+        AccessMode,
+        Audience,
+        FeatureCatalogModel,
+        PeriodUnit,
+        PlanCatalogModel,
+        PlanFeatureBindingModel,
+        PlanFeatureQuotaModel,
+        ResetMode,
+        SourceOrigin,
+    )
+    from app.services.b2b.enterprise_quota_usage_service import EnterpriseQuotaUsageService
+    from app.services.entitlement.effective_entitlement_resolver_service import (
+        EffectiveEntitlementResolverService,
+    )
+    from app.services.entitlement.entitlement_types import QuotaDefinition
+    from app.services.entitlement.feature_scope_registry import (
+        FEATURE_SCOPE_REGISTRY,
+        FeatureScope,
+    )
+    from app.services.entitlement.snapshot_cache import reset_entitlement_snapshot_cache
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    feature_codes = [f"bench_metered_{index:03d}" for index in range(feature_count)]
+    registered = [code for code in feature_codes if code not in FEATURE_SCOPE_REGISTRY]
+    for code in registered:
+        FEATURE_SCOPE_REGISTRY[code] = FeatureScope.B2B
+
+    try:
+        with Session(engine) as db:
+            db.add(EnterpriseAccountModel(id=1, company_name="Bench", status="active"))
+            plan = PlanCatalogModel(
+                plan_code="bench_b2b",
+                plan_name="Bench",
+                audience=Audience.B2B,
+                source_type=SourceOrigin.MIGRATED_FROM_ENTERPRISE_PLAN.value,
+                source_id=1,
+            )
+            db.add(plan)
+            db.add(EnterpriseAccountBillingPlanModel(enterprise_account_id=1, plan_id=1))
+            db.flush()
+            quotas: list[tuple[str, QuotaDefinition]] = []
+            for code in feature_codes:
+                feature = FeatureCatalogModel(feature_code=code, feature_name=code)
+                db.add(feature)
+                db.flush()
+                binding = PlanFeatureBindingModel(
+                    plan_id=plan.id,
+                    feature_id=feature.id,
+                    access_mode=AccessMode.QUOTA,
+                    is_enabled=True,
+                )
+                db.add(binding)
+                db.flush()
+                for quota_key, unit in (("daily", PeriodUnit.DAY), ("monthly", PeriodUnit.MONTH)):
+                    db.add(
+                        PlanFeatureQuotaModel(
+                            plan_feature_binding_id=binding.id,
+                            quota_key=quota_key,
+                            quota_limit=1000,
+                            period_unit=unit,
+                            period_value=1,
+                            reset_mode=ResetMode.CALENDAR,
+                        )
+                    )
+                    quotas.append(
+                        (
+                            code,
+                            QuotaDefinition(
+                                quota_key=quota_key,
+                                quota_limit=1000,
+                                period_unit=unit.value,
+                                period_value=1,
+                                reset_mode="calendar",
+                            ),
+                        )
+                    )
+            db.commit()
+
+            def _per_quota() -> None:
+                for code, quota in quotas:
+                    EnterpriseQuotaUsageService.get_usage(
+                        db, account_id=1, feature_code=code, quota=quota
+                    )
+
+            def _batched() -> None:
+                EnterpriseQuotaUsageService.get_usages(db, account_id=1, quotas=quotas)
+
+            def _snapshot() -> None:
+                EffectiveEntitlementResolverService.resolve_b2b_account_snapshot(
+                    db, enterprise_account_id=1
+                )
+
+            def _snapshot_cold() -> None:
+                reset_entitlement_snapshot_cache()
+                db.expire_all()
+                _snapshot()
+
+            results = {
+                "per_quota": _measure(engine, rounds, _per_quota),
+                "batched": _measure(engine, rounds, _batched),
+                "snapshot_cold": _measure(engine, rounds, _snapshot_cold),
+            }
+            _snapshot()
+            results["snapshot_warm"] = _measure(engine, rounds, _snapshot)
+            return results
+    finally:
+        for code in registered:
+            FEATURE_SCOPE_REGISTRY.pop(code, None)
+        reset_entitlement_snapshot_cache()
+        engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    _ensure_backend_root_on_path()
+    print(f"{'features':>8} {'path':<14} {'queries':>8} {'median_ms':>10}")
+    for feature_count in args.features:
+        for path, (queries, median_ms) in _run(feature_count, args.rounds).items():
+            print(f"{feature_count:>8} {path:<14} {queries:>8.1f} {median_ms:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
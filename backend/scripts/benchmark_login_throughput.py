@@ -0,0 +1,87 @@
+"""Mesure le débit de vérification des mots de passe (chemin login) par worker de hachage.
+
+Usage:
+    python scripts/benchmark_login_throughput.py [--workers 0 1 2 4] [--threads 16]
+        [--logins 400] [--iterations 120000]
+
+`--threads` threads de requête enchaînent des vérifications PBKDF2 via
+`PasswordHasher`; `--workers 0` hache dans le thread appelant (comportement
+historique). En parallèle, un thread "route voisine" exécute une boucle Python
+courte en continu: sa latence p95 montre l'effet du GIL sur les autres routes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def _ensure_backend_root_on_path() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _bystander(stop: threading.Event, latencies: list[float]) -> None:
+    """Simule une route sans hachage: une petite boucle Python chronométrée."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        sum(range(2_000))
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.001)
+
+
+def _run(hasher, stored_hash: str, *, threads: int, logins: int) -> tuple[float, float]:
+    """Retourne (logins par seconde, p95 de la route voisine en ms)."""
+    stop = threading.Event()
+    latencies: list[float] = []
+    bystander = threading.Thread(target=_bystander, args=(stop, latencies))
+    bystander.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(
+            executor.map(lambda _: hasher.verify("bench-password", stored_hash), range(logins))
+        )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    bystander.join()
+    assert all(results)
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else 0.0
+    return logins / elapsed, p95
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=120_000)
+    args = parser.parse_args(argv)
+
+    _ensure_backend_root_on_path()
+    from app.core.security import hash_password
+    from app.services.auth.password_hasher import PasswordHasher
+
+    stored_hash = hash_password("bench-password", iterations=args.iterations)
+    print(f"{'workers':>8} {'logins/s':>10} {'par worker':>11} {'p95 route voisine':>18}")
+    for workers in args.workers:
+        hasher = PasswordHasher(workers=workers, max_pending=args.threads, timeout_seconds=600.0)
+        try:
+            if workers > 0:
+                # Démarrage du pool hors mesure.
+                hasher.verify("bench-password", stored_hash)
+            throughput, p95_ms = _run(hasher, stored_hash, threads=args.threads, logins=args.logins)
+        finally:
+            hasher.shutdown()
+        per_worker = throughput / max(workers, 1)
+        print(f"{workers:>8} {throughput:>10.1f} {per_worker:>11.1f} {p95_ms:>15.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
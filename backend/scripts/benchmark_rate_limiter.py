@@ -0,0 +1,79 @@
+"""Mesure le débit des backends de limitation de `app.core.rate_limit` sous contention.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--threads 1 2 4 8 16 32 64]
+        [--calls 20000] [--keys 1000] [--redis-url redis://localhost:6379/15]
+
+Chaque thread enchaîne `--calls` appels sur `--keys` clés partagées. Backends comparés:
+
+- `memory_1_shard`: GCRA en mémoire derrière un verrou unique;
+- `memory_sharded`: GCRA en mémoire réparti sur `--shards` verrous;
+- `redis`: script Lua GCRA, seulement si `--redis-url` est fourni.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def _ensure_backend_root_on_path() -> None:
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _throughput(backend, *, threads: int, calls: int, keys: int) -> float:
+    """Retourne le nombre d'appels `acquire` par seconde, tous threads confondus."""
+
+    def _worker(offset: int) -> None:
+        for index in range(calls):
+            backend.acquire(f"bench:{(offset + index) % keys}", limit=1_000_000, window_seconds=60)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(_worker, range(threads)))
+    return threads * calls / (time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=1_000)
+    parser.add_argument("--shards", type=int, default=32)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args(argv)
+
+    _ensure_backend_root_on_path()
+    from app.core.rate_limit import InMemoryGcraRateLimiter
+
+    factories: dict[str, Callable[[], object]] = {
+        "memory_1_shard": lambda: InMemoryGcraRateLimiter(shards=1),
+        "memory_sharded": lambda: InMemoryGcraRateLimiter(shards=args.shards),
+    }
+    if args.redis_url:
+        import redis
+
+        from app.infra.cache.redis_rate_limiter import RedisGcraRateLimiter
+
+        client = redis.Redis.from_url(args.redis_url)
+        factories["redis"] = lambda: RedisGcraRateLimiter(client, prefix="bench_rate_limit:")
+
+    print(f"{'backend':<16} {'threads':>7} {'calls_per_s':>12}")
+    for name, factory in factories.items():
+        for threads in args.threads:
+            backend = factory()
+            calls = args.calls if name != "redis" else max(1, args.calls // 10)
+            rate = _throughput(backend, threads=threads, calls=calls, keys=args.keys)
+            backend.reset()
+            print(f"{name:<16} {threads:>7} {rate:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Export complet de l'audit des droits B2B en NDJSON.
+
+Les comptes sont parcourus par lots ordonnés par id, filtrés en SQL et évalués
+en parallèle (une session par worker); la mémoire reste bornée au nombre de lots
+en vol. `--start-after` permet de reprendre un export interrompu.
+
+Usage:
+    python scripts/export_b2b_entitlement_audit.py > audit.ndjson
+    python scripts/export_b2b_entitlement_audit.py --blocker-only --workers 8
+    python scripts/export_b2b_entitlement_audit.py --resolution-source canonical_quota
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.b2b.audit_service import B2BAuditService
+
+
+def main(
+    *,
+    resolution_source: str | None,
+    blocker_only: bool,
+    start_after: int | None,
+    chunk_size: int | None,
+    workers: int | None,
+) -> None:
+    exported = 0
+    for entry in B2BAuditService.iter_b2b_entitlement_audit(
+        resolution_source_filter=resolution_source,
+        blocker_only=blocker_only,
+        start_after_account_id=start_after,
+        chunk_size=chunk_size,
+        workers=workers,
+    ):
+        sys.stdout.write(json.dumps(asdict(entry), default=str) + "\n")
+        exported += 1
+    print(f"✅ {exported} compte(s) exporté(s).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--resolution-source",
+        choices=[
+            "canonical_quota",
+            "canonical_unlimited",
+            "canonical_disabled",
+            "settings_fallback",
+        ],
+    )
+    parser.add_argument("--blocker-only", action="store_true")
+    parser.add_argument("--start-after", type=int)
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    main(
+        resolution_source=args.resolution_source,
+        blocker_only=args.blocker_only,
+        start_after=args.start_after,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
@@ -0,0 +1,56 @@
+"""Reconstruction du ledger de réconciliation B2B depuis les sources.
+
+Le ledger est tenu à jour à l'écriture (compteurs d'usage, cycles, actions) et
+reconstruit périodiquement par le scheduler. Ce script le remplit après la
+migration, ou le recale à la demande, par lots de comptes commités; il est
+idempotent et peut être relancé après interruption.
+
+Usage:
+    python scripts/rebuild_b2b_reconciliation_ledger.py --dry-run
+    python scripts/rebuild_b2b_reconciliation_ledger.py --batch-size 200
+    python scripts/rebuild_b2b_reconciliation_ledger.py --account-id 42
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import func, select
+
+from app.infra.db.models.enterprise_reconciliation_ledger import (
+    EnterpriseReconciliationLedgerEntryModel,
+)
+from app.infra.db.session import SessionLocal
+from app.services.b2b.reconciliation_service import B2BReconciliationService
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main(*, dry_run: bool, batch_size: int, account_ids: list[int] | None) -> None:
+    with SessionLocal() as db:
+        existing = (
+            db.scalar(select(func.count()).select_from(EnterpriseReconciliationLedgerEntryModel))
+            or 0
+        )
+        print(f"Lignes de ledger existantes: {existing}")
+        if dry_run:
+            return
+        written = B2BReconciliationService.recompute_ledger(
+            db, account_ids=account_ids, batch_size=batch_size
+        )
+        print(f"✅ {written} ligne(s) de ledger reconstruite(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--account-id", type=int, action="append", dest="account_ids")
+    args = parser.parse_args()
+    main(dry_run=args.dry_run, batch_size=args.batch_size, account_ids=args.account_ids)